@@ -0,0 +1,531 @@
+"""Persistencia de sujetos, usuarios, serapios y configuraciones.
+
+Hay dos almacenes con la misma interfaz:
+
+- AlmacenJSON: los archivos *.json de siempre. Los sujetos se guardan como
+  una instantánea (sujetos_guardados.json) más un diario de operaciones
+  (sujetos_guardados.jsonl) que se compacta en segundo plano.
+- AlmacenSQLite: una base SQLite embebida (debida_diligencia.db) en modo WAL,
+  donde agregar o eliminar un sujeto es una sola sentencia indexada.
+
+abrir_almacen() elige el almacén según la variable de entorno DD_ALMACEN
+('sqlite' o 'json'); por defecto usa SQLite y, la primera vez que crea la
+base, importa los archivos JSON existentes.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from modelo_caso import CAMPOS_SUJETO
+
+ARCHIVO_SUJETOS = 'sujetos_guardados.json'
+ARCHIVO_DIARIO = 'sujetos_guardados.jsonl'
+ARCHIVO_USUARIOS = 'usuarios_guardados.json'
+ARCHIVO_SERAPIOS = 'serapios_guardados.json'
+ARCHIVO_CONFIGURACIONES = 'configuraciones.json'
+ARCHIVO_BASE = 'debida_diligencia.db'
+
+# Operaciones en el diario antes de compactarlo en la instantánea
+COMPACTAR_CADA = 200
+# Sujetos por lote en leer_sujetos_por_lotes
+LOTE_LECTURA = 5000
+
+
+def _leer_json(ruta, defecto):
+    """Lee un archivo JSON; si no existe devuelve el valor por defecto"""
+    if not os.path.exists(ruta):
+        return defecto
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def nuevo_uid():
+    """Identificador único y estable de un sujeto"""
+    return uuid.uuid4().hex
+
+
+def asegurar_uid(sujetos):
+    """Asigna uid a los sujetos guardados antes de que existiera; devuelve cuántos"""
+    asignados = 0
+    for sujeto in sujetos:
+        if not sujeto.get('uid'):
+            sujeto['uid'] = nuevo_uid()
+            asignados += 1
+    return asignados
+
+
+def _escribir_json(ruta, datos):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+def _reemplazar_atomico(ruta, escribir):
+    """Escribe en un temporal y lo renombra sobre la ruta final.
+
+    Si el proceso muere a mitad de la escritura queda intacto el archivo
+    anterior; nunca uno truncado.
+    """
+    descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(ruta) + '.',
+                                           suffix='.tmp', dir=os.path.dirname(ruta) or '.')
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            escribir(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def _aplicar_operacion(sujetos, operacion):
+    """Aplica una operación del diario a la lista de sujetos"""
+    tipo = operacion['op']
+    if tipo == 'agregar':
+        sujetos.append(operacion['sujeto'])
+    elif tipo == 'agregar_varios':
+        sujetos.extend(operacion['sujetos'])
+    elif tipo == 'eliminar':
+        sujeto = operacion['sujeto']
+        try:
+            sujetos.remove(sujeto)
+        except ValueError:
+            # Sujeto de una instantánea anterior a los uid, aún sin compactar
+            sin_uid = {clave: valor for clave, valor in sujeto.items() if clave != 'uid'}
+            for posicion, guardado in enumerate(sujetos):
+                if 'uid' not in guardado and guardado == sin_uid:
+                    del sujetos[posicion]
+                    break
+    elif tipo == 'vaciar':
+        sujetos.clear()
+    else:
+        raise ValueError(f"Operación desconocida en el diario: {tipo}")
+
+
+class AlmacenJSON:
+    """Almacén basado en los archivos JSON de la aplicación.
+
+    Cada alta o baja de sujeto agrega una línea numerada al diario en lugar
+    de reescribir la lista completa. Cada COMPACTAR_CADA operaciones un hilo
+    vuelca la lista a la instantánea (con el número de la última operación
+    incluida) y recorta del diario lo que ya quedó en ella.
+
+    Con solo_lectura (para importar los archivos a otro almacén) nunca se
+    tocan los archivos: ni se recorta el diario, ni se apartan los dañados,
+    ni se compacta.
+    """
+
+    # Los sujetos se leen de una vez y bajo el mismo bloqueo que el diario:
+    # no se cargan en otro hilo mientras la aplicación ya agrega o elimina
+    LECTURA_EN_HILO = False
+
+    def __init__(self, carpeta='.', solo_lectura=False):
+        self.carpeta = carpeta
+        self.solo_lectura = solo_lectura
+        self._sujetos = []
+        self._usuarios = []
+        self._serapios = []
+        self._seq = 0
+        self._pendientes = 0
+        self._diario = None
+        self._bloqueo = threading.Lock()
+        self._compactando = None
+
+    def _ruta(self, archivo):
+        return os.path.join(self.carpeta, archivo)
+
+    # Sujetos
+    def cargar_sujetos(self):
+        """Carga la instantánea y reaplica las operaciones posteriores del diario.
+
+        Una última línea incompleta del diario (corte a mitad de escritura) se
+        descarta. Si la instantánea o el diario están dañados se apartan como
+        *.corrupto-<fecha> y se lanza ValueError, en vez de empezar en blanco
+        y sobrescribirlos.
+        """
+        ruta = self._ruta(ARCHIVO_SUJETOS)
+        ruta_diario = self._ruta(ARCHIVO_DIARIO)
+        with self._bloqueo:
+            self._cerrar_diario()
+            try:
+                instantanea = _leer_json(ruta, [])
+                # Formato antiguo: la lista de sujetos sin número de operación
+                if isinstance(instantanea, list):
+                    instantanea = {'seq': 0, 'sujetos': instantanea}
+                sujetos, seq = instantanea['sujetos'], instantanea['seq']
+                operaciones, valido = self._leer_diario(ruta_diario, reparar=not self.solo_lectura)
+            except (ValueError, KeyError, TypeError) as e:
+                if self.solo_lectura:
+                    raise ValueError(f"Archivo de sujetos dañado ({e})") from e
+                apartados = self._apartar_corruptos(ruta, ruta_diario)
+                self._sujetos, self._seq, self._pendientes = [], 0, 0
+                raise ValueError(f"Archivo de sujetos dañado ({e}); se conservó como "
+                                 f"{', '.join(apartados)}") from e
+
+            if valido is not None and not self.solo_lectura:
+                # Recortar la línea incompleta para que la próxima no quede pegada
+                with open(ruta_diario, 'r+b') as f:
+                    f.truncate(valido)
+
+            for operacion in operaciones:
+                if operacion['seq'] > seq:
+                    _aplicar_operacion(sujetos, operacion)
+                    seq = operacion['seq']
+            self._sujetos, self._seq = sujetos, seq
+            self._pendientes = len(operaciones)
+            # Los sujetos sin uid lo reciben ahora y se fijan en la próxima compactación
+            if asegurar_uid(sujetos):
+                self._pendientes = max(self._pendientes, COMPACTAR_CADA)
+        if self._pendientes >= COMPACTAR_CADA and not self.solo_lectura:
+            self.compactar(en_segundo_plano=True)
+        return list(self._sujetos)
+
+    def leer_sujetos_por_lotes(self, tamano=LOTE_LECTURA):
+        """Genera los sujetos guardados en listas de hasta tamano"""
+        sujetos = self.cargar_sujetos()
+        for inicio in range(0, len(sujetos), tamano):
+            yield sujetos[inicio:inicio + tamano]
+
+    @staticmethod
+    def _leer_diario(ruta, reparar=True):
+        """Devuelve (operaciones, largo válido si hubo que descartar la última línea).
+
+        Con reparar, a una última línea completa sin salto se le agrega el salto.
+        """
+        if not os.path.exists(ruta):
+            return [], None
+        with open(ruta, 'rb') as f:
+            contenido = f.read()
+        operaciones = []
+        inicio = 0
+        while inicio < len(contenido):
+            fin = contenido.find(b'\n', inicio)
+            linea = contenido[inicio:] if fin < 0 else contenido[inicio:fin]
+            try:
+                if linea.strip():
+                    operaciones.append(json.loads(linea))
+            except ValueError:
+                if fin < 0 or not contenido[fin + 1:].strip():
+                    return operaciones, inicio  # última línea cortada
+                raise
+            if fin < 0:
+                # Línea final completa pero sin salto: se agrega para las siguientes
+                if reparar:
+                    with open(ruta, 'ab') as f:
+                        f.write(b'\n')
+                break
+            inicio = fin + 1
+        return operaciones, None
+
+    @staticmethod
+    def _apartar_corruptos(*rutas):
+        sufijo = time.strftime('.corrupto-%Y%m%d%H%M%S')
+        apartados = []
+        for ruta in rutas:
+            if os.path.exists(ruta):
+                os.replace(ruta, ruta + sufijo)
+                apartados.append(os.path.basename(ruta + sufijo))
+        return apartados
+
+    def _registrar(self, operacion):
+        """Aplica una operación a la lista y la agrega numerada al diario.
+
+        Ambas cosas ocurren bajo el mismo bloqueo para que la compactación
+        nunca vea la lista y el número de operación desfasados.
+        """
+        with self._bloqueo:
+            _aplicar_operacion(self._sujetos, operacion)
+            self._seq += 1
+            operacion['seq'] = self._seq
+            if self._diario is None:
+                self._diario = open(self._ruta(ARCHIVO_DIARIO), 'a', encoding='utf-8')
+            self._diario.write(json.dumps(operacion, ensure_ascii=False) + '\n')
+            self._diario.flush()
+            self._pendientes += 1
+            compactar = self._pendientes >= COMPACTAR_CADA
+        if compactar:
+            self.compactar(en_segundo_plano=True)
+
+    def _cerrar_diario(self):
+        if self._diario is not None:
+            self._diario.close()
+            self._diario = None
+
+    def compactar(self, en_segundo_plano=False):
+        """Vuelca los sujetos a la instantánea y recorta el diario"""
+        if en_segundo_plano:
+            if self._compactando is not None and self._compactando.is_alive():
+                return
+            self._compactando = threading.Thread(target=self.compactar, daemon=True)
+            self._compactando.start()
+            return
+
+        with self._bloqueo:
+            sujetos, seq = list(self._sujetos), self._seq
+        _reemplazar_atomico(self._ruta(ARCHIVO_SUJETOS),
+                            lambda f: json.dump({'seq': seq, 'sujetos': sujetos}, f,
+                                                ensure_ascii=False, indent=2))
+
+        # Conservar solo las operaciones llegadas mientras se escribía
+        with self._bloqueo:
+            self._cerrar_diario()
+            ruta_diario = self._ruta(ARCHIVO_DIARIO)
+            operaciones, _ = self._leer_diario(ruta_diario)
+            restantes = [o for o in operaciones if o['seq'] > seq]
+            _reemplazar_atomico(ruta_diario, lambda f: f.writelines(
+                json.dumps(o, ensure_ascii=False) + '\n' for o in restantes))
+            self._pendientes = len(restantes)
+
+    def agregar_sujeto(self, sujeto):
+        asegurar_uid([sujeto])
+        self._registrar({'op': 'agregar', 'sujeto': sujeto})
+
+    def agregar_sujetos(self, sujetos):
+        """Agrega varios sujetos con una sola línea en el diario"""
+        sujetos = list(sujetos)
+        asegurar_uid(sujetos)
+        self._registrar({'op': 'agregar_varios', 'sujetos': sujetos})
+
+    def eliminar_sujeto(self, sujeto):
+        self._registrar({'op': 'eliminar', 'sujeto': sujeto})
+
+    def eliminar_todos_sujetos(self):
+        self._registrar({'op': 'vaciar'})
+
+    # Usuarios y serapios
+    def cargar_usuarios(self):
+        self._usuarios = _leer_json(self._ruta(ARCHIVO_USUARIOS), [])
+        return list(self._usuarios)
+
+    def agregar_usuario(self, usuario):
+        if usuario not in self._usuarios:
+            self._usuarios.append(usuario)
+            _escribir_json(self._ruta(ARCHIVO_USUARIOS), self._usuarios)
+
+    def cargar_serapios(self):
+        self._serapios = _leer_json(self._ruta(ARCHIVO_SERAPIOS), [])
+        return list(self._serapios)
+
+    def agregar_serapio(self, serapio):
+        if serapio not in self._serapios:
+            self._serapios.append(serapio)
+            _escribir_json(self._ruta(ARCHIVO_SERAPIOS), self._serapios)
+
+    # Configuraciones
+    def cargar_configuraciones(self):
+        """Devuelve las configuraciones guardadas o None si no hay"""
+        return _leer_json(self._ruta(ARCHIVO_CONFIGURACIONES), None)
+
+    def guardar_configuraciones(self, configuraciones):
+        _escribir_json(self._ruta(ARCHIVO_CONFIGURACIONES), configuraciones)
+
+    def cerrar(self):
+        if self._compactando is not None:
+            self._compactando.join()
+        if self._pendientes and not self.solo_lectura:
+            self.compactar()
+        with self._bloqueo:
+            self._cerrar_diario()
+
+
+class AlmacenSQLite:
+    """Almacén en una base SQLite con índices por identificación, gestión y nombre"""
+
+    # leer_sujetos_por_lotes usa su propia conexión: puede correr en otro hilo
+    LECTURA_EN_HILO = True
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS sujetos (
+            id INTEGER PRIMARY KEY,
+            uid TEXT,
+            nombre TEXT NOT NULL,
+            identificacion TEXT NOT NULL,
+            descripcion TEXT NOT NULL DEFAULT '',
+            id_gestion TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS ix_sujetos_identificacion ON sujetos (identificacion);
+        CREATE INDEX IF NOT EXISTS ix_sujetos_id_gestion ON sujetos (id_gestion);
+        CREATE INDEX IF NOT EXISTS ix_sujetos_nombre ON sujetos (nombre COLLATE NOCASE);
+        CREATE TABLE IF NOT EXISTS usuarios (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE);
+        CREATE TABLE IF NOT EXISTS serapios (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE);
+        CREATE TABLE IF NOT EXISTS configuracion (clave TEXT PRIMARY KEY, valor TEXT NOT NULL);
+    """
+
+    def __init__(self, ruta=ARCHIVO_BASE):
+        self.ruta = ruta
+        nueva = not os.path.exists(ruta)
+        # isolation_level=None: cada sentencia se confirma sola salvo entre
+        # BEGIN y COMMIT explícitos
+        self.conexion = sqlite3.connect(ruta, isolation_level=None)
+        self.conexion.execute('PRAGMA journal_mode=WAL')
+        self.conexion.execute('PRAGMA synchronous=NORMAL')
+        self.conexion.executescript(self.ESQUEMA)
+        self._migrar_uid()
+        if nueva:
+            try:
+                self.importar_json(os.path.dirname(os.path.abspath(ruta)))
+            except Exception:
+                # Sin importar no debe quedar una base vacía que parezca migrada
+                self.conexion.close()
+                for sufijo in ('', '-wal', '-shm'):
+                    if os.path.exists(ruta + sufijo):
+                        os.remove(ruta + sufijo)
+                raise
+
+    def _migrar_uid(self):
+        """Agrega la columna uid a bases anteriores y la completa"""
+        columnas = [fila[1] for fila in self.conexion.execute('PRAGMA table_info(sujetos)')]
+        if 'uid' not in columnas:
+            self.conexion.execute('ALTER TABLE sujetos ADD COLUMN uid TEXT')
+        sin_uid = [fila[0] for fila in self.conexion.execute('SELECT id FROM sujetos WHERE uid IS NULL')]
+        if sin_uid:
+            self.conexion.execute('BEGIN')
+            self.conexion.executemany('UPDATE sujetos SET uid = ? WHERE id = ?',
+                                      ((nuevo_uid(), id_fila) for id_fila in sin_uid))
+            self.conexion.execute('COMMIT')
+        self.conexion.execute('CREATE UNIQUE INDEX IF NOT EXISTS ix_sujetos_uid ON sujetos (uid)')
+
+    def importar_json(self, carpeta):
+        """Importa (una sola vez) los archivos JSON de una carpeta a la base.
+
+        Los archivos se leen sin modificarlos: si alguno está dañado se lanza
+        ValueError y quedan como estaban para repararlos e intentar de nuevo.
+        """
+        origen = AlmacenJSON(carpeta, solo_lectura=True)
+        try:
+            sujetos = origen.cargar_sujetos()
+            usuarios = origen.cargar_usuarios()
+            serapios = origen.cargar_serapios()
+            configuraciones = origen.cargar_configuraciones()
+        finally:
+            origen.cerrar()
+
+        self.conexion.execute('BEGIN')
+        try:
+            self.conexion.executemany(
+                'INSERT INTO sujetos (uid, nombre, identificacion, descripcion, id_gestion) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self._fila(s) for s in sujetos))
+            self.conexion.executemany('INSERT OR IGNORE INTO usuarios (nombre) VALUES (?)',
+                                      ((u,) for u in usuarios))
+            self.conexion.executemany('INSERT OR IGNORE INTO serapios (nombre) VALUES (?)',
+                                      ((s,) for s in serapios))
+            if configuraciones is not None:
+                self._guardar_configuraciones(configuraciones)
+            self.conexion.execute('COMMIT')
+        except Exception:
+            self.conexion.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _fila(sujeto):
+        return tuple(sujeto.get(campo) or '' for campo in CAMPOS_SUJETO)
+
+    # Sujetos
+    def cargar_sujetos(self):
+        cursor = self.conexion.execute(
+            'SELECT uid, nombre, identificacion, descripcion, id_gestion FROM sujetos ORDER BY id')
+        return [dict(zip(CAMPOS_SUJETO, fila)) for fila in cursor]
+
+    def leer_sujetos_por_lotes(self, tamano=LOTE_LECTURA):
+        """Genera los sujetos guardados en listas de hasta tamano, con una conexión propia.
+
+        Es una sola consulta: ve la base como estaba al empezar aunque mientras
+        tanto la conexión principal agregue o elimine sujetos.
+        """
+        conexion = sqlite3.connect(self.ruta)
+        try:
+            cursor = conexion.execute(
+                'SELECT uid, nombre, identificacion, descripcion, id_gestion FROM sujetos ORDER BY id')
+            while True:
+                filas = cursor.fetchmany(tamano)
+                if not filas:
+                    break
+                yield [dict(zip(CAMPOS_SUJETO, fila)) for fila in filas]
+        finally:
+            conexion.close()
+
+    def agregar_sujeto(self, sujeto):
+        asegurar_uid([sujeto])
+        self.conexion.execute(
+            'INSERT INTO sujetos (uid, nombre, identificacion, descripcion, id_gestion) VALUES (?, ?, ?, ?, ?)',
+            self._fila(sujeto))
+
+    def agregar_sujetos(self, sujetos):
+        """Agrega varios sujetos en una sola transacción"""
+        sujetos = list(sujetos)
+        asegurar_uid(sujetos)
+        self.conexion.execute('BEGIN')
+        try:
+            self.conexion.executemany(
+                'INSERT INTO sujetos (uid, nombre, identificacion, descripcion, id_gestion) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self._fila(s) for s in sujetos))
+            self.conexion.execute('COMMIT')
+        except Exception:
+            self.conexion.execute('ROLLBACK')
+            raise
+
+    def eliminar_sujeto(self, sujeto):
+        """Elimina el sujeto por su uid (o, sin uid, el primero con los mismos datos)"""
+        if sujeto.get('uid'):
+            self.conexion.execute('DELETE FROM sujetos WHERE uid = ?', (sujeto['uid'],))
+            return
+        self.conexion.execute(
+            'DELETE FROM sujetos WHERE id = (SELECT id FROM sujetos WHERE identificacion = ? '
+            'AND nombre = ? AND id_gestion = ? ORDER BY id LIMIT 1)',
+            (sujeto.get('identificacion') or '', sujeto.get('nombre') or '', sujeto.get('id_gestion') or ''))
+
+    def eliminar_todos_sujetos(self):
+        self.conexion.execute('DELETE FROM sujetos')
+
+    # Usuarios y serapios
+    def cargar_usuarios(self):
+        return [fila[0] for fila in self.conexion.execute('SELECT nombre FROM usuarios ORDER BY id')]
+
+    def agregar_usuario(self, usuario):
+        self.conexion.execute('INSERT OR IGNORE INTO usuarios (nombre) VALUES (?)', (usuario,))
+
+    def cargar_serapios(self):
+        return [fila[0] for fila in self.conexion.execute('SELECT nombre FROM serapios ORDER BY id')]
+
+    def agregar_serapio(self, serapio):
+        self.conexion.execute('INSERT OR IGNORE INTO serapios (nombre) VALUES (?)', (serapio,))
+
+    # Configuraciones: una fila por clave de primer nivel
+    def cargar_configuraciones(self):
+        filas = self.conexion.execute('SELECT clave, valor FROM configuracion').fetchall()
+        if not filas:
+            return None
+        return {clave: json.loads(valor) for clave, valor in filas}
+
+    def _guardar_configuraciones(self, configuraciones):
+        self.conexion.execute('DELETE FROM configuracion')
+        self.conexion.executemany(
+            'INSERT INTO configuracion (clave, valor) VALUES (?, ?)',
+            ((clave, json.dumps(valor, ensure_ascii=False)) for clave, valor in configuraciones.items()))
+
+    def guardar_configuraciones(self, configuraciones):
+        self.conexion.execute('BEGIN')
+        try:
+            self._guardar_configuraciones(configuraciones)
+            self.conexion.execute('COMMIT')
+        except Exception:
+            self.conexion.execute('ROLLBACK')
+            raise
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+def abrir_almacen(carpeta='.'):
+    """Abre el almacén indicado por DD_ALMACEN (por defecto SQLite)"""
+    tipo = os.environ.get('DD_ALMACEN', 'sqlite').strip().lower()
+    if tipo == 'json':
+        return AlmacenJSON(carpeta)
+    return AlmacenSQLite(os.path.join(carpeta, ARCHIVO_BASE))
@@ -0,0 +1,237 @@
+"""Caché persistente de los resultados del cribado en listas de restricción.
+
+Los mismos sujetos se repiten entre gestiones (proveedores habituales,
+empleados que se revisan cada año): el resultado de cribar a un sujeto en
+una lista se guarda en una base SQLite (cribado_cache.db) con clave en su
+identificación y su nombre normalizados, y se reutiliza mientras:
+
+- la lista no haya cambiado: cada resultado guarda la huella SHA-256 de la
+  lista con la que se obtuvo, y al usar una lista con otra huella se borran
+  los resultados de la versión anterior;
+- se haya pedido con el mismo umbral de similitud;
+- no haya vencido (configuraciones['cache_cribado']['dias_vigencia']).
+
+Cuando se superan max_entradas se desalojan las menos usadas recientemente.
+Los aciertos y fallos se cuentan por sesión y en total (tabla estadisticas).
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from coincidencia_nombres import normalizar_nombre
+from cribado_listas import Coincidencia, Coincidencias, normalizar_identificacion
+
+ARCHIVO_CACHE = 'cribado_cache.db'
+
+DIAS_VIGENCIA = 30
+MAX_ENTRADAS = 500000
+# Filas pendientes que fuerzan una escritura en medio de un lote
+LOTE_ESCRITURA = 500
+# Al desalojar se deja la caché en esta fracción de max_entradas
+FRACCION_DESALOJO = 0.9
+
+CONTADORES = ('aciertos', 'fallos', 'vencidas', 'invalidadas', 'desalojadas')
+
+
+def clave_sujeto(nombre, identificacion):
+    """Clave de un sujeto en la caché: identificación y nombre normalizados"""
+    return f"{normalizar_identificacion(identificacion)}\x1f{normalizar_nombre(nombre)}"
+
+
+def _con_tasa(contadores):
+    consultas = contadores['aciertos'] + contadores['fallos']
+    return dict(contadores, tasa_aciertos=contadores['aciertos'] / consultas if consultas else 0.0)
+
+
+class CacheCribado:
+    """Resultados del cribado por (sujeto, lista) en una base SQLite"""
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS cribado (
+            clave TEXT NOT NULL,
+            lista TEXT NOT NULL,
+            huella TEXT NOT NULL,
+            umbral REAL NOT NULL,
+            coincidencias TEXT NOT NULL,
+            creado REAL NOT NULL,
+            usado REAL NOT NULL,
+            PRIMARY KEY (clave, lista)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS ix_cribado_usado ON cribado (usado);
+        CREATE INDEX IF NOT EXISTS ix_cribado_lista ON cribado (lista, huella);
+        CREATE TABLE IF NOT EXISTS estadisticas (contador TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+    """
+
+    def __init__(self, ruta=ARCHIVO_CACHE, dias_vigencia=DIAS_VIGENCIA, max_entradas=MAX_ENTRADAS):
+        self.ruta = ruta
+        self.vigencia = dias_vigencia * 86400
+        self.max_entradas = max_entradas
+        # isolation_level=None: las lecturas no abren transacción; las escrituras se
+        # juntan en memoria y se hacen en ráfagas cortas (BEGIN IMMEDIATE) para no
+        # bloquear a los otros procesos de generar_lote mientras se busca en las listas
+        self.conexion = sqlite3.connect(ruta, isolation_level=None, timeout=30)
+        self.conexion.execute('PRAGMA journal_mode=WAL')
+        self.conexion.execute('PRAGMA synchronous=NORMAL')
+        self.conexion.executescript(self.ESQUEMA)
+        self.sesion = dict.fromkeys(CONTADORES, 0)
+        self._pendientes = dict.fromkeys(CONTADORES, 0)  # Aún no sumados a la tabla estadisticas
+        self._huellas = {}  # lista -> huella ya revisada en esta sesión
+        self._nuevas = {}  # (clave, lista) -> fila por escribir
+        self._usadas = {}  # (clave, lista) -> momento del último acierto, por escribir
+        self._en_lote = 0
+        self._entradas = self._contar_entradas()
+
+    @classmethod
+    def desde_configuraciones(cls, configuraciones, carpeta='.'):
+        """Caché según configuraciones['cache_cribado'], o None si está desactivada"""
+        opciones = (configuraciones or {}).get('cache_cribado') or {}
+        dias = opciones.get('dias_vigencia', DIAS_VIGENCIA)
+        if not opciones.get('activa', True) or dias <= 0:
+            return None
+        return cls(os.path.join(carpeta, ARCHIVO_CACHE), dias, opciones.get('max_entradas', MAX_ENTRADAS))
+
+    def _contar_entradas(self):
+        return self.conexion.execute('SELECT COUNT(*) FROM cribado').fetchone()[0]
+
+    def _contar(self, contador, cantidad=1):
+        self.sesion[contador] += cantidad
+        self._pendientes[contador] += cantidad
+
+    def _lista(self, lista):
+        """Identificador de la lista; borra lo guardado con otra versión (una vez por sesión)"""
+        ruta = os.path.abspath(lista.ruta_lista or lista.ruta_indice)
+        if self._huellas.get(ruta) != lista.huella:
+            borradas = self.conexion.execute('DELETE FROM cribado WHERE lista = ? AND huella <> ?',
+                                             (ruta, lista.huella)).rowcount
+            if borradas > 0:
+                self._contar('invalidadas', borradas)
+                self._entradas -= borradas
+            self._nuevas = {llave: fila for llave, fila in self._nuevas.items()
+                            if llave[1] != ruta or fila[2] == lista.huella}
+            self._huellas[ruta] = lista.huella
+        return ruta
+
+    def obtener(self, lista, nombre, identificacion, umbral):
+        """Coincidencias guardadas del sujeto en la lista, o None si no hay vigentes"""
+        llave = (clave_sujeto(nombre, identificacion), self._lista(lista))
+        nueva = self._nuevas.get(llave)
+        if nueva is not None:
+            fila = (nueva[2], nueva[3], nueva[4], nueva[5])
+        else:
+            fila = self.conexion.execute(
+                'SELECT huella, umbral, coincidencias, creado FROM cribado WHERE clave = ? AND lista = ?',
+                llave).fetchone()
+        ahora = time.time()
+        if fila is None or fila[0] != lista.huella or fila[1] != umbral:
+            self._contar('fallos')
+            return None
+        if self.vigencia and ahora - fila[3] > self.vigencia:
+            self._contar('vencidas')
+            self._contar('fallos')
+            return None
+        # El uso (para desalojar las menos usadas) se escribe con el resto de la ráfaga
+        self._usadas[llave] = ahora
+        self._contar('aciertos')
+        guardadas = json.loads(fila[2])
+        return Coincidencias((Coincidencia(puntaje, motivo, nombre_lista, programa, tuple(ids), archivo)
+                              for puntaje, motivo, nombre_lista, programa, ids, archivo
+                              in guardadas['coincidencias']), guardadas['sin_comparar'])
+
+    def guardar(self, lista, nombre, identificacion, umbral, coincidencias):
+        llave = (clave_sujeto(nombre, identificacion), self._lista(lista))
+        ahora = time.time()
+        guardadas = json.dumps({'coincidencias': coincidencias, 'sin_comparar': coincidencias.sin_comparar},
+                               ensure_ascii=False)
+        self._nuevas[llave] = (*llave, lista.huella, umbral, guardadas, ahora, ahora)
+        if not self._en_lote or len(self._nuevas) + len(self._usadas) >= LOTE_ESCRITURA:
+            self.escribir()
+
+    def buscar(self, lista, nombre, identificacion, umbral):
+        """Coincidencias del sujeto en la lista: de la caché o, si no están, del buscador"""
+        coincidencias = self.obtener(lista, nombre, identificacion, umbral)
+        if coincidencias is None:
+            coincidencias = lista.buscar(nombre, identificacion, umbral)
+            self.guardar(lista, nombre, identificacion, umbral, coincidencias)
+        return coincidencias
+
+    def escribir(self):
+        """Escribe en una transacción corta lo pendiente: resultados nuevos, usos y contadores"""
+        if not (self._nuevas or self._usadas or any(self._pendientes.values())):
+            return
+        nuevas, usadas = self._nuevas, self._usadas
+        self.conexion.execute('BEGIN IMMEDIATE')
+        try:
+            self.conexion.executemany(
+                'INSERT OR REPLACE INTO cribado (clave, lista, huella, umbral, coincidencias, creado, usado) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', nuevas.values())
+            self.conexion.executemany('UPDATE cribado SET usado = ? WHERE clave = ? AND lista = ?',
+                                      [(usado, *llave) for llave, usado in usadas.items() if llave not in nuevas])
+            # Cuenta aproximada (un reemplazo también suma): se corrige al desalojar
+            self._entradas += len(nuevas)
+            if self._entradas > self.max_entradas:
+                self._desalojar()
+            self.conexion.executemany(
+                'INSERT INTO estadisticas (contador, valor) VALUES (?, ?) '
+                'ON CONFLICT (contador) DO UPDATE SET valor = valor + excluded.valor',
+                [(contador, valor) for contador, valor in self._pendientes.items() if valor])
+            self.conexion.execute('COMMIT')
+        except BaseException:
+            self.conexion.execute('ROLLBACK')
+            raise
+        self._nuevas, self._usadas = {}, {}
+        self._pendientes = dict.fromkeys(CONTADORES, 0)
+
+    def _desalojar(self):
+        """Borra las entradas usadas hace más tiempo hasta quedar bajo el máximo"""
+        self._entradas = self._contar_entradas()
+        sobrantes = self._entradas - int(self.max_entradas * FRACCION_DESALOJO)
+        if self._entradas <= self.max_entradas or sobrantes <= 0:
+            return
+        self.conexion.execute(
+            'DELETE FROM cribado WHERE (clave, lista) IN '
+            '(SELECT clave, lista FROM cribado ORDER BY usado LIMIT ?)', (sobrantes,))
+        self._contar('desalojadas', sobrantes)
+        self._entradas -= sobrantes
+
+    @contextmanager
+    def lote(self):
+        """Junta las escrituras de un cribado en ráfagas de hasta LOTE_ESCRITURA filas.
+
+        Las búsquedas en las listas se hacen fuera de toda transacción; lo
+        pendiente se escribe al salir, aunque el cribado se detenga a mitad.
+        """
+        self._en_lote += 1
+        try:
+            yield self
+        finally:
+            self._en_lote -= 1
+            if not self._en_lote:
+                self.escribir()
+
+    def estadisticas(self):
+        """Contadores de la sesión y acumulados, con la tasa de aciertos, y entradas guardadas"""
+        total = dict.fromkeys(CONTADORES, 0)
+        total.update(self.conexion.execute('SELECT contador, valor FROM estadisticas'))
+        for contador, valor in self._pendientes.items():
+            total[contador] += valor
+        return {'sesion': _con_tasa(self.sesion), 'total': _con_tasa(total), 'entradas': self._contar_entradas()}
+
+    def limpiar_vencidas(self):
+        """Borra las entradas vencidas y devuelve cuántas eran"""
+        if not self.vigencia:
+            return 0
+        borradas = self.conexion.execute('DELETE FROM cribado WHERE creado < ?',
+                                         (time.time() - self.vigencia,)).rowcount
+        self._entradas = self._contar_entradas()
+        return borradas
+
+    def vaciar(self):
+        self.conexion.execute('DELETE FROM cribado')
+        self._huellas, self._nuevas, self._usadas = {}, {}, {}
+        self._entradas = 0
+
+    def cerrar(self):
+        self.escribir()
+        self.conexion.close()
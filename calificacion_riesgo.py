@@ -0,0 +1,113 @@
+"""Calificación del nivel de riesgo de los sujetos según una política configurable.
+
+La política (configuraciones['politica_riesgo']) da un peso a cada estado de
+resultado y otro a cada fuente. El puntaje de un sujeto es la suma, por
+fuente, de peso de la fuente × peso del estado de su resultado, y los
+umbrales lo convierten en nivel: bajo por debajo de 'medio', medio desde
+'medio' y alto desde 'alto'. El nivel del caso es el más alto de sus sujetos.
+
+El cálculo se hace por columnas con NumPy sobre la TablaResultados: cada
+columna de códigos de estado se lee como arreglo sin copiarla, de modo que
+recalificar cientos de miles de sujetos tras cambiar la política es cuestión
+de milisegundos. numpy se importa dentro de las funciones: la interfaz usa
+este módulo al arrancar solo por la política predeterminada.
+"""
+from modelo_caso import NOMBRES_ESTADO, NIVELES_RIESGO, NIVEL_AUTOMATICO
+
+
+def politica_default():
+    """Política de riesgo predeterminada"""
+    return {
+        'pesos_estado': {
+            'Pendiente': 0,
+            'Sin coincidencias': 0,
+            'Con coincidencias': 1,
+            'No disponible': 0.5
+        },
+        'pesos_fuente': {
+            'Ministerio Público': 3,
+            'Diarios Hondureños': 1,
+            'Listas de restricción': 3,
+            'OFAC': 5,
+            'Infornet': 1
+        },
+        'peso_fuente_default': 1,  # Fuentes sin peso propio
+        'umbrales': {'medio': 1, 'alto': 3}
+    }
+
+
+def validar_politica(politica):
+    """Completa la política con los valores predeterminados y la valida.
+
+    Lanza ValueError si un peso o umbral no es numérico, si un estado no
+    existe o si el umbral 'alto' es menor que el 'medio'.
+    """
+    completa = politica_default()
+    for clave, valor in (politica or {}).items():
+        if isinstance(completa.get(clave), dict):
+            completa[clave] = dict(completa[clave], **valor)
+        else:
+            completa[clave] = valor
+
+    def numero(valor, que):
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            raise ValueError(f"{que} debe ser un número (se recibió {valor!r})")
+        return valor
+
+    for estado, peso in completa['pesos_estado'].items():
+        if estado not in NOMBRES_ESTADO:
+            raise ValueError(f"Estado desconocido en la política de riesgo: {estado!r}")
+        numero(peso, f"El peso del estado '{estado}'")
+    for fuente, peso in completa['pesos_fuente'].items():
+        numero(peso, f"El peso de la fuente '{fuente}'")
+    numero(completa['peso_fuente_default'], "El peso de fuente predeterminado")
+    medio = numero(completa['umbrales'].get('medio'), "El umbral 'medio'")
+    alto = numero(completa['umbrales'].get('alto'), "El umbral 'alto'")
+    if alto < medio:
+        raise ValueError("El umbral 'alto' no puede ser menor que el 'medio'")
+    return completa
+
+
+def politica_de(configuraciones):
+    """Política validada de unas configuraciones (las guardadas antes pueden no tenerla)"""
+    return validar_politica(configuraciones.get('politica_riesgo'))
+
+
+def puntajes(tabla, politica):
+    """Arreglo con el puntaje de cada fila de la tabla de resultados"""
+    import numpy as np
+
+    pesos_estado = np.array([politica['pesos_estado'].get(nombre, 0) for nombre in NOMBRES_ESTADO],
+                            dtype=np.float64)
+    total = np.zeros(len(tabla), dtype=np.float64)
+    if not len(tabla):
+        return total
+    for fuente in tabla.fuentes:
+        peso = politica['pesos_fuente'].get(fuente, politica['peso_fuente_default'])
+        if peso:
+            codigos = np.frombuffer(tabla.estados[fuente], dtype=np.uint8)
+            total += peso * pesos_estado[codigos]
+    return total
+
+
+def niveles(puntajes_filas, politica):
+    """Código de nivel (índice de NIVELES_RIESGO) de cada puntaje"""
+    import numpy as np
+
+    umbrales = [politica['umbrales']['medio'], politica['umbrales']['alto']]
+    return np.searchsorted(umbrales, puntajes_filas, side='right').astype(np.uint8)
+
+
+def calificar_caso(caso, tabla, configuraciones):
+    """Nivel de riesgo del caso y lista con el de cada sujeto.
+
+    Si el caso trae un nivel elegido a mano, ese vale para todos; con
+    NIVEL_AUTOMATICO se calcula con la política de las configuraciones.
+    """
+    nivel = caso['nivel_riesgo']
+    if nivel != NIVEL_AUTOMATICO:
+        return nivel, [nivel] * len(caso['sujetos'])
+    politica = politica_de(configuraciones)
+    codigos = niveles(puntajes(tabla, politica), politica)
+    nivel_caso = NIVELES_RIESGO[int(codigos.max())] if len(codigos) else NIVELES_RIESGO[0]
+    return nivel_caso, [NIVELES_RIESGO[codigo] for codigo in codigos.tolist()]
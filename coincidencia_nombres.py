@@ -0,0 +1,169 @@
+"""Coincidencia aproximada de nombres de personas y empresas.
+
+Los nombres se comparan plegados (sin tildes, diéresis ni mayúsculas, ñ
+como n), sin partículas (de, del, la...) y con las palabras ordenadas, de
+modo que 'Jose Perez', 'José Pérez' y 'PÉREZ, José' quedan iguales. Cada
+palabra tiene además una clave fonética pensada para el español (b/v,
+c/s/z, ll/y, h muda...), para tolerar variantes de escritura.
+
+IndiceNombres agrupa los nombres en bloques por clave fonética y por
+prefijo de cada palabra: una consulta solo compara contra los nombres que
+comparten bloques con ella, nunca contra toda la lista. A todos ellos se les
+calcula primero una cota barata de la similitud; la comparación completa se
+hace solo con los de mejor cota.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+PARTICULAS = frozenset({'de', 'del', 'la', 'las', 'los', 'y', 'e', 'da', 'di', 'van', 'von'})
+
+# Similitud mínima (0 a 1) para considerar dos nombres como posible duplicado
+UMBRAL_SIMILITUD = 0.85
+# Umbral más permisivo para el modo de búsqueda aproximada
+UMBRAL_BUSQUEDA = 0.7
+
+# Nombres que se comparan por completo (ratio) como máximo en una consulta,
+# elegidos por su cota de similitud
+MAX_COMPARACIONES = 300
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+# Reglas fonéticas, en orden, sobre palabras ya plegadas
+_REGLAS_FONETICAS = [(re.compile(patron), reemplazo) for patron, reemplazo in [
+    (r'ch', 'x'),
+    (r'ph', 'f'),
+    (r'h', ''),
+    (r'qu([ei])', r'k\1'),
+    (r'c([ei])', r's\1'),
+    (r'gu([ei])', r'g\1'),
+    (r'g([ei])', r'j\1'),
+    (r'll', 'y'),
+    (r'y$', 'i'),
+    (r'[cq]', 'k'),
+    (r'z', 's'),
+    (r'v', 'b'),
+    (r'w', 'u'),
+    (r'(.)\1+', r'\1'),
+]]
+
+
+def plegar(texto):
+    """Minúsculas sin tildes ni signos; las palabras quedan separadas por un espacio"""
+    descompuesto = unicodedata.normalize('NFKD', str(texto))
+    sin_marcas = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(' ', sin_marcas.casefold()).strip()
+
+
+def palabras_nombre(texto):
+    """Palabras significativas del nombre, plegadas"""
+    palabras = plegar(texto).split()
+    significativas = [p for p in palabras if p not in PARTICULAS]
+    return significativas or palabras
+
+
+def normalizar_nombre(texto):
+    """Forma canónica para comparar: palabras plegadas y ordenadas"""
+    return ' '.join(sorted(palabras_nombre(texto)))
+
+
+@lru_cache(maxsize=65536)
+def clave_fonetica(palabra):
+    """Clave fonética aproximada de una palabra plegada"""
+    for patron, reemplazo in _REGLAS_FONETICAS:
+        palabra = patron.sub(reemplazo, palabra)
+    return palabra
+
+
+def formas_nombre(texto):
+    """(forma ordenada, forma fonética ordenada, claves de bloque) de un nombre"""
+    palabras = palabras_nombre(texto)
+    foneticas = [clave_fonetica(p) for p in palabras]
+    bloques = {'f' + f for f in foneticas if f} | {'p' + p[:4] for p in palabras}
+    return ' '.join(sorted(palabras)), ' '.join(sorted(foneticas)), bloques
+
+
+def similitud(nombre_a, nombre_b):
+    """Similitud entre 0 y 1 de dos nombres escritos libremente"""
+    a, fa, _ = formas_nombre(nombre_a)
+    b, fb, _ = formas_nombre(nombre_b)
+    return max(SequenceMatcher(None, a, b).ratio(), SequenceMatcher(None, fa, fb).ratio())
+
+
+def _cota_largo(a, b):
+    """Máxima similitud (ratio) posible entre textos de estos largos"""
+    return 2 * min(len(a), len(b)) / (len(a) + len(b)) if a or b else 1.0
+
+
+class IndiceNombres:
+    """Índice por bloques para encontrar nombres parecidos.
+
+    Cada nombre se registra con una clave elegida por quien llama (por
+    ejemplo, la posición del sujeto en su lista).
+    """
+
+    def __init__(self):
+        self.vaciar()
+
+    def vaciar(self):
+        self._bloques = {}
+        self._formas = {}
+
+    def __len__(self):
+        return len(self._formas)
+
+    def agregar(self, clave, nombre):
+        ordenada, fonetica, bloques = formas_nombre(nombre)
+        self._formas[clave] = (ordenada, fonetica, bloques)
+        for bloque in bloques:
+            self._bloques.setdefault(bloque, []).append(clave)
+
+    def eliminar(self, clave):
+        formas = self._formas.pop(clave, None)
+        if formas is None:
+            return
+        for bloque in formas[2]:
+            claves = self._bloques.get(bloque)
+            if claves is not None:
+                claves.remove(clave)
+                if not claves:
+                    del self._bloques[bloque]
+
+    def candidatos(self, nombre, limite=10, umbral=UMBRAL_SIMILITUD):
+        """Lista de (similitud, clave) de los nombres parecidos, de mayor a menor"""
+        ordenada, fonetica, bloques = formas_nombre(nombre)
+        if not ordenada:
+            return []
+
+        compartidos = set()
+        for bloque in bloques:
+            compartidos.update(self._bloques.get(bloque, ()))
+        comparar = SequenceMatcher(None, b=ordenada)
+        comparar_fonetica = SequenceMatcher(None, b=fonetica)
+
+        # Cota superior de todos los que comparten algún bloque: primero la del
+        # largo, sin mirar los caracteres, y después quick_ratio
+        cotas = []
+        for clave in compartidos:
+            otra, otra_fonetica, _ = self._formas[clave]
+            if (_cota_largo(ordenada, otra) < umbral
+                    and _cota_largo(fonetica, otra_fonetica) < umbral):
+                continue
+            comparar.set_seq1(otra)
+            comparar_fonetica.set_seq1(otra_fonetica)
+            cota = max(comparar.quick_ratio(), comparar_fonetica.quick_ratio())
+            if cota >= umbral:
+                cotas.append((cota, clave))
+        cotas.sort(key=lambda par: -par[0])
+
+        resultado = []
+        for _, clave in cotas[:MAX_COMPARACIONES]:
+            otra, otra_fonetica, _ = self._formas[clave]
+            comparar.set_seq1(otra)
+            comparar_fonetica.set_seq1(otra_fonetica)
+            puntaje = max(comparar.ratio(), comparar_fonetica.ratio())
+            if puntaje >= umbral:
+                resultado.append((round(puntaje, 3), clave))
+        resultado.sort(key=lambda par: -par[0])
+        return resultado[:limite]
@@ -0,0 +1,678 @@
+"""Cribado local de sujetos contra listas de restricción (OFAC y otras).
+
+Las listas son archivos en disco: el SDN de OFAC en XML (sdn.xml) o CSV
+(sdn.csv, con alt.csv al lado para los alias), o un CSV propio con
+encabezado (nombre, alias, identificacion, programa). Cada archivo se
+compila una sola vez en un índice binario a su lado (<archivo>.ddidx) que se
+abre con mmap, de modo que abrir una lista de cientos de miles de entradas
+no la carga en memoria. El índice se recompila solo cuando el archivo de la
+lista cambia (tamaño, fecha o huella SHA-256).
+
+El índice guarda, por cada nombre y alias, su forma ordenada y su forma
+fonética (coincidencia_nombres) y listas de posiciones por clave de bloque;
+las identificaciones normalizadas van en una tabla ordenada aparte. Una
+consulta cuenta con NumPy los nombres que comparten más bloques con el
+buscado y solo esos se comparan; una identificación igual es coincidencia
+segura.
+
+Los resultados por sujeto y lista pueden guardarse en una caché persistente
+(cache_cribado) para no repetir la búsqueda de quienes vuelven a cribarse.
+
+Funciona sin conexión. Uso desde la línea de comandos:
+    python cribado_listas.py sdn.xml --sujetos sujetos.csv --salida coincidencias.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from array import array
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import date
+from difflib import SequenceMatcher
+
+import numpy as np
+
+from coincidencia_nombres import formas_nombre, plegar
+from modelo_caso import ESTADO_PENDIENTE, ESTADO_SIN_COINCIDENCIAS, ESTADO_CON_COINCIDENCIAS
+
+EXTENSION_INDICE = '.ddidx'
+MAGIA = b'DDCRIB01'
+VERSION_FORMATO = 1
+
+# Similitud mínima de nombres para reportar una posible coincidencia
+UMBRAL_CRIBADO = 0.88
+# Nombres de la lista que se comparan por completo (ratio) como máximo por consulta;
+# los que pasan la cota barata y quedan fuera se informan en sin_comparar
+MAX_CANDIDATOS = 200
+# Bloques con más nombres que esto se ignoran si la consulta tiene otros
+LIMITE_BLOQUE = 20000
+# Largo mínimo de una identificación normalizada para buscarla
+MIN_LARGO_ID = 5
+# Cada cuántos sujetos se informa el progreso del cribado
+AVISAR_CADA = 200
+
+SEPARADOR_IDS = '|'
+CAMPOS_ENTRADA = 3  # nombre, programa, identificaciones
+
+
+class CribadoCancelado(Exception):
+    """La función de progreso pidió detener el cribado"""
+
+
+# Entrada de una lista, tal como se lee del archivo
+Entrada = namedtuple('Entrada', 'nombre alias identificaciones programa')
+# Posible coincidencia de un sujeto con una entrada de lista
+Coincidencia = namedtuple('Coincidencia', 'puntaje motivo nombre programa identificaciones lista')
+
+
+class Coincidencias(list):
+    """Coincidencias de un sujeto, de mayor a menor puntaje.
+
+    sin_comparar cuenta los nombres parecidos que no llegaron a compararse
+    por superar MAX_CANDIDATOS: si no es cero, el resultado no es concluyente.
+    """
+
+    def __init__(self, coincidencias=(), sin_comparar=0):
+        super().__init__(coincidencias)
+        self.sin_comparar = sin_comparar
+
+
+COLUMNAS_LISTA = {
+    'nombre': 'nombre',
+    'name': 'nombre',
+    'nombre completo': 'nombre',
+    'sdn name': 'nombre',
+    'alias': 'alias',
+    'aliases': 'alias',
+    'aka': 'alias',
+    'identificacion': 'identificaciones',
+    'identificaciones': 'identificaciones',
+    'id': 'identificaciones',
+    'documento': 'identificaciones',
+    'id number': 'identificaciones',
+    'programa': 'programa',
+    'program': 'programa',
+    'lista': 'programa',
+}
+
+# Documentos mencionados en las observaciones del SDN en CSV
+_PATRON_ID_NOTAS = re.compile(
+    r'(?:No\.|Number|ID|Passport|C[eé]dula|RTN|NIT|DNI|RUC|Identification)\s*:?\s*#?\s*'
+    r'([A-Z0-9][A-Z0-9-]{4,})', re.IGNORECASE)
+
+
+def normalizar_identificacion(texto):
+    """Identificación sin guiones, espacios ni mayúsculas"""
+    return plegar(texto).replace(' ', '')
+
+
+def _clave(texto):
+    """Entero de 64 bits con el que se guarda una clave en el índice"""
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+# Lectura de las listas
+def _codificacion(ruta):
+    """utf-8-sig si el inicio del archivo es UTF-8 válido; si no, latin-1"""
+    with open(ruta, 'rb') as f:
+        muestra = f.read(65536)
+    try:
+        muestra.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.start < len(muestra) - 4:  # No es solo un carácter cortado al final
+            return 'latin-1'
+    return 'utf-8-sig'
+
+
+def _vacio_sdn(valor):
+    valor = (valor or '').strip()
+    return '' if valor == '-0-' else valor
+
+
+def _ids_notas(notas):
+    return tuple(m for m in _PATRON_ID_NOTAS.findall(notas or '') if any(c.isdigit() for c in m))
+
+
+def _leer_csv(ruta):
+    codificacion = _codificacion(ruta)
+    with open(ruta, 'r', encoding=codificacion, newline='') as f:
+        filas = csv.reader(f)
+        primera = next(filas, None)
+        if primera is None:
+            return []
+        columnas = [COLUMNAS_LISTA.get(plegar(c).replace('_', ' ')) for c in primera]
+        if 'nombre' in columnas:
+            return list(_leer_csv_propio(filas, columnas))
+        return list(_leer_sdn_csv(ruta, [primera], filas, codificacion))
+
+
+def _leer_csv_propio(filas, columnas):
+    for fila in filas:
+        datos = {'nombre': '', 'alias': '', 'identificaciones': '', 'programa': ''}
+        for columna, valor in zip(columnas, fila):
+            if columna:
+                datos[columna] = valor.strip()
+        if datos['nombre']:
+            yield Entrada(datos['nombre'],
+                          tuple(a.strip() for a in datos['alias'].split(';') if a.strip()),
+                          tuple(i.strip() for i in datos['identificaciones'].split(';') if i.strip()),
+                          datos['programa'])
+
+
+def _leer_sdn_csv(ruta, iniciales, filas, codificacion):
+    """sdn.csv de OFAC: sin encabezado; nombre en la 2.ª columna, programa en la 4.ª y notas en la 12.ª"""
+    alias = {}
+    ruta_alt = os.path.join(os.path.dirname(ruta), 'alt.csv')
+    if os.path.basename(ruta).lower() == 'sdn.csv' and os.path.exists(ruta_alt):
+        with open(ruta_alt, 'r', encoding=_codificacion(ruta_alt), newline='') as f:
+            for fila in csv.reader(f):
+                if len(fila) > 3 and _vacio_sdn(fila[3]):
+                    alias.setdefault(fila[0].strip(), []).append(_vacio_sdn(fila[3]))
+
+    for fila in (f for grupo in (iniciales, filas) for f in grupo):
+        if len(fila) < 2 or not _vacio_sdn(fila[1]):
+            continue
+        notas = _vacio_sdn(fila[11]) if len(fila) > 11 else ''
+        yield Entrada(_vacio_sdn(fila[1]), tuple(alias.get(fila[0].strip(), ())), _ids_notas(notas),
+                      _vacio_sdn(fila[3]) if len(fila) > 3 else '')
+
+
+def _leer_sdn_xml(ruta):
+    """sdn.xml de OFAC; devuelve (fecha de publicación, entradas)"""
+    def etiqueta(elemento):
+        return elemento.tag.rsplit('}', 1)[-1]
+
+    def hijo(elemento, nombre):
+        for sub in elemento:
+            if etiqueta(sub) == nombre:
+                return (sub.text or '').strip()
+        return ''
+
+    def nombre_completo(elemento):
+        return ' '.join(p for p in (hijo(elemento, 'firstName'), hijo(elemento, 'lastName')) if p)
+
+    version = None
+    entradas = []
+    for _, elemento in ET.iterparse(ruta, events=('end',)):
+        nombre = etiqueta(elemento)
+        if nombre == 'Publish_Date':
+            version = (elemento.text or '').strip() or None
+        elif nombre == 'sdnEntry':
+            alias, ids, programas = [], [], []
+            for sub in elemento.iter():
+                tipo = etiqueta(sub)
+                if tipo == 'aka':
+                    alias.append(nombre_completo(sub))
+                elif tipo == 'idNumber' and sub.text:
+                    ids.append(sub.text.strip())
+                elif tipo == 'program' and sub.text:
+                    programas.append(sub.text.strip())
+            entrada = nombre_completo(elemento)
+            if entrada:
+                entradas.append(Entrada(entrada, tuple(a for a in alias if a), tuple(ids), ', '.join(programas)))
+            elemento.clear()
+    return version, entradas
+
+
+def leer_lista(ruta):
+    """(versión publicada o None, lista de Entrada) de un archivo de lista"""
+    if ruta.lower().endswith('.xml'):
+        return _leer_sdn_xml(ruta)
+    return None, _leer_csv(ruta)
+
+
+# Índice en disco
+def huella_archivo(ruta):
+    """SHA-256 del contenido del archivo"""
+    suma = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            suma.update(bloque)
+    return suma.hexdigest()
+
+
+def compilar_indice(ruta_lista, ruta_indice=None):
+    """Lee la lista y escribe su índice binario; devuelve la ruta del índice.
+
+    Formato: cabecera (MAGIA, posición y largo de los metadatos), secciones
+    alineadas a 8 bytes con arrays en el orden de bytes de la máquina, y al
+    final los metadatos en JSON con la posición de cada sección.
+    """
+    ruta_indice = ruta_indice or ruta_lista + EXTENSION_INDICE
+    estado = os.stat(ruta_lista)
+    huella = huella_archivo(ruta_lista)
+    version, entradas = leer_lista(ruta_lista)
+
+    cadenas = []  # CAMPOS_ENTRADA por entrada
+    formas = []  # forma ordenada y fonética por nombre
+    nombre_entrada = array('I')
+    bloques = {}  # clave -> nombres
+    ids = []  # (clave, entrada)
+    for numero, entrada in enumerate(entradas):
+        normalizadas = list(dict.fromkeys(
+            n for n in map(normalizar_identificacion, entrada.identificaciones) if len(n) >= MIN_LARGO_ID))
+        cadenas += [entrada.nombre, entrada.programa, SEPARADOR_IDS.join(normalizadas)]
+        ids += [(_clave(n), numero) for n in normalizadas]
+        for nombre in dict.fromkeys((entrada.nombre,) + entrada.alias):
+            ordenada, fonetica, claves = formas_nombre(nombre)
+            if not ordenada:
+                continue
+            posicion = len(nombre_entrada)
+            nombre_entrada.append(numero)
+            formas += [ordenada, fonetica]
+            for clave in claves:
+                lista = bloques.get(clave)
+                if lista is None:
+                    lista = bloques[clave] = array('I')
+                lista.append(posicion)
+
+    codificadas = [c.encode('utf-8') for c in cadenas + formas]
+    posiciones = array('I', [0])
+    for texto in codificadas:
+        posiciones.append(posiciones[-1] + len(texto))
+
+    claves_bloque = sorted((_clave(clave), lista) for clave, lista in bloques.items())
+    inicio_bloque = array('I', [0])
+    postings = array('I')
+    for _, lista in claves_bloque:
+        postings.extend(lista)
+        inicio_bloque.append(len(postings))
+    ids.sort()
+
+    secciones = [
+        ('textos', b''.join(codificadas), 'B'),
+        ('posiciones', posiciones, 'I'),
+        ('nombre_entrada', nombre_entrada, 'I'),
+        ('claves_bloque', array('Q', [clave for clave, _ in claves_bloque]), 'Q'),
+        ('inicio_bloque', inicio_bloque, 'I'),
+        ('bloques', postings, 'I'),
+        ('claves_id', array('Q', [clave for clave, _ in ids]), 'Q'),
+        ('id_entrada', array('I', [numero for _, numero in ids]), 'I'),
+    ]
+    metadatos = {
+        'version_formato': VERSION_FORMATO,
+        'orden_bytes': sys.byteorder,
+        'archivo': os.path.basename(ruta_lista),
+        'tamano': estado.st_size,
+        'modificado_ns': estado.st_mtime_ns,
+        'huella': huella,
+        'version_lista': version,
+        'entradas': len(cadenas) // CAMPOS_ENTRADA,
+        'nombres': len(nombre_entrada),
+        'secciones': {},
+    }
+
+    # Se escribe en un temporal y se reemplaza: nunca queda un índice a medias
+    descriptor, temporal = tempfile.mkstemp(prefix='.~', suffix=EXTENSION_INDICE,
+                                            dir=os.path.dirname(os.path.abspath(ruta_indice)))
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(struct.pack('<8sQQ', MAGIA, 0, 0))
+            for nombre, datos, tipo in secciones:
+                inicio = f.tell()
+                f.write(datos if isinstance(datos, bytes) else datos.tobytes())
+                metadatos['secciones'][nombre] = [inicio, len(datos), tipo]
+                f.write(b'\0' * (-f.tell() % 8))
+            inicio_metadatos = f.tell()
+            texto = json.dumps(metadatos).encode('utf-8')
+            f.write(texto)
+            f.seek(0)
+            f.write(struct.pack('<8sQQ', MAGIA, inicio_metadatos, len(texto)))
+        os.replace(temporal, ruta_indice)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return ruta_indice
+
+
+def _leer_metadatos(ruta_indice):
+    with open(ruta_indice, 'rb') as f:
+        magia, inicio, largo = struct.unpack('<8sQQ', f.read(24))
+        if magia != MAGIA:
+            raise ValueError(f"{ruta_indice} no es un índice de lista")
+        f.seek(inicio)
+        return json.loads(f.read(largo))
+
+
+def indice_vigente(ruta_lista, ruta_indice):
+    """True si el índice existe y corresponde al contenido actual de la lista"""
+    try:
+        metadatos = _leer_metadatos(ruta_indice)
+    except (OSError, ValueError):
+        return False
+    if metadatos.get('version_formato') != VERSION_FORMATO or metadatos.get('orden_bytes') != sys.byteorder:
+        return False
+    estado = os.stat(ruta_lista)
+    if estado.st_size == metadatos['tamano'] and estado.st_mtime_ns == metadatos['modificado_ns']:
+        return True
+    # Tocado pero quizás igual (copiado de nuevo, por ejemplo): decide la huella
+    return estado.st_size == metadatos['tamano'] and huella_archivo(ruta_lista) == metadatos['huella']
+
+
+class ListaIndexada:
+    """Lista de restricción abierta desde su índice con mmap"""
+
+    def __init__(self, ruta_indice, ruta_lista=None):
+        self.ruta_indice = ruta_indice
+        self.ruta_lista = ruta_lista
+        self.metadatos = _leer_metadatos(ruta_indice)
+        with open(ruta_indice, 'rb') as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        tipos = {'B': np.uint8, 'I': np.uint32, 'Q': np.uint64}
+        self._arreglos = {
+            nombre: np.frombuffer(self._mapa, dtype=tipos[tipo], count=largo, offset=inicio)
+            for nombre, (inicio, largo, tipo) in self.metadatos['secciones'].items()}
+        self._inicio_textos = self.metadatos['secciones']['textos'][0]
+        self._base_formas = self.metadatos['entradas'] * CAMPOS_ENTRADA
+
+    @classmethod
+    def abrir(cls, ruta_lista, reconstruir=False):
+        """Abre la lista, compilando antes su índice si falta o quedó viejo"""
+        ruta_indice = ruta_lista + EXTENSION_INDICE
+        if reconstruir or not indice_vigente(ruta_lista, ruta_indice):
+            compilar_indice(ruta_lista, ruta_indice)
+        return cls(ruta_indice, ruta_lista)
+
+    def cerrar(self):
+        # Los arreglos de NumPy apuntan al mmap: hay que soltarlos antes de cerrarlo
+        self._arreglos = {}
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return self.metadatos['entradas']
+
+    @property
+    def huella(self):
+        return self.metadatos['huella']
+
+    @property
+    def version(self):
+        """Fecha de publicación de la lista o, si no la trae, el inicio de su huella"""
+        return self.metadatos['version_lista'] or self.huella[:12]
+
+    @property
+    def descripcion(self):
+        return f"{self.metadatos['archivo']} (versión {self.version})"
+
+    def _texto(self, numero):
+        posiciones = self._arreglos['posiciones']
+        inicio = self._inicio_textos + int(posiciones[numero])
+        return self._mapa[inicio:self._inicio_textos + int(posiciones[numero + 1])].decode('utf-8')
+
+    def entrada(self, numero):
+        """(nombre, programa, identificaciones normalizadas) de una entrada"""
+        base = numero * CAMPOS_ENTRADA
+        ids = self._texto(base + 2)
+        return self._texto(base), self._texto(base + 1), tuple(ids.split(SEPARADOR_IDS)) if ids else ()
+
+    def _candidatos(self, claves):
+        """Todos los nombres que comparten al menos la mitad de los bloques de la consulta"""
+        claves_bloque = self._arreglos['claves_bloque']
+        if not len(claves_bloque):
+            return np.empty(0, dtype=np.int64)
+        buscadas = np.array([_clave(clave) for clave in claves], dtype=np.uint64)
+        posiciones = np.minimum(np.searchsorted(claves_bloque, buscadas), len(claves_bloque) - 1)
+        posiciones = posiciones[claves_bloque[posiciones] == buscadas]
+        inicio_bloque, postings = self._arreglos['inicio_bloque'], self._arreglos['bloques']
+        tramos = sorted((postings[inicio_bloque[p]:inicio_bloque[p + 1]] for p in posiciones), key=len)
+        if not tramos:
+            return np.empty(0, dtype=np.int64)
+        tramos = [t for t in tramos if len(t) <= LIMITE_BLOQUE] or tramos[:1]
+        if len(tramos) == 1:
+            return tramos[0].astype(np.int64)
+        nombres, compartidos = np.unique(np.concatenate(tramos), return_counts=True)
+        return nombres[compartidos >= (len(tramos) + 1) // 2].astype(np.int64)
+
+    def _histogramas(self, textos):
+        """Largo y cantidad de cada byte (fila de 128) de los textos dados por número"""
+        posiciones, datos = self._arreglos['posiciones'], self._arreglos['textos']
+        inicios = posiciones[textos].astype(np.int64)
+        largos = posiciones[textos + 1].astype(np.int64) - inicios
+        filas = np.repeat(np.arange(len(textos)), largos)
+        desde_inicio = np.arange(int(largos.sum())) - np.repeat(np.cumsum(largos) - largos, largos)
+        caracteres = datos[np.repeat(inicios, largos) + desde_inicio]
+        return largos, np.bincount(filas * 128 + caracteres, minlength=len(textos) * 128).reshape(-1, 128)
+
+    def _cotas(self, candidatos, formas_buscadas):
+        """Cota superior de la similitud de cada candidato: la de quick_ratio, calculada con NumPy.
+
+        quick_ratio cuenta los caracteres en común sin importar el orden; las
+        formas son ASCII, así que bastan histogramas de bytes. Se toma la mejor
+        de las dos formas (ordenada y fonética), igual que el puntaje.
+        """
+        cotas = np.zeros(len(candidatos))
+        for desplazamiento, buscada in enumerate(formas_buscadas):
+            codigos = np.frombuffer(buscada.encode('ascii'), dtype=np.uint8)
+            largos, histogramas = self._histogramas(self._base_formas + 2 * candidatos + desplazamiento)
+            comunes = np.minimum(histogramas, np.bincount(codigos, minlength=128)).sum(axis=1)
+            cotas = np.maximum(cotas, 2.0 * comunes / np.maximum(largos + len(codigos), 1))
+        return cotas
+
+    def buscar(self, nombre, identificacion='', umbral=UMBRAL_CRIBADO):
+        """Posibles coincidencias de un sujeto (Coincidencias, una por entrada).
+
+        Los candidatos se filtran con una cota superior barata de la similitud
+        (_cotas), que nunca descarta uno que alcance el umbral; solo los
+        MAX_CANDIDATOS con mejor cota se comparan por completo y el resto se
+        cuenta en sin_comparar.
+        """
+        mejores = {}  # entrada -> (puntaje, motivo)
+        sin_comparar = 0
+
+        buscada = normalizar_identificacion(identificacion)
+        if len(buscada) >= MIN_LARGO_ID:
+            claves_id, id_entrada = self._arreglos['claves_id'], self._arreglos['id_entrada']
+            clave = np.uint64(_clave(buscada))
+            posicion = int(np.searchsorted(claves_id, clave))
+            while posicion < len(claves_id) and claves_id[posicion] == clave:
+                numero = int(id_entrada[posicion])
+                if buscada in self.entrada(numero)[2]:
+                    mejores[numero] = (1.0, 'identificación')
+                posicion += 1
+
+        ordenada, fonetica, claves = formas_nombre(nombre)
+        if ordenada:
+            comparar = SequenceMatcher(None, b=ordenada)
+            comparar_fonetica = SequenceMatcher(None, b=fonetica)
+            nombre_entrada = self._arreglos['nombre_entrada']
+            candidatos = self._candidatos(claves)
+            if mejores:
+                candidatos = candidatos[~np.isin(nombre_entrada[candidatos], list(mejores))]
+            cotas = self._cotas(candidatos, (ordenada, fonetica))
+            alcanzan = cotas >= umbral
+            candidatos, cotas = candidatos[alcanzan], cotas[alcanzan]
+            sin_comparar = max(0, len(candidatos) - MAX_CANDIDATOS)
+            for posicion in candidatos[np.argsort(-cotas, kind='stable')[:MAX_CANDIDATOS]].tolist():
+                numero = int(nombre_entrada[posicion])
+                comparar.set_seq1(self._texto(self._base_formas + 2 * posicion))
+                comparar_fonetica.set_seq1(self._texto(self._base_formas + 2 * posicion + 1))
+                puntaje = round(max(comparar.ratio(), comparar_fonetica.ratio()), 3)
+                if puntaje >= umbral and puntaje > mejores.get(numero, (0, ''))[0]:
+                    mejores[numero] = (puntaje, 'nombre')
+
+        coincidencias = Coincidencias(sin_comparar=sin_comparar)
+        for numero, (puntaje, motivo) in mejores.items():
+            nombre_lista, programa, ids = self.entrada(numero)
+            coincidencias.append(Coincidencia(puntaje, motivo, nombre_lista, programa, ids,
+                                              self.metadatos['archivo']))
+        coincidencias.sort(key=lambda c: -c.puntaje)
+        return coincidencias
+
+
+# Listas abiertas en este proceso, por ruta del archivo de lista
+_abiertas = {}
+
+
+def abrir_lista(ruta_lista):
+    """ListaIndexada de un archivo, reutilizando la ya abierta si el índice sigue vigente"""
+    ruta_lista = os.path.abspath(ruta_lista)
+    lista = _abiertas.get(ruta_lista)
+    if lista is not None:
+        if indice_vigente(ruta_lista, lista.ruta_indice):
+            return lista
+        lista.cerrar()
+    lista = _abiertas[ruta_lista] = ListaIndexada.abrir(ruta_lista)
+    return lista
+
+
+def listas_configuradas(configuraciones):
+    """{fuente: [ListaIndexada]} según configuraciones['listas_cribado']"""
+    return {fuente: [abrir_lista(ruta) for ruta in rutas]
+            for fuente, rutas in (configuraciones.get('listas_cribado') or {}).items() if rutas}
+
+
+def _con_aviso(sujetos, progreso):
+    """Recorre los sujetos llamando a progreso(hechos, total) cada AVISAR_CADA"""
+    total = len(sujetos)
+    for posicion, sujeto in enumerate(sujetos):
+        if progreso is not None and posicion % AVISAR_CADA == 0:
+            progreso(posicion, total)
+        yield posicion, sujeto
+    if progreso is not None:
+        progreso(total, total)
+
+
+def _buscar_en(listas, sujeto, umbral, cache=None):
+    nombre, identificacion = sujeto['nombre'], sujeto['identificacion']
+    coincidencias = Coincidencias()
+    for lista in listas:
+        if cache is None:
+            encontradas = lista.buscar(nombre, identificacion, umbral)
+        else:
+            encontradas = cache.buscar(lista, nombre, identificacion, umbral)
+        coincidencias.extend(encontradas)
+        coincidencias.sin_comparar += encontradas.sin_comparar
+    coincidencias.sort(key=lambda c: -c.puntaje)
+    return coincidencias
+
+
+def _en_lote(cache):
+    return cache.lote() if cache is not None else nullcontext()
+
+
+def cribar(sujetos, listas, umbral=UMBRAL_CRIBADO, progreso=None, cache=None):
+    """Genera (posición, coincidencias) de cada sujeto contra todas las listas dadas.
+
+    progreso(hechos, total) se llama cada AVISAR_CADA sujetos; puede lanzar
+    CribadoCancelado para detener el cribado. Con una cache (CacheCribado)
+    los sujetos ya cribados con la misma versión de cada lista no se buscan
+    de nuevo.
+    """
+    with _en_lote(cache):
+        for posicion, sujeto in _con_aviso(sujetos, progreso):
+            yield posicion, _buscar_en(listas, sujeto, umbral, cache)
+
+
+def resultado_cribado(coincidencias, listas):
+    """(texto, código de estado) para la tabla de resultados.
+
+    Si quedaron nombres parecidos sin comparar y no hubo coincidencias, el
+    resultado queda Pendiente de revisión manual en vez de Sin coincidencias.
+    """
+    revisar = ''
+    if coincidencias.sin_comparar:
+        revisar = (f" Revisar manualmente: {coincidencias.sin_comparar} nombres parecidos "
+                   f"de la lista no se compararon.")
+    if not coincidencias:
+        if revisar:
+            return f"Cribado no concluyente.{revisar}", ESTADO_PENDIENTE
+        return (f"Sin coincidencias en {', '.join(lista.descripcion for lista in listas)}.",
+                ESTADO_SIN_COINCIDENCIAS)
+    detalle = '; '.join(f"{c.nombre} ({c.programa or c.lista}, {c.puntaje:.0%} por {c.motivo})"
+                        for c in coincidencias[:3])
+    if len(coincidencias) > 3:
+        detalle += f" y {len(coincidencias) - 3} más"
+    return f"Posible coincidencia: {detalle}.{revisar}", ESTADO_CON_COINCIDENCIAS
+
+
+def cribar_resultados(sujetos, listas_por_fuente, umbral=UMBRAL_CRIBADO, progreso=None, cache=None):
+    """Genera (posición, fuente, texto, estado) del cribado de cada sujeto en cada fuente"""
+    with _en_lote(cache):
+        for posicion, sujeto in _con_aviso(sujetos, progreso):
+            for fuente, listas in listas_por_fuente.items():
+                texto, estado = resultado_cribado(_buscar_en(listas, sujeto, umbral, cache), listas)
+                yield posicion, fuente, texto, estado
+
+
+def escribir_en_tabla(resultados, filas, tabla):
+    """Escribe en la tabla, con la fecha de hoy, los (posición, fuente, texto, estado) del cribado.
+
+    filas da la fila de la tabla de cada posición; los resultados de fuentes
+    que la tabla no tiene se ignoran. Devuelve cuántos sujetos tuvieron
+    alguna posible coincidencia.
+    """
+    hoy = date.today().toordinal()
+    con_coincidencias = set()
+    for posicion, fuente, texto, estado in resultados:
+        if fuente not in tabla.fuentes:
+            continue
+        tabla.establecer(filas[posicion], fuente, texto=texto, estado=estado, fecha=hoy)
+        if estado == ESTADO_CON_COINCIDENCIAS:
+            con_coincidencias.add(posicion)
+    return len(con_coincidencias)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Criba sujetos contra listas de restricción locales")
+    parser.add_argument('lista', nargs='+', help="Archivos de lista (sdn.xml, sdn.csv o CSV propio)")
+    parser.add_argument('--sujetos', help="CSV con columnas nombre e identificacion")
+    parser.add_argument('--salida', help="CSV donde escribir las posibles coincidencias")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_CRIBADO,
+                        help=f"Similitud mínima de nombres (por defecto {UMBRAL_CRIBADO})")
+    parser.add_argument('--reconstruir', action='store_true', help="Recompila los índices aunque estén vigentes")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="No usa ni actualiza la caché de resultados (cribado_cache.db)")
+    args = parser.parse_args(argv)
+
+    listas = [ListaIndexada.abrir(ruta, reconstruir=args.reconstruir) for ruta in args.lista]
+    for lista in listas:
+        print(f"{lista.descripcion}: {len(lista)} entradas, {lista.metadatos['nombres']} nombres")
+    if not args.sujetos:
+        return 0
+
+    with open(args.sujetos, 'r', encoding='utf-8-sig', newline='') as f:
+        sujetos = [{'nombre': fila.get('nombre', ''), 'identificacion': fila.get('identificacion', '')}
+                   for fila in csv.DictReader(f)]
+    cache = None
+    if not args.sin_cache:
+        from cache_cribado import CacheCribado
+        cache = CacheCribado()
+    salida = open(args.salida, 'w', encoding='utf-8-sig', newline='') if args.salida else sys.stdout
+    try:
+        escritor = csv.writer(salida)
+        escritor.writerow(['nombre', 'identificacion', 'puntaje', 'motivo', 'nombre_lista', 'programa', 'lista'])
+        for posicion, coincidencias in cribar(sujetos, listas, args.umbral, cache=cache):
+            if coincidencias.sin_comparar:
+                print(f"Aviso: {sujetos[posicion]['nombre']}: {coincidencias.sin_comparar} nombres parecidos "
+                      f"sin comparar; revise manualmente", file=sys.stderr)
+            for c in coincidencias:
+                escritor.writerow([sujetos[posicion]['nombre'], sujetos[posicion]['identificacion'],
+                                   c.puntaje, c.motivo, c.nombre, c.programa, c.lista])
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+        if cache is not None:
+            sesion = cache.estadisticas()['sesion']
+            cache.cerrar()
+            print(f"Caché: {sesion['aciertos']} aciertos, {sesion['fallos']} fallos "
+                  f"({sesion['tasa_aciertos']:.0%})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Datos de un caso de debida diligencia y sus valores por defecto.
+
+Módulo liviano (solo biblioteca estándar): la interfaz lo usa al arrancar
+sin cargar python-docx ni pandas, que quedan en motor_informes y se
+importan recién al generar documentos.
+"""
+import locale
+from datetime import datetime
+
+from calificacion_riesgo import politica_default
+from modelo_caso import (RESULTADO_DEFAULT, ESTADO_SIN_COINCIDENCIAS, NIVEL_AUTOMATICO, TablaResultados,
+                         estado_desde_texto, fecha_desde_texto)
+
+TITULO_DEFAULT = 'INFORME DE DEBIDA DILIGENCIA'
+FUENTE_INFO_DEFAULT = 'Búsqueda en medios de comunicación hondureños y bases de datos públicas y privadas.'
+
+MESES = {
+    1: 'enero', 2: 'febrero', 3: 'marzo', 4: 'abril',
+    5: 'mayo', 6: 'junio', 7: 'julio', 8: 'agosto',
+    9: 'septiembre', 10: 'octubre', 11: 'noviembre', 12: 'diciembre'
+}
+DIAS = {
+    0: 'lunes', 1: 'martes', 2: 'miércoles', 3: 'jueves',
+    4: 'viernes', 5: 'sábado', 6: 'domingo'
+}
+
+
+def configurar_locale():
+    """Configura el locale para español (nombres de meses en las fechas)"""
+    try:
+        locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
+    except locale.Error:
+        try:
+            locale.setlocale(locale.LC_TIME, 'Spanish_Spain.1252')
+        except locale.Error:
+            pass
+
+
+def fecha_en_espanol(momento=None):
+    """Devuelve la fecha en formato 'lunes 1 de enero de 2024'"""
+    ahora = momento or datetime.now()
+    return f"{DIAS[ahora.weekday()]} {ahora.day} de {MESES[ahora.month]} de {ahora.year}"
+
+
+def configuraciones_default():
+    """Configuraciones predeterminadas del sistema"""
+    return {
+        'tipos_solicitud': ['proveedor', 'cliente', 'socio', 'empleado', 'otro'],
+        'fuentes_investigacion': [
+            'Ministerio Público',
+            'Diarios Hondureños',
+            'Listas de restricción',
+            'OFAC',
+            'Infornet'
+        ],
+        'nombres_pestanas': {
+            'fecha_solicitud': 'Fecha de Solicitud',
+            'usuario_requirente': 'Usuario Requirente',
+            'tipo_solicitud': 'Tipo de Solicitud',
+            'descripcion': 'Descripción',
+            'serapio': 'Serapio',
+            'fuente_info': 'Fuente de Información'
+        },
+        'titulo_documento': TITULO_DEFAULT,
+        'politica_riesgo': politica_default(),
+        'listas_cribado': {},  # fuente -> archivos de lista para el cribado local
+        # Caché de resultados del cribado (cache_cribado); dias_vigencia 0 la desactiva
+        'cache_cribado': {'activa': True, 'dias_vigencia': 30, 'max_entradas': 500000}
+    }
+
+
+def plantilla_default():
+    """Textos predeterminados de la plantilla del informe"""
+    return {
+        'objetivo': 'Cumplir con lo establecido en la normativa de prevención de lavado de activos',
+        'conclusion_template': 'Tras el análisis de las fuentes consultadas y la información disponible públicamente, no se han identificado indicios que sugieran la existencia de riesgos reputacionales o legales relevantes asociados a {nombres}. Por lo tanto, se considera que el nivel de riesgo de esta operación, en relación con el lavado de activos, es **{nivel_riesgo}**.',
+        'compromiso': 'El área de Cumplimiento reitera su compromiso en cumplir con todos los requerimientos establecidos en las leyes nacionales y estándares internacionales.',
+        'lugar_emision': 'Tegucigalpa, Honduras',
+        'jefe_cumplimiento': '',
+        'analista': '',
+        'incisos_adicionales': []  # Nueva lista para incisos personalizados
+    }
+
+
+def caso_desde_dict(datos, configuraciones=None):
+    """Completa un caso con los mismos valores por defecto que el formulario.
+
+    Un caso es un diccionario con los datos generales de la gestión, la lista
+    de sujetos, los resultados por fuente, el nivel de riesgo y la plantilla.
+    Cada sujeto puede traer sus propios "resultados" por fuente, como texto
+    o como {"resultado", "estado", "fecha"}; las fuentes que no trae toman
+    los resultados del caso. Todos quedan en 'tabla_resultados'. Sin
+    nivel de riesgo, se calcula con la política de riesgo al generar.
+    """
+    configuraciones = configuraciones or configuraciones_default()
+    plantilla = plantilla_default()
+    plantilla.update(datos.get('plantilla') or {})
+
+    id_gestion = str(datos.get('id_gestion') or '').strip()
+    sujetos = []
+    propios = []
+    for sujeto in datos.get('sujetos') or []:
+        propios.append(sujeto.get('resultados') or {})
+        sujetos.append({
+            'nombre': str(sujeto.get('nombre', '')).strip(),
+            'identificacion': str(sujeto.get('identificacion', '')).strip(),
+            'descripcion': str(sujeto.get('descripcion') or '').strip(),
+            'id_gestion': str(sujeto.get('id_gestion') or id_gestion).strip()
+        })
+
+    resultados = {}
+    resultados_dados = datos.get('resultados') or {}
+    for fuente in configuraciones['fuentes_investigacion']:
+        resultados[fuente] = str(resultados_dados.get(fuente, RESULTADO_DEFAULT))
+
+    tabla = TablaResultados.uniforme(len(sujetos), resultados)
+    for fila, resultados_sujeto in enumerate(propios):
+        for fuente, valor in resultados_sujeto.items():
+            if fuente not in resultados:
+                continue
+            if not isinstance(valor, dict):
+                valor = {'resultado': valor}
+            tabla.establecer(fila, fuente,
+                             texto=str(valor.get('resultado', resultados[fuente])),
+                             estado=estado_desde_texto(valor.get('estado', ESTADO_SIN_COINCIDENCIAS)),
+                             fecha=fecha_desde_texto(valor.get('fecha')))
+
+    return {
+        'id_gestion': id_gestion,
+        'fecha_solicitud': datos.get('fecha_solicitud') or datetime.now().strftime("%d de %B del %Y"),
+        'usuario_requirente': datos.get('usuario_requirente', ''),
+        'tipo_solicitud': datos.get('tipo_solicitud', 'proveedor'),
+        'descripcion': datos.get('descripcion', 'Solicitud de permisos'),
+        'serapio': datos.get('serapio', ''),
+        'fuente_info': datos.get('fuente_info', FUENTE_INFO_DEFAULT),
+        'sujetos': sujetos,
+        'resultados': resultados,
+        'tabla_resultados': tabla,
+        'nivel_riesgo': datos.get('nivel_riesgo') or NIVEL_AUTOMATICO,
+        'plantilla': plantilla
+    }
+
+
+def validar_caso(caso):
+    """Verifica que el caso tenga lo mínimo para generar documentos"""
+    if not caso['sujetos']:
+        raise ValueError("Debe agregar al menos un sujeto de investigación")
+    for sujeto in caso['sujetos']:
+        if not sujeto['nombre'] or not sujeto['identificacion']:
+            raise ValueError("Cada sujeto debe tener al menos nombre e identificación")
+
+
+def nombre_archivo_seguro(texto):
+    """Convierte un texto en un fragmento válido para nombres de archivo"""
+    limpio = ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(texto).strip())
+    return limpio.strip('_') or 'sin_id'
@@ -0,0 +1,327 @@
+"""Generación desatendida de informes de debida diligencia por lotes.
+
+Uso:
+    python generar_lote.py casos.json --salida informes/
+    python generar_lote.py casos.csv --salida informes/ --formatos word,excel
+    python generar_lote.py casos.json --salida informes/ --trabajadores 8
+    python generar_lote.py casos.json --formatos "" --consolidado base.xlsx
+    python generar_lote.py casos.csv --salida informes/ --cribar
+
+El archivo JSON puede ser una lista de casos o un objeto con la clave "casos".
+Cada caso usa las mismas claves que el formulario (id_gestion, fecha_solicitud,
+usuario_requirente, tipo_solicitud, descripcion, serapio, fuente_info,
+nivel_riesgo, resultados, plantilla) y una lista de "sujetos"; cada sujeto
+puede traer sus propios "resultados" por fuente.
+
+En CSV cada fila es un sujeto; las filas se agrupan en casos por id_gestion.
+La descripción del sujeto va en la columna "descripcion_sujeto" y el resultado
+de cada fuente en una columna con el nombre de la fuente; opcionalmente, su
+estado y su fecha (dd/mm/aaaa) en "<fuente> (estado)" y "<fuente> (fecha)".
+
+Con --cribar, los resultados de las fuentes que tienen listas de restricción
+en configuraciones ("listas_cribado") se llenan cribando cada sujeto contra
+esas listas (ver cribado_listas). Las listas se abren una vez por proceso y
+los sujetos ya cribados con la misma versión de cada lista se toman de la
+caché de resultados (ver cache_cribado). La base consolidada reutiliza el
+cribado hecho para los informes.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cache_cribado
+import cribado_listas
+import datos_informe
+import motor_informes
+
+CAMPOS_CASO = ['fecha_solicitud', 'usuario_requirente', 'tipo_solicitud', 'descripcion',
+               'serapio', 'fuente_info', 'nivel_riesgo']
+
+
+def cargar_configuraciones(ruta):
+    """Carga configuraciones desde archivo o usa las predeterminadas"""
+    if ruta and os.path.exists(ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return datos_informe.configuraciones_default()
+
+
+def leer_casos_json(ruta):
+    """Lee los casos de un archivo JSON"""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    if isinstance(datos, dict):
+        datos = datos.get('casos', [datos])
+    return datos
+
+
+def leer_casos_csv(ruta, configuraciones):
+    """Lee un CSV de sujetos y los agrupa en casos por ID de gestión"""
+    casos = {}
+    with open(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+        for fila in csv.DictReader(f):
+            id_gestion = (fila.get('id_gestion') or '').strip()
+            caso = casos.get(id_gestion)
+            if caso is None:
+                caso = {'id_gestion': id_gestion, 'sujetos': []}
+                for campo in CAMPOS_CASO:
+                    if fila.get(campo):
+                        caso[campo] = fila[campo]
+                casos[id_gestion] = caso
+
+            # Resultados de este sujeto, con estado y fecha si vienen
+            resultados = {}
+            for fuente in configuraciones['fuentes_investigacion']:
+                if fila.get(fuente):
+                    resultados[fuente] = {'resultado': fila[fuente]}
+                    for campo in ('estado', 'fecha'):
+                        if fila.get(f"{fuente} ({campo})"):
+                            resultados[fuente][campo] = fila[f"{fuente} ({campo})"]
+
+            caso['sujetos'].append({
+                'nombre': fila.get('nombre', ''),
+                'identificacion': fila.get('identificacion', ''),
+                'descripcion': fila.get('descripcion_sujeto', ''),
+                'id_gestion': id_gestion,
+                'resultados': resultados
+            })
+    return list(casos.values())
+
+
+def leer_casos(ruta, configuraciones):
+    """Lee los casos según la extensión del archivo de entrada"""
+    if ruta.lower().endswith('.csv'):
+        return leer_casos_csv(ruta, configuraciones)
+    return leer_casos_json(ruta)
+
+
+# Caché de cribado de este proceso (cada trabajador abre su propia conexión)
+_cache_proceso = None
+
+
+def _cache_cribado(configuraciones):
+    global _cache_proceso
+    if _cache_proceso is None:
+        _cache_proceso = cache_cribado.CacheCribado.desde_configuraciones(configuraciones) or False
+    return _cache_proceso or None
+
+
+def totales_cache(configuraciones):
+    """Contadores acumulados de la caché de cribado (de todos los procesos), o None sin caché.
+
+    Usa una conexión propia que se cierra enseguida: los procesos trabajadores
+    no deben heredar una conexión SQLite abierta.
+    """
+    cache = cache_cribado.CacheCribado.desde_configuraciones(configuraciones)
+    if cache is None:
+        return None
+    try:
+        return cache.estadisticas()['total']
+    finally:
+        cache.cerrar()
+
+
+def cribar_caso(caso, listas, configuraciones):
+    """Resultados (posición, fuente, texto, estado) del cribado de los sujetos del caso.
+
+    listas es {fuente: [ListaIndexada]} ya abiertas; solo se criban las
+    fuentes del caso.
+    """
+    fuentes = caso['tabla_resultados'].fuentes
+    listas = {fuente: grupo for fuente, grupo in listas.items() if fuente in fuentes}
+    return list(cribado_listas.cribar_resultados(
+        caso['sujetos'], listas, configuraciones.get('umbral_cribado') or cribado_listas.UMBRAL_CRIBADO,
+        cache=_cache_cribado(configuraciones)))
+
+
+def preparar_caso(datos, configuraciones, cribado=()):
+    """Caso completo; cribado son resultados de cribar_caso que se escriben en su tabla"""
+    caso = datos_informe.caso_desde_dict(datos, configuraciones)
+    if cribado:
+        cribado_listas.escribir_en_tabla(cribado, range(len(caso['sujetos'])), caso['tabla_resultados'])
+    return caso
+
+
+def procesar_caso(numero, datos, configuraciones, carpeta, formatos, listas=None, conservar_cribado=False):
+    """Genera los documentos de un caso; los errores se devuelven, no se lanzan.
+
+    Con listas, las fuentes que tienen listas locales se llenan cribando a los
+    sujetos; con conservar_cribado esos resultados se devuelven en 'cribado'.
+    """
+    inicio = time.perf_counter()
+    resultado = {'caso': numero, 'id_gestion': datos.get('id_gestion', ''), 'archivos': [], 'error': None}
+    try:
+        caso = preparar_caso(datos, configuraciones)
+        if listas:
+            cribado = cribar_caso(caso, listas, configuraciones)
+            cribado_listas.escribir_en_tabla(cribado, range(len(caso['sujetos'])), caso['tabla_resultados'])
+            if conservar_cribado:
+                resultado['cribado'] = cribado
+        datos_informe.validar_caso(caso)
+        identificador = datos_informe.nombre_archivo_seguro(caso['id_gestion'] or f"caso_{numero}")
+        for formato in formatos:
+            generador, patron = motor_informes.GENERADORES[formato]
+            filename = os.path.join(carpeta, patron.format(id=identificador))
+            generador(caso, configuraciones, filename)
+            resultado['archivos'].append(filename)
+    except Exception as e:
+        resultado['error'] = f"{type(e).__name__}: {e}"
+    resultado['segundos'] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+# Estado del proceso trabajador: se prepara una sola vez al iniciarlo
+_configuraciones_trabajador = None
+_listas_trabajador = None
+
+
+def _iniciar_trabajador(configuraciones, indices_listas):
+    """Prepara cada proceso del pool: locale, configuraciones y listas de cribado.
+
+    indices_listas es {fuente: [(ruta del índice, ruta de la lista)]}; el
+    proceso principal ya compiló los índices, aquí solo se abren.
+    """
+    global _configuraciones_trabajador, _listas_trabajador
+    datos_informe.configurar_locale()
+    _configuraciones_trabajador = configuraciones
+    if indices_listas:
+        _listas_trabajador = {fuente: [cribado_listas.ListaIndexada(ruta_indice, ruta_lista)
+                                       for ruta_indice, ruta_lista in rutas]
+                              for fuente, rutas in indices_listas.items()}
+
+
+def _procesar_en_trabajador(numero, datos, carpeta, formatos, conservar_cribado):
+    return procesar_caso(numero, datos, _configuraciones_trabajador, carpeta, formatos, _listas_trabajador,
+                         conservar_cribado)
+
+
+def procesar_lote(casos, configuraciones, carpeta, formatos, trabajadores=1, listas=None,
+                  conservar_cribado=False):
+    """Genera los documentos de todos los casos y devuelve el resultado de cada uno.
+
+    Con más de un trabajador los casos se reparten en un pool de procesos; un
+    caso que falla (incluso si su proceso muere) solo marca error en ese caso.
+    listas son las listas de cribado ya abiertas ({fuente: [ListaIndexada]});
+    los trabajadores abren cada una una sola vez, desde su índice.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    casos = list(casos)
+    trabajadores = max(1, min(trabajadores or os.cpu_count() or 1, len(casos) or 1))
+
+    if trabajadores == 1:
+        return [procesar_caso(numero, datos, configuraciones, carpeta, formatos, listas, conservar_cribado)
+                for numero, datos in enumerate(casos, 1)]
+
+    indices_listas = {fuente: [(lista.ruta_indice, lista.ruta_lista) for lista in grupo]
+                      for fuente, grupo in (listas or {}).items()}
+    resultados = []
+    with ProcessPoolExecutor(max_workers=trabajadores, initializer=_iniciar_trabajador,
+                             initargs=(configuraciones, indices_listas)) as pool:
+        pendientes = {}
+        for numero, datos in enumerate(casos, 1):
+            futuro = pool.submit(_procesar_en_trabajador, numero, datos, carpeta, formatos, conservar_cribado)
+            pendientes[futuro] = (numero, datos)
+
+        for futuro in as_completed(pendientes):
+            numero, datos = pendientes[futuro]
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                resultados.append({'caso': numero, 'id_gestion': datos.get('id_gestion', ''),
+                                   'archivos': [], 'error': f"{type(e).__name__}: {e}", 'segundos': 0})
+
+    resultados.sort(key=lambda r: r['caso'])
+    return resultados
+
+
+def guardar_resumen(resultados, carpeta, trabajadores, segundos):
+    """Escribe el reporte agregado del lote en resumen_lote.json"""
+    errores = [r for r in resultados if r['error']]
+    resumen = {
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'trabajadores': trabajadores,
+        'segundos_totales': round(segundos, 3),
+        'casos': len(resultados),
+        'correctos': len(resultados) - len(errores),
+        'con_error': len(errores),
+        'archivos_generados': sum(len(r['archivos']) for r in resultados),
+        'resultados': resultados
+    }
+    ruta = os.path.join(carpeta, 'resumen_lote.json')
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(resumen, f, ensure_ascii=False, indent=2)
+    return ruta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera informes de debida diligencia por lotes")
+    parser.add_argument('entrada', help="Archivo JSON o CSV con los casos")
+    parser.add_argument('--salida', default='informes', help="Carpeta destino de los documentos")
+    parser.add_argument('--formatos', default='word,excel,pestanas',
+                        help="Formatos separados por comas: word, excel, pestanas")
+    parser.add_argument('--config', default='configuraciones.json',
+                        help="Archivo de configuraciones (por defecto configuraciones.json si existe)")
+    parser.add_argument('--trabajadores', type=int, default=0,
+                        help="Procesos en paralelo (por defecto, uno por núcleo; 1 = secuencial)")
+    parser.add_argument('--consolidado',
+                        help="Escribe además una base Excel única con todos los casos (modo streaming)")
+    parser.add_argument('--cribar', action='store_true',
+                        help="Llena los resultados cribando a los sujetos en las listas locales configuradas")
+    args = parser.parse_args(argv)
+
+    formatos = [f.strip() for f in args.formatos.split(',') if f.strip()]
+    desconocidos = [f for f in formatos if f not in motor_informes.GENERADORES]
+    if desconocidos:
+        parser.error(f"Formatos no reconocidos: {', '.join(desconocidos)}")
+
+    datos_informe.configurar_locale()
+    configuraciones = cargar_configuraciones(args.config)
+    casos = leer_casos(args.entrada, configuraciones)
+    antes = None
+    listas = None
+    if args.cribar:
+        # Los índices se compilan aquí una vez, antes de repartir los casos
+        listas = cribado_listas.listas_configuradas(configuraciones)
+        if not listas:
+            parser.error("--cribar necesita 'listas_cribado' en las configuraciones")
+        for lista in (lista for grupo in listas.values() for lista in grupo):
+            print(f"Lista {lista.descripcion}: {len(lista)} entradas")
+        antes = totales_cache(configuraciones)
+
+    trabajadores = args.trabajadores or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    resultados = procesar_lote(casos, configuraciones, args.salida, formatos, trabajadores, listas,
+                               conservar_cribado=bool(args.consolidado))
+    segundos = time.perf_counter() - inicio
+    # El cribado de cada caso se usa para la base consolidada, no va al resumen
+    cribados = [r.pop('cribado', ()) for r in resultados]
+    ruta_resumen = guardar_resumen(resultados, args.salida, trabajadores, segundos)
+
+    if args.consolidado:
+        validos = (preparar_caso(datos, configuraciones, cribado)
+                   for datos, r, cribado in zip(casos, resultados, cribados) if not r['error'])
+        motor_informes.generar_excel_streaming(validos, configuraciones, args.consolidado)
+        print(f"Base consolidada: {args.consolidado}")
+
+    if antes is not None:
+        total = totales_cache(configuraciones)
+        aciertos = total['aciertos'] - antes['aciertos']
+        consultas = aciertos + total['fallos'] - antes['fallos']
+        print(f"Caché de cribado: {aciertos} de {consultas} consultas respondidas sin buscar "
+              f"({aciertos / consultas if consultas else 0:.0%})")
+
+    errores = [r for r in resultados if r['error']]
+    for r in errores:
+        print(f"Error en caso {r['caso']} ({r['id_gestion'] or 'sin ID'}): {r['error']}", file=sys.stderr)
+    print(f"Casos procesados: {len(resultados)} - correctos: {len(resultados) - len(errores)} - "
+          f"con error: {len(errores)} - {segundos:.1f} s con {trabajadores} trabajador(es)")
+    print(f"Resumen: {ruta_resumen}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
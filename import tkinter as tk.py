@@ -1,1794 +1,2106 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext, filedialog
-from datetime import datetime
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-import pandas as pd
-import os
-import locale
-import json
-
-# Configurar locale para español
-try:
-    locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_TIME, 'Spanish_Spain.1252')
-    except:
-        pass
-
-class DueDiligenceSystem:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Sistema de Debida Diligencia - Profesional")
-        self.root.geometry("1200x750")
-        
-        # Configurar estilo profesional
-        self.configurar_estilos()
-        
-        # Datos
-        self.sujetos = []
-        self.plantilla_modificable = self.cargar_plantilla_default()
-        self.configuraciones = self.cargar_configuraciones_default()
-        self.usuarios_guardados = self.cargar_usuarios_guardados()
-        self.serapios_guardados = self.cargar_serapios_guardados()
-        self.incisos_personalizados = []
-        self.gestion_actual = ""  # Para identificar gestiones
-        
-        # Cargar sujetos guardados desde archivo
-        self.cargar_sujetos_guardados()
-        
-        # Crear header profesional
-        self.crear_header()
-        
-        # Crear notebook (pestañas)
-        self.notebook = ttk.Notebook(root)
-        self.notebook.pack(fill='both', expand=True, padx=15, pady=(0, 15))
-        
-        # Crear pestañas
-        self.crear_tab_datos_generales()
-        self.crear_tab_sujetos()
-        self.crear_tab_resultados()
-        self.crear_tab_plantilla()
-        self.crear_tab_configuraciones()
-        self.crear_tab_generar()
-    
-    def configurar_estilos(self):
-        """Configura estilos profesionales para la aplicación"""
-        style = ttk.Style()
-        
-        # Tema base
-        style.theme_use('clam')
-        
-        # Colores profesionales
-        color_primario = '#2C3E50'
-        color_secundario = '#34495E'
-        color_acento = '#3498DB'
-        color_fondo = '#ECF0F1'
-        color_texto = '#2C3E50'
-        
-        # Configurar Notebook (pestañas)
-        style.configure('TNotebook', background=color_fondo, borderwidth=0)
-        style.configure('TNotebook.Tab', 
-                       background=color_secundario,
-                       foreground='white',
-                       padding=[20, 10],
-                       font=('Segoe UI', 10, 'bold'))
-        style.map('TNotebook.Tab',
-                 background=[('selected', color_acento)],
-                 foreground=[('selected', 'white')])
-        
-        # Configurar LabelFrame
-        style.configure('TLabelframe', 
-                       background='white',
-                       borderwidth=2,
-                       relief='groove')
-        style.configure('TLabelframe.Label',
-                       background='white',
-                       foreground=color_primario,
-                       font=('Segoe UI', 11, 'bold'))
-        
-        # Configurar Botones
-        style.configure('TButton',
-                       background=color_acento,
-                       foreground='white',
-                       borderwidth=0,
-                       focuscolor='none',
-                       padding=[15, 8],
-                       font=('Segoe UI', 10))
-        style.map('TButton',
-                 background=[('active', '#2980B9')])
-        
-        # Configurar Labels
-        style.configure('TLabel',
-                       background='white',
-                       foreground=color_texto,
-                       font=('Segoe UI', 10))
-        
-        # Configurar Entry
-        style.configure('TEntry',
-                       fieldbackground='white',
-                       borderwidth=1)
-        
-        # Configurar Combobox
-        style.configure('TCombobox',
-                       fieldbackground='white',
-                       background='white',
-                       borderwidth=1)
-        
-        # Configurar el fondo de la ventana principal
-        self.root.configure(bg=color_fondo)
-    
-    def crear_header(self):
-        """Crea un encabezado profesional para la aplicación"""
-        header_frame = tk.Frame(self.root, bg='#2C3E50', height=80)
-        header_frame.pack(fill='x', padx=0, pady=0)
-        header_frame.pack_propagate(False)
-        
-        # Título principal
-        titulo = tk.Label(header_frame,
-                         text="SISTEMA DE DEBIDA DILIGENCIA",
-                         font=('Segoe UI', 18, 'bold'),
-                         bg='#2C3E50',
-                         fg='white')
-        titulo.pack(side='left', padx=30, pady=20)
-        
-        # Subtítulo
-        subtitulo = tk.Label(header_frame,
-                            text="Gestión Profesional de Cumplimiento",
-                            font=('Segoe UI', 10),
-                            bg='#2C3E50',
-                            fg='#BDC3C7')
-        subtitulo.pack(side='left', padx=(0, 30), pady=20)
-    
-    def cargar_usuarios_guardados(self):
-        """Carga los usuarios guardados desde un archivo JSON"""
-        try:
-            if os.path.exists('usuarios_guardados.json'):
-                with open('usuarios_guardados.json', 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            pass
-        return []
-    
-    def guardar_usuario(self, usuario):
-        """Guarda un usuario en la lista de usuarios guardados"""
-        if usuario and usuario not in self.usuarios_guardados:
-            self.usuarios_guardados.append(usuario)
-            try:
-                with open('usuarios_guardados.json', 'w', encoding='utf-8') as f:
-                    json.dump(self.usuarios_guardados, f, ensure_ascii=False, indent=2)
-            except:
-                pass
-    
-    def cargar_serapios_guardados(self):
-        """Carga los serapios guardados desde un archivo JSON"""
-        try:
-            if os.path.exists('serapios_guardados.json'):
-                with open('serapios_guardados.json', 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            pass
-        return []
-    
-    def guardar_serapio(self, serapio):
-        """Guarda un serapio en la lista de serapios guardados"""
-        if serapio and serapio not in self.serapios_guardados:
-            self.serapios_guardados.append(serapio)
-            try:
-                with open('serapios_guardados.json', 'w', encoding='utf-8') as f:
-                    json.dump(self.serapios_guardados, f, ensure_ascii=False, indent=2)
-            except:
-                pass
-    
-    def cargar_sujetos_guardados(self):
-        """Carga los sujetos guardados desde un archivo JSON"""
-        try:
-            if os.path.exists('sujetos_guardados.json'):
-                with open('sujetos_guardados.json', 'r', encoding='utf-8') as f:
-                    self.sujetos = json.load(f)
-        except:
-            pass
-    
-    def guardar_sujetos_archivo(self):
-        """Guarda todos los sujetos en un archivo JSON"""
-        try:
-            with open('sujetos_guardados.json', 'w', encoding='utf-8') as f:
-                json.dump(self.sujetos, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error al guardar sujetos: {e}")
-        
-    def cargar_configuraciones_default(self):
-        """Carga configuraciones desde archivo o crea las predeterminadas"""
-        try:
-            if os.path.exists('configuraciones.json'):
-                with open('configuraciones.json', 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            pass
-        
-        return {
-            'tipos_solicitud': ['proveedor', 'cliente', 'socio', 'empleado', 'otro'],
-            'fuentes_investigacion': [
-                'Ministerio Público',
-                'Diarios Hondureños',
-                'Listas de restricción',
-                'OFAC',
-                'Infornet'
-            ],
-            'nombres_pestanas': {
-                'fecha_solicitud': 'Fecha de Solicitud',
-                'usuario_requirente': 'Usuario Requirente',
-                'tipo_solicitud': 'Tipo de Solicitud',
-                'descripcion': 'Descripción',
-                'serapio': 'Serapio',
-                'fuente_info': 'Fuente de Información'
-            },
-            'titulo_documento': 'INFORME DE DEBIDA DILIGENCIA'
-        }
-    
-    def guardar_configuraciones_archivo(self):
-        """Guarda las configuraciones en un archivo JSON"""
-        try:
-            with open('configuraciones.json', 'w', encoding='utf-8') as f:
-                json.dump(self.configuraciones, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error al guardar configuraciones: {e}")
-        
-    def cargar_plantilla_default(self):
-        return {
-            'objetivo': 'Cumplir con lo establecido en la normativa de prevención de lavado de activos',
-            'conclusion_template': 'Tras el análisis de las fuentes consultadas y la información disponible públicamente, no se han identificado indicios que sugieran la existencia de riesgos reputacionales o legales relevantes asociados a {nombres}. Por lo tanto, se considera que el nivel de riesgo de esta operación, en relación con el lavado de activos, es **{nivel_riesgo}**.',
-            'compromiso': 'El área de Cumplimiento reitera su compromiso en cumplir con todos los requerimientos establecidos en las leyes nacionales y estándares internacionales.',
-            'lugar_emision': 'Tegucigalpa, Honduras',
-            'jefe_cumplimiento': '',
-            'analista': '',
-            'incisos_adicionales': []  # Nueva lista para incisos personalizados
-        }
-    
-    def crear_tab_datos_generales(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="📋 Datos Generales")
-        
-        # Frame principal con fondo blanco
-        main_container = tk.Frame(tab, bg='#ECF0F1')
-        main_container.pack(fill='both', expand=True)
-        
-        # Frame principal
-        frame = ttk.LabelFrame(main_container, text="Información General del Caso", padding=25)
-        frame.pack(fill='both', expand=True, padx=20, pady=20)
-        
-        # ID de Gestión (nuevo campo al inicio)
-        ttk.Label(frame, text="ID de Gestión:", font=('Segoe UI', 10, 'bold')).grid(row=0, column=0, sticky='w', pady=8)
-        gestion_frame = tk.Frame(frame, bg='white')
-        gestion_frame.grid(row=0, column=1, pady=8, padx=15, sticky='ew')
-        self.id_gestion = tk.Entry(gestion_frame, width=30, font=('Segoe UI', 10), relief='solid', borderwidth=1)
-        self.id_gestion.pack(side='left', padx=(0, 5))
-        ttk.Button(gestion_frame, text="Generar ID", command=self.generar_id_gestion, width=12).pack(side='left')
-        
-        # Fecha de solicitud
-        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['fecha_solicitud'] + ":", 
-                 font=('Segoe UI', 10, 'bold')).grid(row=1, column=0, sticky='w', pady=8)
-        self.fecha_solicitud = tk.Entry(frame, width=45, font=('Segoe UI', 10), relief='solid', borderwidth=1)
-        self.fecha_solicitud.insert(0, datetime.now().strftime("%d de %B del %Y"))
-        self.fecha_solicitud.grid(row=1, column=1, pady=8, padx=15, sticky='ew')
-        
-        # Usuario requirente con autocompletado
-        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['usuario_requirente'] + ":", 
-                 font=('Segoe UI', 10, 'bold')).grid(row=2, column=0, sticky='w', pady=8)
-        usuario_frame = tk.Frame(frame, bg='white')
-        usuario_frame.grid(row=2, column=1, pady=8, padx=15, sticky='ew')
-        self.usuario_requirente = ttk.Combobox(usuario_frame, width=35, values=self.usuarios_guardados, font=('Segoe UI', 10))
-        self.usuario_requirente.pack(side='left', fill='x', expand=True, padx=(0, 5))
-        ttk.Button(usuario_frame, text="💾", command=self.guardar_usuario_actual, width=3).pack(side='left')
-        
-        # Tipo de solicitud (solo lectura, se modifica desde configuraciones)
-        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['tipo_solicitud'] + ":", 
-                 font=('Segoe UI', 10, 'bold')).grid(row=3, column=0, sticky='w', pady=8)
-        self.tipo_solicitud = ttk.Combobox(frame, width=42, values=self.configuraciones['tipos_solicitud'], 
-                                          font=('Segoe UI', 10), state='readonly')
-        self.tipo_solicitud.set('proveedor')
-        self.tipo_solicitud.grid(row=3, column=1, pady=8, padx=15, sticky='ew')
-        
-        # Descripción
-        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['descripcion'] + ":", 
-                 font=('Segoe UI', 10, 'bold')).grid(row=4, column=0, sticky='w', pady=8)
-        self.descripcion_solicitud = tk.Entry(frame, width=45, font=('Segoe UI', 10), relief='solid', borderwidth=1)
-        self.descripcion_solicitud.insert(0, 'Solicitud de permisos')
-        self.descripcion_solicitud.grid(row=4, column=1, pady=8, padx=15, sticky='ew')
-        
-        # Serapio (NUEVO CAMPO)
-        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['serapio'] + ":", 
-                 font=('Segoe UI', 10, 'bold')).grid(row=5, column=0, sticky='w', pady=8)
-        serapio_frame = tk.Frame(frame, bg='white')
-        serapio_frame.grid(row=5, column=1, pady=8, padx=15, sticky='ew')
-        self.serapio = ttk.Combobox(serapio_frame, width=35, values=self.serapios_guardados, font=('Segoe UI', 10))
-        self.serapio.pack(side='left', fill='x', expand=True, padx=(0, 5))
-        ttk.Button(serapio_frame, text="💾", command=self.guardar_serapio_actual, width=3).pack(side='left')
-        
-        # Fuente de información
-        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['fuente_info'] + ":", 
-                 font=('Segoe UI', 10, 'bold')).grid(row=6, column=0, sticky='nw', pady=8)
-        self.fuente_info = scrolledtext.ScrolledText(frame, width=45, height=4, font=('Segoe UI', 9), 
-                                                     relief='solid', borderwidth=1, wrap='word')
-        self.fuente_info.insert(1.0, 'Búsqueda en medios de comunicación hondureños y bases de datos públicas y privadas.')
-        self.fuente_info.grid(row=6, column=1, pady=8, padx=15, sticky='ew')
-        
-        # Configurar expansión de columnas
-        frame.columnconfigure(1, weight=1)
-    
-    def generar_id_gestion(self):
-        """Genera un ID único para la gestión"""
-        fecha = datetime.now().strftime("%Y%m%d")
-        hora = datetime.now().strftime("%H%M%S")
-        id_gestion = f"DD-{fecha}-{hora}"
-        self.id_gestion.delete(0, tk.END)
-        self.id_gestion.insert(0, id_gestion)
-        self.gestion_actual = id_gestion
-        messagebox.showinfo("ID Generado", f"ID de Gestión: {id_gestion}\n\nTodos los sujetos agregados a partir de ahora pertenecerán a esta gestión.")
-    
-    def guardar_usuario_actual(self):
-        """Guarda el usuario actual en la lista"""
-        usuario = self.usuario_requirente.get().strip()
-        if usuario:
-            self.guardar_usuario(usuario)
-            self.usuario_requirente['values'] = self.usuarios_guardados
-            messagebox.showinfo("Guardado", f"Usuario '{usuario}' guardado correctamente")
-    
-    def guardar_serapio_actual(self):
-        """Guarda el serapio actual en la lista"""
-        serapio = self.serapio.get().strip()
-        if serapio:
-            self.guardar_serapio(serapio)
-            self.serapio['values'] = self.serapios_guardados
-            messagebox.showinfo("Guardado", f"Serapio '{serapio}' guardado correctamente")
-    
-    def crear_tab_sujetos(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="👤 Sujetos de Investigación")
-        
-        # Configurar fondo
-        main_container = tk.Frame(tab, bg='#ECF0F1')
-        main_container.pack(fill='both', expand=True)
-        
-        # Frame de búsqueda (NUEVO)
-        frame_busqueda = ttk.LabelFrame(main_container, text="🔍 Buscar Sujetos", padding=15)
-        frame_busqueda.pack(fill='x', padx=20, pady=(20, 10))
-        
-        busqueda_frame = tk.Frame(frame_busqueda, bg='white')
-        busqueda_frame.pack(fill='x')
-        
-        ttk.Label(busqueda_frame, text="Buscar por:", font=('Segoe UI', 10, 'bold')).pack(side='left', padx=5)
-        
-        self.tipo_busqueda = ttk.Combobox(busqueda_frame, width=15, values=['Nombre', 'Identificación', 'ID Gestión'], 
-                                         font=('Segoe UI', 10), state='readonly')
-        self.tipo_busqueda.set('Nombre')
-        self.tipo_busqueda.pack(side='left', padx=5)
-        
-        self.campo_busqueda = tk.Entry(busqueda_frame, width=30, font=('Segoe UI', 10), relief='solid', borderwidth=1)
-        self.campo_busqueda.pack(side='left', padx=5)
-        self.campo_busqueda.bind('<KeyRelease>', self.buscar_sujeto_en_tiempo_real)
-        
-        ttk.Button(busqueda_frame, text="🔍 Buscar", command=self.buscar_sujeto).pack(side='left', padx=5)
-        ttk.Button(busqueda_frame, text="🔄 Mostrar Todos", command=self.mostrar_todos_sujetos).pack(side='left', padx=5)
-        
-        # Frame de entrada
-        frame_entrada = ttk.LabelFrame(main_container, text="Agregar Nuevo Sujeto", padding=25)
-        frame_entrada.pack(fill='x', padx=20, pady=10)
-        
-        # Campos en una sola fila para nombre e identificación (más angostos)
-        campos_frame = tk.Frame(frame_entrada, bg='white')
-        campos_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=8)
-        
-        ttk.Label(campos_frame, text="Nombre:", font=('Segoe UI', 10, 'bold')).pack(side='left', padx=(0, 5))
-        self.nombre_sujeto = tk.Entry(campos_frame, width=25, font=('Segoe UI', 10), relief='solid', borderwidth=1)
-        self.nombre_sujeto.pack(side='left', padx=5)
-        # Validación: solo letras y espacios
-        vcmd_nombre = (self.root.register(self.validar_nombre), '%P')
-        self.nombre_sujeto.config(validate='key', validatecommand=vcmd_nombre)
-        
-        ttk.Label(campos_frame, text="Identificación:", font=('Segoe UI', 10, 'bold')).pack(side='left', padx=(15, 5))
-        self.identificacion_sujeto = tk.Entry(campos_frame, width=20, font=('Segoe UI', 10), relief='solid', borderwidth=1)
-        self.identificacion_sujeto.pack(side='left', padx=5)
-        # Validación: solo números y guiones
-        vcmd_id = (self.root.register(self.validar_identificacion), '%P')
-        self.identificacion_sujeto.config(validate='key', validatecommand=vcmd_id)
-        
-        # Descripción en segunda fila (ancho completo)
-        ttk.Label(frame_entrada, text="Descripción:", font=('Segoe UI', 10, 'bold')).grid(row=1, column=0, sticky='w', pady=8)
-        self.descripcion_sujeto = tk.Entry(frame_entrada, width=60, font=('Segoe UI', 10), relief='solid', borderwidth=1)
-        self.descripcion_sujeto.grid(row=1, column=1, pady=8, padx=15, sticky='ew')
-        
-        # Botón de agregar con estilo
-        btn_frame = tk.Frame(frame_entrada, bg='white')
-        btn_frame.grid(row=2, column=0, columnspan=2, pady=15)
-        ttk.Button(btn_frame, text="➕ Agregar Sujeto", command=self.agregar_sujeto).pack()
-        
-        frame_entrada.columnconfigure(1, weight=1)
-        
-        # Frame de lista
-        frame_lista = ttk.LabelFrame(main_container, text="Sujetos Registrados", padding=25)
-        frame_lista.pack(fill='both', expand=True, padx=20, pady=(10, 20))
-        
-        # Treeview con estilo mejorado (incluye columna de ID de Gestión y columna de Acciones)
-        tree_frame = tk.Frame(frame_lista, bg='white')
-        tree_frame.pack(fill='both', expand=True)
-        
-        self.tree_sujetos = ttk.Treeview(tree_frame, columns=('Nombre', 'Identificación', 'Descripción', 'Gestión', 'Acciones'), 
-                                         show='headings', height=12)
-        self.tree_sujetos.heading('Nombre', text='Nombre Completo')
-        self.tree_sujetos.heading('Identificación', text='Identificación')
-        self.tree_sujetos.heading('Descripción', text='Descripción')
-        self.tree_sujetos.heading('Gestión', text='ID de Gestión')
-        self.tree_sujetos.heading('Acciones', text='Eliminar')
-        
-        # Ajustar anchos
-        self.tree_sujetos.column('Nombre', width=180)
-        self.tree_sujetos.column('Identificación', width=110)
-        self.tree_sujetos.column('Descripción', width=180)
-        self.tree_sujetos.column('Gestión', width=130)
-        self.tree_sujetos.column('Acciones', width=70)
-        
-        # Bind para detectar clicks en la columna de acciones
-        self.tree_sujetos.bind('<Button-1>', self.on_tree_click)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree_sujetos.yview)
-        self.tree_sujetos.configure(yscrollcommand=scrollbar.set)
-        
-        self.tree_sujetos.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
-        
-        # Botones (sin botón eliminar individual ya que está en cada fila)
-        btn_frame2 = tk.Frame(frame_lista, bg='white')
-        btn_frame2.pack(pady=10)
-        ttk.Button(btn_frame2, text="📋 Cargar Seleccionado", command=self.cargar_sujeto_seleccionado).pack(side='left', padx=5)
-        ttk.Button(btn_frame2, text="🔍 Filtrar por Gestión", command=self.filtrar_por_gestion).pack(side='left', padx=5)
-    
-    def validar_nombre(self, texto):
-        """Valida que solo se ingresen letras, espacios y algunos caracteres especiales en nombres"""
-        if texto == "":
-            return True
-        # Permitir letras (incluyendo acentos y ñ), espacios, puntos, comas y apóstrofes
-        import re
-        return bool(re.match(r"^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s.,'-]+$", texto))
-    
-    def validar_identificacion(self, texto):
-        """Valida que solo se ingresen números y guiones en identificación"""
-        if texto == "":
-            return True
-        # Solo números y guiones
-        import re
-        return bool(re.match(r"^[0-9-]+$", texto))
-    
-    def filtrar_por_gestion(self):
-        """Muestra solo los sujetos de una gestión específica"""
-        gestion_id = self.id_gestion.get().strip()
-        if not gestion_id:
-            messagebox.showwarning("Advertencia", "Primero debe ingresar o generar un ID de Gestión")
-            return
-        
-        sujetos_filtrados = [s for s in self.sujetos if s.get('id_gestion') == gestion_id]
-        
-        if not sujetos_filtrados:
-            messagebox.showinfo("Sin resultados", f"No hay sujetos asociados a la gestión: {gestion_id}")
-            return
-        
-        mensaje = f"Sujetos de la gestión {gestion_id}:\n\n"
-        for i, sujeto in enumerate(sujetos_filtrados, 1):
-            mensaje += f"{i}. {sujeto['nombre']} ({sujeto['identificacion']})\n"
-        
-        messagebox.showinfo("Sujetos Filtrados", mensaje)
-    
-    def buscar_sujeto(self):
-        """Busca sujetos según el criterio seleccionado"""
-        tipo = self.tipo_busqueda.get()
-        termino = self.campo_busqueda.get().strip().lower()
-        
-        if not termino:
-            messagebox.showwarning("Advertencia", "Ingrese un término de búsqueda")
-            return
-        
-        # Limpiar el árbol
-        for item in self.tree_sujetos.get_children():
-            self.tree_sujetos.delete(item)
-        
-        # Buscar y mostrar resultados
-        encontrados = 0
-        for sujeto in self.sujetos:
-            mostrar = False
-            
-            if tipo == 'Nombre' and termino in sujeto['nombre'].lower():
-                mostrar = True
-            elif tipo == 'Identificación' and termino in sujeto['identificacion'].lower():
-                mostrar = True
-            elif tipo == 'ID Gestión' and termino in sujeto.get('id_gestion', '').lower():
-                mostrar = True
-            
-            if mostrar:
-                self.tree_sujetos.insert('', 'end', values=(
-                    sujeto['nombre'],
-                    sujeto['identificacion'],
-                    sujeto['descripcion'],
-                    sujeto.get('id_gestion', 'N/A'),
-                    '🗑️'
-                ))
-                encontrados += 1
-        
-        if encontrados == 0:
-            messagebox.showinfo("Sin resultados", f"No se encontraron sujetos con '{termino}' en {tipo}")
-    
-    def buscar_sujeto_en_tiempo_real(self, event=None):
-        """Busca sujetos mientras el usuario escribe"""
-        tipo = self.tipo_busqueda.get()
-        termino = self.campo_busqueda.get().strip().lower()
-        
-        # Limpiar el árbol
-        for item in self.tree_sujetos.get_children():
-            self.tree_sujetos.delete(item)
-        
-        # Si no hay término, mostrar todos
-        if not termino:
-            self.mostrar_todos_sujetos()
-            return
-        
-        # Buscar y mostrar resultados
-        for sujeto in self.sujetos:
-            mostrar = False
-            
-            if tipo == 'Nombre' and termino in sujeto['nombre'].lower():
-                mostrar = True
-            elif tipo == 'Identificación' and termino in sujeto['identificacion'].lower():
-                mostrar = True
-            elif tipo == 'ID Gestión' and termino in sujeto.get('id_gestion', '').lower():
-                mostrar = True
-            
-            if mostrar:
-                self.tree_sujetos.insert('', 'end', values=(
-                    sujeto['nombre'],
-                    sujeto['identificacion'],
-                    sujeto['descripcion'],
-                    sujeto.get('id_gestion', 'N/A'),
-                    '🗑️'
-                ))
-    
-    def mostrar_todos_sujetos(self):
-        """Muestra todos los sujetos en el árbol"""
-        # Limpiar el árbol
-        for item in self.tree_sujetos.get_children():
-            self.tree_sujetos.delete(item)
-        
-        # Agregar todos los sujetos
-        for sujeto in self.sujetos:
-            self.tree_sujetos.insert('', 'end', values=(
-                sujeto['nombre'],
-                sujeto['identificacion'],
-                sujeto['descripcion'],
-                sujeto.get('id_gestion', 'N/A'),
-                '🗑️'
-            ))
-        
-        # Limpiar campo de búsqueda
-        self.campo_busqueda.delete(0, tk.END)
-    
-    def cargar_sujeto_seleccionado(self):
-        """Carga los datos del sujeto seleccionado en los campos de entrada"""
-        selected = self.tree_sujetos.selection()
-        if not selected:
-            messagebox.showwarning("Advertencia", "Seleccione un sujeto para cargar")
-            return
-        
-        # Obtener índice del sujeto seleccionado
-        item = self.tree_sujetos.item(selected[0])
-        valores = item['values']
-        
-        # Buscar el sujeto completo en la lista
-        for sujeto in self.sujetos:
-            if (sujeto['nombre'] == valores[0] and 
-                sujeto['identificacion'] == valores[1] and
-                sujeto.get('id_gestion', 'N/A') == valores[3]):
-                
-                # Cargar datos en los campos
-                self.nombre_sujeto.delete(0, tk.END)
-                self.nombre_sujeto.insert(0, sujeto['nombre'])
-                
-                self.identificacion_sujeto.delete(0, tk.END)
-                self.identificacion_sujeto.insert(0, sujeto['identificacion'])
-                
-                self.descripcion_sujeto.delete(0, tk.END)
-                self.descripcion_sujeto.insert(0, sujeto['descripcion'])
-                
-                messagebox.showinfo("Cargado", f"Datos de '{sujeto['nombre']}' cargados en los campos")
-                break
-    
-    def eliminar_todos_sujetos(self):
-        """Elimina todos los sujetos guardados sin confirmación"""
-        if not self.sujetos:
-            messagebox.showinfo("Información", "No hay sujetos para eliminar")
-            return
-        
-        # Limpiar lista de sujetos
-        self.sujetos.clear()
-        
-        # Limpiar árbol
-        for item in self.tree_sujetos.get_children():
-            self.tree_sujetos.delete(item)
-        
-        # Guardar cambios (archivo vacío)
-        self.guardar_sujetos_archivo()
-        
-        messagebox.showinfo("Éxito", "Todos los sujetos han sido eliminados")
-    
-    def crear_tab_resultados(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="🔍 Resultados de Investigación")
-        
-        main_container = tk.Frame(tab, bg='#ECF0F1')
-        main_container.pack(fill='both', expand=True)
-        
-        frame = ttk.LabelFrame(main_container, text="Fuentes Consultadas", padding=20)
-        frame.pack(fill='both', expand=True, padx=20, pady=20)
-        
-        # Crear campos para cada fuente
-        self.resultados = {}
-        
-        for i, fuente in enumerate(self.configuraciones['fuentes_investigacion']):
-            ttk.Label(frame, text=f"{fuente}:", font=('Segoe UI', 10, 'bold')).grid(row=i*2, column=0, sticky='w', pady=5)
-            
-            resultado = tk.Entry(frame, width=60, font=('Segoe UI', 10))
-            resultado.insert(0, 'No se encontraron referencias.')
-            resultado.grid(row=i*2+1, column=0, pady=2, padx=20, sticky='ew')
-            
-            self.resultados[fuente] = resultado
-        
-        # Nivel de riesgo
-        ttk.Label(frame, text="Nivel de Riesgo:", font=('Segoe UI', 10, 'bold')).grid(
-            row=len(self.configuraciones['fuentes_investigacion'])*2, column=0, sticky='w', pady=10)
-        self.nivel_riesgo = ttk.Combobox(frame, width=20, values=['bajo', 'medio', 'alto'], font=('Segoe UI', 10))
-        self.nivel_riesgo.set('bajo')
-        self.nivel_riesgo.grid(row=len(self.configuraciones['fuentes_investigacion'])*2+1, column=0, 
-                              pady=2, padx=20, sticky='w')
-        
-        frame.columnconfigure(0, weight=1)
-    
-    def crear_tab_plantilla(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="📝 Modificar Plantilla")
-        
-        main_container = tk.Frame(tab, bg='#ECF0F1')
-        main_container.pack(fill='both', expand=True)
-        
-        # Frame principal con scroll
-        canvas = tk.Canvas(main_container, bg='#ECF0F1')
-        scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg='#ECF0F1')
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        frame = ttk.LabelFrame(scrollable_frame, text="Personalizar Plantilla", padding=20)
-        frame.pack(fill='both', expand=True, padx=20, pady=20)
-        
-        # Objetivo
-        ttk.Label(frame, text="Objetivo del Informe:", font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=5)
-        self.objetivo_text = scrolledtext.ScrolledText(frame, width=80, height=3, font=('Segoe UI', 10))
-        self.objetivo_text.insert(1.0, self.plantilla_modificable['objetivo'])
-        self.objetivo_text.pack(pady=5, fill='x')
-        
-        # Conclusión template
-        ttk.Label(frame, text="Plantilla de Conclusión (use {nombres} y {nivel_riesgo}):", 
-                 font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=5)
-        self.conclusion_text = scrolledtext.ScrolledText(frame, width=80, height=4, font=('Segoe UI', 10))
-        self.conclusion_text.insert(1.0, self.plantilla_modificable['conclusion_template'])
-        self.conclusion_text.pack(pady=5, fill='x')
-        
-        # Compromiso
-        ttk.Label(frame, text="Texto de Compromiso:", font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=5)
-        self.compromiso_text = scrolledtext.ScrolledText(frame, width=80, height=3, font=('Segoe UI', 10))
-        self.compromiso_text.insert(1.0, self.plantilla_modificable['compromiso'])
-        self.compromiso_text.pack(pady=5, fill='x')
-        
-        # NUEVA SECCIÓN: Incisos Adicionales
-        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
-        
-        inciso_header = tk.Frame(frame, bg='white')
-        inciso_header.pack(fill='x', pady=10)
-        ttk.Label(inciso_header, text="Incisos Adicionales para la Conclusión:", 
-                 font=('Segoe UI', 11, 'bold')).pack(side='left')
-        ttk.Button(inciso_header, text="➕ Agregar Inciso", command=self.agregar_inciso).pack(side='right')
-        
-        # Lista de incisos
-        self.frame_incisos = tk.Frame(frame, bg='white')
-        self.frame_incisos.pack(fill='both', expand=True, pady=10)
-        
-        self.incisos_widgets = []
-        self.cargar_incisos_guardados()
-        
-        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
-        
-        # Datos de firma
-        frame_firma = ttk.Frame(frame)
-        frame_firma.pack(fill='x', pady=10)
-        
-        ttk.Label(frame_firma, text="Lugar de Emisión:", font=('Segoe UI', 10)).grid(row=0, column=0, sticky='w', pady=5)
-        self.lugar_emision = tk.Entry(frame_firma, width=40, font=('Segoe UI', 10))
-        self.lugar_emision.insert(0, self.plantilla_modificable['lugar_emision'])
-        self.lugar_emision.grid(row=0, column=1, pady=5, padx=10, sticky='ew')
-        
-        ttk.Label(frame_firma, text="Jefe de Cumplimiento:", font=('Segoe UI', 10)).grid(row=1, column=0, sticky='w', pady=5)
-        self.jefe_cumplimiento = tk.Entry(frame_firma, width=40, font=('Segoe UI', 10))
-        self.jefe_cumplimiento.grid(row=1, column=1, pady=5, padx=10, sticky='ew')
-        
-        ttk.Label(frame_firma, text="Analista:", font=('Segoe UI', 10)).grid(row=2, column=0, sticky='w', pady=5)
-        self.analista = tk.Entry(frame_firma, width=40, font=('Segoe UI', 10))
-        self.analista.grid(row=2, column=1, pady=5, padx=10, sticky='ew')
-        
-        frame_firma.columnconfigure(1, weight=1)
-        
-        ttk.Button(frame, text="💾 Guardar Cambios de Plantilla", command=self.guardar_plantilla).pack(pady=20)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-    
-    def agregar_inciso(self):
-        """Agrega un nuevo campo para inciso personalizado"""
-        inciso_frame = tk.Frame(self.frame_incisos, bg='white', relief='ridge', borderwidth=1)
-        inciso_frame.pack(fill='x', pady=5, padx=10)
-        
-        letra_frame = tk.Frame(inciso_frame, bg='white')
-        letra_frame.pack(side='left', padx=5, pady=5)
-        
-        numero_inciso = len(self.incisos_widgets) + 3  # Empieza en 'c' (después de a y b)
-        letra = chr(96 + numero_inciso)  # 'c', 'd', 'e', etc.
-        
-        ttk.Label(letra_frame, text=f"{letra}.", font=('Segoe UI', 10, 'bold')).pack()
-        
-        text_widget = scrolledtext.ScrolledText(inciso_frame, width=70, height=3, font=('Segoe UI', 9), wrap='word')
-        text_widget.pack(side='left', fill='both', expand=True, padx=5, pady=5)
-        
-        btn_eliminar = ttk.Button(inciso_frame, text="🗑️", width=3, 
-                                  command=lambda: self.eliminar_inciso(inciso_frame, text_widget))
-        btn_eliminar.pack(side='right', padx=5, pady=5)
-        
-        self.incisos_widgets.append(text_widget)
-    
-    def eliminar_inciso(self, frame, widget):
-        """Elimina un inciso personalizado"""
-        if messagebox.askyesno("Confirmar", "¿Desea eliminar este inciso?"):
-            self.incisos_widgets.remove(widget)
-            frame.destroy()
-            self.renumerar_incisos()
-    
-    def renumerar_incisos(self):
-        """Renumera los incisos después de eliminar uno"""
-        for i, widget_frame in enumerate(self.frame_incisos.winfo_children()):
-            numero_inciso = i + 3
-            letra = chr(96 + numero_inciso)
-            # Actualizar la letra del label
-            for child in widget_frame.winfo_children():
-                if isinstance(child, tk.Frame):
-                    for label in child.winfo_children():
-                        if isinstance(label, ttk.Label):
-                            label.config(text=f"{letra}.")
-    
-    def cargar_incisos_guardados(self):
-        """Carga los incisos guardados en la plantilla"""
-        if 'incisos_adicionales' in self.plantilla_modificable:
-            for texto_inciso in self.plantilla_modificable['incisos_adicionales']:
-                self.agregar_inciso()
-                self.incisos_widgets[-1].insert(1.0, texto_inciso)
-    
-    def crear_tab_configuraciones(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="⚙️ Configuraciones")
-        
-        main_container = tk.Frame(tab, bg='#ECF0F1')
-        main_container.pack(fill='both', expand=True)
-        
-        # Frame con scroll
-        canvas = tk.Canvas(main_container, bg='#ECF0F1')
-        scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg='#ECF0F1')
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        frame = ttk.LabelFrame(scrollable_frame, text="Personalizar Opciones del Sistema", padding=20)
-        frame.pack(fill='both', expand=True, padx=20, pady=20)
-        
-        # Tipos de Solicitud
-        ttk.Label(frame, text="Tipos de Solicitud:", font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
-        ttk.Label(frame, text="Ingrese los tipos de solicitud separados por comas:", 
-                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
-        
-        self.tipos_solicitud_text = tk.Entry(frame, width=80, font=('Segoe UI', 10))
-        self.tipos_solicitud_text.insert(0, ', '.join(self.configuraciones['tipos_solicitud']))
-        self.tipos_solicitud_text.pack(pady=5, fill='x')
-        
-        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
-        
-        # Fuentes de Investigación
-        ttk.Label(frame, text="Fuentes de Investigación:", font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
-        ttk.Label(frame, text="Ingrese las fuentes de investigación (una por línea):", 
-                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
-        
-        self.fuentes_text = scrolledtext.ScrolledText(frame, width=80, height=8, font=('Segoe UI', 10))
-        self.fuentes_text.insert(1.0, '\n'.join(self.configuraciones['fuentes_investigacion']))
-        self.fuentes_text.pack(pady=5, fill='x')
-        
-        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
-        
-        # NUEVA SECCIÓN: Nombres de Pestañas
-        ttk.Label(frame, text="Nombres de Campos en Información General:", 
-                 font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
-        ttk.Label(frame, text="Personalice los nombres de los campos que aparecen en Datos Generales:", 
-                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
-        
-        nombres_frame = tk.Frame(frame, bg='white', relief='groove', borderwidth=2)
-        nombres_frame.pack(fill='x', pady=10, padx=5)
-        
-        self.campos_nombres = {}
-        campos_config = [
-            ('fecha_solicitud', 'Fecha de Solicitud'),
-            ('usuario_requirente', 'Usuario Requirente'),
-            ('tipo_solicitud', 'Tipo de Solicitud'),
-            ('descripcion', 'Descripción'),
-            ('serapio', 'Serapio'),
-            ('fuente_info', 'Fuente de Información')
-        ]
-        
-        for i, (clave, nombre_default) in enumerate(campos_config):
-            campo_frame = tk.Frame(nombres_frame, bg='white')
-            campo_frame.pack(fill='x', padx=10, pady=5)
-            
-            ttk.Label(campo_frame, text=f"{nombre_default}:", 
-                     font=('Segoe UI', 9, 'bold'), width=25).pack(side='left')
-            
-            entry = tk.Entry(campo_frame, width=40, font=('Segoe UI', 9))
-            valor_actual = self.configuraciones['nombres_pestanas'].get(clave, nombre_default)
-            entry.insert(0, valor_actual)
-            entry.pack(side='left', padx=5)
-            
-            self.campos_nombres[clave] = entry
-        
-        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
-        
-        # NUEVA SECCIÓN: Título del Documento
-        ttk.Label(frame, text="Título del Documento Word:", 
-                 font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
-        ttk.Label(frame, text="Personalice el título principal que aparece en el documento generado:", 
-                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
-        
-        self.titulo_documento = tk.Entry(frame, width=80, font=('Segoe UI', 10))
-        titulo_actual = self.configuraciones.get('titulo_documento', 'INFORME DE DEBIDA DILIGENCIA')
-        self.titulo_documento.insert(0, titulo_actual)
-        self.titulo_documento.pack(pady=5, fill='x')
-        
-        ttk.Label(frame, text="Nota: Después de guardar, los cambios se aplicarán al reiniciar la pestaña", 
-                 font=('Segoe UI', 9, 'italic'), foreground='#E74C3C').pack(pady=10)
-        
-        frame_botones = tk.Frame(frame, bg='white')
-        frame_botones.pack(pady=20)
-        
-        ttk.Button(frame_botones, text="💾 Guardar Configuraciones", 
-                  command=self.guardar_configuraciones).pack(side='left', padx=5)
-        ttk.Button(frame_botones, text="🔄 Restaurar Predeterminados", 
-                  command=self.restaurar_configuraciones).pack(side='left', padx=5)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-    
-    def guardar_configuraciones(self):
-        try:
-            # Actualizar tipos de solicitud
-            tipos_texto = self.tipos_solicitud_text.get().strip()
-            self.configuraciones['tipos_solicitud'] = [t.strip() for t in tipos_texto.split(',') if t.strip()]
-            
-            # Actualizar fuentes
-            fuentes_texto = self.fuentes_text.get(1.0, tk.END).strip()
-            self.configuraciones['fuentes_investigacion'] = [f.strip() for f in fuentes_texto.split('\n') if f.strip()]
-            
-            # Actualizar nombres de pestañas
-            for clave, entry in self.campos_nombres.items():
-                self.configuraciones['nombres_pestanas'][clave] = entry.get().strip()
-            
-            # Actualizar título del documento
-            self.configuraciones['titulo_documento'] = self.titulo_documento.get().strip()
-            
-            # Guardar en archivo
-            self.guardar_configuraciones_archivo()
-            
-            # Actualizar el combobox de tipo de solicitud
-            self.tipo_solicitud['values'] = self.configuraciones['tipos_solicitud']
-            
-            # Actualizar la pestaña de resultados
-            self.actualizar_tab_resultados()
-            
-            messagebox.showinfo("Éxito", "Configuraciones guardadas correctamente.\n\n" +
-                              "La pestaña de Resultados ha sido actualizada.\n" +
-                              "Los nombres de campos se actualizarán al reiniciar la aplicación.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al guardar configuraciones: {str(e)}")
-    
-    def restaurar_configuraciones(self):
-        if messagebox.askyesno("Confirmar", "¿Desea restaurar las configuraciones predeterminadas?"):
-            # Restaurar sin el archivo
-            config_temp = self.cargar_configuraciones_default()
-            # Mantener nombres_pestanas si no existen en default
-            if 'nombres_pestanas' not in config_temp:
-                config_temp['nombres_pestanas'] = {
-                    'fecha_solicitud': 'Fecha de Solicitud',
-                    'usuario_requirente': 'Usuario Requirente',
-                    'tipo_solicitud': 'Tipo de Solicitud',
-                    'descripcion': 'Descripción',
-                    'serapio': 'Serapio',
-                    'fuente_info': 'Fuente de Información'
-                }
-            
-            self.configuraciones = config_temp
-            
-            # Actualizar campos en la interfaz
-            self.tipos_solicitud_text.delete(0, tk.END)
-            self.tipos_solicitud_text.insert(0, ', '.join(self.configuraciones['tipos_solicitud']))
-            
-            self.fuentes_text.delete(1.0, tk.END)
-            self.fuentes_text.insert(1.0, '\n'.join(self.configuraciones['fuentes_investigacion']))
-            
-            for clave, entry in self.campos_nombres.items():
-                entry.delete(0, tk.END)
-                entry.insert(0, self.configuraciones['nombres_pestanas'][clave])
-            
-            # Actualizar título del documento
-            self.titulo_documento.delete(0, tk.END)
-            titulo_restaurado = self.configuraciones.get('titulo_documento', 'INFORME DE DEBIDA DILIGENCIA')
-            self.titulo_documento.insert(0, titulo_restaurado)
-            
-            messagebox.showinfo("Éxito", "Configuraciones restauradas. " +
-                              "Presione 'Guardar Configuraciones' para aplicar los cambios.")
-    
-    def actualizar_tab_resultados(self):
-        # Guardar valores actuales
-        valores_actuales = {}
-        for fuente, widget in self.resultados.items():
-            valores_actuales[fuente] = widget.get()
-        
-        # Limpiar resultados actuales
-        self.resultados.clear()
-        
-        # Recrear la pestaña de resultados
-        for i in range(self.notebook.index('end')):
-            if '🔍' in self.notebook.tab(i, 'text') or 'Resultados' in self.notebook.tab(i, 'text'):
-                tab_index = i
-                break
-        
-        # Eliminar la pestaña antigua
-        self.notebook.forget(tab_index)
-        
-        # Recrear la pestaña
-        self.crear_tab_resultados()
-        
-        # Restaurar valores
-        for fuente, widget in self.resultados.items():
-            if fuente in valores_actuales:
-                widget.delete(0, tk.END)
-                widget.insert(0, valores_actuales[fuente])
-    
-    def crear_tab_generar(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="📄 Generar Documentos")
-        
-        # Configurar fondo
-        main_container = tk.Frame(tab, bg='#ECF0F1')
-        main_container.pack(fill='both', expand=True)
-        
-        frame = ttk.LabelFrame(main_container, text="Opciones de Generación de Documentos", padding=30)
-        frame.pack(fill='both', expand=True, padx=20, pady=20)
-        
-        # Título
-        titulo = tk.Label(frame, 
-                         text="Seleccione el formato de documento que desea generar:",
-                         font=('Segoe UI', 12, 'bold'),
-                         bg='white',
-                         fg='#2C3E50')
-        titulo.pack(pady=(10, 30))
-        
-        # Botones con descripciones
-        btn_container = tk.Frame(frame, bg='white')
-        btn_container.pack(pady=10)
-        
-        # Botón Word
-        word_frame = tk.Frame(btn_container, bg='white')
-        word_frame.pack(pady=8)
-        ttk.Button(word_frame, text="📝 Generar Documento Word (.docx)", 
-                  command=self.generar_word, width=50).pack()
-        desc_word = tk.Label(word_frame, 
-                           text="Genera un informe completo en formato Word con normas APA",
-                           font=('Segoe UI', 9, 'italic'),
-                           bg='white',
-                           fg='#7F8C8D')
-        desc_word.pack()
-        
-        # Botón Excel Completo
-        excel_frame = tk.Frame(btn_container, bg='white')
-        excel_frame.pack(pady=8)
-        ttk.Button(excel_frame, text="📊 Generar Excel Completo", 
-                  command=self.generar_excel_completo, width=50).pack()
-        desc_excel = tk.Label(excel_frame,
-                             text="Base de datos horizontal con todas las debidas diligencias",
-                             font=('Segoe UI', 9, 'italic'),
-                             bg='white',
-                             fg='#7F8C8D')
-        desc_excel.pack()
-        
-        # Botón Excel Pestañas
-        pestanas_frame = tk.Frame(btn_container, bg='white')
-        pestanas_frame.pack(pady=8)
-        ttk.Button(pestanas_frame, text="📑 Generar Excel con Pestañas por Sujeto", 
-                  command=self.generar_excel_pestanas, width=50).pack()
-        desc_pestanas = tk.Label(pestanas_frame,
-                                text="Una pestaña individual para cada sujeto investigado",
-                                font=('Segoe UI', 9, 'italic'),
-                                bg='white',
-                                fg='#7F8C8D')
-        desc_pestanas.pack()
-        
-        # Botón Todo
-        todo_frame = tk.Frame(btn_container, bg='white')
-        todo_frame.pack(pady=8)
-        ttk.Button(todo_frame, text="📦 Generar Todo (Word + Excels)", 
-                  command=self.generar_todo, width=50).pack()
-        desc_todo = tk.Label(todo_frame,
-                           text="Genera todos los formatos disponibles simultáneamente",
-                           font=('Segoe UI', 9, 'italic'),
-                           bg='white',
-                           fg='#7F8C8D')
-        desc_todo.pack()
-        
-        # Separador
-        separator = ttk.Separator(frame, orient='horizontal')
-        separator.pack(fill='x', pady=20)
-        
-        # Label de estado con mejor diseño
-        status_frame = tk.Frame(frame, bg='#E8F8F5', relief='ridge', borderwidth=2)
-        status_frame.pack(fill='x', pady=10)
-        
-        self.status_label = tk.Label(status_frame, 
-                                     text="",
-                                     font=('Segoe UI', 10),
-                                     bg='#E8F8F5',
-                                     fg='#27AE60',
-                                     pady=10)
-        self.status_label.pack()
-    
-    def agregar_sujeto(self):
-        nombre = self.nombre_sujeto.get().strip()
-        identificacion = self.identificacion_sujeto.get().strip()
-        descripcion = self.descripcion_sujeto.get().strip()
-        id_gestion = self.id_gestion.get().strip()
-        
-        if not nombre or not identificacion:
-            messagebox.showwarning("Advertencia", "Debe ingresar al menos nombre e identificación")
-            return
-        
-        if not id_gestion:
-            respuesta = messagebox.askyesno("ID de Gestión", 
-                                           "No ha ingresado un ID de Gestión.\n\n" +
-                                           "¿Desea generar uno automáticamente?")
-            if respuesta:
-                self.generar_id_gestion()
-                id_gestion = self.id_gestion.get().strip()
-            else:
-                return
-        
-        sujeto = {
-            'nombre': nombre,
-            'identificacion': identificacion,
-            'descripcion': descripcion,
-            'id_gestion': id_gestion
-        }
-        
-        self.sujetos.append(sujeto)
-        self.tree_sujetos.insert('', 'end', values=(nombre, identificacion, descripcion, id_gestion, '🗑️'))
-        
-        # Guardar en archivo
-        self.guardar_sujetos_archivo()
-        
-        # Limpiar campos
-        self.nombre_sujeto.delete(0, tk.END)
-        self.identificacion_sujeto.delete(0, tk.END)
-        self.descripcion_sujeto.delete(0, tk.END)
-        
-        messagebox.showinfo("Éxito", f"Sujeto agregado y guardado correctamente\nGestión: {id_gestion}")
-    
-    def on_tree_click(self, event):
-        """Detecta clicks en el árbol y verifica si fue en la columna de eliminar"""
-        region = self.tree_sujetos.identify("region", event.x, event.y)
-        if region == "cell":
-            column = self.tree_sujetos.identify_column(event.x)
-            item = self.tree_sujetos.identify_row(event.y)
-            
-            # Si se hizo click en la columna de "Acciones" (columna #5)
-            if column == '#5' and item:
-                self.eliminar_sujeto_directo(item)
-    
-    def eliminar_sujeto_directo(self, item):
-        """Elimina un sujeto directamente sin confirmación"""
-        # Obtener valores del item
-        valores = self.tree_sujetos.item(item)['values']
-        
-        # Buscar y eliminar de la lista
-        for i, sujeto in enumerate(self.sujetos):
-            if (sujeto['nombre'] == valores[0] and 
-                sujeto['identificacion'] == valores[1] and
-                sujeto.get('id_gestion', 'N/A') == valores[3]):
-                self.sujetos.pop(i)
-                break
-        
-        # Eliminar del árbol
-        self.tree_sujetos.delete(item)
-        
-        # Guardar cambios en archivo
-        self.guardar_sujetos_archivo()
-    
-    def eliminar_sujeto(self):
-        """Elimina el sujeto seleccionado (método alternativo)"""
-        selected = self.tree_sujetos.selection()
-        if not selected:
-            messagebox.showwarning("Advertencia", "Seleccione un sujeto para eliminar")
-            return
-        
-        self.eliminar_sujeto_directo(selected[0])
-    
-    def guardar_plantilla(self):
-        self.plantilla_modificable['objetivo'] = self.objetivo_text.get(1.0, tk.END).strip()
-        self.plantilla_modificable['conclusion_template'] = self.conclusion_text.get(1.0, tk.END).strip()
-        self.plantilla_modificable['compromiso'] = self.compromiso_text.get(1.0, tk.END).strip()
-        self.plantilla_modificable['lugar_emision'] = self.lugar_emision.get().strip()
-        self.plantilla_modificable['jefe_cumplimiento'] = self.jefe_cumplimiento.get().strip()
-        self.plantilla_modificable['analista'] = self.analista.get().strip()
-        
-        # Guardar incisos adicionales
-        self.plantilla_modificable['incisos_adicionales'] = []
-        for widget in self.incisos_widgets:
-            texto = widget.get(1.0, tk.END).strip()
-            if texto:
-                self.plantilla_modificable['incisos_adicionales'].append(texto)
-        
-        messagebox.showinfo("Éxito", f"Plantilla actualizada correctamente\n\n" +
-                          f"Incisos adicionales guardados: {len(self.plantilla_modificable['incisos_adicionales'])}")
-    
-    def aplicar_formato_apa(self, doc):
-        """Aplica formato APA al documento"""
-        sections = doc.sections
-        for section in sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
-            
-        for paragraph in doc.paragraphs:
-            # Aplicar fuente a todos los runs
-            for run in paragraph.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
-            
-            # Solo aplicar doble espacio si no tiene configuración específica
-            if paragraph.paragraph_format.line_spacing is None or paragraph.paragraph_format.line_spacing == 1.0:
-                if paragraph.style.name == 'Normal':
-                    paragraph.paragraph_format.line_spacing = 2.0
-            
-            # Alineación justificada para texto normal
-            if paragraph.style.name == 'Normal' and paragraph.alignment != WD_ALIGN_PARAGRAPH.CENTER:
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            
-            # Sangría solo para párrafos largos sin otra configuración
-            if paragraph.style.name == 'Normal' and len(paragraph.text) > 50:
-                if paragraph.paragraph_format.first_line_indent is None or paragraph.paragraph_format.first_line_indent == 0:
-                    paragraph.paragraph_format.first_line_indent = Inches(0.5)
-    
-    def crear_tabla_apa(self, doc, filas, columnas):
-        """Crea una tabla con formato APA"""
-        tabla = doc.add_table(rows=filas, cols=columnas)
-        tabla.style = 'Light Grid'
-        
-        for row in tabla.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = 'Times New Roman'
-                        run.font.size = Pt(11)
-                    paragraph.paragraph_format.space_after = Pt(0)
-                    paragraph.paragraph_format.space_before = Pt(0)
-        
-        return tabla
-    
-    def generar_word(self):
-        if not self.sujetos:
-            messagebox.showwarning("Advertencia", "Debe agregar al menos un sujeto de investigación")
-            return
-        
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".docx",
-            filetypes=[("Documento Word", "*.docx"), ("Todos los archivos", "*.*")],
-            initialfile=f"Debida_Diligencia_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-        )
-        
-        if not filename:
-            return
-        
-        try:
-            doc = Document()
-            
-            # Configurar márgenes primero
-            sections = doc.sections
-            for section in sections:
-                section.top_margin = Inches(1)
-                section.bottom_margin = Inches(1)
-                section.left_margin = Inches(1)
-                section.right_margin = Inches(1)
-            
-            # Título principal con formato APA (usando configuración personalizable)
-            titulo_texto = self.configuraciones.get('titulo_documento', 'INFORME DE DEBIDA DILIGENCIA')
-            titulo = doc.add_heading(titulo_texto, level=0)
-            titulo.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            titulo_run = titulo.runs[0]
-            titulo_run.font.name = 'Times New Roman'
-            titulo_run.font.size = Pt(16)
-            titulo_run.font.bold = True
-            titulo.paragraph_format.space_after = Pt(24)
-            titulo.paragraph_format.space_before = Pt(0)
-            
-            # Información general
-            datos_generales = [
-                ('Fecha de Solicitud: ', self.fecha_solicitud.get()),
-                ('Usuario Requirente: ', self.usuario_requirente.get()),
-                ('Tipo de Solicitud: ', self.tipo_solicitud.get()),
-                ('Descripción: ', self.descripcion_solicitud.get())
-            ]
-            
-            for etiqueta, valor in datos_generales:
-                p = doc.add_paragraph()
-                run1 = p.add_run(etiqueta)
-                run1.font.bold = True
-                run1.font.name = 'Times New Roman'
-                run1.font.size = Pt(12)
-                run2 = p.add_run(valor)
-                run2.font.name = 'Times New Roman'
-                run2.font.size = Pt(12)
-                p.paragraph_format.space_after = Pt(6)
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.line_spacing = 1.0
-            
-            # Serapio
-            p = doc.add_paragraph()
-            run1 = p.add_run('Serapio: ')
-            run1.font.bold = True
-            run1.font.name = 'Times New Roman'
-            run1.font.size = Pt(12)
-            run2 = p.add_run(self.serapio.get())
-            run2.font.name = 'Times New Roman'
-            run2.font.size = Pt(12)
-            p.paragraph_format.space_after = Pt(12)
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.line_spacing = 1.0
-            
-            # Encabezado: Sujeto de Investigación
-            encabezado = doc.add_heading('Sujeto de Investigación', level=1)
-            enc_run = encabezado.runs[0]
-            enc_run.font.name = 'Times New Roman'
-            enc_run.font.size = Pt(14)
-            enc_run.font.bold = True
-            encabezado.paragraph_format.space_before = Pt(12)
-            encabezado.paragraph_format.space_after = Pt(12)
-            
-            # Tabla de sujetos (con columna de ID Gestión)
-            tabla = self.crear_tabla_apa(doc, len(self.sujetos) + 1, 4)
-            hdr_cells = tabla.rows[0].cells
-            hdr_cells[0].text = 'Nombre'
-            hdr_cells[1].text = 'Identificación'
-            hdr_cells[2].text = 'Descripción'
-            hdr_cells[3].text = 'ID Gestión'
-            
-            for cell in tabla.rows[0].cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.bold = True
-            
-            for i, sujeto in enumerate(self.sujetos, 1):
-                row_cells = tabla.rows[i].cells
-                row_cells[0].text = sujeto['nombre'].title()  # Formato de nombres propios
-                row_cells[1].text = sujeto['identificacion']
-                row_cells[2].text = sujeto['descripcion']
-                row_cells[3].text = sujeto.get('id_gestion', 'N/A')
-            
-            # Espacio después de la tabla
-            p_espacio = doc.add_paragraph()
-            p_espacio.paragraph_format.space_after = Pt(12)
-            
-            # Fuente de información
-            p = doc.add_paragraph()
-            run = p.add_run('Fuente de Información: ')
-            run.font.bold = True
-            run.font.name = 'Times New Roman'
-            run.font.size = Pt(12)
-            run2 = p.add_run(self.fuente_info.get(1.0, tk.END).strip())
-            run2.font.name = 'Times New Roman'
-            run2.font.size = Pt(12)
-            p.paragraph_format.space_after = Pt(18)
-            p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            
-            # Sección 1: Objetivo del Informe
-            encabezado = doc.add_heading('1. Objetivo del Informe', level=1)
-            for run in encabezado.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(14)
-                run.font.bold = True
-            encabezado.paragraph_format.space_before = Pt(12)
-            encabezado.paragraph_format.space_after = Pt(12)
-            
-            p = doc.add_paragraph(self.plantilla_modificable['objetivo'])
-            p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            for run in p.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
-            p.paragraph_format.space_after = Pt(12)
-            p.paragraph_format.line_spacing = 2.0  # Doble espacio según APA
-            
-            # Sección 2: Resultados de la Investigación
-            encabezado = doc.add_heading('2. Resultados de la Investigación', level=1)
-            for run in encabezado.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(14)
-                run.font.bold = True
-            encabezado.paragraph_format.space_before = Pt(12)
-            encabezado.paragraph_format.space_after = Pt(12)
-            
-            tabla_resultados = self.crear_tabla_apa(doc, len(self.resultados) + 1, 3)
-            hdr_cells = tabla_resultados.rows[0].cells
-            hdr_cells[0].text = 'Fuente'
-            hdr_cells[1].text = 'Resultado'
-            hdr_cells[2].text = 'Fecha'
-            
-            # Formato de encabezados
-            for cell in tabla_resultados.rows[0].cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.bold = True
-                        run.font.name = 'Times New Roman'
-                        run.font.size = Pt(11)
-            
-            # Datos de resultados
-            for i, (fuente, widget) in enumerate(self.resultados.items(), 1):
-                row_cells = tabla_resultados.rows[i].cells
-                row_cells[0].text = fuente
-                row_cells[1].text = widget.get()
-                row_cells[2].text = 'N/A'
-                
-                # Formato de celdas
-                for cell in row_cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.name = 'Times New Roman'
-                            run.font.size = Pt(11)
-            
-            # Espacio después de la tabla
-            doc.add_paragraph()
-            
-            # Sección 3: Conclusión
-            encabezado = doc.add_heading('3. Conclusión', level=1)
-            enc_run = encabezado.runs[0]
-            enc_run.font.name = 'Times New Roman'
-            enc_run.font.size = Pt(14)
-            enc_run.font.bold = True
-            encabezado.paragraph_format.space_before = Pt(12)
-            encabezado.paragraph_format.space_after = Pt(12)
-            
-            # Preparar texto de nombres
-            if len(self.sujetos) == 1:
-                nombres_texto = f"la persona {self.sujetos[0]['nombre'].title()}"
-            else:
-                nombres = [s['nombre'].title() for s in self.sujetos]  # Formato de nombres propios
-                nombres_texto = "las personas " + ", ".join(nombres[:-1]) + f" y {nombres[-1]}"
-            
-            conclusion = self.plantilla_modificable['conclusion_template'].format(
-                nombres=nombres_texto,
-                nivel_riesgo=self.nivel_riesgo.get()
-            )
-            
-            # Inciso a
-            p = doc.add_paragraph()
-            run1 = p.add_run('a. ')
-            run1.font.name = 'Times New Roman'
-            run1.font.size = Pt(12)
-            run1.font.bold = True
-            run2 = p.add_run(conclusion)
-            run2.font.name = 'Times New Roman'
-            run2.font.size = Pt(12)
-            p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            p.paragraph_format.space_after = Pt(12)
-            p.paragraph_format.line_spacing = 2.0
-            p.paragraph_format.first_line_indent = Inches(0.5)
-            
-            # Inciso b
-            p = doc.add_paragraph()
-            run1 = p.add_run('b. ')
-            run1.font.name = 'Times New Roman'
-            run1.font.size = Pt(12)
-            run1.font.bold = True
-            run2 = p.add_run(self.plantilla_modificable['compromiso'])
-            run2.font.name = 'Times New Roman'
-            run2.font.size = Pt(12)
-            p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            p.paragraph_format.space_after = Pt(12)
-            p.paragraph_format.line_spacing = 2.0
-            p.paragraph_format.first_line_indent = Inches(0.5)
-            
-            # Incisos adicionales personalizados
-            if 'incisos_adicionales' in self.plantilla_modificable and self.plantilla_modificable['incisos_adicionales']:
-                for i, texto_inciso in enumerate(self.plantilla_modificable['incisos_adicionales'], start=3):
-                    letra = chr(96 + i)  # c, d, e, etc.
-                    p = doc.add_paragraph()
-                    run1 = p.add_run(f'{letra}. ')
-                    run1.font.name = 'Times New Roman'
-                    run1.font.size = Pt(12)
-                    run1.font.bold = True
-                    run2 = p.add_run(texto_inciso)
-                    run2.font.name = 'Times New Roman'
-                    run2.font.size = Pt(12)
-                    p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-                    p.paragraph_format.space_after = Pt(12)
-                    p.paragraph_format.line_spacing = 2.0
-                    p.paragraph_format.first_line_indent = Inches(0.5)
-            
-            # Sección 4: Firma y Lugar de Emisión
-            encabezado = doc.add_heading('4. Firma y Lugar de Emisión', level=1)
-            enc_run = encabezado.runs[0]
-            enc_run.font.name = 'Times New Roman'
-            enc_run.font.size = Pt(14)
-            enc_run.font.bold = True
-            encabezado.paragraph_format.space_before = Pt(12)
-            encabezado.paragraph_format.space_after = Pt(12)
-            
-            meses = {
-                1: 'enero', 2: 'febrero', 3: 'marzo', 4: 'abril',
-                5: 'mayo', 6: 'junio', 7: 'julio', 8: 'agosto',
-                9: 'septiembre', 10: 'octubre', 11: 'noviembre', 12: 'diciembre'
-            }
-            dias = {
-                0: 'lunes', 1: 'martes', 2: 'miércoles', 3: 'jueves',
-                4: 'viernes', 5: 'sábado', 6: 'domingo'
-            }
-            
-            ahora = datetime.now()
-            dia_semana = dias[ahora.weekday()]
-            dia = ahora.day
-            mes = meses[ahora.month]
-            año = ahora.year
-            fecha_actual = f"{dia_semana} {dia} de {mes} de {año}"
-            
-            p = doc.add_paragraph(f"Emitido en {self.plantilla_modificable['lugar_emision']}, el {fecha_actual}")
-            for run in p.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
-            p.paragraph_format.space_after = Pt(24)
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Espacio adicional para las firmas (más separación)
-            doc.add_paragraph()  # Espacio 1
-            doc.add_paragraph()  # Espacio 2
-            doc.add_paragraph()  # Espacio 3
-            
-            # Tabla de firmas profesional (sin bordes) con más ancho
-            tabla_firmas = doc.add_table(rows=1, cols=2)
-            tabla_firmas.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Eliminar todos los bordes de la tabla
-            for row in tabla_firmas.rows:
-                for cell in row.cells:
-                    cell.width = Inches(3.5)  # Aumentado de 2.5 a 3.5 pulgadas
-                    tcPr = cell._element.get_or_add_tcPr()
-                    tcBorders = OxmlElement('w:tcBorders')
-                    for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-                        border = OxmlElement(f'w:{border_name}')
-                        border.set(qn('w:val'), 'none')
-                        tcBorders.append(border)
-                    tcPr.append(tcBorders)
-            
-            # Columna izquierda: Jefe de Cumplimiento
-            cell_izq = tabla_firmas.rows[0].cells[0]
-            
-            # Línea de firma
-            p_linea_izq = cell_izq.add_paragraph()
-            p_linea_izq.add_run('_' * 35)  # Aumentado de 30 a 35
-            p_linea_izq.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            for run in p_linea_izq.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
-            p_linea_izq.paragraph_format.space_after = Pt(8)  # Aumentado de 6 a 8
-            
-            # Nombre del jefe
-            jefe = self.plantilla_modificable['jefe_cumplimiento'] if self.plantilla_modificable['jefe_cumplimiento'] else "Jefe de Cumplimiento"
-            p_nombre_izq = cell_izq.add_paragraph()
-            run_nombre = p_nombre_izq.add_run(jefe)
-            run_nombre.font.name = 'Times New Roman'
-            run_nombre.font.size = Pt(12)
-            run_nombre.font.bold = True
-            p_nombre_izq.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p_nombre_izq.paragraph_format.space_after = Pt(4)  # Aumentado de 3 a 4
-            
-            # Cargo
-            p_cargo_izq = cell_izq.add_paragraph()
-            run_cargo = p_cargo_izq.add_run('Jefe de Cumplimiento')
-            run_cargo.font.name = 'Times New Roman'
-            run_cargo.font.size = Pt(11)
-            p_cargo_izq.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Columna derecha: Analista
-            cell_der = tabla_firmas.rows[0].cells[1]
-            
-            # Línea de firma
-            p_linea_der = cell_der.add_paragraph()
-            p_linea_der.add_run('_' * 35)  # Aumentado de 30 a 35
-            p_linea_der.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            for run in p_linea_der.runs:
-                run.font.name = 'Times New Roman'
-                run.font.size = Pt(12)
-            p_linea_der.paragraph_format.space_after = Pt(8)  # Aumentado de 6 a 8
-            
-            # Nombre del analista
-            analista = self.plantilla_modificable['analista'] if self.plantilla_modificable['analista'] else "Analista"
-            p_nombre_der = cell_der.add_paragraph()
-            run_nombre_der = p_nombre_der.add_run(analista)
-            run_nombre_der.font.name = 'Times New Roman'
-            run_nombre_der.font.size = Pt(12)
-            run_nombre_der.font.bold = True
-            p_nombre_der.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p_nombre_der.paragraph_format.space_after = Pt(4)  # Aumentado de 3 a 4
-            
-            # Cargo y firma del responsable designado
-            p_cargo_der = cell_der.add_paragraph()
-            run_cargo_der = p_cargo_der.add_run('Analista de Cumplimiento')
-            run_cargo_der.font.name = 'Times New Roman'
-            run_cargo_der.font.size = Pt(11)
-            p_cargo_der.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p_cargo_der.paragraph_format.space_after = Pt(4)  # Aumentado de 3 a 4
-            
-            p_firma_resp = cell_der.add_paragraph()
-            run_firma = p_firma_resp.add_run('Firma del Responsable Designado')
-            run_firma.font.name = 'Times New Roman'
-            run_firma.font.size = Pt(10)
-            run_firma.font.italic = True
-            p_firma_resp.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Aplicar formato APA al final
-            self.aplicar_formato_apa(doc)
-            
-            # Guardar documento
-            doc.save(filename)
-            
-            self.status_label.config(text=f"✓ Documento Word generado: {os.path.basename(filename)}")
-            messagebox.showinfo("Éxito", f"Documento generado exitosamente:\n{filename}")
-            
-        except PermissionError:
-            messagebox.showerror("Error de Permisos", 
-                               "No se puede guardar el archivo. Verifique que:\n" +
-                               "1. El archivo no esté abierto en Word\n" +
-                               "2. Tenga permisos de escritura en la carpeta")
-        except Exception as e:
-            import traceback
-            error_detallado = traceback.format_exc()
-            messagebox.showerror("Error", f"Error al generar documento:\n{str(e)}\n\nDetalles:\n{error_detallado[:200]}")
-    
-    def generar_excel_completo(self):
-        if not self.sujetos:
-            messagebox.showwarning("Advertencia", "Debe agregar al menos un sujeto de investigación")
-            return
-        
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Archivo Excel", "*.xlsx"), ("Todos los archivos", "*.*")],
-            initialfile=f"Debida_Diligencia_Completo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        )
-        
-        if not filename:
-            return
-        
-        try:
-            meses = {
-                1: 'enero', 2: 'febrero', 3: 'marzo', 4: 'abril',
-                5: 'mayo', 6: 'junio', 7: 'julio', 8: 'agosto',
-                9: 'septiembre', 10: 'octubre', 11: 'noviembre', 12: 'diciembre'
-            }
-            dias = {
-                0: 'lunes', 1: 'martes', 2: 'miércoles', 3: 'jueves',
-                4: 'viernes', 5: 'sábado', 6: 'domingo'
-            }
-            
-            ahora = datetime.now()
-            dia_semana = dias[ahora.weekday()]
-            dia = ahora.day
-            mes = meses[ahora.month]
-            año = ahora.year
-            fecha_emision = f"{dia_semana} {dia} de {mes} de {año}"
-            
-            data_dict = {
-                'ID Gestión': [],
-                'Fecha de Solicitud': [],
-                'Usuario Requirente': [],
-                'Tipo de Solicitud': [],
-                'Descripción': [],
-                'Serapio': [],
-                'Nombre': [],
-                'Identificación': [],
-                'Descripción del Sujeto': []
-            }
-            
-            for fuente in self.configuraciones['fuentes_investigacion']:
-                data_dict[fuente] = []
-            
-            data_dict['Nivel de Riesgo'] = []
-            data_dict['Fecha de Emisión'] = []
-            
-            for sujeto in self.sujetos:
-                data_dict['ID Gestión'].append(sujeto.get('id_gestion', 'N/A'))
-                data_dict['Fecha de Solicitud'].append(self.fecha_solicitud.get())
-                data_dict['Usuario Requirente'].append(self.usuario_requirente.get())
-                data_dict['Tipo de Solicitud'].append(self.tipo_solicitud.get())
-                data_dict['Descripción'].append(self.descripcion_solicitud.get())
-                data_dict['Serapio'].append(self.serapio.get())
-                data_dict['Nombre'].append(sujeto['nombre'].title())  # Formato nombres propios
-                data_dict['Identificación'].append(sujeto['identificacion'])
-                data_dict['Descripción del Sujeto'].append(sujeto['descripcion'])
-                
-                for fuente in self.configuraciones['fuentes_investigacion']:
-                    if fuente in self.resultados:
-                        data_dict[fuente].append(self.resultados[fuente].get())
-                    else:
-                        data_dict[fuente].append('N/A')
-                
-                data_dict['Nivel de Riesgo'].append(self.nivel_riesgo.get().upper())
-                data_dict['Fecha de Emisión'].append(fecha_emision)
-            
-            df = pd.DataFrame(data_dict)
-            
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Debidas Diligencias', index=False)
-                
-                workbook = writer.book
-                worksheet = writer.sheets['Debidas Diligencias']
-                
-                from openpyxl.styles import Font, PatternFill, Alignment, Border
-                
-                header_font = Font(name='Calibri', size=12, bold=True, color='FFFFFF')
-                header_fill = PatternFill(start_color='2C3E50', end_color='2C3E50', fill_type='solid')
-                header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                
-                data_font = Font(name='Calibri', size=11)
-                data_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-                
-                fill_even = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
-                fill_odd = PatternFill(start_color='F8F9FA', end_color='F8F9FA', fill_type='solid')
-                
-                no_border = Border()
-                
-                for cell in worksheet[1]:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    cell.border = no_border
-                
-                for idx, row in enumerate(worksheet.iter_rows(min_row=2, max_row=worksheet.max_row, min_col=1, max_col=worksheet.max_column), start=2):
-                    if idx % 2 == 0:
-                        row_fill = fill_even
-                    else:
-                        row_fill = fill_odd
-                    
-                    for cell in row:
-                        cell.font = data_font
-                        cell.alignment = data_alignment
-                        cell.border = no_border
-                        cell.fill = row_fill
-                
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    for cell in column:
-                        try:
-                            if cell.value:
-                                cell_length = len(str(cell.value))
-                                if cell_length > max_length:
-                                    max_length = cell_length
-                        except:
-                            pass
-                    
-                    adjusted_width = min(max_length + 2, 50)
-                    adjusted_width = max(adjusted_width, 12)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-                
-                worksheet.freeze_panes = 'A2'
-                worksheet.auto_filter.ref = worksheet.dimensions
-                worksheet.row_dimensions[1].height = 30
-            
-            self.status_label.config(text=f"✓ Excel completo generado: {os.path.basename(filename)}")
-            messagebox.showinfo("Éxito", f"Excel generado exitosamente:\n{filename}\n\nCada fila representa una debida diligencia completa.")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al generar Excel: {str(e)}")
-    
-    def generar_excel_pestanas(self):
-        if not self.sujetos:
-            messagebox.showwarning("Advertencia", "Debe agregar al menos un sujeto de investigación")
-            return
-        
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Archivo Excel", "*.xlsx"), ("Todos los archivos", "*.*")],
-            initialfile=f"Debida_Diligencia_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        )
-        
-        if not filename:
-            return
-        
-        try:
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                resumen_data = {
-                    'Campo': ['ID Gestión', 'Fecha de Solicitud', 'Usuario Requirente', 'Tipo de Solicitud', 'Descripción', 'Serapio'],
-                    'Valor': [
-                        self.id_gestion.get(),
-                        self.fecha_solicitud.get(),
-                        self.usuario_requirente.get(),
-                        self.tipo_solicitud.get(),
-                        self.descripcion_solicitud.get(),
-                        self.serapio.get()
-                    ]
-                }
-                df_resumen = pd.DataFrame(resumen_data)
-                df_resumen.to_excel(writer, sheet_name='Resumen', index=False)
-                
-                for i, sujeto in enumerate(self.sujetos, 1):
-                    data = {
-                        'Campo': ['Nombre', 'Identificación', 'Descripción', 'ID Gestión', '', 'Resultados:'],
-                        'Valor': [sujeto['nombre'].title(), sujeto['identificacion'], sujeto['descripcion'],  # Formato nombres propios
-                                 sujeto.get('id_gestion', 'N/A'), '', '']
-                    }
-                    
-                    for fuente, widget in self.resultados.items():
-                        data['Campo'].append(fuente)
-                        data['Valor'].append(widget.get())
-                    
-                    data['Campo'].append('Nivel de Riesgo')
-                    data['Valor'].append(self.nivel_riesgo.get())
-                    
-                    df = pd.DataFrame(data)
-                    sheet_name = sujeto['nombre'][:31]
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-            
-            self.status_label.config(text=f"✓ Excel generado: {os.path.basename(filename)}")
-            messagebox.showinfo("Éxito", f"Excel generado exitosamente:\n{filename}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al generar Excel: {str(e)}")
-    
-    def generar_todo(self):
-        self.generar_word()
-        self.generar_excel_completo()
-        self.generar_excel_pestanas()
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = DueDiligenceSystem(root)
+import time
+_INICIO_ARRANQUE = time.perf_counter()
+
+import tkinter as tk
+from tkinter import ttk, messagebox, scrolledtext, filedialog
+from datetime import datetime
+import copy
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import traceback
+# motor_informes (python-docx) se importa al generar el
+# primer informe o en el precalentamiento, no al arrancar
+import datos_informe
+import almacenamiento
+from modelo_caso import (CasoSnapshot, ListaSujetos, Sujeto, TablaResultados, NOMBRES_ESTADO, SIN_FECHA,
+                         NIVELES_RIESGO, NIVEL_AUTOMATICO, ESTADO_CON_COINCIDENCIAS,
+                         fecha_desde_texto, texto_fecha)
+import calificacion_riesgo
+from indice_sujetos import IndiceSujetos, CAMPOS_BUSQUEDA
+from lista_virtual import ListaVirtual
+import importacion_sujetos
+from importacion_sujetos import PATRON_NOMBRE, PATRON_IDENTIFICACION
+
+_FIN_IMPORTS = time.perf_counter()
+
+# Configurar locale para español
+datos_informe.configurar_locale()
+
+# DD_PERFIL_ARRANQUE=1 imprime el desglose del tiempo de arranque
+PERFIL_ARRANQUE = os.environ.get('DD_PERFIL_ARRANQUE', '') not in ('', '0')
+# DD_PRECALENTAR=0 desactiva la carga anticipada del motor de informes
+PRECALENTAR = os.environ.get('DD_PRECALENTAR', '1') != '0'
+# Espera (ms) tras mostrar la ventana antes de precalentar
+RETARDO_PRECALENTAR_MS = 500
+
+# Pausa de escritura (ms) antes de lanzar la búsqueda en vivo
+RETARDO_BUSQUEDA_MS = 250
+
+# Cada cuánto (ms) se revisa el avance de la generación en segundo plano
+INTERVALO_PROGRESO_MS = 100
+
+# Opción del selector de la pestaña de resultados que edita a todos los sujetos
+TODOS_LOS_SUJETOS = "Todos los sujetos"
+
+# Documentos que se pueden generar (las claves son las de motor_informes.GENERADORES)
+NOMBRES_DOCUMENTO = {
+    'word': 'Documento Word',
+    'excel': 'Excel completo',
+    'pestanas': 'Excel con pestañas',
+    'zip': 'Paquete ZIP',
+}
+ARCHIVOS_SALIDA = {
+    'word': ("Documento Word", ".docx", "Debida_Diligencia_{}.docx"),
+    'excel': ("Archivo Excel", ".xlsx", "Debida_Diligencia_Completo_{}.xlsx"),
+    'pestanas': ("Archivo Excel", ".xlsx", "Debida_Diligencia_{}.xlsx"),
+}
+MENSAJES_EXITO = {
+    'word': "Documento generado exitosamente:\n{}",
+    'excel': "Excel generado exitosamente:\n{}\n\nCada fila representa una debida diligencia completa.",
+    'pestanas': "Excel generado exitosamente:\n{}",
+    'zip': "Documentos empaquetados exitosamente:\n{}",
+}
+
+class DueDiligenceSystem:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Sistema de Debida Diligencia - Profesional")
+        self.root.geometry("1200x750")
+        
+        # Configurar estilo profesional
+        self.configurar_estilos()
+        
+        # Datos
+        try:
+            self.almacen = almacenamiento.abrir_almacen()
+        except Exception as e:
+            # Sin almacén no hay con qué trabajar; los archivos de origen quedan intactos
+            messagebox.showerror("Error", f"No se pudieron abrir los datos guardados:\n{e}\n\n"
+                                          "Los archivos originales no se modificaron. "
+                                          "Corríjalos o muévalos y vuelva a abrir la aplicación.")
+            self.root.destroy()
+            raise SystemExit(1)
+        self.sujetos = ListaSujetos()
+        self.indice = IndiceSujetos()
+        self.plantilla_modificable = self.cargar_plantilla_default()
+        self.configuraciones = self.cargar_configuraciones_default()
+        self.usuarios_guardados = self.cargar_usuarios_guardados()
+        self.serapios_guardados = self.cargar_serapios_guardados()
+        self.incisos_personalizados = []
+        self.gestion_actual = ""  # Para identificar gestiones
+        
+        # Modelo de la pestaña de resultados: vale aunque la pestaña aún no se
+        # haya construido; sus widgets se crean al visitarla. Los resultados
+        # son por sujeto y fuente; sujeto_resultados es el uid elegido en la
+        # pestaña (None: todos los sujetos)
+        self.tabla_resultados = TablaResultados(self.configuraciones['fuentes_investigacion'])
+        self.sujeto_resultados = None
+        self.valor_nivel_riesgo = NIVEL_AUTOMATICO
+        self.resultados = {}  # fuente -> (resultado, estado, fecha)
+        self._resultados_mostrados = {}
+        self._uids_selector = []
+        self.nivel_riesgo = None
+        
+        # Generación de documentos en curso (hilo, cola de mensajes, cancelación)
+        self.generacion = None
+        # Cribado en listas locales en curso (igual que la generación)
+        self.cribado = None
+        
+        # Carga de los sujetos guardados en curso (hilo, cola de lotes, cancelación)
+        self.carga_sujetos = None
+        
+        # Búsqueda en vivo: última búsqueda para refinarla
+        self._ultima_busqueda = None
+        self._busqueda_pendiente = None
+        
+        # Cargar sujetos guardados desde archivo
+        self.cargar_sujetos_guardados()
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
+        
+        # Crear header profesional
+        self.crear_header()
+        
+        # Crear notebook (pestañas)
+        self.notebook = ttk.Notebook(root)
+        self.notebook.pack(fill='both', expand=True, padx=15, pady=(0, 15))
+        
+        # Crear pestañas vacías; cada una se construye la primera vez que se muestra
+        self.tabs_pendientes = {}
+        for texto, constructor in [
+            ("📋 Datos Generales", self.crear_tab_datos_generales),
+            ("👤 Sujetos de Investigación", self.crear_tab_sujetos),
+            ("🔍 Resultados de Investigación", self.crear_tab_resultados),
+            ("📝 Modificar Plantilla", self.crear_tab_plantilla),
+            ("⚙️ Configuraciones", self.crear_tab_configuraciones),
+            ("📄 Generar Documentos", self.crear_tab_generar),
+        ]:
+            tab = ttk.Frame(self.notebook)
+            self.notebook.add(tab, text=texto)
+            self.tabs_pendientes[str(tab)] = (tab, constructor)
+            if constructor == self.crear_tab_resultados:
+                self.tab_resultados = tab
+        self.notebook.bind('<<NotebookTabChanged>>', self.construir_tab_seleccionada)
+        self.construir_tab_seleccionada()
+        
+        if PRECALENTAR:
+            self.root.after(RETARDO_PRECALENTAR_MS, self.precalentar)
+    
+    def construir_tab_seleccionada(self, event=None):
+        """Construye los widgets de la pestaña visible si es su primera visita"""
+        pendiente = self.tabs_pendientes.pop(self.notebook.select(), None)
+        if pendiente is not None:
+            tab, constructor = pendiente
+            constructor(tab)
+    
+    def precalentar(self):
+        """Importa el motor de informes en un hilo mientras el usuario trabaja.
+        
+        Así el primer informe no paga la carga de python-docx (pandas y
+        openpyxl se cargan al escribir el primer Excel). Si el usuario genera antes de que termine, el import espera
+        al hilo (el bloqueo de imports de Python lo garantiza).
+        """
+        def cargar():
+            inicio = time.perf_counter()
+            import motor_informes
+            if PERFIL_ARRANQUE:
+                print(f"[arranque] precalentamiento del motor: {time.perf_counter() - inicio:.3f} s")
+        
+        threading.Thread(target=cargar, daemon=True).start()
+    
+    def configurar_estilos(self):
+        """Configura estilos profesionales para la aplicación"""
+        style = ttk.Style()
+        
+        # Tema base
+        style.theme_use('clam')
+        
+        # Colores profesionales
+        color_primario = '#2C3E50'
+        color_secundario = '#34495E'
+        color_acento = '#3498DB'
+        color_fondo = '#ECF0F1'
+        color_texto = '#2C3E50'
+        
+        # Configurar Notebook (pestañas)
+        style.configure('TNotebook', background=color_fondo, borderwidth=0)
+        style.configure('TNotebook.Tab', 
+                       background=color_secundario,
+                       foreground='white',
+                       padding=[20, 10],
+                       font=('Segoe UI', 10, 'bold'))
+        style.map('TNotebook.Tab',
+                 background=[('selected', color_acento)],
+                 foreground=[('selected', 'white')])
+        
+        # Configurar LabelFrame
+        style.configure('TLabelframe', 
+                       background='white',
+                       borderwidth=2,
+                       relief='groove')
+        style.configure('TLabelframe.Label',
+                       background='white',
+                       foreground=color_primario,
+                       font=('Segoe UI', 11, 'bold'))
+        
+        # Configurar Botones
+        style.configure('TButton',
+                       background=color_acento,
+                       foreground='white',
+                       borderwidth=0,
+                       focuscolor='none',
+                       padding=[15, 8],
+                       font=('Segoe UI', 10))
+        style.map('TButton',
+                 background=[('active', '#2980B9')])
+        
+        # Configurar Labels
+        style.configure('TLabel',
+                       background='white',
+                       foreground=color_texto,
+                       font=('Segoe UI', 10))
+        
+        # Configurar Entry
+        style.configure('TEntry',
+                       fieldbackground='white',
+                       borderwidth=1)
+        
+        # Configurar Combobox
+        style.configure('TCombobox',
+                       fieldbackground='white',
+                       background='white',
+                       borderwidth=1)
+        
+        # Configurar el fondo de la ventana principal
+        self.root.configure(bg=color_fondo)
+    
+    def crear_header(self):
+        """Crea un encabezado profesional para la aplicación"""
+        header_frame = tk.Frame(self.root, bg='#2C3E50', height=80)
+        header_frame.pack(fill='x', padx=0, pady=0)
+        header_frame.pack_propagate(False)
+        
+        # Título principal
+        titulo = tk.Label(header_frame,
+                         text="SISTEMA DE DEBIDA DILIGENCIA",
+                         font=('Segoe UI', 18, 'bold'),
+                         bg='#2C3E50',
+                         fg='white')
+        titulo.pack(side='left', padx=30, pady=20)
+        
+        # Subtítulo
+        subtitulo = tk.Label(header_frame,
+                            text="Gestión Profesional de Cumplimiento",
+                            font=('Segoe UI', 10),
+                            bg='#2C3E50',
+                            fg='#BDC3C7')
+        subtitulo.pack(side='left', padx=(0, 30), pady=20)
+    
+    def cargar_usuarios_guardados(self):
+        """Carga los usuarios guardados"""
+        try:
+            return self.almacen.cargar_usuarios()
+        except Exception as e:
+            print(f"Error al cargar usuarios: {e}")
+        return []
+    
+    def guardar_usuario(self, usuario):
+        """Guarda un usuario en la lista de usuarios guardados"""
+        if usuario and usuario not in self.usuarios_guardados:
+            self.usuarios_guardados.append(usuario)
+            try:
+                self.almacen.agregar_usuario(usuario)
+            except Exception as e:
+                print(f"Error al guardar usuario: {e}")
+    
+    def cargar_serapios_guardados(self):
+        """Carga los serapios guardados"""
+        try:
+            return self.almacen.cargar_serapios()
+        except Exception as e:
+            print(f"Error al cargar serapios: {e}")
+        return []
+    
+    def guardar_serapio(self, serapio):
+        """Guarda un serapio en la lista de serapios guardados"""
+        if serapio and serapio not in self.serapios_guardados:
+            self.serapios_guardados.append(serapio)
+            try:
+                self.almacen.agregar_serapio(serapio)
+            except Exception as e:
+                print(f"Error al guardar serapio: {e}")
+    
+    def cargar_sujetos_guardados(self):
+        """Carga los sujetos guardados.
+        
+        Con SQLite se leen por lotes en un hilo y se van agregando a la lista y
+        al índice sin demorar el arranque; los trigramas se arman al terminar,
+        también en segundo plano.
+        """
+        if self.almacen.LECTURA_EN_HILO:
+            self.carga_sujetos = {'cola': queue.Queue(), 'cancelar': threading.Event()}
+            threading.Thread(target=self._cargar_sujetos_en_hilo, daemon=True,
+                             args=(self.carga_sujetos['cola'], self.carga_sujetos['cancelar'])).start()
+            self.root.after(INTERVALO_PROGRESO_MS, self._revisar_carga_sujetos)
+            return
+        try:
+            for lote in self.almacen.leer_sujetos_por_lotes():
+                self._agregar_cargados(self._sujetos_de_lote(lote))
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron cargar los sujetos guardados:\n{e}")
+        self.indice.preparar_en_segundo_plano()
+    
+    @staticmethod
+    def _sujetos_de_lote(lote):
+        almacenamiento.asegurar_uid(lote)
+        return [Sujeto.desde_dict(sujeto) for sujeto in lote]
+    
+    def _cargar_sujetos_en_hilo(self, cola, cancelar):
+        """Cuerpo del hilo de carga: no toca widgets ni la lista, solo la cola"""
+        try:
+            for lote in self.almacen.leer_sujetos_por_lotes():
+                if cancelar.is_set():
+                    return
+                cola.put(('lote', self._sujetos_de_lote(lote)))
+            cola.put(('fin',))
+        except Exception as e:
+            cola.put(('error', f"{type(e).__name__}: {e}"))
+    
+    def _agregar_cargados(self, sujetos):
+        self.sujetos.extend(sujetos)
+        for sujeto in sujetos:
+            self.indice.agregar(sujeto)
+        # La búsqueda anterior no incluye a los recién cargados: no se refina
+        self._ultima_busqueda = None
+    
+    def _revisar_carga_sujetos(self):
+        """Agrega los lotes leídos por el hilo de carga (root.after)"""
+        carga = self.carga_sujetos
+        if carga is None:
+            return
+        final = None
+        cargados = []
+        while final is None:
+            try:
+                mensaje = carga['cola'].get_nowait()
+            except queue.Empty:
+                break
+            if mensaje[0] == 'lote':
+                cargados.extend(mensaje[1])
+            else:
+                final = mensaje
+        if cargados:
+            self._agregar_cargados(cargados)
+            # Si la lista muestra a todos los sujetos (no una búsqueda), se redibuja
+            if hasattr(self, 'lista_sujetos') and self.lista_sujetos.datos is self.sujetos:
+                self.mostrar_sujetos(self.sujetos)
+        if final is None:
+            self.root.after(INTERVALO_PROGRESO_MS, self._revisar_carga_sujetos)
+            return
+        self.carga_sujetos = None
+        if final[0] == 'error':
+            messagebox.showerror("Error", f"No se pudieron cargar los sujetos guardados:\n{final[1]}")
+        self.indice.preparar_en_segundo_plano()
+    
+    def cancelar_carga_sujetos(self):
+        if self.carga_sujetos is not None:
+            self.carga_sujetos['cancelar'].set()
+            self.carga_sujetos = None
+    
+    def guardar_sujeto_agregado(self, sujeto):
+        """Guarda un sujeto nuevo sin reescribir los demás"""
+        try:
+            self.almacen.agregar_sujeto(sujeto.a_dict())
+        except Exception as e:
+            print(f"Error al guardar sujetos: {e}")
+    
+    def guardar_sujeto_eliminado(self, sujeto):
+        """Quita un sujeto del almacén"""
+        try:
+            self.almacen.eliminar_sujeto(sujeto.a_dict())
+        except Exception as e:
+            print(f"Error al guardar sujetos: {e}")
+        
+    def cargar_configuraciones_default(self):
+        """Carga configuraciones guardadas o crea las predeterminadas"""
+        try:
+            configuraciones = self.almacen.cargar_configuraciones()
+            if configuraciones:
+                return configuraciones
+        except Exception as e:
+            print(f"Error al cargar configuraciones: {e}")
+        
+        return datos_informe.configuraciones_default()
+    
+    def guardar_configuraciones_archivo(self):
+        """Guarda las configuraciones"""
+        try:
+            self.almacen.guardar_configuraciones(self.configuraciones)
+        except Exception as e:
+            print(f"Error al guardar configuraciones: {e}")
+        
+    def cerrar(self):
+        """Compacta y cierra el almacén antes de salir"""
+        if self.generacion is not None:
+            # Cancelar y dar tiempo al hilo de borrar su archivo temporal
+            self.generacion['cancelar'].set()
+            self.generacion['hilo'].join(timeout=5)
+        if self.cribado is not None:
+            self.cribado['cancelar'].set()
+        self.cancelar_carga_sujetos()
+        try:
+            self.almacen.cerrar()
+        except Exception as e:
+            print(f"Error al cerrar el almacén: {e}")
+        self.root.destroy()
+        
+    def cargar_plantilla_default(self):
+        return datos_informe.plantilla_default()
+    
+    def crear_tab_datos_generales(self, tab):
+        # Frame principal con fondo blanco
+        main_container = tk.Frame(tab, bg='#ECF0F1')
+        main_container.pack(fill='both', expand=True)
+        
+        # Frame principal
+        frame = ttk.LabelFrame(main_container, text="Información General del Caso", padding=25)
+        frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # ID de Gestión (nuevo campo al inicio)
+        ttk.Label(frame, text="ID de Gestión:", font=('Segoe UI', 10, 'bold')).grid(row=0, column=0, sticky='w', pady=8)
+        gestion_frame = tk.Frame(frame, bg='white')
+        gestion_frame.grid(row=0, column=1, pady=8, padx=15, sticky='ew')
+        self.id_gestion = tk.Entry(gestion_frame, width=30, font=('Segoe UI', 10), relief='solid', borderwidth=1)
+        self.id_gestion.pack(side='left', padx=(0, 5))
+        ttk.Button(gestion_frame, text="Generar ID", command=self.generar_id_gestion, width=12).pack(side='left')
+        
+        # Fecha de solicitud
+        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['fecha_solicitud'] + ":", 
+                 font=('Segoe UI', 10, 'bold')).grid(row=1, column=0, sticky='w', pady=8)
+        self.fecha_solicitud = tk.Entry(frame, width=45, font=('Segoe UI', 10), relief='solid', borderwidth=1)
+        self.fecha_solicitud.insert(0, datetime.now().strftime("%d de %B del %Y"))
+        self.fecha_solicitud.grid(row=1, column=1, pady=8, padx=15, sticky='ew')
+        
+        # Usuario requirente con autocompletado
+        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['usuario_requirente'] + ":", 
+                 font=('Segoe UI', 10, 'bold')).grid(row=2, column=0, sticky='w', pady=8)
+        usuario_frame = tk.Frame(frame, bg='white')
+        usuario_frame.grid(row=2, column=1, pady=8, padx=15, sticky='ew')
+        self.usuario_requirente = ttk.Combobox(usuario_frame, width=35, values=self.usuarios_guardados, font=('Segoe UI', 10))
+        self.usuario_requirente.pack(side='left', fill='x', expand=True, padx=(0, 5))
+        ttk.Button(usuario_frame, text="💾", command=self.guardar_usuario_actual, width=3).pack(side='left')
+        
+        # Tipo de solicitud (solo lectura, se modifica desde configuraciones)
+        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['tipo_solicitud'] + ":", 
+                 font=('Segoe UI', 10, 'bold')).grid(row=3, column=0, sticky='w', pady=8)
+        self.tipo_solicitud = ttk.Combobox(frame, width=42, values=self.configuraciones['tipos_solicitud'], 
+                                          font=('Segoe UI', 10), state='readonly')
+        self.tipo_solicitud.set('proveedor')
+        self.tipo_solicitud.grid(row=3, column=1, pady=8, padx=15, sticky='ew')
+        
+        # Descripción
+        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['descripcion'] + ":", 
+                 font=('Segoe UI', 10, 'bold')).grid(row=4, column=0, sticky='w', pady=8)
+        self.descripcion_solicitud = tk.Entry(frame, width=45, font=('Segoe UI', 10), relief='solid', borderwidth=1)
+        self.descripcion_solicitud.insert(0, 'Solicitud de permisos')
+        self.descripcion_solicitud.grid(row=4, column=1, pady=8, padx=15, sticky='ew')
+        
+        # Serapio (NUEVO CAMPO)
+        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['serapio'] + ":", 
+                 font=('Segoe UI', 10, 'bold')).grid(row=5, column=0, sticky='w', pady=8)
+        serapio_frame = tk.Frame(frame, bg='white')
+        serapio_frame.grid(row=5, column=1, pady=8, padx=15, sticky='ew')
+        self.serapio = ttk.Combobox(serapio_frame, width=35, values=self.serapios_guardados, font=('Segoe UI', 10))
+        self.serapio.pack(side='left', fill='x', expand=True, padx=(0, 5))
+        ttk.Button(serapio_frame, text="💾", command=self.guardar_serapio_actual, width=3).pack(side='left')
+        
+        # Fuente de información
+        ttk.Label(frame, text=self.configuraciones['nombres_pestanas']['fuente_info'] + ":", 
+                 font=('Segoe UI', 10, 'bold')).grid(row=6, column=0, sticky='nw', pady=8)
+        self.fuente_info = scrolledtext.ScrolledText(frame, width=45, height=4, font=('Segoe UI', 9), 
+                                                     relief='solid', borderwidth=1, wrap='word')
+        self.fuente_info.insert(1.0, 'Búsqueda en medios de comunicación hondureños y bases de datos públicas y privadas.')
+        self.fuente_info.grid(row=6, column=1, pady=8, padx=15, sticky='ew')
+        
+        # Configurar expansión de columnas
+        frame.columnconfigure(1, weight=1)
+    
+    def generar_id_gestion(self):
+        """Genera un ID único para la gestión"""
+        fecha = datetime.now().strftime("%Y%m%d")
+        hora = datetime.now().strftime("%H%M%S")
+        id_gestion = f"DD-{fecha}-{hora}"
+        self.id_gestion.delete(0, tk.END)
+        self.id_gestion.insert(0, id_gestion)
+        self.gestion_actual = id_gestion
+        messagebox.showinfo("ID Generado", f"ID de Gestión: {id_gestion}\n\nTodos los sujetos agregados a partir de ahora pertenecerán a esta gestión.")
+    
+    def guardar_usuario_actual(self):
+        """Guarda el usuario actual en la lista"""
+        usuario = self.usuario_requirente.get().strip()
+        if usuario:
+            self.guardar_usuario(usuario)
+            self.usuario_requirente['values'] = self.usuarios_guardados
+            messagebox.showinfo("Guardado", f"Usuario '{usuario}' guardado correctamente")
+    
+    def guardar_serapio_actual(self):
+        """Guarda el serapio actual en la lista"""
+        serapio = self.serapio.get().strip()
+        if serapio:
+            self.guardar_serapio(serapio)
+            self.serapio['values'] = self.serapios_guardados
+            messagebox.showinfo("Guardado", f"Serapio '{serapio}' guardado correctamente")
+    
+    def crear_tab_sujetos(self, tab):
+        # Configurar fondo
+        main_container = tk.Frame(tab, bg='#ECF0F1')
+        main_container.pack(fill='both', expand=True)
+        
+        # Frame de búsqueda (NUEVO)
+        frame_busqueda = ttk.LabelFrame(main_container, text="🔍 Buscar Sujetos", padding=15)
+        frame_busqueda.pack(fill='x', padx=20, pady=(20, 10))
+        
+        busqueda_frame = tk.Frame(frame_busqueda, bg='white')
+        busqueda_frame.pack(fill='x')
+        
+        ttk.Label(busqueda_frame, text="Buscar por:", font=('Segoe UI', 10, 'bold')).pack(side='left', padx=5)
+        
+        self.tipo_busqueda = ttk.Combobox(busqueda_frame, width=18, values=list(CAMPOS_BUSQUEDA), 
+                                         font=('Segoe UI', 10), state='readonly')
+        self.tipo_busqueda.set('Nombre')
+        self.tipo_busqueda.pack(side='left', padx=5)
+        
+        self.campo_busqueda = tk.Entry(busqueda_frame, width=30, font=('Segoe UI', 10), relief='solid', borderwidth=1)
+        self.campo_busqueda.pack(side='left', padx=5)
+        self.campo_busqueda.bind('<KeyRelease>', self.buscar_sujeto_en_tiempo_real)
+        
+        ttk.Button(busqueda_frame, text="🔍 Buscar", command=self.buscar_sujeto).pack(side='left', padx=5)
+        ttk.Button(busqueda_frame, text="🔄 Mostrar Todos", command=self.mostrar_todos_sujetos).pack(side='left', padx=5)
+        
+        # Frame de entrada
+        frame_entrada = ttk.LabelFrame(main_container, text="Agregar Nuevo Sujeto", padding=25)
+        frame_entrada.pack(fill='x', padx=20, pady=10)
+        
+        # Campos en una sola fila para nombre e identificación (más angostos)
+        campos_frame = tk.Frame(frame_entrada, bg='white')
+        campos_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=8)
+        
+        ttk.Label(campos_frame, text="Nombre:", font=('Segoe UI', 10, 'bold')).pack(side='left', padx=(0, 5))
+        self.nombre_sujeto = tk.Entry(campos_frame, width=25, font=('Segoe UI', 10), relief='solid', borderwidth=1)
+        self.nombre_sujeto.pack(side='left', padx=5)
+        # Validación: solo letras y espacios
+        vcmd_nombre = (self.root.register(self.validar_nombre), '%P')
+        self.nombre_sujeto.config(validate='key', validatecommand=vcmd_nombre)
+        
+        ttk.Label(campos_frame, text="Identificación:", font=('Segoe UI', 10, 'bold')).pack(side='left', padx=(15, 5))
+        self.identificacion_sujeto = tk.Entry(campos_frame, width=20, font=('Segoe UI', 10), relief='solid', borderwidth=1)
+        self.identificacion_sujeto.pack(side='left', padx=5)
+        # Validación: solo números y guiones
+        vcmd_id = (self.root.register(self.validar_identificacion), '%P')
+        self.identificacion_sujeto.config(validate='key', validatecommand=vcmd_id)
+        
+        # Descripción en segunda fila (ancho completo)
+        ttk.Label(frame_entrada, text="Descripción:", font=('Segoe UI', 10, 'bold')).grid(row=1, column=0, sticky='w', pady=8)
+        self.descripcion_sujeto = tk.Entry(frame_entrada, width=60, font=('Segoe UI', 10), relief='solid', borderwidth=1)
+        self.descripcion_sujeto.grid(row=1, column=1, pady=8, padx=15, sticky='ew')
+        
+        # Botón de agregar con estilo
+        btn_frame = tk.Frame(frame_entrada, bg='white')
+        btn_frame.grid(row=2, column=0, columnspan=2, pady=15)
+        ttk.Button(btn_frame, text="➕ Agregar Sujeto", command=self.agregar_sujeto).pack()
+        
+        frame_entrada.columnconfigure(1, weight=1)
+        
+        # Frame de lista
+        frame_lista = ttk.LabelFrame(main_container, text="Sujetos Registrados", padding=25)
+        frame_lista.pack(fill='both', expand=True, padx=20, pady=(10, 20))
+        
+        # Lista virtual: el Treeview solo contiene las filas visibles
+        # (incluye columna de ID de Gestión y columna de Acciones)
+        self.lista_sujetos = ListaVirtual(frame_lista, ('Nombre', 'Identificación', 'Descripción', 'Gestión', 'Acciones'),
+                                          valores_fila=self.valores_fila_sujeto, clave_fila=self._iid_sujeto,
+                                          height=12, bg='white')
+        self.lista_sujetos.pack(fill='both', expand=True)
+        self.tree_sujetos = self.lista_sujetos.tree
+        self.tree_sujetos.heading('Nombre', text='Nombre Completo')
+        self.tree_sujetos.heading('Identificación', text='Identificación')
+        self.tree_sujetos.heading('Descripción', text='Descripción')
+        self.tree_sujetos.heading('Gestión', text='ID de Gestión')
+        self.tree_sujetos.heading('Acciones', text='Eliminar')
+        
+        # Ajustar anchos
+        self.tree_sujetos.column('Nombre', width=180)
+        self.tree_sujetos.column('Identificación', width=110)
+        self.tree_sujetos.column('Descripción', width=180)
+        self.tree_sujetos.column('Gestión', width=130)
+        self.tree_sujetos.column('Acciones', width=70)
+        
+        # Bind para detectar clicks en la columna de acciones
+        self.tree_sujetos.bind('<Button-1>', self.on_tree_click)
+        
+        # Mostrar los sujetos guardados
+        self.mostrar_sujetos(self.sujetos)
+        
+        # Botones (sin botón eliminar individual ya que está en cada fila)
+        btn_frame2 = tk.Frame(frame_lista, bg='white')
+        btn_frame2.pack(pady=10)
+        ttk.Button(btn_frame2, text="📋 Cargar Seleccionado", command=self.cargar_sujeto_seleccionado).pack(side='left', padx=5)
+        ttk.Button(btn_frame2, text="🔍 Filtrar por Gestión", command=self.filtrar_por_gestion).pack(side='left', padx=5)
+        ttk.Button(btn_frame2, text="📥 Importar CSV/Excel", command=self.importar_sujetos).pack(side='left', padx=5)
+    
+    def validar_nombre(self, texto):
+        """Valida que solo se ingresen letras, espacios y algunos caracteres especiales en nombres"""
+        if texto == "":
+            return True
+        # Permitir letras (incluyendo acentos y ñ), espacios, puntos, comas y apóstrofes
+        return bool(PATRON_NOMBRE.match(texto))
+    
+    def validar_identificacion(self, texto):
+        """Valida que solo se ingresen números y guiones en identificación"""
+        if texto == "":
+            return True
+        # Solo números y guiones
+        return bool(PATRON_IDENTIFICACION.match(texto))
+    
+    def filtrar_por_gestion(self):
+        """Muestra solo los sujetos de una gestión específica"""
+        gestion_id = self.id_gestion.get().strip()
+        if not gestion_id:
+            messagebox.showwarning("Advertencia", "Primero debe ingresar o generar un ID de Gestión")
+            return
+        
+        sujetos_filtrados = self.indice.por_gestion(gestion_id)
+        
+        if not sujetos_filtrados:
+            messagebox.showinfo("Sin resultados", f"No hay sujetos asociados a la gestión: {gestion_id}")
+            return
+        
+        mensaje = f"Sujetos de la gestión {gestion_id}:\n\n"
+        for i, sujeto in enumerate(sujetos_filtrados, 1):
+            mensaje += f"{i}. {sujeto['nombre']} ({sujeto['identificacion']})\n"
+        
+        messagebox.showinfo("Sujetos Filtrados", mensaje)
+    
+    def buscar_sujeto(self):
+        """Busca sujetos según el criterio seleccionado"""
+        tipo = self.tipo_busqueda.get()
+        termino = self.campo_busqueda.get().strip().lower()
+        
+        if not termino:
+            messagebox.showwarning("Advertencia", "Ingrese un término de búsqueda")
+            return
+        
+        encontrados = self.filtrar_sujetos(tipo, termino)
+        self.mostrar_sujetos(encontrados)
+        
+        if not encontrados:
+            messagebox.showinfo("Sin resultados", f"No se encontraron sujetos con '{termino}' en {tipo}")
+    
+    def buscar_sujeto_en_tiempo_real(self, event=None):
+        """Busca sujetos mientras el usuario escribe.
+        
+        Las teclas seguidas se agrupan: solo se busca cuando pasan
+        RETARDO_BUSQUEDA_MS sin escribir.
+        """
+        if self._busqueda_pendiente is not None:
+            self.root.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.root.after(RETARDO_BUSQUEDA_MS, self.ejecutar_busqueda_en_vivo)
+    
+    def ejecutar_busqueda_en_vivo(self):
+        self._busqueda_pendiente = None
+        termino = self.campo_busqueda.get().strip().lower()
+        
+        # Si no hay término, mostrar todos
+        if not termino:
+            self._ultima_busqueda = None
+            self.mostrar_sujetos(self.sujetos)
+            return
+        
+        self.mostrar_sujetos(self.filtrar_sujetos(self.tipo_busqueda.get(), termino))
+    
+    def filtrar_sujetos(self, tipo, termino):
+        """Sujetos que coinciden con el término.
+        
+        Si el término amplía el de la búsqueda anterior (mismo tipo), se
+        filtran los resultados anteriores en lugar de volver a buscar.
+        """
+        campo = CAMPOS_BUSQUEDA[tipo]
+        anterior = self._ultima_busqueda
+        if (anterior is not None and campo != 'nombre_aproximado' and anterior[0] == campo
+                and termino.startswith(anterior[1])):
+            encontrados = [s for s in anterior[2] if termino in (s.get(campo) or '').lower()]
+        else:
+            encontrados = self.indice.buscar(campo, termino)
+            if campo == 'nombre_aproximado' and not self.indice.listo:
+                # Resultado provisional por subcadena: se repite cuando el índice de nombres esté listo
+                self._reintentar_busqueda()
+        self._ultima_busqueda = (campo, termino, encontrados)
+        return encontrados
+    
+    def _reintentar_busqueda(self):
+        if self._busqueda_pendiente is None:
+            self._busqueda_pendiente = self.root.after(INTERVALO_PROGRESO_MS, self.ejecutar_busqueda_en_vivo)
+    
+    def _iid_sujeto(self, sujeto):
+        """Identificador de la fila del sujeto en el árbol: su uid estable"""
+        return sujeto['uid']
+    
+    def mostrar_sujetos(self, sujetos):
+        """Muestra estos sujetos en la lista (solo se dibujan las filas visibles)"""
+        self.lista_sujetos.establecer_datos(sujetos)
+    
+    def valores_fila_sujeto(self, sujeto):
+        return (
+            sujeto['nombre'],
+            sujeto['identificacion'],
+            sujeto['descripcion'],
+            sujeto.get('id_gestion', 'N/A'),
+            '🗑️'
+        )
+    
+    def mostrar_todos_sujetos(self):
+        """Muestra todos los sujetos en el árbol"""
+        if self._busqueda_pendiente is not None:
+            self.root.after_cancel(self._busqueda_pendiente)
+            self._busqueda_pendiente = None
+        self._ultima_busqueda = None
+        self.mostrar_sujetos(self.sujetos)
+        
+        # Limpiar campo de búsqueda
+        self.campo_busqueda.delete(0, tk.END)
+    
+    def cargar_sujeto_seleccionado(self):
+        """Carga los datos del sujeto seleccionado en los campos de entrada"""
+        selected = self.tree_sujetos.selection()
+        if not selected:
+            messagebox.showwarning("Advertencia", "Seleccione un sujeto para cargar")
+            return
+        
+        # Sujeto completo de la fila seleccionada (el iid es su uid)
+        sujeto = self.indice.por_uid(selected[0])
+        if sujeto is None:
+            return
+        
+        # Cargar datos en los campos
+        self.nombre_sujeto.delete(0, tk.END)
+        self.nombre_sujeto.insert(0, sujeto['nombre'])
+        
+        self.identificacion_sujeto.delete(0, tk.END)
+        self.identificacion_sujeto.insert(0, sujeto['identificacion'])
+        
+        self.descripcion_sujeto.delete(0, tk.END)
+        self.descripcion_sujeto.insert(0, sujeto['descripcion'])
+        
+        messagebox.showinfo("Cargado", f"Datos de '{sujeto['nombre']}' cargados en los campos")
+    
+    def eliminar_todos_sujetos(self):
+        """Elimina todos los sujetos guardados sin confirmación"""
+        if not self.sujetos and self.carga_sujetos is None:
+            messagebox.showinfo("Información", "No hay sujetos para eliminar")
+            return
+        
+        # Lo que aún no se terminó de leer también se elimina
+        self.cancelar_carga_sujetos()
+        
+        # Limpiar lista de sujetos
+        self.sujetos.clear()
+        self.indice.vaciar()
+        self.tabla_resultados.vaciar()
+        self._olvidar_sujeto_resultados(self.sujeto_resultados)
+        self._ultima_busqueda = None
+        
+        # Limpiar lista
+        self.mostrar_sujetos(self.sujetos)
+        
+        # Guardar cambios
+        try:
+            self.almacen.eliminar_todos_sujetos()
+        except Exception as e:
+            print(f"Error al guardar sujetos: {e}")
+        
+        messagebox.showinfo("Éxito", "Todos los sujetos han sido eliminados")
+    
+    def crear_tab_resultados(self, tab):
+        main_container = tk.Frame(tab, bg='#ECF0F1')
+        main_container.pack(fill='both', expand=True)
+        
+        frame = ttk.LabelFrame(main_container, text="Fuentes Consultadas", padding=20)
+        frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Sujeto cuyos resultados se editan (o todos a la vez)
+        ttk.Label(frame, text="Sujeto:", font=('Segoe UI', 10, 'bold')).grid(row=0, column=0, sticky='w', pady=5)
+        self.selector_sujeto = ttk.Combobox(frame, state='readonly', font=('Segoe UI', 10),
+                                            postcommand=self.llenar_selector_sujetos)
+        self.selector_sujeto.set(self.etiqueta_sujeto_resultados())
+        self.selector_sujeto.grid(row=0, column=1, columnspan=3, pady=5, sticky='ew')
+        self.selector_sujeto.bind('<<ComboboxSelected>>', self.al_elegir_sujeto_resultados)
+        
+        for columna, titulo in enumerate(['Fuente', 'Resultado', 'Estado', 'Fecha (dd/mm/aaaa)']):
+            ttk.Label(frame, text=titulo, font=('Segoe UI', 10, 'bold')).grid(
+                row=1, column=columna, sticky='w', pady=(10, 2), padx=5)
+        
+        # Una fila de campos por fuente; los valores se cargan desde el modelo
+        self.resultados = {}
+        fuentes = self.configuraciones['fuentes_investigacion']
+        
+        for i, fuente in enumerate(fuentes, 2):
+            ttk.Label(frame, text=f"{fuente}:").grid(row=i, column=0, sticky='w', pady=3, padx=5)
+            
+            resultado = tk.Entry(frame, width=50, font=('Segoe UI', 10))
+            resultado.grid(row=i, column=1, pady=3, padx=5, sticky='ew')
+            estado = ttk.Combobox(frame, width=18, state='readonly', values=NOMBRES_ESTADO,
+                                  font=('Segoe UI', 10))
+            estado.grid(row=i, column=2, pady=3, padx=5)
+            fecha = tk.Entry(frame, width=12, font=('Segoe UI', 10))
+            fecha.grid(row=i, column=3, pady=3, padx=5)
+            
+            self.resultados[fuente] = (resultado, estado, fecha)
+        
+        # Nivel de riesgo
+        fila = len(fuentes) + 2
+        ttk.Label(frame, text="Nivel de Riesgo:", font=('Segoe UI', 10, 'bold')).grid(
+            row=fila, column=0, sticky='w', pady=10)
+        frame_riesgo = tk.Frame(frame)
+        frame_riesgo.grid(row=fila, column=1, columnspan=3, pady=10, padx=5, sticky='w')
+        self.nivel_riesgo = ttk.Combobox(frame_riesgo, width=20, values=[NIVEL_AUTOMATICO, *NIVELES_RIESGO],
+                                         font=('Segoe UI', 10))
+        self.nivel_riesgo.set(self.valor_nivel_riesgo)
+        self.nivel_riesgo.pack(side='left')
+        ttk.Button(frame_riesgo, text="Calcular según la política",
+                   command=self.calcular_nivel_riesgo).pack(side='left', padx=10)
+        self.nivel_calculado = ttk.Label(frame_riesgo, text="", font=('Segoe UI', 10))
+        self.nivel_calculado.pack(side='left')
+        
+        ttk.Label(frame, text="Con 'Todos los sujetos', un campo vacío indica que los sujetos tienen "
+                              "valores distintos: si se deja vacío, cada uno conserva el suyo.",
+                  font=('Segoe UI', 9, 'italic'), wraplength=700).grid(
+            row=fila + 1, column=0, columnspan=4, sticky='w')
+        
+        # Cribado automático contra las listas de restricción configuradas
+        frame_cribado = tk.Frame(frame)
+        frame_cribado.grid(row=fila + 2, column=0, columnspan=4, sticky='w', pady=(15, 0))
+        self.boton_cribar = ttk.Button(frame_cribado, text="🔎 Cribar en listas locales",
+                                       command=self.cribar_listas)
+        self.boton_cribar.pack(side='left')
+        if self.cribado is not None:
+            self.boton_cribar.config(state='disabled')
+        self.estado_cribado = ttk.Label(frame_cribado, text="", font=('Segoe UI', 10))
+        self.estado_cribado.pack(side='left', padx=10)
+        
+        frame.columnconfigure(1, weight=1)
+        self.mostrar_resultados()
+    
+    def crear_tab_plantilla(self, tab):
+        main_container = tk.Frame(tab, bg='#ECF0F1')
+        main_container.pack(fill='both', expand=True)
+        
+        # Frame principal con scroll
+        canvas = tk.Canvas(main_container, bg='#ECF0F1')
+        scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
+        scrollable_frame = tk.Frame(canvas, bg='#ECF0F1')
+        
+        scrollable_frame.bind(
+            "<Configure>",
+            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        )
+        
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+        
+        frame = ttk.LabelFrame(scrollable_frame, text="Personalizar Plantilla", padding=20)
+        frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Objetivo
+        ttk.Label(frame, text="Objetivo del Informe:", font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=5)
+        self.objetivo_text = scrolledtext.ScrolledText(frame, width=80, height=3, font=('Segoe UI', 10))
+        self.objetivo_text.insert(1.0, self.plantilla_modificable['objetivo'])
+        self.objetivo_text.pack(pady=5, fill='x')
+        
+        # Conclusión template
+        ttk.Label(frame, text="Plantilla de Conclusión (use {nombres} y {nivel_riesgo}):", 
+                 font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=5)
+        self.conclusion_text = scrolledtext.ScrolledText(frame, width=80, height=4, font=('Segoe UI', 10))
+        self.conclusion_text.insert(1.0, self.plantilla_modificable['conclusion_template'])
+        self.conclusion_text.pack(pady=5, fill='x')
+        
+        # Compromiso
+        ttk.Label(frame, text="Texto de Compromiso:", font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=5)
+        self.compromiso_text = scrolledtext.ScrolledText(frame, width=80, height=3, font=('Segoe UI', 10))
+        self.compromiso_text.insert(1.0, self.plantilla_modificable['compromiso'])
+        self.compromiso_text.pack(pady=5, fill='x')
+        
+        # NUEVA SECCIÓN: Incisos Adicionales
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
+        
+        inciso_header = tk.Frame(frame, bg='white')
+        inciso_header.pack(fill='x', pady=10)
+        ttk.Label(inciso_header, text="Incisos Adicionales para la Conclusión:", 
+                 font=('Segoe UI', 11, 'bold')).pack(side='left')
+        ttk.Button(inciso_header, text="➕ Agregar Inciso", command=self.agregar_inciso).pack(side='right')
+        
+        # Lista de incisos
+        self.frame_incisos = tk.Frame(frame, bg='white')
+        self.frame_incisos.pack(fill='both', expand=True, pady=10)
+        
+        self.incisos_widgets = []
+        self.cargar_incisos_guardados()
+        
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
+        
+        # Datos de firma
+        frame_firma = ttk.Frame(frame)
+        frame_firma.pack(fill='x', pady=10)
+        
+        ttk.Label(frame_firma, text="Lugar de Emisión:", font=('Segoe UI', 10)).grid(row=0, column=0, sticky='w', pady=5)
+        self.lugar_emision = tk.Entry(frame_firma, width=40, font=('Segoe UI', 10))
+        self.lugar_emision.insert(0, self.plantilla_modificable['lugar_emision'])
+        self.lugar_emision.grid(row=0, column=1, pady=5, padx=10, sticky='ew')
+        
+        ttk.Label(frame_firma, text="Jefe de Cumplimiento:", font=('Segoe UI', 10)).grid(row=1, column=0, sticky='w', pady=5)
+        self.jefe_cumplimiento = tk.Entry(frame_firma, width=40, font=('Segoe UI', 10))
+        self.jefe_cumplimiento.grid(row=1, column=1, pady=5, padx=10, sticky='ew')
+        
+        ttk.Label(frame_firma, text="Analista:", font=('Segoe UI', 10)).grid(row=2, column=0, sticky='w', pady=5)
+        self.analista = tk.Entry(frame_firma, width=40, font=('Segoe UI', 10))
+        self.analista.grid(row=2, column=1, pady=5, padx=10, sticky='ew')
+        
+        frame_firma.columnconfigure(1, weight=1)
+        
+        ttk.Button(frame, text="💾 Guardar Cambios de Plantilla", command=self.guardar_plantilla).pack(pady=20)
+        
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+    
+    def agregar_inciso(self):
+        """Agrega un nuevo campo para inciso personalizado"""
+        inciso_frame = tk.Frame(self.frame_incisos, bg='white', relief='ridge', borderwidth=1)
+        inciso_frame.pack(fill='x', pady=5, padx=10)
+        
+        letra_frame = tk.Frame(inciso_frame, bg='white')
+        letra_frame.pack(side='left', padx=5, pady=5)
+        
+        numero_inciso = len(self.incisos_widgets) + 3  # Empieza en 'c' (después de a y b)
+        letra = chr(96 + numero_inciso)  # 'c', 'd', 'e', etc.
+        
+        ttk.Label(letra_frame, text=f"{letra}.", font=('Segoe UI', 10, 'bold')).pack()
+        
+        text_widget = scrolledtext.ScrolledText(inciso_frame, width=70, height=3, font=('Segoe UI', 9), wrap='word')
+        text_widget.pack(side='left', fill='both', expand=True, padx=5, pady=5)
+        
+        btn_eliminar = ttk.Button(inciso_frame, text="🗑️", width=3, 
+                                  command=lambda: self.eliminar_inciso(inciso_frame, text_widget))
+        btn_eliminar.pack(side='right', padx=5, pady=5)
+        
+        self.incisos_widgets.append(text_widget)
+    
+    def eliminar_inciso(self, frame, widget):
+        """Elimina un inciso personalizado"""
+        if messagebox.askyesno("Confirmar", "¿Desea eliminar este inciso?"):
+            self.incisos_widgets.remove(widget)
+            frame.destroy()
+            self.renumerar_incisos()
+    
+    def renumerar_incisos(self):
+        """Renumera los incisos después de eliminar uno"""
+        for i, widget_frame in enumerate(self.frame_incisos.winfo_children()):
+            numero_inciso = i + 3
+            letra = chr(96 + numero_inciso)
+            # Actualizar la letra del label
+            for child in widget_frame.winfo_children():
+                if isinstance(child, tk.Frame):
+                    for label in child.winfo_children():
+                        if isinstance(label, ttk.Label):
+                            label.config(text=f"{letra}.")
+    
+    def cargar_incisos_guardados(self):
+        """Carga los incisos guardados en la plantilla"""
+        if 'incisos_adicionales' in self.plantilla_modificable:
+            for texto_inciso in self.plantilla_modificable['incisos_adicionales']:
+                self.agregar_inciso()
+                self.incisos_widgets[-1].insert(1.0, texto_inciso)
+    
+    def crear_tab_configuraciones(self, tab):
+        main_container = tk.Frame(tab, bg='#ECF0F1')
+        main_container.pack(fill='both', expand=True)
+        
+        # Frame con scroll
+        canvas = tk.Canvas(main_container, bg='#ECF0F1')
+        scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
+        scrollable_frame = tk.Frame(canvas, bg='#ECF0F1')
+        
+        scrollable_frame.bind(
+            "<Configure>",
+            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        )
+        
+        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
+        canvas.configure(yscrollcommand=scrollbar.set)
+        
+        frame = ttk.LabelFrame(scrollable_frame, text="Personalizar Opciones del Sistema", padding=20)
+        frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Tipos de Solicitud
+        ttk.Label(frame, text="Tipos de Solicitud:", font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
+        ttk.Label(frame, text="Ingrese los tipos de solicitud separados por comas:", 
+                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
+        
+        self.tipos_solicitud_text = tk.Entry(frame, width=80, font=('Segoe UI', 10))
+        self.tipos_solicitud_text.insert(0, ', '.join(self.configuraciones['tipos_solicitud']))
+        self.tipos_solicitud_text.pack(pady=5, fill='x')
+        
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
+        
+        # Fuentes de Investigación
+        ttk.Label(frame, text="Fuentes de Investigación:", font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
+        ttk.Label(frame, text="Ingrese las fuentes de investigación (una por línea):", 
+                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
+        
+        self.fuentes_text = scrolledtext.ScrolledText(frame, width=80, height=8, font=('Segoe UI', 10))
+        self.fuentes_text.insert(1.0, '\n'.join(self.configuraciones['fuentes_investigacion']))
+        self.fuentes_text.pack(pady=5, fill='x')
+        
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
+        
+        # NUEVA SECCIÓN: Nombres de Pestañas
+        ttk.Label(frame, text="Nombres de Campos en Información General:", 
+                 font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
+        ttk.Label(frame, text="Personalice los nombres de los campos que aparecen en Datos Generales:", 
+                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
+        
+        nombres_frame = tk.Frame(frame, bg='white', relief='groove', borderwidth=2)
+        nombres_frame.pack(fill='x', pady=10, padx=5)
+        
+        self.campos_nombres = {}
+        campos_config = [
+            ('fecha_solicitud', 'Fecha de Solicitud'),
+            ('usuario_requirente', 'Usuario Requirente'),
+            ('tipo_solicitud', 'Tipo de Solicitud'),
+            ('descripcion', 'Descripción'),
+            ('serapio', 'Serapio'),
+            ('fuente_info', 'Fuente de Información')
+        ]
+        
+        for i, (clave, nombre_default) in enumerate(campos_config):
+            campo_frame = tk.Frame(nombres_frame, bg='white')
+            campo_frame.pack(fill='x', padx=10, pady=5)
+            
+            ttk.Label(campo_frame, text=f"{nombre_default}:", 
+                     font=('Segoe UI', 9, 'bold'), width=25).pack(side='left')
+            
+            entry = tk.Entry(campo_frame, width=40, font=('Segoe UI', 9))
+            valor_actual = self.configuraciones['nombres_pestanas'].get(clave, nombre_default)
+            entry.insert(0, valor_actual)
+            entry.pack(side='left', padx=5)
+            
+            self.campos_nombres[clave] = entry
+        
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
+        
+        # NUEVA SECCIÓN: Título del Documento
+        ttk.Label(frame, text="Título del Documento Word:", 
+                 font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
+        ttk.Label(frame, text="Personalice el título principal que aparece en el documento generado:", 
+                 font=('Segoe UI', 9)).pack(anchor='w', pady=2)
+        
+        self.titulo_documento = tk.Entry(frame, width=80, font=('Segoe UI', 10))
+        titulo_actual = self.configuraciones.get('titulo_documento', 'INFORME DE DEBIDA DILIGENCIA')
+        self.titulo_documento.insert(0, titulo_actual)
+        self.titulo_documento.pack(pady=5, fill='x')
+        
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
+        
+        # Política de riesgo (nivel automático)
+        ttk.Label(frame, text="Política de Riesgo:", 
+                 font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
+        ttk.Label(frame, text="Pesos por estado y por fuente, y umbrales de los niveles 'medio' y 'alto' (JSON). "
+                              "El puntaje de un sujeto es la suma de peso de la fuente × peso del estado:", 
+                 font=('Segoe UI', 9), wraplength=700).pack(anchor='w', pady=2)
+        
+        self.politica_text = scrolledtext.ScrolledText(frame, width=80, height=12, font=('Consolas', 9))
+        self.politica_text.insert(1.0, self.texto_politica_riesgo())
+        self.politica_text.pack(pady=5, fill='x')
+        
+        ttk.Separator(frame, orient='horizontal').pack(fill='x', pady=20)
+        
+        # Listas de restricción para el cribado local
+        ttk.Label(frame, text="Listas de Restricción (cribado local):", 
+                 font=('Segoe UI', 11, 'bold')).pack(anchor='w', pady=10)
+        ttk.Label(frame, text="Una lista por línea como 'Fuente = ruta del archivo' (sdn.xml, sdn.csv de OFAC "
+                              "o CSV con columnas nombre, alias, identificacion, programa):", 
+                 font=('Segoe UI', 9), wraplength=700).pack(anchor='w', pady=2)
+        
+        self.listas_text = scrolledtext.ScrolledText(frame, width=80, height=4, font=('Segoe UI', 10))
+        self.listas_text.insert(1.0, self.texto_listas_cribado())
+        self.listas_text.pack(pady=5, fill='x')
+        ttk.Button(frame, text="📂 Agregar archivo de lista...", 
+                  command=self.agregar_archivo_lista).pack(anchor='w', pady=5)
+        
+        # Caché de resultados del cribado
+        opciones_cache = self.opciones_cache_cribado()
+        frame_cache = tk.Frame(frame, bg='white')
+        frame_cache.pack(anchor='w', pady=5)
+        ttk.Label(frame_cache, text="Reutilizar resultados del cribado durante (días, 0 = no):").pack(side='left')
+        self.cache_dias = tk.Entry(frame_cache, width=6, font=('Segoe UI', 10))
+        self.cache_dias.insert(0, str(opciones_cache['dias_vigencia']))
+        self.cache_dias.pack(side='left', padx=5)
+        ttk.Label(frame_cache, text="Máximo de resultados guardados:").pack(side='left', padx=(15, 0))
+        self.cache_max = tk.Entry(frame_cache, width=10, font=('Segoe UI', 10))
+        self.cache_max.insert(0, str(opciones_cache['max_entradas']))
+        self.cache_max.pack(side='left', padx=5)
+        ttk.Button(frame_cache, text="🗑 Vaciar caché", 
+                  command=self.vaciar_cache_cribado).pack(side='left', padx=10)
+        
+        ttk.Label(frame, text="Nota: Después de guardar, los cambios se aplicarán al reiniciar la pestaña", 
+                 font=('Segoe UI', 9, 'italic'), foreground='#E74C3C').pack(pady=10)
+        
+        frame_botones = tk.Frame(frame, bg='white')
+        frame_botones.pack(pady=20)
+        
+        ttk.Button(frame_botones, text="💾 Guardar Configuraciones", 
+                  command=self.guardar_configuraciones).pack(side='left', padx=5)
+        ttk.Button(frame_botones, text="🔄 Restaurar Predeterminados", 
+                  command=self.restaurar_configuraciones).pack(side='left', padx=5)
+        
+        canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+    
+    def texto_listas_cribado(self):
+        """Listas de cribado de las configuraciones, una 'Fuente = ruta' por línea"""
+        return '\n'.join(f"{fuente} = {ruta}"
+                         for fuente, rutas in (self.configuraciones.get('listas_cribado') or {}).items()
+                         for ruta in rutas)
+    
+    def agregar_archivo_lista(self):
+        ruta = filedialog.askopenfilename(
+            title="Archivo de lista de restricción",
+            filetypes=[("Listas", "*.xml *.csv"), ("Todos los archivos", "*.*")])
+        if not ruta:
+            return
+        fuentes = self.configuraciones['fuentes_investigacion']
+        if 'sdn' in os.path.basename(ruta).lower() and 'OFAC' in fuentes:
+            fuente = 'OFAC'
+        elif 'Listas de restricción' in fuentes:
+            fuente = 'Listas de restricción'
+        else:
+            fuente = fuentes[0] if fuentes else 'OFAC'
+        if self.listas_text.get(1.0, tk.END).strip():
+            self.listas_text.insert(tk.END, '\n')
+        self.listas_text.insert(tk.END, f"{fuente} = {ruta}")
+    
+    def opciones_cache_cribado(self):
+        """Opciones de la caché de cribado (las configuraciones guardadas antes pueden no tenerlas)"""
+        return dict(datos_informe.configuraciones_default()['cache_cribado'],
+                    **(self.configuraciones.get('cache_cribado') or {}))
+    
+    def leer_cache_cribado(self):
+        """Opciones de la caché escritas en la pestaña; ValueError si no son enteros válidos"""
+        try:
+            dias, maximo = int(self.cache_dias.get().strip()), int(self.cache_max.get().strip())
+        except ValueError:
+            raise ValueError("Los días y el máximo de resultados deben ser números enteros") from None
+        if dias < 0 or maximo < 1:
+            raise ValueError("Los días no pueden ser negativos y el máximo debe ser al menos 1")
+        return dict(self.opciones_cache_cribado(), dias_vigencia=dias, max_entradas=maximo)
+    
+    def vaciar_cache_cribado(self):
+        if self.cribado is not None:
+            messagebox.showwarning("Caché de cribado", "Espere a que termine el cribado en curso")
+            return
+        if not messagebox.askyesno("Confirmar", "¿Borrar los resultados de cribado guardados?\n\n"
+                                                "Los próximos cribados buscarán de nuevo a todos los sujetos."):
+            return
+        import cache_cribado
+        
+        cache = cache_cribado.CacheCribado()
+        try:
+            cache.vaciar()
+        finally:
+            cache.cerrar()
+        messagebox.showinfo("Caché de cribado", "Caché vaciada")
+    
+    def leer_listas_cribado(self, fuentes):
+        """Listas escritas en configuraciones como {fuente: [rutas]}; ValueError si una línea no sirve"""
+        listas = {}
+        for numero, linea in enumerate(self.listas_text.get(1.0, tk.END).splitlines(), 1):
+            if not linea.strip():
+                continue
+            fuente, separador, ruta = linea.partition('=')
+            fuente, ruta = fuente.strip(), ruta.strip()
+            if not separador or not fuente or not ruta:
+                raise ValueError(f"Línea {numero}: use el formato 'Fuente = ruta del archivo'")
+            if fuente not in fuentes:
+                raise ValueError(f"Línea {numero}: '{fuente}' no es una fuente de investigación")
+            if not os.path.isfile(ruta):
+                raise ValueError(f"Línea {numero}: no existe el archivo {ruta}")
+            listas.setdefault(fuente, []).append(ruta)
+        return listas
+    
+    def texto_politica_riesgo(self):
+        """Política de riesgo de las configuraciones, como JSON para editar"""
+        try:
+            politica = calificacion_riesgo.politica_de(self.configuraciones)
+        except ValueError:
+            politica = calificacion_riesgo.politica_default()
+        return json.dumps(politica, ensure_ascii=False, indent=2)
+    
+    def guardar_configuraciones(self):
+        try:
+            # Actualizar tipos de solicitud
+            tipos_texto = self.tipos_solicitud_text.get().strip()
+            self.configuraciones['tipos_solicitud'] = [t.strip() for t in tipos_texto.split(',') if t.strip()]
+            
+            # Actualizar fuentes
+            fuentes_texto = self.fuentes_text.get(1.0, tk.END).strip()
+            self.configuraciones['fuentes_investigacion'] = [f.strip() for f in fuentes_texto.split('\n') if f.strip()]
+            
+            # Actualizar nombres de pestañas
+            for clave, entry in self.campos_nombres.items():
+                self.configuraciones['nombres_pestanas'][clave] = entry.get().strip()
+            
+            # Actualizar título del documento
+            self.configuraciones['titulo_documento'] = self.titulo_documento.get().strip()
+            
+            # Actualizar política de riesgo (se valida antes de guardar)
+            try:
+                politica = json.loads(self.politica_text.get(1.0, tk.END))
+                self.configuraciones['politica_riesgo'] = calificacion_riesgo.validar_politica(politica)
+            except ValueError as e:
+                messagebox.showerror("Política de riesgo", f"La política de riesgo no es válida:\n{e}")
+                return
+            
+            # Actualizar listas de cribado
+            try:
+                self.configuraciones['listas_cribado'] = self.leer_listas_cribado(
+                    self.configuraciones['fuentes_investigacion'])
+                self.configuraciones['cache_cribado'] = self.leer_cache_cribado()
+            except ValueError as e:
+                messagebox.showerror("Listas de restricción", str(e))
+                return
+            
+            # Guardar en archivo
+            self.guardar_configuraciones_archivo()
+            
+            # Actualizar el combobox de tipo de solicitud
+            self.tipo_solicitud['values'] = self.configuraciones['tipos_solicitud']
+            
+            # Actualizar la pestaña de resultados
+            self.actualizar_tab_resultados()
+            
+            messagebox.showinfo("Éxito", "Configuraciones guardadas correctamente.\n\n" +
+                              "La pestaña de Resultados ha sido actualizada.\n" +
+                              "Los nombres de campos se actualizarán al reiniciar la aplicación.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al guardar configuraciones: {str(e)}")
+    
+    def restaurar_configuraciones(self):
+        if messagebox.askyesno("Confirmar", "¿Desea restaurar las configuraciones predeterminadas?"):
+            # Restaurar sin el archivo
+            config_temp = self.cargar_configuraciones_default()
+            # Mantener nombres_pestanas si no existen en default
+            if 'nombres_pestanas' not in config_temp:
+                config_temp['nombres_pestanas'] = {
+                    'fecha_solicitud': 'Fecha de Solicitud',
+                    'usuario_requirente': 'Usuario Requirente',
+                    'tipo_solicitud': 'Tipo de Solicitud',
+                    'descripcion': 'Descripción',
+                    'serapio': 'Serapio',
+                    'fuente_info': 'Fuente de Información'
+                }
+            
+            self.configuraciones = config_temp
+            
+            # Actualizar campos en la interfaz
+            self.tipos_solicitud_text.delete(0, tk.END)
+            self.tipos_solicitud_text.insert(0, ', '.join(self.configuraciones['tipos_solicitud']))
+            
+            self.fuentes_text.delete(1.0, tk.END)
+            self.fuentes_text.insert(1.0, '\n'.join(self.configuraciones['fuentes_investigacion']))
+            
+            for clave, entry in self.campos_nombres.items():
+                entry.delete(0, tk.END)
+                entry.insert(0, self.configuraciones['nombres_pestanas'][clave])
+            
+            # Actualizar título del documento
+            self.titulo_documento.delete(0, tk.END)
+            titulo_restaurado = self.configuraciones.get('titulo_documento', 'INFORME DE DEBIDA DILIGENCIA')
+            self.titulo_documento.insert(0, titulo_restaurado)
+            
+            self.politica_text.delete(1.0, tk.END)
+            self.politica_text.insert(1.0, self.texto_politica_riesgo())
+            
+            self.listas_text.delete(1.0, tk.END)
+            self.listas_text.insert(1.0, self.texto_listas_cribado())
+            
+            opciones_cache = self.opciones_cache_cribado()
+            self.cache_dias.delete(0, tk.END)
+            self.cache_dias.insert(0, str(opciones_cache['dias_vigencia']))
+            self.cache_max.delete(0, tk.END)
+            self.cache_max.insert(0, str(opciones_cache['max_entradas']))
+            
+            messagebox.showinfo("Éxito", "Configuraciones restauradas. " +
+                              "Presione 'Guardar Configuraciones' para aplicar los cambios.")
+    
+    def etiqueta_sujeto_resultados(self):
+        sujeto = None if self.sujeto_resultados is None else self.indice.por_uid(self.sujeto_resultados)
+        if sujeto is None:
+            return TODOS_LOS_SUJETOS
+        return f"{sujeto.nombre} ({sujeto.identificacion})"
+    
+    def llenar_selector_sujetos(self):
+        """Opciones del selector de sujetos, armadas al desplegarlo"""
+        self._uids_selector = [None] + [sujeto.uid for sujeto in self.sujetos]
+        self.selector_sujeto['values'] = [TODOS_LOS_SUJETOS] + [
+            f"{sujeto.nombre} ({sujeto.identificacion})" for sujeto in self.sujetos]
+    
+    def al_elegir_sujeto_resultados(self, event=None):
+        # Guardar lo escrito para el sujeto anterior antes de mostrar el nuevo
+        self.sincronizar_resultados()
+        posicion = self.selector_sujeto.current()
+        self.sujeto_resultados = self._uids_selector[posicion] if posicion > 0 else None
+        self.mostrar_resultados()
+    
+    def _olvidar_sujeto_resultados(self, uid):
+        """Vuelve a 'Todos los sujetos' si el sujeto elegido en resultados ya no existe"""
+        if uid is None or uid != self.sujeto_resultados:
+            return
+        self.sujeto_resultados = None
+        if self.nivel_riesgo is not None:
+            self.selector_sujeto.set(TODOS_LOS_SUJETOS)
+            self.mostrar_resultados()
+    
+    def mostrar_resultados(self):
+        """Carga en los campos los resultados del sujeto elegido.
+        
+        Con todos los sujetos se muestra el valor común de cada campo y queda
+        vacío donde difieren. Lo mostrado se recuerda para que al sincronizar
+        solo se apliquen los campos que se cambiaron.
+        """
+        tabla = self.tabla_resultados
+        uid = self.sujeto_resultados
+        fila = None if uid is None else tabla.fila(uid)
+        self._resultados_mostrados = {}
+        for fuente, widgets in self.resultados.items():
+            if uid is None:
+                texto, estado, fecha = tabla.valor_comun(fuente, len(self.sujetos))
+            elif fila is None:
+                texto, estado, fecha = tabla.defectos[fuente]
+            else:
+                texto, estado, fecha = (tabla.textos[fuente][fila], tabla.estados[fuente][fila],
+                                        tabla.fechas[fuente][fila])
+            mostrados = ('' if texto is None else texto,
+                         '' if estado is None else NOMBRES_ESTADO[estado],
+                         '' if fecha in (None, SIN_FECHA) else texto_fecha(fecha))
+            resultado, combo_estado, campo_fecha = widgets
+            resultado.delete(0, tk.END)
+            resultado.insert(0, mostrados[0])
+            combo_estado.set(mostrados[1])
+            campo_fecha.delete(0, tk.END)
+            campo_fecha.insert(0, mostrados[2])
+            self._resultados_mostrados[fuente] = mostrados
+    
+    def sincronizar_resultados(self):
+        """Pasa al modelo lo cambiado en la pestaña de resultados, si ya se construyó"""
+        if self.nivel_riesgo is None:
+            return
+        tabla = self.tabla_resultados
+        uid = self.sujeto_resultados
+        for fuente, widgets in self.resultados.items():
+            mostrados = self._resultados_mostrados[fuente]
+            texto, estado, fecha = (widget.get() for widget in widgets)
+            cambios = {}
+            if texto != mostrados[0]:
+                cambios['texto'] = texto
+            if estado and estado != mostrados[1]:
+                cambios['estado'] = NOMBRES_ESTADO.index(estado)
+            if fecha.strip() != mostrados[2]:
+                try:
+                    cambios['fecha'] = fecha_desde_texto(fecha)
+                except ValueError:
+                    messagebox.showwarning("Fecha inválida",
+                                           f"La fecha de '{fuente}' debe tener el formato dd/mm/aaaa. "
+                                           "Se conserva la anterior.")
+                    fecha = mostrados[2]
+                    widgets[2].delete(0, tk.END)
+                    widgets[2].insert(0, fecha)
+            if cambios:
+                if uid is None:
+                    tabla.establecer_columna(fuente, **cambios)
+                elif self.indice.por_uid(uid) is not None:
+                    tabla.establecer(tabla.fila(uid, crear=True), fuente, **cambios)
+            self._resultados_mostrados[fuente] = (texto, estado, fecha.strip())
+        self.valor_nivel_riesgo = self.nivel_riesgo.get()
+    
+    def calcular_nivel_riesgo(self):
+        """Muestra el nivel que daría la política de riesgo con los resultados actuales"""
+        self.sincronizar_resultados()
+        if not self.sujetos:
+            self.nivel_calculado.config(text="Agregue sujetos para calcular el nivel")
+            return
+        tabla = self.tabla_resultados.alineada([sujeto.uid for sujeto in self.sujetos])
+        caso = {'nivel_riesgo': NIVEL_AUTOMATICO, 'sujetos': self.sujetos}
+        try:
+            nivel, niveles = calificacion_riesgo.calificar_caso(caso, tabla, self.configuraciones)
+        except ValueError as e:
+            messagebox.showerror("Política de riesgo", str(e))
+            return
+        conteo = ', '.join(f"{niveles.count(n)} {n}" for n in NIVELES_RIESGO if n in niveles)
+        self.nivel_calculado.config(text=f"Calculado: {nivel} (sujetos: {conteo})")
+    
+    def cribar_listas(self):
+        """Criba los sujetos (de la gestión o todos) contra las listas locales, en un hilo"""
+        if self.cribado is not None:
+            return
+        listas = {fuente: rutas for fuente, rutas in (self.configuraciones.get('listas_cribado') or {}).items()
+                  if rutas and fuente in self.tabla_resultados.fuentes}
+        if not listas:
+            messagebox.showinfo("Cribado", "No hay listas de restricción configuradas.\n\n"
+                                "Agréguelas en Configuraciones, por ejemplo: OFAC = C:\\listas\\sdn.xml")
+            return
+        if not self.sujetos:
+            messagebox.showwarning("Advertencia", "No hay sujetos para cribar")
+            return
+        
+        sujetos = self.sujetos
+        id_gestion = self.id_gestion.get().strip()
+        de_gestion = [s for s in self.sujetos if s.id_gestion == id_gestion] if id_gestion else []
+        if de_gestion and len(de_gestion) < len(self.sujetos):
+            respuesta = messagebox.askyesnocancel(
+                "Cribado", f"¿Cribar solo los {len(de_gestion)} sujetos de la gestión {id_gestion}?\n\n"
+                           f"No: cribar los {len(self.sujetos)} sujetos registrados.")
+            if respuesta is None:
+                return
+            if respuesta:
+                sujetos = de_gestion
+        
+        self.sincronizar_resultados()
+        self.cribado = {'cola': queue.Queue(), 'cancelar': threading.Event()}
+        self.cribado['hilo'] = threading.Thread(
+            target=self._cribar_en_hilo, daemon=True,
+            args=(list(sujetos), listas, self.configuraciones.get('umbral_cribado'),
+                  self.opciones_cache_cribado(), self.cribado['cola'], self.cribado['cancelar']))
+        self.cribado['hilo'].start()
+        self.boton_cribar.config(state='disabled')
+        self.estado_cribado.config(text="Abriendo listas (la primera vez se indexan)...")
+        self.root.after(INTERVALO_PROGRESO_MS, self._revisar_cribado)
+    
+    def _cribar_en_hilo(self, sujetos, rutas_por_fuente, umbral, opciones_cache, cola, cancelar):
+        """Cuerpo del hilo de cribado: no toca widgets ni la tabla, solo la cola"""
+        cache = None
+        try:
+            import cache_cribado
+            import cribado_listas
+            
+            def progreso(hechos, total):
+                if cancelar.is_set():
+                    raise cribado_listas.CribadoCancelado()
+                cola.put(('progreso', hechos, total))
+            
+            listas = cribado_listas.listas_configuradas({'listas_cribado': rutas_por_fuente})
+            # La conexión SQLite de la caché solo puede usarse en el hilo que la abre
+            cache = cache_cribado.CacheCribado.desde_configuraciones({'cache_cribado': opciones_cache})
+            resultados = [(sujetos[posicion].uid, fuente, texto, estado)
+                          for posicion, fuente, texto, estado in cribado_listas.cribar_resultados(
+                              sujetos, listas, umbral or cribado_listas.UMBRAL_CRIBADO, progreso, cache)]
+            cola.put(('fin', resultados, len(sujetos), cache.estadisticas()['sesion'] if cache else None))
+        except Exception as e:
+            if cancelar.is_set():
+                cola.put(('cancelado',))
+            else:
+                cola.put(('error', f"{type(e).__name__}: {e}"))
+        finally:
+            if cache is not None:
+                cache.cerrar()
+    
+    def _revisar_cribado(self):
+        """Lee los mensajes del hilo de cribado (root.after) y al terminar llena la tabla"""
+        cribado = self.cribado
+        if cribado is None:
+            return
+        final = None
+        while final is None:
+            try:
+                mensaje = cribado['cola'].get_nowait()
+            except queue.Empty:
+                break
+            if mensaje[0] == 'progreso':
+                self.estado_cribado.config(text=f"Cribando {mensaje[1]} de {mensaje[2]} sujetos...")
+            else:
+                final = mensaje
+        if final is None:
+            self.root.after(INTERVALO_PROGRESO_MS, self._revisar_cribado)
+            return
+        
+        self.cribado = None
+        self.boton_cribar.config(state='normal')
+        if final[0] == 'error':
+            self.estado_cribado.config(text="")
+            messagebox.showerror("Cribado", f"No se pudo completar el cribado:\n{final[1]}")
+            return
+        if final[0] == 'cancelado':
+            self.estado_cribado.config(text="Cribado cancelado")
+            return
+        
+        # Lo escrito mientras tanto se guarda antes de que el cribado lo reemplace
+        _, resultados, cribados, estadisticas_cache = final
+        self.sincronizar_resultados()
+        tabla = self.tabla_resultados
+        hoy = datetime.now().toordinal()
+        con_coincidencias = set()
+        for uid, fuente, texto, estado in resultados:
+            # Los sujetos eliminados durante el cribado no vuelven a la tabla
+            if self.indice.por_uid(uid) is None:
+                continue
+            if fuente in tabla.fuentes:
+                tabla.establecer(tabla.fila(uid, crear=True), fuente, texto=texto, estado=estado, fecha=hoy)
+            if estado == ESTADO_CON_COINCIDENCIAS:
+                con_coincidencias.add(uid)
+        self.mostrar_resultados()
+        texto = f"{cribados} sujetos cribados: {len(con_coincidencias)} con posibles coincidencias"
+        if estadisticas_cache:
+            texto += f" (caché: {estadisticas_cache['tasa_aciertos']:.0%} de aciertos)"
+        self.estado_cribado.config(text=texto)
+    
+    def actualizar_tab_resultados(self):
+        # Ajustar el modelo a las fuentes configuradas, conservando los valores escritos
+        self.sincronizar_resultados()
+        self.tabla_resultados.ajustar_fuentes(self.configuraciones['fuentes_investigacion'])
+        
+        # Si la pestaña ya se construyó, rehacer sus widgets en el mismo lugar
+        if str(self.tab_resultados) in self.tabs_pendientes:
+            return
+        for hijo in self.tab_resultados.winfo_children():
+            hijo.destroy()
+        self.crear_tab_resultados(self.tab_resultados)
+    
+    def crear_tab_generar(self, tab):
+        # Configurar fondo
+        main_container = tk.Frame(tab, bg='#ECF0F1')
+        main_container.pack(fill='both', expand=True)
+        
+        frame = ttk.LabelFrame(main_container, text="Opciones de Generación de Documentos", padding=30)
+        frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Título
+        titulo = tk.Label(frame, 
+                         text="Seleccione el formato de documento que desea generar:",
+                         font=('Segoe UI', 12, 'bold'),
+                         bg='white',
+                         fg='#2C3E50')
+        titulo.pack(pady=(10, 30))
+        
+        # Botones con descripciones
+        btn_container = tk.Frame(frame, bg='white')
+        btn_container.pack(pady=10)
+        
+        # Botón Word
+        word_frame = tk.Frame(btn_container, bg='white')
+        word_frame.pack(pady=8)
+        ttk.Button(word_frame, text="📝 Generar Documento Word (.docx)", 
+                  command=self.generar_word, width=50).pack()
+        desc_word = tk.Label(word_frame, 
+                           text="Genera un informe completo en formato Word con normas APA",
+                           font=('Segoe UI', 9, 'italic'),
+                           bg='white',
+                           fg='#7F8C8D')
+        desc_word.pack()
+        
+        # Botón Excel Completo
+        excel_frame = tk.Frame(btn_container, bg='white')
+        excel_frame.pack(pady=8)
+        ttk.Button(excel_frame, text="📊 Generar Excel Completo", 
+                  command=self.generar_excel_completo, width=50).pack()
+        desc_excel = tk.Label(excel_frame,
+                             text="Base de datos horizontal con todas las debidas diligencias",
+                             font=('Segoe UI', 9, 'italic'),
+                             bg='white',
+                             fg='#7F8C8D')
+        desc_excel.pack()
+        
+        # Botón Excel Pestañas
+        pestanas_frame = tk.Frame(btn_container, bg='white')
+        pestanas_frame.pack(pady=8)
+        ttk.Button(pestanas_frame, text="📑 Generar Excel con Pestañas por Sujeto", 
+                  command=self.generar_excel_pestanas, width=50).pack()
+        desc_pestanas = tk.Label(pestanas_frame,
+                                text="Una pestaña individual para cada sujeto investigado",
+                                font=('Segoe UI', 9, 'italic'),
+                                bg='white',
+                                fg='#7F8C8D')
+        desc_pestanas.pack()
+        
+        # Botón Todo
+        todo_frame = tk.Frame(btn_container, bg='white')
+        todo_frame.pack(pady=8)
+        ttk.Button(todo_frame, text="📦 Generar Todo (Word + Excels)", 
+                  command=self.generar_todo, width=50).pack()
+        desc_todo = tk.Label(todo_frame,
+                           text="Genera todos los formatos simultáneamente en una carpeta",
+                           font=('Segoe UI', 9, 'italic'),
+                           bg='white',
+                           fg='#7F8C8D')
+        desc_todo.pack()
+        self.todo_en_zip = tk.BooleanVar(value=False)
+        ttk.Checkbutton(todo_frame, text="Empaquetar los documentos en un ZIP",
+                        variable=self.todo_en_zip).pack()
+        
+        # Separador
+        separator = ttk.Separator(frame, orient='horizontal')
+        separator.pack(fill='x', pady=20)
+        
+        # Label de estado con mejor diseño
+        status_frame = tk.Frame(frame, bg='#E8F8F5', relief='ridge', borderwidth=2)
+        status_frame.pack(fill='x', pady=10)
+        
+        self.status_label = tk.Label(status_frame, 
+                                     text="",
+                                     font=('Segoe UI', 10),
+                                     bg='#E8F8F5',
+                                     fg='#27AE60',
+                                     pady=10)
+        self.status_label.pack()
+        
+        # Barra de progreso y cancelación, visibles solo mientras se genera
+        self.frame_progreso = tk.Frame(frame, bg='white')
+        self.barra_progreso = ttk.Progressbar(self.frame_progreso, mode='determinate')
+        self.barra_progreso.pack(side='left', fill='x', expand=True, padx=(0, 10))
+        self.boton_cancelar = ttk.Button(self.frame_progreso, text="✖ Cancelar",
+                                         command=self.cancelar_generacion)
+        self.boton_cancelar.pack(side='left')
+    
+    def agregar_sujeto(self):
+        nombre = self.nombre_sujeto.get().strip()
+        identificacion = self.identificacion_sujeto.get().strip()
+        descripcion = self.descripcion_sujeto.get().strip()
+        id_gestion = self.id_gestion.get().strip()
+        
+        if not nombre or not identificacion:
+            messagebox.showwarning("Advertencia", "Debe ingresar al menos nombre e identificación")
+            return
+        
+        if not id_gestion:
+            respuesta = messagebox.askyesno("ID de Gestión", 
+                                           "No ha ingresado un ID de Gestión.\n\n" +
+                                           "¿Desea generar uno automáticamente?")
+            if respuesta:
+                self.generar_id_gestion()
+                id_gestion = self.id_gestion.get().strip()
+            else:
+                return
+        
+        # Advertir posibles duplicados (misma identificación o nombre parecido)
+        if not self.confirmar_posibles_duplicados(nombre, identificacion):
+            return
+        
+        sujeto = Sujeto(almacenamiento.nuevo_uid(), nombre, identificacion, descripcion, id_gestion)
+        
+        self.sujetos.append(sujeto)
+        self.indice.agregar(sujeto)
+        self._ultima_busqueda = None
+        self.lista_sujetos.establecer_datos(self.sujetos, al_final=True)
+        
+        # Guardar en el almacén
+        self.guardar_sujeto_agregado(sujeto)
+        
+        # Limpiar campos
+        self.nombre_sujeto.delete(0, tk.END)
+        self.identificacion_sujeto.delete(0, tk.END)
+        self.descripcion_sujeto.delete(0, tk.END)
+        
+        messagebox.showinfo("Éxito", f"Sujeto agregado y guardado correctamente\nGestión: {id_gestion}")
+    
+    def importar_sujetos(self):
+        """Agrega de una vez los sujetos de un archivo CSV o Excel"""
+        ruta = filedialog.askopenfilename(
+            title="Importar sujetos",
+            filetypes=[("CSV o Excel", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if not ruta:
+            return
+        
+        # Las filas sin ID de gestión toman el del formulario
+        id_gestion = self.id_gestion.get().strip()
+        existentes = {importacion_sujetos.clave_duplicado(s['identificacion'], s.get('id_gestion', ''))
+                      for s in self.sujetos}
+        try:
+            aceptados, rechazados = importacion_sujetos.importar_archivo(ruta, id_gestion, existentes)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo leer el archivo: {str(e)}")
+            return
+        
+        if aceptados:
+            # Una sola escritura en el almacén y un solo refresco de la lista
+            try:
+                self.almacen.agregar_sujetos(aceptados)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudieron guardar los sujetos: {str(e)}")
+                return
+            aceptados = [Sujeto.desde_dict(sujeto) for sujeto in aceptados]
+            self.sujetos.extend(aceptados)
+            for sujeto in aceptados:
+                self.indice.agregar(sujeto)
+            self.indice.preparar_en_segundo_plano()
+            self._ultima_busqueda = None
+            self.lista_sujetos.establecer_datos(self.sujetos, al_final=True)
+        
+        mensaje = f"Sujetos importados: {len(aceptados)}\nFilas rechazadas: {len(rechazados)}"
+        if rechazados:
+            reporte = os.path.splitext(ruta)[0] + "_rechazados.csv"
+            try:
+                importacion_sujetos.guardar_rechazados(rechazados, reporte)
+                mensaje += f"\n\nDetalle de rechazos: {reporte}"
+            except Exception as e:
+                mensaje += f"\n\nNo se pudo guardar el detalle de rechazos: {e}"
+        messagebox.showinfo("Importación", mensaje)
+    
+    def confirmar_posibles_duplicados(self, nombre, identificacion):
+        """Pregunta antes de agregar un sujeto que parece ya registrado.
+        
+        Mientras los sujetos guardados se cargan o se indexan en segundo plano
+        no se espera por ellos: se revisa lo disponible y se avisa que la
+        revisión puede estar incompleta.
+        """
+        coincidencias = []
+        for sujeto in self.indice.por_identificacion(identificacion):
+            coincidencias.append(f"• {sujeto['nombre']} ({sujeto['identificacion']}) - misma identificación")
+        similares = self.indice.similares(nombre, limite=5, esperar=False)
+        for puntaje, sujeto in similares or ():
+            if sujeto['identificacion'] != identificacion:
+                coincidencias.append(f"• {sujeto['nombre']} ({sujeto['identificacion']}) - "
+                                     f"nombre similar {puntaje:.0%}")
+        if not coincidencias:
+            return True
+        
+        incompleta = ''
+        if similares is None or self.carga_sujetos is not None:
+            incompleta = ("\n\n(Los sujetos guardados aún se están cargando: "
+                          "puede haber otros parecidos que no se revisaron.)")
+        return messagebox.askyesno("Posibles duplicados",
+                                   "Ya hay sujetos registrados que podrían ser la misma persona:\n\n" +
+                                   "\n".join(coincidencias[:8]) + incompleta +
+                                   "\n\n¿Desea agregarlo de todos modos?")
+    
+    def on_tree_click(self, event):
+        """Detecta clicks en el árbol y verifica si fue en la columna de eliminar"""
+        region = self.tree_sujetos.identify("region", event.x, event.y)
+        if region == "cell":
+            column = self.tree_sujetos.identify_column(event.x)
+            item = self.tree_sujetos.identify_row(event.y)
+            
+            # Si se hizo click en la columna de "Acciones" (columna #5)
+            if column == '#5' and item:
+                self.eliminar_sujeto_directo(item)
+    
+    def eliminar_sujeto_directo(self, item):
+        """Elimina un sujeto directamente sin confirmación"""
+        # Sujeto de la fila (el iid es su uid)
+        sujeto = self.indice.por_uid(item)
+        if sujeto is not None:
+            # Todo se quita por uid, sin recorrer la lista de sujetos
+            self.sujetos.quitar(sujeto.uid)
+            self.indice.eliminar(sujeto)
+            self.tabla_resultados.quitar_sujeto(sujeto.uid)
+            self._olvidar_sujeto_resultados(sujeto.uid)
+            self._ultima_busqueda = None
+            self.guardar_sujeto_eliminado(sujeto)
+            
+            # Quitar de la lista mostrada: si muestra a todos ya no está en ella
+            if self.lista_sujetos.datos is self.sujetos:
+                self.mostrar_sujetos(self.sujetos)
+            else:
+                self.lista_sujetos.quitar(sujeto)
+    
+    def eliminar_sujeto(self):
+        """Elimina el sujeto seleccionado (método alternativo)"""
+        selected = self.tree_sujetos.selection()
+        if not selected:
+            messagebox.showwarning("Advertencia", "Seleccione un sujeto para eliminar")
+            return
+        
+        self.eliminar_sujeto_directo(selected[0])
+    
+    def guardar_plantilla(self):
+        self.plantilla_modificable['objetivo'] = self.objetivo_text.get(1.0, tk.END).strip()
+        self.plantilla_modificable['conclusion_template'] = self.conclusion_text.get(1.0, tk.END).strip()
+        self.plantilla_modificable['compromiso'] = self.compromiso_text.get(1.0, tk.END).strip()
+        self.plantilla_modificable['lugar_emision'] = self.lugar_emision.get().strip()
+        self.plantilla_modificable['jefe_cumplimiento'] = self.jefe_cumplimiento.get().strip()
+        self.plantilla_modificable['analista'] = self.analista.get().strip()
+        
+        # Guardar incisos adicionales
+        self.plantilla_modificable['incisos_adicionales'] = []
+        for widget in self.incisos_widgets:
+            texto = widget.get(1.0, tk.END).strip()
+            if texto:
+                self.plantilla_modificable['incisos_adicionales'].append(texto)
+        
+        messagebox.showinfo("Éxito", f"Plantilla actualizada correctamente\n\n" +
+                          f"Incisos adicionales guardados: {len(self.plantilla_modificable['incisos_adicionales'])}")
+    
+    def capturar_caso(self):
+        """Toma una sola vez los valores del formulario como CasoSnapshot.
+        
+        Las pestañas que aún no se visitaron aportan los valores de su modelo.
+        Los sujetos ya son inmutables, así que se comparten sin copiarlos; la
+        tabla de resultados se copia con una fila por sujeto, en su orden.
+        """
+        self.sincronizar_resultados()
+        tabla = self.tabla_resultados
+        return CasoSnapshot(
+            id_gestion=self.id_gestion.get().strip(),
+            fecha_solicitud=self.fecha_solicitud.get(),
+            usuario_requirente=self.usuario_requirente.get(),
+            tipo_solicitud=self.tipo_solicitud.get(),
+            descripcion=self.descripcion_solicitud.get(),
+            serapio=self.serapio.get(),
+            fuente_info=self.fuente_info.get(1.0, tk.END).strip(),
+            sujetos=self.sujetos,
+            resultados={fuente: tabla.defectos[fuente][0] for fuente in tabla.fuentes},
+            nivel_riesgo=self.valor_nivel_riesgo,
+            plantilla=self.plantilla_modificable,
+            tabla_resultados=tabla.alineada([sujeto.uid for sujeto in self.sujetos])
+        )
+    
+    def pedir_archivo_salida(self, tipo):
+        """Pregunta dónde guardar el documento del tipo dado ('' si se cancela)"""
+        descripcion, extension, patron = ARCHIVOS_SALIDA[tipo]
+        return filedialog.asksaveasfilename(
+            defaultextension=extension,
+            filetypes=[(descripcion, f"*{extension}"), ("Todos los archivos", "*.*")],
+            initialfile=patron.format(datetime.now().strftime('%Y%m%d_%H%M%S'))
+        )
+    
+    def puede_generar(self):
+        """Avisa y devuelve False si no hay sujetos o ya hay una generación en curso"""
+        if not self.sujetos:
+            messagebox.showwarning("Advertencia", "Debe agregar al menos un sujeto de investigación")
+            return False
+        if self.generacion is not None:
+            messagebox.showwarning("Generación en curso",
+                                   "Espere a que termine la generación actual o cancélela.")
+            return False
+        return True
+    
+    def generar_documentos(self, tipos):
+        """Pide el archivo de cada tipo y los genera en segundo plano"""
+        if not self.puede_generar():
+            return
+        
+        trabajos = []
+        for tipo in tipos:
+            filename = self.pedir_archivo_salida(tipo)
+            if not filename:
+                return
+            trabajos.append((tipo, filename))
+        
+        self.iniciar_generacion(trabajos)
+    
+    def generar_word(self):
+        self.generar_documentos(['word'])
+    
+    def generar_excel_completo(self):
+        self.generar_documentos(['excel'])
+    
+    def generar_excel_pestanas(self):
+        self.generar_documentos(['pestanas'])
+    
+    def generar_todo(self):
+        """Genera los tres documentos a la vez en una carpeta, desde una sola captura del formulario"""
+        if not self.puede_generar():
+            return
+        carpeta = filedialog.askdirectory(title="Carpeta de destino de los documentos")
+        if not carpeta:
+            return
+        
+        marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+        trabajos = [(tipo, os.path.join(carpeta, ARCHIVOS_SALIDA[tipo][2].format(marca)))
+                    for tipo in ('word', 'excel', 'pestanas')]
+        archivo_zip = None
+        if self.todo_en_zip.get():
+            archivo_zip = os.path.join(carpeta, f"Debida_Diligencia_{marca}.zip")
+        self.iniciar_generacion(trabajos, paralelo=True, archivo_zip=archivo_zip)
+    
+    # Generación en segundo plano
+    def iniciar_generacion(self, trabajos, paralelo=False, archivo_zip=None):
+        """Lanza el hilo que genera los trabajos [(tipo, archivo), ...].
+        
+        Uno tras otro, o con paralelo=True cada uno en su proceso; con
+        archivo_zip, los documentos se entregan empaquetados en ese ZIP. El
+        snapshot del caso y la copia de las configuraciones se toman aquí, en
+        el hilo de Tk: todos los documentos salen de la misma captura y el
+        analista puede seguir editando el formulario mientras se generan.
+        """
+        caso = self.capturar_caso()
+        configuraciones = copy.deepcopy(self.configuraciones)
+        self.generacion = {
+            'trabajos': trabajos,
+            'paralelo': paralelo,
+            'cola': queue.Queue(),
+            'cancelar': threading.Event(),
+            'avance': {},  # tipo -> (hecho, total, etapa)
+            'listos': [],
+            'errores': [],
+        }
+        self.generacion['hilo'] = threading.Thread(
+            target=self._generar_en_hilo,
+            args=(caso, configuraciones, trabajos, paralelo, archivo_zip,
+                  self.generacion['cancelar'], self.generacion['cola']),
+            daemon=True)
+        
+        self.barra_progreso.config(maximum=len(trabajos), value=0)
+        self.boton_cancelar.config(state='normal')
+        self.frame_progreso.pack(fill='x', pady=(0, 10))
+        self.status_label.config(text="⏳ Preparando generación...", fg='#2C3E50')
+        self.generacion['hilo'].start()
+        self.root.after(INTERVALO_PROGRESO_MS, self._revisar_generacion)
+    
+    def _generar_en_hilo(self, caso, configuraciones, trabajos, paralelo, archivo_zip, cancelar, cola):
+        """Cuerpo del hilo: no toca widgets, solo deja mensajes en la cola"""
+        try:
+            import motor_informes
+        except Exception as e:
+            cola.put(('error', trabajos[0][0], trabajos[0][1], e, traceback.format_exc()))
+            cola.put(('fin',))
+            return
+        
+        def progreso(tipo, hecho, total, etapa):
+            if cancelar.is_set():
+                raise motor_informes.GeneracionCancelada()
+            cola.put(('progreso', tipo, hecho, total, etapa))
+        
+        def informar(tipo, filename, error):
+            if error is None:
+                cola.put(('listo', tipo, filename))
+            else:
+                detalle = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+                cola.put(('error', tipo, filename, error, detalle))
+        
+        carpeta_zip = None
+        try:
+            if paralelo:
+                destinos = dict(trabajos)
+                if archivo_zip:
+                    # Los documentos se generan aparte y solo se entrega el ZIP
+                    carpeta_zip = tempfile.mkdtemp(dir=os.path.dirname(archivo_zip), prefix='.~')
+                    destinos = {tipo: os.path.join(carpeta_zip, os.path.basename(filename))
+                                for tipo, filename in trabajos}
+                generados = []
+                for tipo, filename, error in motor_informes.generar_en_paralelo(
+                        caso, configuraciones, destinos, progreso, cancelar):
+                    if error is None:
+                        generados.append(filename)
+                    if not archivo_zip or error is not None:
+                        informar(tipo, filename, error)
+                    else:
+                        cola.put(('progreso', tipo, 1, 1, 'Listo'))
+                if archivo_zip and generados:
+                    try:
+                        motor_informes.empaquetar_zip(generados, archivo_zip)
+                    except Exception as e:
+                        informar('zip', archivo_zip, e)
+                    else:
+                        informar('zip', archivo_zip, None)
+            else:
+                for tipo, filename in trabajos:
+                    generador = motor_informes.GENERADORES[tipo][0]
+                    try:
+                        motor_informes.generar_en_temporal(
+                            generador, caso, configuraciones, filename,
+                            lambda hecho, total, etapa, tipo=tipo: progreso(tipo, hecho, total, etapa))
+                    except motor_informes.GeneracionCancelada:
+                        raise
+                    except Exception as e:
+                        informar(tipo, filename, e)
+                    else:
+                        informar(tipo, filename, None)
+        except motor_informes.GeneracionCancelada:
+            cola.put(('cancelado',))
+            return
+        except Exception as e:
+            # Fallo al preparar los procesos o la carpeta temporal
+            informar(trabajos[0][0], trabajos[0][1], e)
+        finally:
+            if carpeta_zip is not None:
+                shutil.rmtree(carpeta_zip, ignore_errors=True)
+        cola.put(('fin',))
+    
+    def _revisar_generacion(self):
+        """Lee los mensajes del hilo (root.after) y actualiza barra y estado"""
+        generacion = self.generacion
+        if generacion is None:
+            return
+        ultimo = None
+        final = None
+        while final is None:
+            try:
+                mensaje = generacion['cola'].get_nowait()
+            except queue.Empty:
+                break
+            if mensaje[0] == 'progreso':
+                tipo, hecho, total, etapa = mensaje[1:]
+                generacion['avance'][tipo] = (hecho, total, etapa)
+                ultimo = tipo
+            elif mensaje[0] == 'listo':
+                generacion['listos'].append(mensaje[1:])
+                generacion['avance'][mensaje[1]] = (1, 1, 'Listo')
+            elif mensaje[0] == 'error':
+                generacion['errores'].append(mensaje[1:])
+                generacion['avance'][mensaje[1]] = (1, 1, 'Error')
+            else:
+                final = mensaje[0]
+        
+        if ultimo is not None and not generacion['cancelar'].is_set():
+            self._mostrar_progreso(ultimo)
+        if final is None:
+            self.root.after(INTERVALO_PROGRESO_MS, self._revisar_generacion)
+        else:
+            self._terminar_generacion(cancelada=(final == 'cancelado'))
+    
+    def _mostrar_progreso(self, ultimo):
+        """Barra: suma de la fracción hecha de cada documento; estado: etapa en curso"""
+        generacion = self.generacion
+        trabajos = generacion['trabajos']
+        avance = generacion['avance']
+        
+        def fraccion(tipo):
+            hecho, total, _ = avance.get(tipo, (0, 0, ''))
+            return hecho / total if total else 0.0
+        
+        self.barra_progreso.config(value=sum(fraccion(tipo) for tipo, _ in trabajos))
+        if generacion['paralelo']:
+            detalle = ' · '.join(f"{NOMBRES_DOCUMENTO[tipo]} {fraccion(tipo):.0%}" for tipo, _ in trabajos)
+            texto = f"⏳ Generando a la vez: {detalle}"
+        else:
+            hecho, total, etapa = avance[ultimo]
+            nombre = NOMBRES_DOCUMENTO[ultimo]
+            if len(trabajos) > 1:
+                numero = [tipo for tipo, _ in trabajos].index(ultimo) + 1
+                nombre = f"({numero}/{len(trabajos)}) {nombre}"
+            texto = f"⏳ {nombre}: {etapa} ({hecho}/{total})"
+        self.status_label.config(text=texto, fg='#2C3E50')
+    
+    def cancelar_generacion(self):
+        if self.generacion is not None:
+            self.generacion['cancelar'].set()
+            self.boton_cancelar.config(state='disabled')
+            self.status_label.config(text="⏳ Cancelando...", fg='#2C3E50')
+    
+    def _terminar_generacion(self, cancelada):
+        generacion = self.generacion
+        self.generacion = None
+        self.frame_progreso.pack_forget()
+        
+        listos = generacion['listos']
+        lineas = [f"✓ {NOMBRES_DOCUMENTO[tipo]} generado: {os.path.basename(filename)}"
+                  for tipo, filename in listos]
+        if cancelada:
+            lineas.append("✖ Generación cancelada")
+        if generacion['errores']:
+            lineas.append(f"✖ {len(generacion['errores'])} documento(s) con error")
+        self.status_label.config(text='\n'.join(lineas),
+                                 fg='#27AE60' if not cancelada and not generacion['errores'] else '#E74C3C')
+        
+        for tipo, filename, error, detalle in generacion['errores']:
+            self._informar_error_generacion(tipo, error, detalle)
+        
+        if len(listos) == 1:
+            tipo, filename = listos[0]
+            messagebox.showinfo("Éxito", MENSAJES_EXITO[tipo].format(filename))
+        elif listos:
+            messagebox.showinfo("Éxito", "Documentos generados exitosamente:\n" +
+                                '\n'.join(filename for _, filename in listos))
+    
+    def _informar_error_generacion(self, tipo, error, detalle):
+        if isinstance(error, PermissionError):
+            messagebox.showerror("Error de Permisos", 
+                               "No se puede guardar el archivo. Verifique que:\n" +
+                               "1. El archivo no esté abierto en Word o Excel\n" +
+                               "2. Tenga permisos de escritura en la carpeta")
+        elif tipo == 'word':
+            messagebox.showerror("Error", f"Error al generar documento:\n{str(error)}\n\nDetalles:\n{detalle[:200]}")
+        else:
+            messagebox.showerror("Error", f"Error al generar {NOMBRES_DOCUMENTO[tipo]}: {str(error)}")
+
+
+def _informar_arranque(root, fin_ventana):
+    """Imprime el desglose del arranque cuando la ventana ya se dibujó"""
+    root.update_idletasks()
+    fin = time.perf_counter()
+    print(f"[arranque] imports:             {_FIN_IMPORTS - _INICIO_ARRANQUE:.3f} s")
+    print(f"[arranque] construir ventana:   {fin_ventana - _FIN_IMPORTS:.3f} s")
+    print(f"[arranque] primer dibujo:       {fin - fin_ventana:.3f} s")
+    print(f"[arranque] total:               {fin - _INICIO_ARRANQUE:.3f} s")
+
+
+if __name__ == "__main__":
+    # "Generar Todo" usa procesos: necesario si la aplicación se empaqueta como ejecutable
+    multiprocessing.freeze_support()
+    root = tk.Tk()
+    app = DueDiligenceSystem(root)
+    if PERFIL_ARRANQUE:
+        fin_ventana = time.perf_counter()
+        root.after_idle(_informar_arranque, root, fin_ventana)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""Importación masiva de sujetos desde CSV o Excel.
+
+El archivo se lee por bloques y cada bloque se valida de una vez con
+operaciones de pandas, usando las mismas reglas que los campos del
+formulario. Las filas inválidas o repetidas (dentro del archivo o respecto
+de los sujetos ya registrados) se devuelven como rechazadas con su motivo.
+
+Columnas reconocidas (sin importar mayúsculas ni tildes): nombre,
+identificacion, descripcion e id_gestion (o gestion).
+
+pandas y numpy se importan dentro de las funciones: la interfaz importa este
+módulo al arrancar solo por los patrones de validación.
+"""
+import csv
+import re
+
+from almacenamiento import nuevo_uid
+from coincidencia_nombres import plegar
+
+# Reglas de validación del formulario de sujetos
+PATRON_NOMBRE = re.compile(r"^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s.,'-]+$")
+PATRON_IDENTIFICACION = re.compile(r"^[0-9-]+$")
+
+FILAS_POR_BLOQUE = 5000
+
+COLUMNAS = {
+    'nombre': 'nombre',
+    'nombre completo': 'nombre',
+    'identificacion': 'identificacion',
+    'descripcion': 'descripcion',
+    'id gestion': 'id_gestion',
+    'gestion': 'id_gestion',
+}
+
+
+def clave_duplicado(identificacion, id_gestion):
+    """Clave con la que se detectan sujetos repetidos: identificación dentro de la gestión"""
+    return f"{identificacion}\x1f{id_gestion}"
+
+
+def _normalizar_columnas(columnas):
+    return [COLUMNAS.get(plegar(c).replace('_', ' '), str(c)) for c in columnas]
+
+
+def leer_bloques(ruta, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Genera DataFrames de texto con las filas del archivo, bloque a bloque"""
+    import pandas as pd
+
+    if ruta.lower().endswith(('.xlsx', '.xlsm')):
+        yield from _leer_bloques_excel(ruta, filas_por_bloque)
+        return
+    for bloque in pd.read_csv(ruta, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+                              sep=_separador_csv(ruta), chunksize=filas_por_bloque):
+        bloque.columns = _normalizar_columnas(bloque.columns)
+        yield bloque
+
+
+def _separador_csv(ruta):
+    """Detecta el separador (coma, punto y coma, tabulador) con el inicio del archivo"""
+    with open(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+        muestra = f.read(4096)
+    try:
+        return csv.Sniffer().sniff(muestra, delimiters=',;\t|').delimiter
+    except csv.Error:
+        return ','
+
+
+def _leer_bloques_excel(ruta, filas_por_bloque):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = workbook.worksheets[0].iter_rows(values_only=True)
+        encabezados = _normalizar_columnas(c or '' for c in next(filas, ()))
+        bloque = []
+        for fila in filas:
+            bloque.append(['' if v is None else str(v) for v in fila[:len(encabezados)]])
+            if len(bloque) == filas_por_bloque:
+                yield pd.DataFrame(bloque, columns=encabezados)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezados)
+    finally:
+        workbook.close()
+
+
+def validar_bloque(bloque, id_gestion_defecto='', vistos=None, existentes=frozenset()):
+    """Valida un bloque y devuelve (DataFrame aceptado, DataFrame rechazado con 'motivo').
+
+    vistos es el conjunto de claves (clave_duplicado) ya aceptadas en bloques
+    anteriores y se actualiza; existentes, el de los sujetos ya registrados.
+    """
+    import numpy as np
+    import pandas as pd
+
+    vistos = set() if vistos is None else vistos
+
+    def columna(nombre):
+        if nombre in bloque.columns:
+            return bloque[nombre].astype(str).str.strip()
+        return pd.Series('', index=bloque.index)
+
+    datos = pd.DataFrame({
+        'nombre': columna('nombre'),
+        'identificacion': columna('identificacion'),
+        'descripcion': columna('descripcion'),
+        'id_gestion': columna('id_gestion').replace('', id_gestion_defecto),
+    })
+
+    claves = datos['identificacion'] + '\x1f' + datos['id_gestion']
+    repetida = claves.map(vistos.__contains__).astype(bool) | claves.duplicated()
+    registrada = claves.map(existentes.__contains__).astype(bool)
+
+    # np.select toma el primer motivo que se cumple
+    motivo = np.select(
+        [datos['nombre'] == '',
+         ~datos['nombre'].str.match(PATRON_NOMBRE),
+         datos['identificacion'] == '',
+         ~datos['identificacion'].str.match(PATRON_IDENTIFICACION),
+         datos['id_gestion'] == '',
+         registrada,
+         repetida],
+        ['Nombre vacío',
+         'Nombre con caracteres no permitidos',
+         'Identificación vacía',
+         'Identificación con caracteres no permitidos',
+         'Sin ID de gestión',
+         'Ya registrado en la gestión',
+         'Repetido en el archivo'],
+        default='')
+    valida = motivo == ''
+
+    aceptados = datos[valida]
+    vistos.update(claves[valida])
+    rechazados = datos[~valida].assign(motivo=motivo[~valida])
+    return aceptados, rechazados
+
+
+def importar_archivo(ruta, id_gestion_defecto='', existentes=frozenset(),
+                     filas_por_bloque=FILAS_POR_BLOQUE):
+    """Lee y valida un archivo completo.
+
+    Devuelve (sujetos aceptados como dicts con uid, filas rechazadas) donde
+    cada rechazada incluye su número de fila en el archivo y el motivo.
+    """
+    aceptados = []
+    rechazados = []
+    vistos = set()
+    fila_inicial = 2  # la fila 1 es el encabezado
+    for bloque in leer_bloques(ruta, filas_por_bloque):
+        validos, invalidos = validar_bloque(bloque, id_gestion_defecto, vistos, existentes)
+        for sujeto in validos.to_dict('records'):
+            sujeto['uid'] = nuevo_uid()
+            aceptados.append(sujeto)
+        invalidos = invalidos.assign(fila=invalidos.index + fila_inicial - bloque.index[0])
+        rechazados.extend(invalidos.to_dict('records'))
+        fila_inicial += len(bloque)
+    return aceptados, rechazados
+
+
+def guardar_rechazados(rechazados, ruta):
+    """Escribe el reporte de filas rechazadas en CSV"""
+    campos = ['fila', 'motivo', 'nombre', 'identificacion', 'descripcion', 'id_gestion']
+    with open(ruta, 'w', encoding='utf-8-sig', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=campos, extrasaction='ignore')
+        escritor.writeheader()
+        escritor.writerows(rechazados)
+    return ruta
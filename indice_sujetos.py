@@ -0,0 +1,240 @@
+"""Índices en memoria para buscar sujetos sin recorrer toda la lista.
+
+- Mapa de uid a sujeto y mapas exactos de identificación e ID de gestión.
+- Índices de trigramas sobre nombre e identificación (en minúsculas) para
+  búsquedas por subcadena o prefijo: se toma la lista de posiciones del
+  trigrama menos frecuente del término y solo esas se comparan.
+- Trigramas sobre las claves distintas de ID de gestión, que son pocas.
+- Un IndiceNombres (coincidencia_nombres) para nombres parecidos, sin
+  importar tildes ni el orden de las palabras.
+
+Los sujetos se guardan por posición de inserción; al eliminar uno su
+posición queda vacía y el índice se reconstruye cuando los huecos superan
+la mitad. Los trigramas y el índice de nombres se construyen en un hilo
+aparte (preparar_en_segundo_plano); mientras no están listos, buscar()
+recorre la lista (la búsqueda aproximada, por subcadena) y
+similares(esperar=False) no responde.
+"""
+import threading
+from array import array
+
+from coincidencia_nombres import IndiceNombres, UMBRAL_BUSQUEDA, UMBRAL_SIMILITUD
+
+# Marca de inicio de texto: permite buscar por prefijo con los mismos trigramas
+INICIO = '\x02'
+
+CAMPOS_TRIGRAMAS = ('nombre', 'identificacion')
+CAMPOS_BUSQUEDA = {'Nombre': 'nombre', 'Nombre (aproximado)': 'nombre_aproximado',
+                   'Identificación': 'identificacion', 'ID Gestión': 'id_gestion'}
+
+# Posiciones que se indexan por cada toma del bloqueo
+BLOQUE_INDEXADO = 5000
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _candidatos(gramas, buscado):
+    """Lista más corta entre las de los trigramas del término (None si falta alguno)"""
+    menor = None
+    for grama in _trigramas(buscado):
+        lista = gramas.get(grama)
+        if lista is None:
+            return None
+        if menor is None or len(lista) < len(menor):
+            menor = lista
+    return menor
+
+
+class IndiceSujetos:
+    """Índice de sujetos que se mantiene al agregar y eliminar"""
+
+    def __init__(self, sujetos=()):
+        self._bloqueo = threading.RLock()
+        self._hilo = None
+        self.vaciar()
+        for sujeto in sujetos:
+            self.agregar(sujeto)
+
+    def vaciar(self):
+        with self._bloqueo:
+            self._sujetos = []
+            self._posicion = {}  # uid -> posición
+            self._textos = {campo: [] for campo in CAMPOS_TRIGRAMAS}
+            self._gramas = {campo: {} for campo in CAMPOS_TRIGRAMAS}
+            self._indexados = 0
+            self._exactos = {'identificacion': {}, 'id_gestion': {}}
+            self._gramas_gestion = {}
+            self._nombres = IndiceNombres()
+            self._huecos = 0
+
+    def __len__(self):
+        return len(self._sujetos) - self._huecos
+
+    def agregar(self, sujeto):
+        with self._bloqueo:
+            posicion = len(self._sujetos)
+            self._sujetos.append(sujeto)
+            self._posicion[sujeto['uid']] = posicion
+            for campo in CAMPOS_TRIGRAMAS:
+                self._textos[campo].append(INICIO + (sujeto.get(campo) or '').lower())
+            for campo, mapa in self._exactos.items():
+                clave = sujeto.get(campo) or ''
+                posiciones = mapa.get(clave)
+                if posiciones is None:
+                    posiciones = mapa[clave] = []
+                    if campo == 'id_gestion':
+                        for grama in _trigramas(INICIO + clave.lower()):
+                            self._gramas_gestion.setdefault(grama, set()).add(clave)
+                posiciones.append(posicion)
+
+    def eliminar(self, sujeto):
+        with self._bloqueo:
+            posicion = self._posicion.pop(sujeto['uid'], None)
+            if posicion is None:
+                return
+            self._sujetos[posicion] = None
+            for campo in CAMPOS_TRIGRAMAS:
+                self._textos[campo][posicion] = None
+            self._nombres.eliminar(posicion)
+            for campo, mapa in self._exactos.items():
+                clave = sujeto.get(campo) or ''
+                posiciones = mapa.get(clave)
+                if posiciones is not None:
+                    posiciones.remove(posicion)
+                    if not posiciones:
+                        del mapa[clave]
+            self._huecos += 1
+            if self._huecos > 1000 and self._huecos * 2 > len(self._sujetos):
+                self._reconstruir()
+
+    def _reconstruir(self):
+        """Rehace el índice sin las posiciones vacías"""
+        vigentes = [s for s in self._sujetos if s is not None]
+        self.vaciar()
+        for sujeto in vigentes:
+            self.agregar(sujeto)
+
+    def _indexar_bloque(self):
+        """Indexa por trigramas el siguiente bloque pendiente; False si no quedaba nada"""
+        with self._bloqueo:
+            inicio = self._indexados
+            fin = min(inicio + BLOQUE_INDEXADO, len(self._sujetos))
+            if inicio >= fin:
+                return False
+            for campo, gramas in self._gramas.items():
+                textos = self._textos[campo]
+                for posicion in range(inicio, fin):
+                    texto = textos[posicion]
+                    if texto is None:
+                        continue
+                    for grama in _trigramas(texto):
+                        lista = gramas.get(grama)
+                        if lista is None:
+                            lista = gramas[grama] = array('I')
+                        lista.append(posicion)
+            for posicion in range(inicio, fin):
+                sujeto = self._sujetos[posicion]
+                if sujeto is not None:
+                    self._nombres.agregar(posicion, sujeto.get('nombre') or '')
+            self._indexados = fin
+            return True
+
+    def preparar(self):
+        """Construye todos los trigramas pendientes"""
+        while self._indexar_bloque():
+            pass
+
+    @property
+    def listo(self):
+        """True si los trigramas y el índice de nombres ya incluyen a todos los sujetos"""
+        return self._indexados >= len(self._sujetos)
+
+    def preparar_en_segundo_plano(self):
+        """Construye los trigramas en un hilo, tomando el bloqueo por bloques"""
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self.preparar, daemon=True)
+            self._hilo.start()
+
+    def _resultado(self, posiciones):
+        sujetos = self._sujetos
+        return [sujetos[p] for p in posiciones]
+
+    # Búsquedas exactas
+    def por_uid(self, uid):
+        with self._bloqueo:
+            posicion = self._posicion.get(uid)
+            return None if posicion is None else self._sujetos[posicion]
+
+    def por_identificacion(self, identificacion):
+        with self._bloqueo:
+            return self._resultado(self._exactos['identificacion'].get(identificacion, ()))
+
+    def por_gestion(self, id_gestion):
+        with self._bloqueo:
+            return self._resultado(self._exactos['id_gestion'].get(id_gestion, ()))
+
+    # Búsqueda por subcadena o prefijo
+    def buscar(self, campo, termino, prefijo=False):
+        """Sujetos cuyo campo contiene el término (sin distinguir mayúsculas).
+
+        Devuelve los sujetos en el orden en que se agregaron. Con
+        'nombre_aproximado' devuelve los de nombre parecido, del más al menos
+        parecido; si el índice de nombres aún no está listo no lo espera y
+        busca el nombre por subcadena (ver listo).
+        """
+        if campo == 'nombre_aproximado':
+            similares = self.similares(termino, limite=200, umbral=UMBRAL_BUSQUEDA, esperar=False)
+            if similares is None:
+                return self.buscar('nombre', termino, prefijo)
+            return [sujeto for _, sujeto in similares]
+
+        buscado = (INICIO if prefijo else '') + termino.lower()
+        with self._bloqueo:
+            if campo == 'id_gestion':
+                return self._buscar_gestion(buscado)
+
+            # Lo agregado después de preparar() se indexa aquí mismo
+            if len(self._sujetos) - self._indexados <= BLOQUE_INDEXADO:
+                self._indexar_bloque()
+            textos = self._textos[campo]
+            if self._indexados < len(self._sujetos):
+                self.preparar_en_segundo_plano()
+            if len(buscado) < 3 or self._indexados < len(self._sujetos):
+                return self._resultado([p for p, texto in enumerate(textos)
+                                        if texto is not None and buscado in texto])
+
+            candidatos = _candidatos(self._gramas[campo], buscado)
+            if candidatos is None:
+                return []
+            return self._resultado([p for p in candidatos
+                                    if textos[p] is not None and buscado in textos[p]])
+
+    def _buscar_gestion(self, buscado):
+        mapa = self._exactos['id_gestion']
+        claves = mapa.keys() if len(buscado) < 3 else _candidatos(self._gramas_gestion, buscado) or ()
+        posiciones = [p for clave in claves
+                      if clave in mapa and buscado in INICIO + clave.lower()
+                      for p in mapa[clave]]
+        return self._resultado(sorted(posiciones))
+
+    # Nombres parecidos
+    def similares(self, nombre, limite=10, umbral=UMBRAL_SIMILITUD, esperar=True):
+        """Lista de (similitud, sujeto) con nombres parecidos, de mayor a menor.
+
+        Necesita el índice completo. Si todavía se está construyendo, con
+        esperar lo termina antes de responder; sin esperar devuelve None y
+        la construcción sigue en segundo plano. Lo agregado después de
+        preparar() (un bloque como máximo) se indexa aquí mismo.
+        """
+        if esperar:
+            self.preparar()
+        with self._bloqueo:
+            if len(self._sujetos) - self._indexados <= BLOQUE_INDEXADO:
+                self._indexar_bloque()
+            if not self.listo:
+                self.preparar_en_segundo_plano()
+                return None
+            return [(puntaje, self._sujetos[posicion])
+                    for puntaje, posicion in self._nombres.candidatos(nombre, limite, umbral)]
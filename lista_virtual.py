@@ -0,0 +1,164 @@
+"""Lista virtual sobre ttk.Treeview: solo existen las filas visibles.
+
+Un Treeview con decenas de miles de filas se vuelve lento al insertar,
+desplazarse y vaciarse. ListaVirtual guarda los registros en una lista de
+Python y mantiene en el árbol únicamente la porción que cabe en pantalla;
+la barra de desplazamiento propia traduce su posición a un desplazamiento
+dentro de los datos y cada redibujo solo toca las filas que cambiaron.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# Alturas usadas hasta que el árbol tiene filas que medir
+ALTO_FILA_INICIAL = 20
+ALTO_ENCABEZADO_INICIAL = 25
+
+
+class ListaVirtual(tk.Frame):
+    """Treeview + barra de desplazamiento que muestra una ventana de los datos.
+
+    valores_fila(registro) devuelve los valores de las columnas y
+    clave_fila(registro) el iid (único) de la fila que lo representa.
+    """
+
+    def __init__(self, master, columnas, valores_fila, clave_fila, height=12, **kwargs):
+        super().__init__(master, **kwargs)
+        self.valores_fila = valores_fila
+        self.clave_fila = clave_fila
+        self.datos = []
+        self.inicio = 0
+        self.filas_visibles = height
+        self._visibles = {}  # iid -> registro de las filas en pantalla
+        self._clave_seleccionada = None
+        self._alto_fila = ALTO_FILA_INICIAL
+        self._alto_encabezado = ALTO_ENCABEZADO_INICIAL
+
+        self.tree = ttk.Treeview(self, columns=columnas, show='headings', height=height,
+                                 selectmode='browse')
+        self.barra = ttk.Scrollbar(self, orient='vertical', command=self._desplazar_barra)
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.barra.pack(side='right', fill='y')
+
+        self.tree.bind('<Configure>', self._al_redimensionar)
+        self.tree.bind('<<TreeviewSelect>>', self._al_seleccionar)
+        self.tree.bind('<MouseWheel>', self._rueda)
+        self.tree.bind('<Button-4>', lambda e: self._mover(-3))
+        self.tree.bind('<Button-5>', lambda e: self._mover(3))
+        self.tree.bind('<Up>', lambda e: self._mover_seleccion(-1))
+        self.tree.bind('<Down>', lambda e: self._mover_seleccion(1))
+        self.tree.bind('<Prior>', lambda e: self._mover_seleccion(-self.filas_visibles))
+        self.tree.bind('<Next>', lambda e: self._mover_seleccion(self.filas_visibles))
+        self.tree.bind('<Home>', lambda e: self._mover_seleccion(-len(self.datos)))
+        self.tree.bind('<End>', lambda e: self._mover_seleccion(len(self.datos)))
+
+    # Datos
+    def establecer_datos(self, datos, al_final=False):
+        """Cambia los registros mostrados; conserva el desplazamiento si cabe"""
+        self.datos = datos
+        if al_final:
+            self.inicio = len(datos)
+        self._dibujar()
+
+    def quitar(self, registro):
+        """Quita un registro de los datos mostrados (si sigue en ellos) y redibuja"""
+        for posicion, otro in enumerate(self.datos):
+            if otro is registro:
+                del self.datos[posicion]
+                break
+        self._dibujar()
+
+    def registro(self, iid):
+        """Registro de una fila visible (None si no está en pantalla)"""
+        return self._visibles.get(iid)
+
+    def seleccionado(self):
+        seleccion = self.tree.selection()
+        return self._visibles.get(seleccion[0]) if seleccion else None
+
+    def actualizar_fila(self, registro):
+        """Refresca los valores de un registro si está en pantalla"""
+        iid = self.clave_fila(registro)
+        if iid in self._visibles:
+            self._visibles[iid] = registro
+            self.tree.item(iid, values=self.valores_fila(registro))
+
+    # Dibujo
+    def _dibujar(self):
+        total = len(self.datos)
+        self.inicio = max(0, min(self.inicio, total - self.filas_visibles))
+        ventana = self.datos[self.inicio:self.inicio + self.filas_visibles]
+
+        # Solo se borran e insertan las filas que entran o salen de la ventana
+        nuevos = {self.clave_fila(registro): registro for registro in ventana}
+        sobrantes = [iid for iid in self._visibles if iid not in nuevos]
+        if sobrantes:
+            self.tree.delete(*sobrantes)
+        for iid, registro in nuevos.items():
+            if iid not in self._visibles:
+                self.tree.insert('', 'end', iid=iid, values=self.valores_fila(registro))
+        self._visibles = nuevos
+        orden = tuple(nuevos)
+        if self.tree.get_children() != orden:
+            self.tree.set_children('', *orden)
+
+        if self._clave_seleccionada in nuevos and self.tree.selection() != (self._clave_seleccionada,):
+            self.tree.selection_set(self._clave_seleccionada)
+
+        if total:
+            self.barra.set(self.inicio / total, min(1.0, (self.inicio + len(ventana)) / total))
+        else:
+            self.barra.set(0.0, 1.0)
+
+    def _al_redimensionar(self, event):
+        # La primera fila da el alto real de fila y de encabezado
+        hijos = self.tree.get_children()
+        caja = self.tree.bbox(hijos[0]) if hijos else None
+        if caja and caja[3]:
+            self._alto_encabezado, self._alto_fila = caja[1], caja[3]
+        filas = max(1, (event.height - self._alto_encabezado) // self._alto_fila)
+        if filas != self.filas_visibles:
+            self.filas_visibles = filas
+            self._dibujar()
+
+    def _al_seleccionar(self, event):
+        seleccion = self.tree.selection()
+        if seleccion:
+            self._clave_seleccionada = seleccion[0]
+
+    # Desplazamiento
+    def _mover(self, filas):
+        self.inicio += filas
+        self._dibujar()
+        return 'break'
+
+    def _rueda(self, event):
+        # Windows informa múltiplos de 120; macOS, pasos pequeños
+        pasos = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._mover(-3 * pasos)
+
+    def _desplazar_barra(self, accion, cantidad, unidad=None):
+        if accion == 'moveto':
+            self.inicio = int(float(cantidad) * len(self.datos))
+        elif accion == 'scroll':
+            paso = self.filas_visibles if unidad == 'pages' else 1
+            self.inicio += int(cantidad) * paso
+        self._dibujar()
+
+    def _mover_seleccion(self, filas):
+        """Mueve la selección por los datos, desplazando la ventana si hace falta"""
+        if not self.datos:
+            return 'break'
+        actual = self.seleccionado()
+        if actual is None:
+            posicion = self.inicio
+        else:
+            posicion = self.inicio + list(self._visibles).index(self.clave_fila(actual)) + filas
+        posicion = max(0, min(posicion, len(self.datos) - 1))
+        if posicion < self.inicio:
+            self.inicio = posicion
+        elif posicion >= self.inicio + self.filas_visibles:
+            self.inicio = posicion - self.filas_visibles + 1
+        self._clave_seleccionada = self.clave_fila(self.datos[posicion])
+        self._dibujar()
+        self.tree.focus(self._clave_seleccionada)
+        return 'break'
@@ -0,0 +1,483 @@
+"""Modelo inmutable del caso que reciben los generadores de documentos.
+
+CasoSnapshot es la foto de un caso tomada una sola vez (desde el formulario
+o desde un diccionario): datos generales de la gestión, sujetos, resultados
+por fuente, nivel de riesgo y plantilla. Como no cambia, puede pasarse a un
+hilo o a otro proceso sin copiarlo y se serializa con pickle en forma
+compacta. Se lee igual que los diccionarios de caso (caso['sujetos'],
+caso['resultados'].items()...), así que motor_informes lo acepta tal cual.
+
+Sujeto reemplaza al diccionario de cada sujeto: con __slots__ ocupa una
+fracción de la memoria de un dict, lo que se nota con historiales grandes.
+ListaSujetos los mantiene en orden de alta y quita uno por su uid sin
+recorrer la lista.
+
+TablaResultados guarda los resultados de la investigación por sujeto y
+fuente en columnas: por cada fuente, una lista de textos, un array de
+códigos de estado y un array de fechas (ordinales), todos alineados por
+fila. Las exportaciones y el cálculo de riesgo recorren columnas enteras.
+"""
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date, datetime
+from types import MappingProxyType
+
+CAMPOS_SUJETO = ('uid', 'nombre', 'identificacion', 'descripcion', 'id_gestion')
+CAMPOS_CASO = ('id_gestion', 'fecha_solicitud', 'usuario_requirente', 'tipo_solicitud',
+               'descripcion', 'serapio', 'fuente_info', 'sujetos', 'resultados',
+               'nivel_riesgo', 'plantilla', 'tabla_resultados')
+
+# Sujetos por tramo de ListaSujetos
+TAMANO_TRAMO = 512
+
+# Texto de un resultado que aún no se cargó
+RESULTADO_DEFAULT = 'No se encontraron referencias.'
+
+# Códigos de estado de un resultado (índices de NOMBRES_ESTADO)
+ESTADO_PENDIENTE = 0
+ESTADO_SIN_COINCIDENCIAS = 1
+ESTADO_CON_COINCIDENCIAS = 2
+ESTADO_NO_DISPONIBLE = 3
+NOMBRES_ESTADO = ('Pendiente', 'Sin coincidencias', 'Con coincidencias', 'No disponible')
+
+# Niveles de riesgo, de menor a mayor; con NIVEL_AUTOMATICO se calculan
+# con la política de riesgo (ver calificacion_riesgo)
+NIVELES_RIESGO = ('bajo', 'medio', 'alto')
+NIVEL_AUTOMATICO = 'automático'
+
+# Fecha vacía en las columnas de fechas
+SIN_FECHA = 0
+FORMATO_FECHA = '%d/%m/%Y'
+
+
+def fecha_desde_texto(texto):
+    """Ordinal de una fecha dd/mm/aaaa (SIN_FECHA si está vacía); ValueError si no es válida"""
+    texto = str(texto or '').strip()
+    if not texto or texto == 'N/A':
+        return SIN_FECHA
+    return datetime.strptime(texto, FORMATO_FECHA).date().toordinal()
+
+
+def texto_fecha(ordinal):
+    """Fecha dd/mm/aaaa de un ordinal, o 'N/A' si no tiene"""
+    return date.fromordinal(ordinal).strftime(FORMATO_FECHA) if ordinal else 'N/A'
+
+
+def estado_desde_texto(texto):
+    """Código de estado a partir de su nombre o su número"""
+    texto = str(texto).strip()
+    if texto.isdigit() and int(texto) < len(NOMBRES_ESTADO):
+        return int(texto)
+    return NOMBRES_ESTADO.index(texto)
+
+
+class _Inmutable:
+    """Base de los objetos del modelo: lectura por atributo o por clave"""
+
+    __slots__ = ()
+    _campos = ()
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __getitem__(self, campo):
+        if campo in self._campos:
+            return getattr(self, campo)
+        raise KeyError(campo)
+
+    def get(self, campo, defecto=None):
+        return getattr(self, campo) if campo in self._campos else defecto
+
+    def keys(self):
+        return self._campos
+
+    def __contains__(self, campo):
+        return campo in self._campos
+
+    def _valores(self):
+        return tuple(getattr(self, campo) for campo in self._campos)
+
+    def __eq__(self, otro):
+        return type(otro) is type(self) and otro._valores() == self._valores()
+
+    def __hash__(self):
+        return hash(self._valores())
+
+
+class Sujeto(_Inmutable):
+    """Sujeto de investigación"""
+
+    __slots__ = CAMPOS_SUJETO
+    _campos = CAMPOS_SUJETO
+
+    def __init__(self, uid, nombre, identificacion, descripcion='', id_gestion=''):
+        iniciar = object.__setattr__
+        iniciar(self, 'uid', uid)
+        iniciar(self, 'nombre', nombre)
+        iniciar(self, 'identificacion', identificacion)
+        iniciar(self, 'descripcion', descripcion)
+        iniciar(self, 'id_gestion', id_gestion)
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(*(datos.get(campo) or '' for campo in CAMPOS_SUJETO))
+
+    def _valores(self):
+        return (self.uid, self.nombre, self.identificacion, self.descripcion, self.id_gestion)
+
+    def a_dict(self):
+        """Diccionario plano, para guardar o exportar"""
+        return dict(zip(CAMPOS_SUJETO, self._valores()))
+
+    def __reduce__(self):
+        return (Sujeto, self._valores())
+
+    def __repr__(self):
+        return f"Sujeto({self.nombre!r}, {self.identificacion!r}, gestión={self.id_gestion!r})"
+
+
+class ListaSujetos:
+    """Sujetos en orden de alta, con acceso por posición y eliminación por uid.
+
+    Los sujetos se guardan en tramos de hasta TAMANO_TRAMO y un mapa da el
+    tramo de cada uid: quitar uno solo recorre su tramo, no toda la lista.
+    Los inicios acumulados de los tramos ubican un índice por bisección; tras
+    quitar se recalculan la próxima vez que se pide un índice.
+    Se usa como una lista (len, iteración, índices y porciones).
+    """
+
+    def __init__(self, sujetos=()):
+        self.clear()
+        self.extend(sujetos)
+
+    def clear(self):
+        self._tramos = []
+        self._tramo_de = {}  # uid -> tramo
+        self._inicios = []  # índice del primer sujeto de cada tramo (None: por recalcular)
+        self._largo = 0
+
+    def __len__(self):
+        return self._largo
+
+    def __iter__(self):
+        for tramo in self._tramos:
+            yield from tramo
+
+    def __contains__(self, sujeto):
+        return self._tramo_de.get(sujeto.uid) is not None
+
+    def append(self, sujeto):
+        if not self._tramos or len(self._tramos[-1]) >= TAMANO_TRAMO:
+            self._tramos.append([])
+            if self._inicios is not None:
+                self._inicios.append(self._largo)
+        tramo = self._tramos[-1]
+        tramo.append(sujeto)
+        self._tramo_de[sujeto.uid] = tramo
+        self._largo += 1
+
+    def extend(self, sujetos):
+        for sujeto in sujetos:
+            self.append(sujeto)
+
+    def quitar(self, uid):
+        """Quita el sujeto con ese uid y lo devuelve (None si no está)"""
+        tramo = self._tramo_de.pop(uid, None)
+        if tramo is None:
+            return None
+        for posicion, sujeto in enumerate(tramo):
+            if sujeto.uid == uid:
+                del tramo[posicion]
+                break
+        self._largo -= 1
+        self._inicios = None
+        if not tramo:
+            self._tramos = [otro for otro in self._tramos if otro is not tramo]
+        return sujeto
+
+    def _ubicar(self, indice):
+        """(número de tramo, posición dentro de él) del índice dado"""
+        if indice >= self._largo:
+            return len(self._tramos), 0
+        if self._inicios is None:
+            self._inicios, inicio = [], 0
+            for tramo in self._tramos:
+                self._inicios.append(inicio)
+                inicio += len(tramo)
+        numero = bisect_right(self._inicios, indice) - 1
+        return numero, indice - self._inicios[numero]
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(self._largo)
+            if paso != 1:
+                return list(self)[indice]
+            porcion = []
+            numero, posicion = self._ubicar(inicio)
+            faltan = fin - inicio
+            while faltan > 0 and numero < len(self._tramos):
+                tomados = self._tramos[numero][posicion:posicion + faltan]
+                porcion.extend(tomados)
+                faltan -= len(tomados)
+                numero, posicion = numero + 1, 0
+            return porcion
+        if indice < 0:
+            indice += self._largo
+        if not 0 <= indice < self._largo:
+            raise IndexError('índice fuera de la lista de sujetos')
+        numero, posicion = self._ubicar(indice)
+        return self._tramos[numero][posicion]
+
+    def __repr__(self):
+        return f"ListaSujetos({self._largo} sujetos)"
+
+
+class CasoSnapshot(_Inmutable):
+    """Foto inmutable de un caso; resultados y plantilla son mapas de solo lectura"""
+
+    __slots__ = CAMPOS_CASO
+    _campos = CAMPOS_CASO
+
+    def __init__(self, id_gestion='', fecha_solicitud='', usuario_requirente='', tipo_solicitud='',
+                 descripcion='', serapio='', fuente_info='', sujetos=(), resultados=None,
+                 nivel_riesgo=NIVEL_AUTOMATICO, plantilla=None, tabla_resultados=None):
+        iniciar = object.__setattr__
+        iniciar(self, 'id_gestion', id_gestion)
+        iniciar(self, 'fecha_solicitud', fecha_solicitud)
+        iniciar(self, 'usuario_requirente', usuario_requirente)
+        iniciar(self, 'tipo_solicitud', tipo_solicitud)
+        iniciar(self, 'descripcion', descripcion)
+        iniciar(self, 'serapio', serapio)
+        iniciar(self, 'fuente_info', fuente_info)
+        iniciar(self, 'sujetos', tuple(s if isinstance(s, Sujeto) else Sujeto.desde_dict(s)
+                                       for s in sujetos))
+        iniciar(self, 'resultados', MappingProxyType(dict(resultados or {})))
+        # Las listas de la plantilla (incisos adicionales) quedan como tuplas
+        iniciar(self, 'plantilla', MappingProxyType({
+            clave: tuple(valor) if isinstance(valor, list) else valor
+            for clave, valor in (plantilla or {}).items()}))
+        iniciar(self, 'nivel_riesgo', nivel_riesgo)
+        # Una fila por sujeto, en el mismo orden; sin tabla, los resultados
+        # por fuente valen para todos los sujetos
+        if tabla_resultados is None:
+            tabla_resultados = TablaResultados.uniforme(len(self.sujetos), self.resultados)
+        elif len(tabla_resultados) != len(self.sujetos):
+            raise ValueError("La tabla de resultados debe tener una fila por sujeto")
+        iniciar(self, 'tabla_resultados', tabla_resultados)
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Snapshot de un caso en forma de diccionario (por ejemplo, de caso_desde_dict)"""
+        return cls(**{campo: datos[campo] for campo in CAMPOS_CASO if campo in datos})
+
+    def a_dict(self):
+        """Diccionario plano con listas y dicts, para JSON"""
+        datos = dict(zip(CAMPOS_CASO, self._valores()))
+        datos['sujetos'] = [sujeto.a_dict() for sujeto in self.sujetos]
+        datos['resultados'] = dict(self.resultados)
+        datos['plantilla'] = {clave: list(valor) if isinstance(valor, tuple) else valor
+                              for clave, valor in self.plantilla.items()}
+        del datos['tabla_resultados']
+        for fila, sujeto in enumerate(datos['sujetos']):
+            sujeto['resultados'] = {fuente: self.tabla_resultados.resultado(fila, fuente)._asdict()
+                                    for fuente in self.tabla_resultados.fuentes}
+        return datos
+
+    def _valores_serializables(self):
+        # Los MappingProxyType no se pueden serializar con pickle: van como dict
+        return tuple(dict(valor) if isinstance(valor, MappingProxyType) else valor
+                     for valor in self._valores())
+
+    def __reduce__(self):
+        # Los sujetos viajan como tuplas de texto, que pickle serializa sin
+        # llamar a Python por cada uno; se reconstruyen al cargar
+        valores = list(self._valores_serializables())
+        valores[CAMPOS_CASO.index('sujetos')] = tuple(sujeto._valores() for sujeto in self.sujetos)
+        return (_caso_desde_pickle, tuple(valores))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"CasoSnapshot({self.id_gestion!r}, {len(self.sujetos)} sujetos)"
+
+
+def _caso_desde_pickle(*valores):
+    datos = dict(zip(CAMPOS_CASO, valores))
+    datos['sujetos'] = [Sujeto(*fila) for fila in datos['sujetos']]
+    return CasoSnapshot(**datos)
+
+
+# Resultado de un sujeto en una fuente, con estado y fecha ya en texto
+Resultado = namedtuple('Resultado', 'resultado estado fecha')
+
+
+class TablaResultados:
+    """Resultados por (sujeto, fuente) guardados por columnas.
+
+    Cada fuente tiene su columna de textos, de estados y de fechas, y un
+    valor por defecto para los sujetos sin fila propia: solo reciben fila
+    los sujetos cuyos resultados se editan uno por uno, de modo que un
+    historial grande no cuesta nada mientras no se toque. Al quitar un
+    sujeto, la última fila ocupa su lugar y las columnas no tienen huecos.
+
+    alineada() devuelve una copia con una fila por sujeto, en el orden de
+    una lista de sujetos: es la que reciben los generadores.
+    """
+
+    def __init__(self, fuentes=()):
+        self.fuentes = list(fuentes)
+        self.defectos = {fuente: (RESULTADO_DEFAULT, ESTADO_SIN_COINCIDENCIAS, SIN_FECHA)
+                         for fuente in self.fuentes}
+        self._vaciar_filas()
+
+    def _vaciar_filas(self):
+        self.uids = []
+        self._filas = {}  # uid -> fila
+        self.textos = {fuente: [] for fuente in self.fuentes}
+        self.estados = {fuente: array('B') for fuente in self.fuentes}
+        self.fechas = {fuente: array('I') for fuente in self.fuentes}
+
+    @classmethod
+    def uniforme(cls, filas, resultados):
+        """Tabla de `filas` filas sin uid en la que cada fuente tiene el mismo texto en todas"""
+        tabla = cls(resultados)
+        for fuente, texto in resultados.items():
+            tabla.defectos[fuente] = (texto, ESTADO_SIN_COINCIDENCIAS, SIN_FECHA)
+        tabla._rellenar(tabla, [''] * filas, [None] * filas)
+        return tabla
+
+    def __len__(self):
+        return len(self.uids)
+
+    def __eq__(self, otra):
+        return (isinstance(otra, TablaResultados) and otra.fuentes == self.fuentes
+                and otra.defectos == self.defectos and otra.uids == self.uids
+                and otra.textos == self.textos and otra.estados == self.estados
+                and otra.fechas == self.fechas)
+
+    __hash__ = None
+
+    # Filas
+    def fila(self, uid, crear=False):
+        """Fila del sujeto; con crear=True la agrega con los valores por defecto"""
+        fila = self._filas.get(uid)
+        if fila is None and crear:
+            fila = len(self.uids)
+            self.uids.append(uid)
+            self._filas[uid] = fila
+            for fuente in self.fuentes:
+                texto, estado, fecha = self.defectos[fuente]
+                self.textos[fuente].append(texto)
+                self.estados[fuente].append(estado)
+                self.fechas[fuente].append(fecha)
+        return fila
+
+    def quitar_sujeto(self, uid):
+        fila = self._filas.pop(uid, None)
+        if fila is None:
+            return
+        ultima = len(self.uids) - 1
+        columnas = [self.uids] + [por_fuente[fuente] for por_fuente in (self.textos, self.estados, self.fechas)
+                                  for fuente in self.fuentes]
+        if fila != ultima:
+            for columna in columnas:
+                columna[fila] = columna[ultima]
+            self._filas[self.uids[fila]] = fila
+        for columna in columnas:
+            del columna[ultima]
+
+    def vaciar(self):
+        """Quita todas las filas; los valores por defecto se conservan"""
+        self._vaciar_filas()
+
+    # Columnas
+    def ajustar_fuentes(self, fuentes):
+        """Deja exactamente estas fuentes, en este orden; las nuevas quedan por defecto"""
+        filas = len(self.uids)
+        for fuente in fuentes:
+            if fuente not in self.defectos:
+                self.defectos[fuente] = (RESULTADO_DEFAULT, ESTADO_SIN_COINCIDENCIAS, SIN_FECHA)
+                self.textos[fuente] = [RESULTADO_DEFAULT] * filas
+                self.estados[fuente] = array('B', [ESTADO_SIN_COINCIDENCIAS]) * filas
+                self.fechas[fuente] = array('I', [SIN_FECHA]) * filas
+        for fuente in set(self.defectos) - set(fuentes):
+            del self.defectos[fuente], self.textos[fuente], self.estados[fuente], self.fechas[fuente]
+        self.fuentes = list(fuentes)
+
+    def establecer(self, fila, fuente, texto=None, estado=None, fecha=None):
+        """Cambia los valores dados (los None se conservan) de una celda"""
+        if texto is not None:
+            self.textos[fuente][fila] = texto
+        if estado is not None:
+            self.estados[fuente][fila] = estado
+        if fecha is not None:
+            self.fechas[fuente][fila] = fecha
+
+    def establecer_columna(self, fuente, texto=None, estado=None, fecha=None):
+        """Cambia los valores dados de una fuente para todos los sujetos, con fila o sin ella"""
+        filas = len(self.uids)
+        defecto = list(self.defectos[fuente])
+        if texto is not None:
+            defecto[0] = texto
+            self.textos[fuente] = [texto] * filas
+        if estado is not None:
+            defecto[1] = estado
+            self.estados[fuente] = array('B', [estado]) * filas
+        if fecha is not None:
+            defecto[2] = fecha
+            self.fechas[fuente] = array('I', [fecha]) * filas
+        self.defectos[fuente] = tuple(defecto)
+
+    def valor_comun(self, fuente, sujetos=None):
+        """(texto, estado, fecha) que comparten todos los sujetos; None donde difieren.
+
+        sujetos es cuántos hay en total: si son más que las filas, los que no
+        tienen fila cuentan con el valor por defecto. Sin él solo se miran las
+        filas (o el valor por defecto si no hay ninguna).
+        """
+        con_defecto = not self.uids or (sujetos is not None and sujetos > len(self.uids))
+        comunes = []
+        for defecto, columna in zip(self.defectos[fuente],
+                                    (self.textos[fuente], self.estados[fuente], self.fechas[fuente])):
+            comun = defecto if con_defecto else columna[0]
+            comunes.append(comun if all(valor == comun for valor in columna) else None)
+        return tuple(comunes)
+
+    def resultado(self, fila, fuente):
+        """Resultado de una celda (o el por defecto si fila es None), con estado y fecha en texto"""
+        if fuente not in self.defectos:
+            texto, estado, fecha = RESULTADO_DEFAULT, ESTADO_SIN_COINCIDENCIAS, SIN_FECHA
+        elif fila is None:
+            texto, estado, fecha = self.defectos[fuente]
+        else:
+            texto, estado, fecha = self.textos[fuente][fila], self.estados[fuente][fila], self.fechas[fuente][fila]
+        return Resultado(texto, NOMBRES_ESTADO[estado], texto_fecha(fecha))
+
+    def _rellenar(self, tabla, uids, origen):
+        """Arma las columnas con una fila por uid, copiando la fila origen[i] de tabla (None: por defecto)"""
+        for fuente in self.fuentes:
+            texto, estado, fecha = self.defectos[fuente]
+            textos, estados, fechas = tabla.textos[fuente], tabla.estados[fuente], tabla.fechas[fuente]
+            self.textos[fuente] = [texto if f is None else textos[f] for f in origen]
+            self.estados[fuente] = array('B', [estado if f is None else estados[f] for f in origen])
+            self.fechas[fuente] = array('I', [fecha if f is None else fechas[f] for f in origen])
+        self.uids = list(uids)
+        self._filas = {uid: fila for fila, uid in enumerate(self.uids) if uid}
+
+    def _copia(self, uids, origen):
+        copia = TablaResultados(self.fuentes)
+        copia.defectos = dict(self.defectos)
+        copia._rellenar(self, uids, origen)
+        return copia
+
+    def alineada(self, uids):
+        """Copia con una fila por uid, en ese orden"""
+        return self._copia(uids, [self._filas.get(uid) for uid in uids])
+
+    def copia(self):
+        """Copia independiente con las mismas filas"""
+        return self._copia(self.uids, range(len(self.uids)))
@@ -0,0 +1,947 @@
+"""Motor de generación de informes de debida diligencia.
+
+Construye los documentos Word y Excel a partir de datos planos (diccionarios),
+sin depender de Tk ni de cuadros de diálogo. Lo utilizan tanto la interfaz
+gráfica como la generación por lotes desde la línea de comandos.
+"""
+import io
+import os
+import itertools
+import re
+import json
+import multiprocessing
+import queue
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
+from docx import Document
+from docx.shared import Pt, Inches, Emu
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+from docx.table import Table
+
+# Datos del caso y valores por defecto (módulo liviano, sin docx ni pandas)
+from datos_informe import TITULO_DEFAULT, fecha_en_espanol, validar_caso
+from modelo_caso import TablaResultados, texto_fecha
+from calificacion_riesgo import calificar_caso
+
+
+class GeneracionCancelada(Exception):
+    """La función de progreso pidió detener la generación"""
+
+
+# Cada cuántos sujetos se informa el progreso
+AVISAR_CADA = 100
+
+
+def _avisar(progreso, hecho, total, etapa):
+    """Informa el avance si se pidió.
+
+    progreso(hecho, total, etapa) recibe los pasos completados, el total de
+    pasos (0 si no se conoce) y una descripción de la etapa; puede lanzar
+    GeneracionCancelada para interrumpir la generación.
+    """
+    if progreso is not None:
+        progreso(hecho, total, etapa)
+
+
+def _con_progreso(elementos, progreso, inicio, total, etapa):
+    """Recorre los elementos informando el avance cada AVISAR_CADA"""
+    if progreso is None:
+        yield from elementos
+        return
+    for numero, elemento in enumerate(elementos, 1):
+        yield elemento
+        if numero % AVISAR_CADA == 0:
+            progreso(inicio + numero, total, etapa)
+
+
+# Estilos APA del informe: se registran una vez en el prototipo y cada
+# elemento recibe su estilo al crearse, sin recorrer párrafos ni runs después.
+ESTILO_TITULO = 'APA Título'
+ESTILO_ENCABEZADO = 'APA Encabezado'
+ESTILO_TEXTO = 'APA Texto'
+ESTILO_DATO = 'APA Dato'
+ESTILO_INCISO = 'APA Inciso'
+ESTILO_CENTRADO = 'APA Centrado'
+ESTILO_TABLA = 'APA Tabla'
+ESTILO_TABLA_ENCABEZADO = 'APA Tabla Encabezado'
+ESTILO_ETIQUETA = 'APA Etiqueta'
+
+
+def _id_estilo(nombre):
+    """Identificador interno (styleId) con el que se registra cada estilo APA"""
+    return nombre.replace(' ', '')
+
+
+def _con_estilo(elemento, nombre):
+    """Asigna un estilo escribiendo directamente su styleId en el XML.
+
+    Evita la búsqueda por nombre en la colección de estilos que hace
+    python-docx en cada asignación; sirve para párrafos (w:p) y runs (w:r).
+    """
+    elemento.style = _id_estilo(nombre)
+
+
+def registrar_estilos_apa(doc):
+    """Registra en el documento los estilos de párrafo, encabezado y tabla APA"""
+    estilos = doc.styles
+
+    def estilo_parrafo(nombre, base, tamano, alineacion=None, interlineado=None,
+                       antes=None, despues=None, sangria=None, negrita=None):
+        estilo = estilos.add_style(nombre, WD_STYLE_TYPE.PARAGRAPH)
+        estilo.style_id = _id_estilo(nombre)
+        estilo.base_style = estilos[base]
+        estilo.font.name = 'Times New Roman'
+        estilo.font.size = Pt(tamano)
+        if negrita is not None:
+            estilo.font.bold = negrita
+        formato = estilo.paragraph_format
+        if alineacion is not None:
+            formato.alignment = alineacion
+        if interlineado is not None:
+            formato.line_spacing = interlineado
+        if antes is not None:
+            formato.space_before = Pt(antes)
+        if despues is not None:
+            formato.space_after = Pt(despues)
+        if sangria is not None:
+            formato.first_line_indent = sangria
+        return estilo
+
+    estilo_parrafo(ESTILO_TITULO, 'Title', 12, alineacion=WD_ALIGN_PARAGRAPH.CENTER,
+                   antes=0, despues=24, negrita=True)
+    estilo_parrafo(ESTILO_ENCABEZADO, 'Heading 1', 12, antes=12, despues=12, negrita=True)
+    estilo_parrafo(ESTILO_TEXTO, 'Normal', 12, alineacion=WD_ALIGN_PARAGRAPH.JUSTIFY, interlineado=2.0)
+    estilo_parrafo(ESTILO_DATO, ESTILO_TEXTO, 12, antes=0, despues=6)
+    estilo_parrafo(ESTILO_INCISO, ESTILO_TEXTO, 12, despues=12, sangria=Inches(0.5))
+    estilo_parrafo(ESTILO_CENTRADO, ESTILO_TEXTO, 12, alineacion=WD_ALIGN_PARAGRAPH.CENTER, despues=24)
+    estilo_parrafo(ESTILO_TABLA, 'Normal', 11, antes=0, despues=0)
+    estilo_parrafo(ESTILO_TABLA_ENCABEZADO, ESTILO_TABLA, 11, negrita=True)
+
+    etiqueta = estilos.add_style(ESTILO_ETIQUETA, WD_STYLE_TYPE.CHARACTER)
+    etiqueta.style_id = _id_estilo(ESTILO_ETIQUETA)
+    etiqueta.font.bold = True
+
+
+def _sangria_si_largo(paragraph, texto):
+    """Sangría APA de primera línea solo para párrafos largos"""
+    if len(texto) > 50:
+        paragraph.paragraph_format.first_line_indent = Inches(0.5)
+
+
+# Caracteres que XML 1.0 no admite y que a veces llegan pegados desde otros sistemas
+_CARACTERES_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _texto_xml(texto):
+    """Escapa un texto para insertarlo dentro de w:t"""
+    return escape(_CARACTERES_INVALIDOS_XML.sub('', str(texto)))
+
+
+def construir_tabla_apa(doc, encabezados, filas):
+    """Construye una tabla APA completa emitiendo el XML de todas las filas de una vez.
+
+    Equivale a crear la tabla con doc.add_table y llenar celda por celda,
+    pero sin pasar por los objetos intermedios de python-docx, cuyo costo
+    crece mucho con miles de filas. La tabla se devuelve sin insertar.
+    """
+    columnas = len(encabezados)
+    seccion = doc.sections[-1]
+    ancho_total = Emu(seccion.page_width - seccion.left_margin - seccion.right_margin)
+    ancho = int(ancho_total.twips / columnas)
+    estilo_tabla = doc.styles['Light Grid'].style_id
+
+    def apertura_celda(estilo):
+        return (f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{ancho}"/></w:tcPr>'
+                f'<w:p><w:pPr><w:pStyle w:val="{_id_estilo(estilo)}"/></w:pPr>')
+
+    def fila_xml(valores, apertura):
+        celdas = []
+        for valor in valores:
+            if valor:
+                celdas.append(f'{apertura}<w:r><w:t xml:space="preserve">{_texto_xml(valor)}</w:t></w:r></w:p></w:tc>')
+            else:
+                celdas.append(f'{apertura}</w:p></w:tc>')
+        return '<w:tr>' + ''.join(celdas) + '</w:tr>'
+
+    partes = [
+        f'<w:tbl {nsdecls("w")}><w:tblPr><w:tblStyle w:val="{estilo_tabla}"/>'
+        '<w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+        'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>',
+        f'<w:gridCol w:w="{ancho}"/>' * columnas,
+        '</w:tblGrid>',
+        fila_xml(encabezados, apertura_celda(ESTILO_TABLA_ENCABEZADO))
+    ]
+    apertura = apertura_celda(ESTILO_TABLA)
+    partes.extend(fila_xml(fila, apertura) for fila in filas)
+    partes.append('</w:tbl>')
+    return Table(parse_xml(''.join(partes)), doc._body)
+
+
+# Marcadores de las partes variables dentro del prototipo del informe
+MARCA_DATOS = '{{DATOS_GENERALES}}'
+MARCA_SUJETOS = '{{SUJETOS}}'
+MARCA_RESULTADOS = '{{RESULTADOS}}'
+MARCA_CONCLUSION = '{{CONCLUSION}}'
+MARCA_EMISION = '{{EMISION}}'
+
+# Prototipos ya construidos (documento serializado), por título y plantilla
+_prototipos_word = {}
+MAX_PROTOTIPOS = 8
+
+
+def _agregar_parrafo(doc, texto, estilo):
+    """Agrega un párrafo con el estilo APA indicado"""
+    p = doc.add_paragraph(texto)
+    _con_estilo(p._p, estilo)
+    return p
+
+
+def _agregar_encabezado(doc, texto):
+    """Agrega un encabezado de sección con formato APA"""
+    return _agregar_parrafo(doc, texto, ESTILO_ENCABEZADO)
+
+
+def _agregar_etiquetado(doc, etiqueta, texto, estilo):
+    """Agrega un párrafo 'Etiqueta: texto' con la etiqueta en negrita"""
+    p = _agregar_parrafo(doc, '', estilo)
+    _con_estilo(p.add_run(etiqueta)._r, ESTILO_ETIQUETA)
+    p.add_run(texto)
+    return p
+
+
+def _agregar_inciso(doc, letra, texto):
+    """Agrega un inciso de la conclusión ('a. texto') con formato APA"""
+    return _agregar_etiquetado(doc, f'{letra}. ', texto, ESTILO_INCISO)
+
+
+def _agregar_bloque_firma(cell, nombre, cargo, firma_responsable=False):
+    """Llena una celda de la tabla de firmas: línea, nombre y cargo"""
+    # Línea de firma
+    p_linea = cell.add_paragraph()
+    p_linea.add_run('_' * 35)  # Aumentado de 30 a 35
+    p_linea.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    for run in p_linea.runs:
+        run.font.name = 'Times New Roman'
+        run.font.size = Pt(12)
+    p_linea.paragraph_format.space_after = Pt(8)  # Aumentado de 6 a 8
+
+    # Nombre
+    p_nombre = cell.add_paragraph()
+    run_nombre = p_nombre.add_run(nombre)
+    run_nombre.font.name = 'Times New Roman'
+    run_nombre.font.size = Pt(12)
+    run_nombre.font.bold = True
+    p_nombre.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p_nombre.paragraph_format.space_after = Pt(4)  # Aumentado de 3 a 4
+
+    # Cargo
+    p_cargo = cell.add_paragraph()
+    run_cargo = p_cargo.add_run(cargo)
+    run_cargo.font.name = 'Times New Roman'
+    run_cargo.font.size = Pt(11)
+    p_cargo.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    if firma_responsable:
+        p_cargo.paragraph_format.space_after = Pt(4)  # Aumentado de 3 a 4
+        p_firma_resp = cell.add_paragraph()
+        run_firma = p_firma_resp.add_run('Firma del Responsable Designado')
+        run_firma.font.name = 'Times New Roman'
+        run_firma.font.size = Pt(10)
+        run_firma.font.italic = True
+        p_firma_resp.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+
+def construir_prototipo_word(plantilla, titulo_texto):
+    """Construye el esqueleto fijo del informe con marcadores para las partes variables.
+
+    Contiene márgenes, estilos APA, título, encabezados de sección, objetivo,
+    incisos fijos de la conclusión y la tabla de firmas; solo depende de la
+    plantilla y del título configurado.
+    """
+    doc = Document()
+    registrar_estilos_apa(doc)
+
+    # Configurar márgenes primero
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
+
+    # Título principal con formato APA (usando configuración personalizable)
+    _agregar_parrafo(doc, titulo_texto, ESTILO_TITULO)
+
+    doc.add_paragraph(MARCA_DATOS)
+
+    # Encabezado: Sujeto de Investigación
+    _agregar_encabezado(doc, 'Sujeto de Investigación')
+    doc.add_paragraph(MARCA_SUJETOS)
+
+    # Sección 1: Objetivo del Informe
+    _agregar_encabezado(doc, '1. Objetivo del Informe')
+
+    p = _agregar_parrafo(doc, plantilla['objetivo'], ESTILO_TEXTO)
+    p.paragraph_format.space_after = Pt(12)
+    _sangria_si_largo(p, plantilla['objetivo'])
+
+    # Sección 2: Resultados de la Investigación
+    _agregar_encabezado(doc, '2. Resultados de la Investigación')
+    doc.add_paragraph(MARCA_RESULTADOS)
+
+    # Sección 3: Conclusión (el inciso a depende de los sujetos y del riesgo)
+    _agregar_encabezado(doc, '3. Conclusión')
+    doc.add_paragraph(MARCA_CONCLUSION)
+
+    # Inciso b
+    _agregar_inciso(doc, 'b', plantilla['compromiso'])
+
+    # Incisos adicionales personalizados
+    if plantilla.get('incisos_adicionales'):
+        for i, texto_inciso in enumerate(plantilla['incisos_adicionales'], start=3):
+            _agregar_inciso(doc, chr(96 + i), texto_inciso)  # c, d, e, etc.
+
+    # Sección 4: Firma y Lugar de Emisión
+    _agregar_encabezado(doc, '4. Firma y Lugar de Emisión')
+    doc.add_paragraph(MARCA_EMISION)
+
+    # Espacio adicional para las firmas (más separación)
+    _agregar_parrafo(doc, '', ESTILO_TEXTO)  # Espacio 1
+    _agregar_parrafo(doc, '', ESTILO_TEXTO)  # Espacio 2
+    _agregar_parrafo(doc, '', ESTILO_TEXTO)  # Espacio 3
+
+    # Tabla de firmas profesional (sin bordes) con más ancho
+    tabla_firmas = doc.add_table(rows=1, cols=2)
+    tabla_firmas.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Eliminar todos los bordes de la tabla
+    for row in tabla_firmas.rows:
+        for cell in row.cells:
+            cell.width = Inches(3.5)  # Aumentado de 2.5 a 3.5 pulgadas
+            tcPr = cell._element.get_or_add_tcPr()
+            tcBorders = OxmlElement('w:tcBorders')
+            for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+                border = OxmlElement(f'w:{border_name}')
+                border.set(qn('w:val'), 'none')
+                tcBorders.append(border)
+            tcPr.append(tcBorders)
+
+    # Columna izquierda: Jefe de Cumplimiento
+    jefe = plantilla['jefe_cumplimiento'] if plantilla['jefe_cumplimiento'] else "Jefe de Cumplimiento"
+    _agregar_bloque_firma(tabla_firmas.rows[0].cells[0], jefe, 'Jefe de Cumplimiento')
+
+    # Columna derecha: Analista
+    analista = plantilla['analista'] if plantilla['analista'] else "Analista"
+    _agregar_bloque_firma(tabla_firmas.rows[0].cells[1], analista, 'Analista de Cumplimiento',
+                          firma_responsable=True)
+
+    return doc
+
+
+def clonar_prototipo_word(plantilla, titulo_texto):
+    """Devuelve una copia nueva del prototipo para la plantilla y el título dados.
+
+    El prototipo se construye una sola vez por combinación de plantilla y
+    título; si cualquiera de los dos cambia, la clave cambia y se construye
+    uno nuevo.
+    """
+    clave = json.dumps([titulo_texto, dict(plantilla)], sort_keys=True, ensure_ascii=False)
+    contenido = _prototipos_word.get(clave)
+    if contenido is None:
+        buffer = io.BytesIO()
+        construir_prototipo_word(plantilla, titulo_texto).save(buffer)
+        contenido = buffer.getvalue()
+        if len(_prototipos_word) >= MAX_PROTOTIPOS:
+            _prototipos_word.clear()
+        _prototipos_word[clave] = contenido
+    return Document(io.BytesIO(contenido))
+
+
+class _Insercion:
+    """Agrega contenido en la posición de un marcador del prototipo.
+
+    Imita doc.add_paragraph/add_table para que el código de llenado sea igual
+    al de un documento nuevo; al terminar, el marcador se elimina.
+    """
+
+    def __init__(self, doc, marcador):
+        self.doc = doc
+        self.marcador = marcador
+
+    def add_paragraph(self, texto=''):
+        return self.marcador.insert_paragraph_before(texto)
+
+    def agregar_tabla_apa(self, encabezados, filas):
+        tabla = construir_tabla_apa(self.doc, encabezados, filas)
+        self.marcador._p.addprevious(tabla._tbl)
+        return tabla
+
+    def cerrar(self):
+        """Quita el marcador del documento"""
+        elemento = self.marcador._p
+        elemento.getparent().remove(elemento)
+
+
+def _marcadores(doc):
+    """Ubica los párrafos marcadores del prototipo"""
+    marcas = {MARCA_DATOS, MARCA_SUJETOS, MARCA_RESULTADOS, MARCA_CONCLUSION, MARCA_EMISION}
+    return {p.text: _Insercion(doc, p) for p in doc.paragraphs if p.text in marcas}
+
+
+def tabla_resultados(caso):
+    """Tabla de resultados del caso, una fila por sujeto (uniforme si el caso no trae una)"""
+    tabla = caso.get('tabla_resultados')
+    if tabla is None:
+        tabla = TablaResultados.uniforme(len(caso['sujetos']), caso['resultados'])
+    return tabla
+
+
+def filas_resultados_word(sujetos, tabla):
+    """Encabezados y filas de la tabla de resultados del informe.
+
+    Con un sujeto, una fila por fuente. Con varios, los sujetos que comparten
+    resultado y fecha en una fuente van juntos en una sola fila ('Todos' si
+    son todos).
+    """
+    if len(sujetos) == 1:
+        return (['Fuente', 'Resultado', 'Fecha'],
+                [(fuente, tabla.textos[fuente][0], texto_fecha(tabla.fechas[fuente][0]))
+                 for fuente in tabla.fuentes])
+
+    filas = []
+    for fuente in tabla.fuentes:
+        grupos = {}  # (texto, fecha) -> filas de los sujetos
+        for fila, clave in enumerate(zip(tabla.textos[fuente], tabla.fechas[fuente])):
+            grupos.setdefault(clave, []).append(fila)
+        for (texto, fecha), filas_grupo in grupos.items():
+            if len(filas_grupo) == len(sujetos):
+                quienes = 'Todos'
+            else:
+                quienes = ', '.join(sujetos[f]['nombre'].title() for f in filas_grupo)
+            filas.append((fuente, quienes, texto, texto_fecha(fecha)))
+    return ['Fuente', 'Sujetos', 'Resultado', 'Fecha'], filas
+
+
+def construir_word(caso, configuraciones, progreso=None):
+    """Construye el documento Word del informe y lo devuelve sin guardar.
+
+    El progreso se mide en sujetos más una etapa por sección (ver _avisar).
+    """
+    validar_caso(caso)
+    plantilla = caso['plantilla']
+    sujetos = caso['sujetos']
+    total = len(sujetos) + 3
+
+    _avisar(progreso, 0, total, 'Preparando plantilla')
+    titulo_texto = configuraciones.get('titulo_documento', TITULO_DEFAULT)
+    doc = clonar_prototipo_word(plantilla, titulo_texto)
+    marcas = _marcadores(doc)
+
+    # Información general
+    destino = marcas[MARCA_DATOS]
+    datos_generales = [
+        ('Fecha de Solicitud: ', caso['fecha_solicitud']),
+        ('Usuario Requirente: ', caso['usuario_requirente']),
+        ('Tipo de Solicitud: ', caso['tipo_solicitud']),
+        ('Descripción: ', caso['descripcion']),
+        ('Serapio: ', caso['serapio'])
+    ]
+
+    for etiqueta, valor in datos_generales:
+        p = _agregar_etiquetado(destino, etiqueta, valor, ESTILO_DATO)
+        _sangria_si_largo(p, etiqueta + valor)
+    p.paragraph_format.space_after = Pt(12)  # Más espacio tras el serapio
+
+    # Tabla de sujetos (con columna de ID Gestión)
+    _avisar(progreso, 1, total, 'Tabla de sujetos')
+    destino = marcas[MARCA_SUJETOS]
+    destino.agregar_tabla_apa(
+        ['Nombre', 'Identificación', 'Descripción', 'ID Gestión'],
+        ((sujeto['nombre'].title(),  # Formato de nombres propios
+          sujeto['identificacion'],
+          sujeto['descripcion'],
+          sujeto.get('id_gestion', 'N/A'))
+         for sujeto in _con_progreso(sujetos, progreso, 1, total, 'Tabla de sujetos'))
+    )
+
+    # Espacio después de la tabla
+    p_espacio = _agregar_parrafo(destino, '', ESTILO_TEXTO)
+    p_espacio.paragraph_format.space_after = Pt(12)
+
+    # Fuente de información
+    p = _agregar_etiquetado(destino, 'Fuente de Información: ', caso['fuente_info'], ESTILO_TEXTO)
+    p.paragraph_format.space_after = Pt(18)
+    _sangria_si_largo(p, 'Fuente de Información: ' + caso['fuente_info'])
+
+    # Resultados de la investigación
+    _avisar(progreso, len(sujetos) + 1, total, 'Resultados y conclusión')
+    destino = marcas[MARCA_RESULTADOS]
+    tabla = tabla_resultados(caso)
+    destino.agregar_tabla_apa(*filas_resultados_word(sujetos, tabla))
+
+    # Espacio después de la tabla
+    _agregar_parrafo(destino, '', ESTILO_TEXTO)
+
+    # Preparar texto de nombres
+    if len(sujetos) == 1:
+        nombres_texto = f"la persona {sujetos[0]['nombre'].title()}"
+    else:
+        nombres = [s['nombre'].title() for s in sujetos]  # Formato de nombres propios
+        nombres_texto = "las personas " + ", ".join(nombres[:-1]) + f" y {nombres[-1]}"
+
+    nivel_riesgo, _ = calificar_caso(caso, tabla, configuraciones)
+    conclusion = plantilla['conclusion_template'].format(
+        nombres=nombres_texto,
+        nivel_riesgo=nivel_riesgo
+    )
+
+    # Inciso a
+    _agregar_inciso(marcas[MARCA_CONCLUSION], 'a', conclusion)
+
+    # Lugar y fecha de emisión
+    emision = f"Emitido en {plantilla['lugar_emision']}, el {fecha_en_espanol()}"
+    p = _agregar_parrafo(marcas[MARCA_EMISION], emision, ESTILO_CENTRADO)
+    _sangria_si_largo(p, emision)
+
+    for destino in marcas.values():
+        destino.cerrar()
+
+    return doc
+
+
+def generar_word(caso, configuraciones, filename, progreso=None):
+    """Genera el informe Word del caso y lo guarda en filename"""
+    doc = construir_word(caso, configuraciones, progreso)
+    _avisar(progreso, len(caso['sujetos']) + 2, len(caso['sujetos']) + 3, 'Guardando')
+    doc.save(filename)
+    return filename
+
+
+def columnas_excel_completo(configuraciones):
+    """Encabezados de la base horizontal, con una columna por fuente configurada"""
+    return (['ID Gestión', 'Fecha de Solicitud', 'Usuario Requirente', 'Tipo de Solicitud',
+             'Descripción', 'Serapio', 'Nombre', 'Identificación', 'Descripción del Sujeto']
+            + list(configuraciones['fuentes_investigacion'])
+            + ['Nivel de Riesgo', 'Fecha de Emisión'])
+
+
+def filas_excel_completo(caso, configuraciones, fecha_emision):
+    """Produce una fila por sujeto con todos los datos del caso, sin acumularlas"""
+    comunes = [caso['fecha_solicitud'], caso['usuario_requirente'], caso['tipo_solicitud'],
+               caso['descripcion'], caso['serapio']]
+
+    # Columnas de textos de la tabla, recorridas a la par de los sujetos y
+    # de sus niveles de riesgo (calculados de una vez para todos)
+    tabla = tabla_resultados(caso)
+    columnas = [tabla.textos.get(fuente) or itertools.repeat('N/A')
+                for fuente in configuraciones['fuentes_investigacion']]
+    resultados = zip(*columnas) if columnas else itertools.repeat(())
+    _, niveles = calificar_caso(caso, tabla, configuraciones)
+
+    for sujeto, resultados_sujeto, nivel in zip(caso['sujetos'], resultados, niveles):
+        yield ([sujeto.get('id_gestion', 'N/A')] + comunes
+               + [sujeto['nombre'].title(),  # Formato nombres propios
+                  sujeto['identificacion'], sujeto['descripcion']]
+               + list(resultados_sujeto) + [nivel.upper(), fecha_emision])
+
+
+# Estilos con nombre de los libros Excel (se registran una vez por libro)
+ESTILO_EXCEL_ENCABEZADO = 'DD Encabezado'
+ESTILO_EXCEL_DATOS = 'DD Datos'
+COLOR_FILA_ALTERNA = 'F8F9FA'
+
+
+def registrar_estilos_excel(workbook):
+    """Registra en el libro los estilos de encabezado y de datos"""
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, NamedStyle
+
+    workbook.add_named_style(NamedStyle(
+        name=ESTILO_EXCEL_ENCABEZADO,
+        font=Font(name='Calibri', size=12, bold=True, color='FFFFFF'),
+        fill=PatternFill(start_color='2C3E50', end_color='2C3E50', fill_type='solid'),
+        alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+        border=Border()
+    ))
+    workbook.add_named_style(NamedStyle(
+        name=ESTILO_EXCEL_DATOS,
+        font=Font(name='Calibri', size=11),
+        alignment=Alignment(horizontal='left', vertical='center', wrap_text=True),
+        border=Border()
+    ))
+
+
+def aplicar_bandas(worksheet, columnas, filas):
+    """Sombrea las filas de datos alternas con una sola regla de formato condicional"""
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import PatternFill
+    from openpyxl.utils import get_column_letter
+
+    if filas < 2:
+        return
+    relleno = PatternFill(start_color=COLOR_FILA_ALTERNA, end_color=COLOR_FILA_ALTERNA,
+                          bgColor=COLOR_FILA_ALTERNA, fill_type='solid')
+    rango = f"A2:{get_column_letter(columnas)}{filas}"
+    worksheet.conditional_formatting.add(rango, FormulaRule(formula=['MOD(ROW(),2)=1'], fill=relleno))
+
+
+def anchos_columnas(filas, encabezados):
+    """Ancho de cada columna, entre 12 y 50 caracteres.
+
+    Los largos de los valores se miden por columna con pandas, recortados a
+    50, sin recorrer las celdas una por una.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(filas, columns=encabezados, dtype=object)
+    anchos = []
+    for i, encabezado in enumerate(encabezados):
+        serie = df.iloc[:, i]
+        largos = serie[serie.astype(bool)].astype(str).str.len().clip(upper=50)
+        maximo = max(len(str(encabezado)), int(largos.max()) if len(largos) else 0)
+        anchos.append(max(min(maximo + 2, 50), 12))
+    return anchos
+
+
+# A partir de cuántos sujetos la base horizontal se escribe en modo streaming
+FILAS_STREAMING = 5000
+# Filas que se usan para estimar el ancho de las columnas en modo streaming
+MUESTRA_ANCHOS = 500
+
+
+def generar_excel_streaming(casos, configuraciones, filename, progreso=None, muestra_anchos=MUESTRA_ANCHOS):
+    """Escribe la base horizontal de uno o varios casos en modo streaming.
+
+    Usa un libro openpyxl de solo escritura: cada fila se escribe ya con su
+    formato a medida que se produce y no se conserva en memoria, por lo que
+    el consumo no crece con el número de filas. Como las columnas deben
+    dimensionarse antes de escribir, el ancho se estima con las primeras
+    muestra_anchos filas (con None, con todas).
+
+    El progreso se mide en filas; el total solo se conoce si casos es una lista.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    encabezados = columnas_excel_completo(configuraciones)
+    fecha_emision = fecha_en_espanol()
+
+    def todas_las_filas():
+        for caso in casos:
+            validar_caso(caso)
+            yield from filas_excel_completo(caso, configuraciones, fecha_emision)
+
+    total_filas = sum(len(caso['sujetos']) for caso in casos) if isinstance(casos, (list, tuple)) else 0
+    _avisar(progreso, 0, total_filas, 'Escribiendo filas')
+    filas = _con_progreso(todas_las_filas(), progreso, 0, total_filas, 'Escribiendo filas')
+    muestra = []
+    for fila in filas:
+        muestra.append(fila)
+        if muestra_anchos is not None and len(muestra) >= muestra_anchos:
+            break
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Debidas Diligencias')
+    registrar_estilos_excel(workbook)
+
+    for i, ancho in enumerate(anchos_columnas(muestra, encabezados), start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = ancho
+
+    worksheet.freeze_panes = 'A2'
+    worksheet.row_dimensions[1].height = 30
+
+    def celda(valor, estilo):
+        cell = WriteOnlyCell(worksheet, value=valor)
+        cell.style = estilo
+        return cell
+
+    worksheet.append([celda(e, ESTILO_EXCEL_ENCABEZADO) for e in encabezados])
+
+    total = 1
+    for idx, fila in enumerate(itertools.chain(muestra, filas), start=2):
+        worksheet.append([celda(valor, ESTILO_EXCEL_DATOS) for valor in fila])
+        total = idx
+
+    aplicar_bandas(worksheet, len(encabezados), total)
+    worksheet.auto_filter.ref = f"A1:{get_column_letter(len(encabezados))}{total}"
+    _avisar(progreso, total - 1, total_filas, 'Guardando')
+    workbook.save(filename)
+    return filename
+
+
+def generar_excel_completo(caso, configuraciones, filename, streaming=None, progreso=None):
+    """Genera la base de datos horizontal en Excel con formato profesional.
+
+    Con streaming=None el modo se elige por tamaño: a partir de
+    FILAS_STREAMING sujetos el ancho de las columnas se estima con una
+    muestra en lugar de con todas las filas. El progreso se mide en filas.
+    """
+    if streaming is None:
+        streaming = len(caso['sujetos']) >= FILAS_STREAMING
+    # Los dos modos escriben con el libro de solo escritura, que aplica el
+    # estilo con nombre al crear cada celda; sin streaming las filas se
+    # guardan todas para medir el ancho de las columnas con ellas
+    return generar_excel_streaming([caso], configuraciones, filename, progreso,
+                                   MUESTRA_ANCHOS if streaming else None)
+
+
+# Caracteres que Excel no admite en nombres de hoja
+_CARACTERES_INVALIDOS_HOJA = re.compile(r"[\[\]:*?/\\]")
+MAX_NOMBRE_HOJA = 31
+HOJA_INDICE = 'Índice'
+
+
+def nombres_hojas_unicos(nombres, reservados=()):
+    """Convierte nombres libres en nombres de hoja válidos y sin repetir.
+
+    Excel limita los nombres a 31 caracteres, prohíbe algunos símbolos y no
+    distingue mayúsculas; cuando dos nombres coinciden tras recortarlos, los
+    siguientes reciben un sufijo ' (2)', ' (3)'... en el orden de entrada,
+    por lo que el resultado es siempre el mismo para la misma lista.
+    """
+    usados = {r.casefold() for r in reservados}
+    resultado = []
+    for nombre in nombres:
+        base = _CARACTERES_INVALIDOS_HOJA.sub('_', str(nombre)).strip().strip("'")
+        base = base[:MAX_NOMBRE_HOJA].strip() or 'Sujeto'
+        candidato = base
+        numero = 2
+        while candidato.casefold() in usados or candidato.casefold() == 'history':
+            sufijo = f' ({numero})'
+            candidato = base[:MAX_NOMBRE_HOJA - len(sufijo)].rstrip() + sufijo
+            numero += 1
+        usados.add(candidato.casefold())
+        resultado.append(candidato)
+    return resultado
+
+
+def _enlace_hoja(hoja, texto):
+    """Fórmula de hipervínculo a la celda A1 de otra hoja del libro"""
+    destino = hoja.replace("'", "''")
+    return f'=HYPERLINK("#\'{destino}\'!A1","{str(texto).replace(chr(34), chr(34) * 2)}")'
+
+
+def generar_excel_pestanas(caso, configuraciones, filename, progreso=None):
+    """Genera un Excel con una hoja índice enlazada y una pestaña por sujeto.
+
+    Se escribe con un libro de solo escritura y cada hoja se cierra al
+    terminarla, de modo que el tiempo por sujeto se mantiene estable aunque
+    la gestión tenga miles de sujetos. El progreso se mide en pestañas.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    validar_caso(caso)
+    sujetos = caso['sujetos']
+    total = len(sujetos) + 1
+    _avisar(progreso, 0, total, 'Hoja índice')
+    hojas = nombres_hojas_unicos([s['nombre'] for s in sujetos], reservados=[HOJA_INDICE])
+
+    workbook = Workbook(write_only=True)
+    registrar_estilos_excel(workbook)
+
+    def encabezado(*valores):
+        fila = []
+        for valor in valores:
+            cell = WriteOnlyCell(indice if hoja is None else hoja, value=valor)
+            cell.style = ESTILO_EXCEL_ENCABEZADO
+            fila.append(cell)
+        return fila
+
+    # Hoja índice: datos generales de la gestión y un enlace por sujeto
+    hoja = None
+    indice = workbook.create_sheet(HOJA_INDICE)
+    indice.column_dimensions['A'].width = 22
+    indice.column_dimensions['B'].width = 45
+    indice.column_dimensions['C'].width = 20
+    indice.column_dimensions['D'].width = 34
+
+    indice.append(encabezado('Campo', 'Valor'))
+    for campo, valor in [('ID Gestión', caso['id_gestion']),
+                         ('Fecha de Solicitud', caso['fecha_solicitud']),
+                         ('Usuario Requirente', caso['usuario_requirente']),
+                         ('Tipo de Solicitud', caso['tipo_solicitud']),
+                         ('Descripción', caso['descripcion']),
+                         ('Serapio', caso['serapio'])]:
+        indice.append([campo, valor])
+
+    indice.append([])
+    indice.append(encabezado('N°', 'Nombre', 'Identificación', 'Hoja'))
+    for numero, (sujeto, nombre_hoja) in enumerate(zip(sujetos, hojas), 1):
+        indice.append([numero, _enlace_hoja(nombre_hoja, sujeto['nombre'].title()),
+                       sujeto['identificacion'], nombre_hoja])
+    indice.freeze_panes = 'A2'
+    indice.close()
+
+    # Una pestaña por sujeto
+    tabla = tabla_resultados(caso)
+    _, niveles = calificar_caso(caso, tabla, configuraciones)
+    for fila, (sujeto, nombre_hoja) in enumerate(
+            _con_progreso(zip(sujetos, hojas), progreso, 1, total, 'Pestañas por sujeto')):
+        hoja = workbook.create_sheet(nombre_hoja)
+        hoja.column_dimensions['A'].width = 25
+        hoja.column_dimensions['B'].width = 60
+        hoja.column_dimensions['C'].width = 18
+        hoja.column_dimensions['D'].width = 12
+
+        hoja.append(encabezado('Campo', 'Valor'))
+        hoja.append(['Nombre', sujeto['nombre'].title()])  # Formato nombres propios
+        hoja.append(['Identificación', sujeto['identificacion']])
+        hoja.append(['Descripción', sujeto['descripcion']])
+        hoja.append(['ID Gestión', sujeto.get('id_gestion', 'N/A')])
+        hoja.append([])
+        hoja.append(['Resultados:'])
+        hoja.append(encabezado('Fuente', 'Resultado', 'Estado', 'Fecha'))
+        for fuente in tabla.fuentes:
+            hoja.append([fuente, *tabla.resultado(fila, fuente)])
+        hoja.append(['Nivel de Riesgo', niveles[fila]])
+        hoja.append([])
+        hoja.append([_enlace_hoja(HOJA_INDICE, '← Volver al índice')])
+        hoja.close()
+
+    _avisar(progreso, len(sujetos), total, 'Guardando')
+    workbook.save(filename)
+    return filename
+
+
+GENERADORES = {
+    'word': (generar_word, 'Debida_Diligencia_{id}.docx'),
+    'excel': (generar_excel_completo, 'Debida_Diligencia_Completo_{id}.xlsx'),
+    'pestanas': (generar_excel_pestanas, 'Debida_Diligencia_Pestanas_{id}.xlsx')
+}
+
+
+@contextmanager
+def archivo_temporal(filename):
+    """Ruta temporal junto a filename que lo reemplaza si el bloque termina bien.
+
+    Si el bloque falla o se cancela, el temporal se borra: no queda un
+    archivo a medias ni se pisa el que ya existía.
+    """
+    carpeta = os.path.dirname(os.path.abspath(filename))
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, prefix='.~', suffix=os.path.splitext(filename)[1])
+    os.close(descriptor)
+    try:
+        yield temporal
+        os.replace(temporal, filename)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def generar_en_temporal(generador, caso, configuraciones, filename, progreso=None):
+    """Ejecuta uno de los GENERADORES escribiendo a través de archivo_temporal"""
+    with archivo_temporal(filename) as temporal:
+        generador(caso, configuraciones, temporal, progreso=progreso)
+    return filename
+
+
+# Cola de progreso y señal de detención de cada proceso de generar_en_paralelo
+_cola_proceso = None
+_detener_proceso = None
+
+
+def _iniciar_proceso(cola, detener):
+    global _cola_proceso, _detener_proceso
+    _cola_proceso, _detener_proceso = cola, detener
+
+
+def _generar_en_proceso(tipo, caso, configuraciones, filename):
+    def progreso(hecho, total, etapa):
+        if _detener_proceso.is_set():
+            raise GeneracionCancelada()
+        _cola_proceso.put((tipo, hecho, total, etapa))
+
+    return generar_en_temporal(GENERADORES[tipo][0], caso, configuraciones, filename, progreso)
+
+
+def generar_en_paralelo(caso, configuraciones, destinos, progreso=None, cancelar=None):
+    """Genera varios documentos del mismo caso a la vez, cada uno en su proceso.
+
+    destinos es {tipo de GENERADORES: archivo}. python-docx y openpyxl
+    trabajan en Python puro, así que con hilos no avanzarían a la vez; con
+    procesos el tiempo total se acerca al del documento más lento.
+
+    progreso(tipo, hecho, total, etapa) se llama en el hilo de quien llama y
+    cancelar (un threading.Event) detiene todos los procesos. Produce
+    (tipo, archivo, error) a medida que termina cada documento, con error
+    None si salió bien; si se cancela, lanza GeneracionCancelada. Con un
+    solo procesador se generan uno tras otro en el hilo actual, sin pagar el
+    arranque de los procesos.
+    """
+    if min(len(destinos), os.cpu_count() or 1) == 1:
+        yield from _generar_en_serie(caso, configuraciones, destinos, progreso, cancelar)
+        return
+
+    # spawn también en Linux: quien llama suele tener hilos (Tk, índices)
+    contexto = multiprocessing.get_context('spawn')
+    cola = contexto.Queue()
+    detener = contexto.Event()
+
+    def vaciar_cola():
+        while True:
+            try:
+                mensaje = cola.get_nowait()
+            except queue.Empty:
+                return
+            if progreso is not None:
+                progreso(*mensaje)
+
+    with ProcessPoolExecutor(max_workers=min(len(destinos), os.cpu_count()), mp_context=contexto,
+                             initializer=_iniciar_proceso, initargs=(cola, detener)) as ejecutor:
+        pendientes = {ejecutor.submit(_generar_en_proceso, tipo, caso, configuraciones, archivo): (tipo, archivo)
+                      for tipo, archivo in destinos.items()}
+        try:
+            while pendientes:
+                terminados, _ = wait(pendientes, timeout=0.1, return_when=FIRST_COMPLETED)
+                vaciar_cola()
+                if cancelar is not None and cancelar.is_set():
+                    raise GeneracionCancelada()
+                for futuro in terminados:
+                    tipo, archivo = pendientes.pop(futuro)
+                    error = futuro.exception()
+                    if isinstance(error, GeneracionCancelada):
+                        raise error
+                    yield tipo, archivo, error
+        finally:
+            # Si se sale antes de tiempo, los procesos que siguen se detienen
+            # en su próximo aviso de progreso
+            if pendientes:
+                detener.set()
+
+
+def _generar_en_serie(caso, configuraciones, destinos, progreso, cancelar):
+    """Variante de generar_en_paralelo sin procesos, con la misma interfaz"""
+    for tipo, archivo in destinos.items():
+        def progreso_tipo(hecho, total, etapa, tipo=tipo):
+            if cancelar is not None and cancelar.is_set():
+                raise GeneracionCancelada()
+            if progreso is not None:
+                progreso(tipo, hecho, total, etapa)
+
+        try:
+            generar_en_temporal(GENERADORES[tipo][0], caso, configuraciones, archivo, progreso_tipo)
+        except GeneracionCancelada:
+            raise
+        except Exception as e:
+            yield tipo, archivo, e
+        else:
+            yield tipo, archivo, None
+
+
+def empaquetar_zip(archivos, destino):
+    """Reúne los archivos en un ZIP, cada uno con su nombre sin carpeta"""
+    with archivo_temporal(destino) as temporal:
+        # docx y xlsx ya vienen comprimidos: se guardan sin volver a comprimir
+        with zipfile.ZipFile(temporal, 'w', zipfile.ZIP_STORED) as paquete:
+            for archivo in archivos:
+                paquete.write(archivo, os.path.basename(archivo))
+    return destino
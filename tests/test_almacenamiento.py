@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+import almacenamiento
+from almacenamiento import ARCHIVO_BASE, ARCHIVO_DIARIO, ARCHIVO_SUJETOS, AlmacenJSON, AlmacenSQLite
+
+
+def sujeto(numero):
+    return {'uid': f'u{numero}', 'nombre': f'Sujeto {numero}', 'identificacion': f'{numero:04d}',
+            'descripcion': '', 'id_gestion': 'G1'}
+
+
+def test_diario_se_reaplica_sobre_la_instantanea(tmp_path):
+    almacen = AlmacenJSON(tmp_path)
+    almacen.agregar_sujetos([sujeto(1), sujeto(2)])
+    almacen.compactar()
+    almacen.agregar_sujeto(sujeto(3))
+    almacen.eliminar_sujeto(sujeto(1))
+    # Sin cerrar: como si la aplicación se hubiera cerrado de golpe
+    almacen._cerrar_diario()
+
+    with open(tmp_path / ARCHIVO_SUJETOS, encoding='utf-8') as f:
+        assert len(json.load(f)['sujetos']) == 2
+    assert [s['uid'] for s in AlmacenJSON(tmp_path).cargar_sujetos()] == ['u2', 'u3']
+
+
+def test_ultima_linea_cortada_se_descarta(tmp_path):
+    almacen = AlmacenJSON(tmp_path)
+    almacen.agregar_sujeto(sujeto(1))
+    almacen._cerrar_diario()
+    with open(tmp_path / ARCHIVO_DIARIO, 'ab') as f:
+        f.write(b'{"op": "agregar", "sujeto": {"nom')
+
+    almacen = AlmacenJSON(tmp_path)
+    assert [s['uid'] for s in almacen.cargar_sujetos()] == ['u1']
+    # La línea nueva no queda pegada a la cortada
+    almacen.agregar_sujeto(sujeto(2))
+    almacen._cerrar_diario()
+    assert [s['uid'] for s in AlmacenJSON(tmp_path).cargar_sujetos()] == ['u1', 'u2']
+
+
+def test_diario_danado_se_aparta(tmp_path):
+    almacen = AlmacenJSON(tmp_path)
+    almacen.agregar_sujeto(sujeto(1))
+    almacen.agregar_sujeto(sujeto(2))
+    almacen._cerrar_diario()
+    ruta = tmp_path / ARCHIVO_DIARIO
+    lineas = ruta.read_bytes().split(b'\n')
+    ruta.write_bytes(b'\n'.join([b'{roto'] + lineas[1:]))
+
+    with pytest.raises(ValueError):
+        AlmacenJSON(tmp_path).cargar_sujetos()
+    assert not ruta.exists()
+    assert any(nombre.startswith(ARCHIVO_DIARIO + '.corrupto-') for nombre in os.listdir(tmp_path))
+
+
+def test_solo_lectura_no_toca_los_archivos(tmp_path):
+    almacen = AlmacenJSON(tmp_path)
+    almacen.agregar_sujeto(sujeto(1))
+    almacen._cerrar_diario()
+    ruta = tmp_path / ARCHIVO_DIARIO
+    with open(ruta, 'ab') as f:
+        f.write(b'{"op": "agreg')
+    antes = ruta.read_bytes()
+
+    origen = AlmacenJSON(tmp_path, solo_lectura=True)
+    assert [s['uid'] for s in origen.cargar_sujetos()] == ['u1']
+    origen.cerrar()
+    assert ruta.read_bytes() == antes
+    assert not (tmp_path / ARCHIVO_SUJETOS).exists()
+
+
+def test_sqlite_importa_los_json_una_vez(tmp_path):
+    almacen = AlmacenJSON(tmp_path)
+    almacen.agregar_sujetos([sujeto(1), sujeto(2)])
+    almacen.agregar_usuario('ana')
+    almacen.cerrar()
+
+    base = AlmacenSQLite(str(tmp_path / ARCHIVO_BASE))
+    base.eliminar_sujeto(sujeto(1))
+    base.agregar_sujeto(sujeto(3))
+    base.cerrar()
+
+    base = AlmacenSQLite(str(tmp_path / ARCHIVO_BASE))
+    assert [s['uid'] for s in base.cargar_sujetos()] == ['u2', 'u3']
+    assert [[s['uid'] for s in lote] for lote in base.leer_sujetos_por_lotes(1)] == [['u2'], ['u3']]
+    assert base.cargar_usuarios() == ['ana']
+    base.cerrar()
+
+
+def test_sqlite_no_queda_migrada_si_el_json_esta_danado(tmp_path):
+    (tmp_path / ARCHIVO_SUJETOS).write_text('{roto', encoding='utf-8')
+    with pytest.raises(ValueError):
+        AlmacenSQLite(str(tmp_path / ARCHIVO_BASE))
+    assert not (tmp_path / ARCHIVO_BASE).exists()
+    assert (tmp_path / ARCHIVO_SUJETOS).read_text(encoding='utf-8') == '{roto'
+
+
+def test_abrir_almacen_segun_variable(tmp_path, monkeypatch):
+    monkeypatch.setenv('DD_ALMACEN', 'json')
+    assert isinstance(almacenamiento.abrir_almacen(str(tmp_path)), AlmacenJSON)
@@ -0,0 +1,119 @@
+import pytest
+
+import cache_cribado
+from cache_cribado import CacheCribado
+from cribado_listas import Coincidencia, Coincidencias
+
+
+class ListaFalsa:
+    """Lo que la caché usa de una ListaIndexada; cuenta las búsquedas"""
+
+    def __init__(self, ruta, huella='h1'):
+        self.ruta_lista = ruta
+        self.ruta_indice = ruta + '.ddidx'
+        self.huella = huella
+        self.busquedas = 0
+
+    def buscar(self, nombre, identificacion, umbral):
+        self.busquedas += 1
+        return Coincidencias([Coincidencia(0.9, 'nombre', nombre.upper(), 'SDN', ('X1',), 'lista.csv')], 2)
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1_000_000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(cache_cribado.time, 'time', reloj)
+    return reloj
+
+
+@pytest.fixture
+def cache(tmp_path, reloj):
+    cache = CacheCribado(str(tmp_path / 'cache.db'), dias_vigencia=30, max_entradas=10)
+    yield cache
+    cache.cerrar()
+
+
+def test_acierto_tras_guardar(cache, tmp_path):
+    lista = ListaFalsa(str(tmp_path / 'lista.csv'))
+    primera = cache.buscar(lista, 'José Pérez', '0801-1990', 0.88)
+    # Mismo sujeto escrito de otra forma: misma clave
+    segunda = cache.buscar(lista, 'PEREZ, Jose', '08011990', 0.88)
+    assert lista.busquedas == 1
+    assert segunda == primera and segunda.sin_comparar == 2
+    assert cache.buscar(lista, 'José Pérez', '0801-1990', 0.9) is not None and lista.busquedas == 2
+    sesion = cache.estadisticas()['sesion']
+    assert (sesion['aciertos'], sesion['fallos']) == (1, 2)
+
+
+def test_vencimiento(cache, reloj, tmp_path):
+    lista = ListaFalsa(str(tmp_path / 'lista.csv'))
+    cache.buscar(lista, 'Ana', '1', 0.88)
+    reloj.ahora += 29 * 86400
+    assert cache.obtener(lista, 'Ana', '1', 0.88) is not None
+    reloj.ahora += 2 * 86400
+    assert cache.obtener(lista, 'Ana', '1', 0.88) is None
+    assert cache.estadisticas()['sesion']['vencidas'] == 1
+    assert cache.limpiar_vencidas() == 1
+
+
+def test_otra_huella_invalida_lo_guardado(tmp_path, reloj):
+    ruta = str(tmp_path / 'cache.db')
+    lista = ListaFalsa(str(tmp_path / 'lista.csv'))
+    cache = CacheCribado(ruta)
+    cache.buscar(lista, 'Ana', '1', 0.88)
+    cache.buscar(lista, 'Luis', '2', 0.88)
+    cache.cerrar()
+
+    cache = CacheCribado(ruta)
+    nueva = ListaFalsa(lista.ruta_lista, huella='h2')
+    assert cache.obtener(nueva, 'Ana', '1', 0.88) is None
+    assert cache.estadisticas()['sesion']['invalidadas'] == 2
+    assert cache.estadisticas()['entradas'] == 0
+    cache.cerrar()
+
+
+def test_desaloja_las_menos_usadas(cache, reloj, tmp_path):
+    lista = ListaFalsa(str(tmp_path / 'lista.csv'))
+    for numero in range(10):
+        reloj.ahora += 1
+        cache.buscar(lista, f'Sujeto {numero}', str(numero), 0.88)
+    # El primero se vuelve a usar: ya no es el menos usado
+    reloj.ahora += 1
+    with cache.lote():
+        assert cache.obtener(lista, 'Sujeto 0', '0', 0.88) is not None
+    reloj.ahora += 1
+    cache.buscar(lista, 'Sujeto 10', '10', 0.88)
+
+    # Queda en el 90 % de max_entradas: se van 1 y 2, los usados hace más tiempo
+    assert cache.estadisticas()['entradas'] == 9
+    assert cache.obtener(lista, 'Sujeto 0', '0', 0.88) is not None
+    assert cache.obtener(lista, 'Sujeto 1', '1', 0.88) is None
+    assert cache.obtener(lista, 'Sujeto 2', '2', 0.88) is None
+    assert cache.obtener(lista, 'Sujeto 3', '3', 0.88) is not None
+    assert cache.estadisticas()['sesion']['desalojadas'] == 2
+
+
+def test_lote_escribe_al_salir(cache, tmp_path):
+    lista = ListaFalsa(str(tmp_path / 'lista.csv'))
+    otra = CacheCribado(cache.ruta)
+    try:
+        with cache.lote():
+            cache.buscar(lista, 'Ana', '1', 0.88)
+            assert otra.estadisticas()['entradas'] == 0
+        assert otra.estadisticas()['entradas'] == 1
+        assert otra.estadisticas()['total']['fallos'] == 1
+    finally:
+        otra.cerrar()
+
+
+def test_desactivada_por_configuraciones(tmp_path):
+    assert CacheCribado.desde_configuraciones({'cache_cribado': {'activa': False}}, str(tmp_path)) is None
+    assert CacheCribado.desde_configuraciones({'cache_cribado': {'dias_vigencia': 0}}, str(tmp_path)) is None
@@ -0,0 +1,59 @@
+import pytest
+
+from calificacion_riesgo import calificar_caso, niveles, politica_default, puntajes, validar_politica
+from modelo_caso import (ESTADO_CON_COINCIDENCIAS, ESTADO_NO_DISPONIBLE, NIVEL_AUTOMATICO, Sujeto,
+                         TablaResultados)
+
+
+def tabla_con(estados_por_fila, fuentes=('OFAC', 'Diarios Hondureños', 'Otra fuente')):
+    tabla = TablaResultados(fuentes)
+    for numero, estados in enumerate(estados_por_fila):
+        fila = tabla.fila(f'u{numero}', crear=True)
+        for fuente, estado in estados.items():
+            tabla.establecer(fila, fuente, estado=estado)
+    return tabla
+
+
+def test_umbrales_en_el_limite():
+    politica = validar_politica({'umbrales': {'medio': 1, 'alto': 3}})
+    assert niveles([0, 0.99, 1, 2.99, 3, 10], politica).tolist() == [0, 0, 1, 1, 2, 2]
+
+
+def test_puntaje_por_fuente_y_estado():
+    politica = validar_politica(None)
+    tabla = tabla_con([{},
+                       {'Diarios Hondureños': ESTADO_CON_COINCIDENCIAS},
+                       {'Otra fuente': ESTADO_NO_DISPONIBLE},
+                       {'OFAC': ESTADO_CON_COINCIDENCIAS, 'Otra fuente': ESTADO_CON_COINCIDENCIAS}])
+    # OFAC pesa 5, Diarios 1 y las fuentes sin peso propio peso_fuente_default (1)
+    assert puntajes(tabla, politica).tolist() == [0, 1, 0.5, 6]
+
+
+def test_calificar_caso():
+    tabla = tabla_con([{}, {'Diarios Hondureños': ESTADO_CON_COINCIDENCIAS}])
+    sujetos = [Sujeto('u0', 'Ana', '1'), Sujeto('u1', 'Luis', '2')]
+    caso = {'nivel_riesgo': NIVEL_AUTOMATICO, 'sujetos': sujetos}
+    assert calificar_caso(caso, tabla, {}) == ('medio', ['bajo', 'medio'])
+    configuraciones = {'politica_riesgo': {'umbrales': {'medio': 0.5, 'alto': 1}}}
+    assert calificar_caso(caso, tabla, configuraciones) == ('alto', ['bajo', 'alto'])
+    # Un nivel elegido a mano vale para todos
+    assert calificar_caso(dict(caso, nivel_riesgo='alto'), tabla, {}) == ('alto', ['alto', 'alto'])
+    assert calificar_caso(dict(caso, sujetos=[]), TablaResultados(['OFAC']), {}) == ('bajo', [])
+
+
+@pytest.mark.parametrize('politica', [
+    {'umbrales': {'medio': 3, 'alto': 1}},
+    {'umbrales': {'medio': 'uno'}},
+    {'pesos_estado': {'Dudoso': 1}},
+    {'pesos_fuente': {'OFAC': True}},
+])
+def test_politica_invalida(politica):
+    with pytest.raises(ValueError):
+        validar_politica(politica)
+
+
+def test_politica_se_completa_con_la_predeterminada():
+    politica = validar_politica({'pesos_fuente': {'OFAC': 10}})
+    assert politica['pesos_fuente']['OFAC'] == 10
+    assert politica['pesos_fuente']['Infornet'] == politica_default()['pesos_fuente']['Infornet']
+    assert politica['umbrales'] == politica_default()['umbrales']
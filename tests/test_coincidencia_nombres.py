@@ -0,0 +1,59 @@
+import coincidencia_nombres
+from coincidencia_nombres import (IndiceNombres, UMBRAL_SIMILITUD, clave_fonetica, formas_nombre,
+                                  normalizar_nombre, plegar, similitud)
+
+
+def test_plegar_y_normalizar():
+    assert plegar('  PÉREZ, José-Ñúñez ') == 'perez jose nunez'
+    assert normalizar_nombre('José Pérez') == normalizar_nombre('PÉREZ, José') == 'jose perez'
+    assert normalizar_nombre('María de la Cruz') == 'cruz maria'
+    # Un nombre hecho solo de partículas no queda vacío
+    assert normalizar_nombre('De La') == 'de la'
+
+
+def test_claves_foneticas_del_espanol():
+    assert clave_fonetica('vazquez') == clave_fonetica('basquez')
+    assert clave_fonetica('cecilia') == clave_fonetica('sesilia')
+    assert clave_fonetica('hernandez') == clave_fonetica('ernandes')
+    assert clave_fonetica('guillermo') == clave_fonetica('guiyermo')
+    assert clave_fonetica('yolanda') == clave_fonetica('llolanda')
+    assert clave_fonetica('garcia') != clave_fonetica('jarcia')
+    assert clave_fonetica('gerardo') == clave_fonetica('jerardo')
+
+
+def test_formas_y_similitud():
+    ordenada, fonetica, bloques = formas_nombre('Vásquez Héctor')
+    assert ordenada == 'hector vasquez'
+    assert fonetica == 'baskes ektor'
+    assert {'fbaskes', 'pvasq', 'fektor', 'phect'} == bloques
+    assert similitud('Héctor Vásquez', 'Ector Basquez') == 1.0
+    assert similitud('Héctor Vásquez', 'María López') < UMBRAL_SIMILITUD
+
+
+def test_indice_de_nombres():
+    indice = IndiceNombres()
+    for clave, nombre in enumerate(['Juan Pérez López', 'Juana Perez', 'Pedro Ruiz', 'Juan Lopez Perez']):
+        indice.agregar(clave, nombre)
+    encontrados = indice.candidatos('PEREZ LOPEZ, Juan')
+    assert [clave for _, clave in encontrados][:2] == [0, 3]
+    assert encontrados[0][0] == 1.0
+    assert 2 not in [clave for _, clave in encontrados]
+
+    indice.eliminar(0)
+    indice.eliminar(0)
+    assert [clave for _, clave in indice.candidatos('Juan Pérez López')][:1] == [3]
+    assert len(indice) == 3
+    assert indice.candidatos('') == []
+
+
+def test_encuentra_el_parecido_detras_de_muchos_con_los_mismos_bloques(monkeypatch):
+    indice = IndiceNombres()
+    # Comparten todos los bloques con la consulta pero no se parecen lo suficiente
+    for clave in range(350):
+        indice.agregar(clave, 'José López Hernández Wenceslao Bartolomeo')
+    indice.agregar('buscado', 'Jose Lopes Hernandes')
+    assert [clave for _, clave in indice.candidatos('José López Hernández')] == ['buscado']
+
+    # Si la cota deja más candidatos que MAX_COMPARACIONES, van primero los de mejor cota
+    monkeypatch.setattr(coincidencia_nombres, 'MAX_COMPARACIONES', 1)
+    assert indice.candidatos('José López Hernández', umbral=0.5)[0][1] == 'buscado'
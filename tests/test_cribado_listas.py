@@ -0,0 +1,73 @@
+import csv
+
+import pytest
+
+import cribado_listas
+from cribado_listas import ListaIndexada, resultado_cribado
+from modelo_caso import ESTADO_CON_COINCIDENCIAS, ESTADO_PENDIENTE, ESTADO_SIN_COINCIDENCIAS
+
+
+def escribir_lista(ruta, filas):
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['nombre', 'alias', 'identificacion', 'programa'])
+        escritor.writerows(filas)
+    return str(ruta)
+
+
+@pytest.fixture
+def lista_apellido_comun(tmp_path):
+    """Más de MAX_CANDIDATOS entradas con el mismo nombre y apellido antes de la buscada"""
+    filas = [[f'Juan Lopez Hernandez{i}', '', '', 'SDGT'] for i in range(3 * cribado_listas.MAX_CANDIDATOS)]
+    filas.append(['Juan Lopez', 'Juancho Lopez', '0801-1990-12345', 'SDNTK'])
+    with ListaIndexada.abrir(escribir_lista(tmp_path / 'lista.csv', filas)) as lista:
+        yield lista
+
+
+def test_encuentra_entrada_detras_de_muchas_con_el_mismo_apellido(lista_apellido_comun):
+    coincidencias = lista_apellido_comun.buscar('Juan López')
+    assert [c.nombre for c in coincidencias] == ['Juan Lopez']
+    assert coincidencias[0].puntaje == 1.0
+    assert coincidencias.sin_comparar == 0
+
+
+def test_encuentra_por_identificacion_aunque_el_nombre_no_se_parezca(lista_apellido_comun):
+    coincidencias = lista_apellido_comun.buscar('Otro Nombre', '0801199012345')
+    assert coincidencias[0].motivo == 'identificación'
+    assert coincidencias[0].nombre == 'Juan Lopez'
+
+
+def test_informa_los_candidatos_que_no_se_compararon(tmp_path, monkeypatch):
+    filas = [[f'Maria Perez{sufijo}', '', '', 'SDGT'] for sufijo in ('', 'a', 'e', 'i', 'o')]
+    with ListaIndexada.abrir(escribir_lista(tmp_path / 'lista.csv', filas)) as lista:
+        monkeypatch.setattr(cribado_listas, 'MAX_CANDIDATOS', 2)
+        coincidencias = lista.buscar('Maria Perez')
+    assert len(coincidencias) == 2
+    assert coincidencias.sin_comparar == 3
+    texto, estado = resultado_cribado(coincidencias, [])
+    assert estado == ESTADO_CON_COINCIDENCIAS
+    assert 'Revisar manualmente' in texto
+
+
+def test_resultado_no_concluyente_queda_pendiente():
+    texto, estado = resultado_cribado(cribado_listas.Coincidencias(sin_comparar=4), [])
+    assert estado == ESTADO_PENDIENTE
+    assert '4 nombres parecidos' in texto
+
+
+def test_sin_coincidencias(lista_apellido_comun):
+    coincidencias = lista_apellido_comun.buscar('Pedro Martinez')
+    assert not coincidencias and coincidencias.sin_comparar == 0
+    assert resultado_cribado(coincidencias, [lista_apellido_comun])[1] == ESTADO_SIN_COINCIDENCIAS
+
+
+def test_recompila_el_indice_cuando_cambia_la_lista(tmp_path):
+    ruta = escribir_lista(tmp_path / 'lista.csv', [['Ana Gomez', '', '', 'X']])
+    with ListaIndexada.abrir(ruta) as lista:
+        huella = lista.huella
+        assert not lista.buscar('Carlos Ruiz')
+    escribir_lista(ruta, [['Ana Gomez', '', '', 'X'], ['Carlos Ruiz', '', '', 'X']])
+    assert not cribado_listas.indice_vigente(ruta, ruta + cribado_listas.EXTENSION_INDICE)
+    with ListaIndexada.abrir(ruta) as lista:
+        assert lista.huella != huella
+        assert [c.nombre for c in lista.buscar('Carlos Ruiz')] == ['Carlos Ruiz']
@@ -0,0 +1,84 @@
+import json
+import os
+
+import pytest
+
+import generar_lote
+import motor_informes
+
+
+def generar_texto(caso, configuraciones, filename):
+    if caso['id_gestion'] == 'FALLA':
+        raise RuntimeError('generador roto')
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(', '.join(s['nombre'] for s in caso['sujetos']))
+
+
+@pytest.fixture
+def formato_texto(monkeypatch):
+    monkeypatch.setitem(motor_informes.GENERADORES, 'texto', (generar_texto, 'caso_{id}.txt'))
+    return ['texto']
+
+
+def casos():
+    return [{'id_gestion': 'G1', 'sujetos': [{'nombre': 'Ana Paz', 'identificacion': '0801'}]},
+            {'id_gestion': 'MAL', 'sujetos': 'no es una lista'},
+            {'id_gestion': 'FALLA', 'sujetos': [{'nombre': 'Luis Paz', 'identificacion': '0802'}]},
+            {'id_gestion': 'G2', 'sujetos': [{'nombre': 'Eva Paz', 'identificacion': '0803'}]}]
+
+
+def test_procesar_caso_devuelve_el_error():
+    resultado = generar_lote.procesar_caso(2, casos()[1], generar_lote.cargar_configuraciones(None), '.', [])
+    assert resultado['caso'] == 2 and resultado['id_gestion'] == 'MAL'
+    assert resultado['archivos'] == [] and resultado['error'].startswith('AttributeError')
+
+
+@pytest.mark.parametrize('trabajadores', [1, 2])
+def test_un_caso_con_error_no_detiene_el_lote(tmp_path, formato_texto, trabajadores):
+    configuraciones = generar_lote.cargar_configuraciones(None)
+    resultados = generar_lote.procesar_lote(casos(), configuraciones, str(tmp_path), formato_texto,
+                                            trabajadores)
+    assert [r['caso'] for r in resultados] == [1, 2, 3, 4]
+    assert [bool(r['error']) for r in resultados] == [False, True, True, False]
+    assert 'generador roto' in resultados[2]['error']
+    assert sorted(os.listdir(tmp_path)) == ['caso_G1.txt', 'caso_G2.txt']
+
+    ruta = generar_lote.guardar_resumen(resultados, str(tmp_path), trabajadores, 1.0)
+    with open(ruta, encoding='utf-8') as f:
+        resumen = json.load(f)
+    assert (resumen['casos'], resumen['correctos'], resumen['con_error']) == (4, 2, 2)
+    assert resumen['archivos_generados'] == 2
+
+
+def test_main_devuelve_error_si_algun_caso_falla(tmp_path, formato_texto):
+    entrada = tmp_path / 'casos.json'
+    entrada.write_text(json.dumps({'casos': casos()[:2]}), encoding='utf-8')
+    salida = tmp_path / 'salida'
+    assert generar_lote.main([str(entrada), '--salida', str(salida), '--formatos', 'texto',
+                              '--trabajadores', '1', '--config', '']) == 1
+    assert (salida / 'caso_G1.txt').read_text(encoding='utf-8') == 'Ana Paz'
+    assert (salida / 'resumen_lote.json').exists()
+
+
+def test_consolidado_reutiliza_el_cribado(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'lista.csv').write_text('nombre,alias,identificacion,programa\nAna Paz,,,SDN\n', encoding='utf-8')
+    configuraciones = generar_lote.cargar_configuraciones(None)
+    configuraciones['listas_cribado'] = {'OFAC': ['lista.csv']}
+    configuraciones['cache_cribado'] = {'activa': False}
+    (tmp_path / 'config.json').write_text(json.dumps(configuraciones), encoding='utf-8')
+    (tmp_path / 'casos.json').write_text(json.dumps(casos()[:1]), encoding='utf-8')
+
+    buscadas = []
+    buscar = generar_lote.cribado_listas.ListaIndexada.buscar
+    monkeypatch.setattr(generar_lote.cribado_listas.ListaIndexada, 'buscar',
+                        lambda lista, *args: buscadas.append(args) or buscar(lista, *args))
+    assert generar_lote.main(['casos.json', '--formatos', '', '--trabajadores', '1', '--config', 'config.json',
+                              '--cribar', '--consolidado', 'base.xlsx']) == 0
+    assert len(buscadas) == 1
+
+    from openpyxl import load_workbook
+    hoja = load_workbook(tmp_path / 'base.xlsx').active
+    assert any('Posible coincidencia: Ana Paz' in str(celda.value) for celda in hoja[2])
+    with open(tmp_path / 'informes' / 'resumen_lote.json', encoding='utf-8') as f:
+        assert 'cribado' not in json.load(f)['resultados'][0]
@@ -0,0 +1,61 @@
+from importacion_sujetos import clave_duplicado, guardar_rechazados, importar_archivo
+
+
+def escribir_csv(ruta, texto):
+    ruta.write_text(texto, encoding='utf-8-sig')
+    return str(ruta)
+
+
+def test_valida_y_rechaza_con_motivo(tmp_path):
+    ruta = escribir_csv(tmp_path / 'sujetos.csv', '\n'.join([
+        'Nombre Completo;Identificación;Descripción;Gestión',
+        'José Pérez;0801-1990;Socio;G1',
+        ';0801;;G1',
+        'Ana 2;0802;;G1',
+        'Luis Ruiz;;;G1',
+        'Luis Ruiz;08A1;;G1',
+        'María López;0803;;',
+        'Otro Nombre;0801-1990;;G1',
+        'Pedro Sosa;0804;;G2',
+        'Pedro Sosa;0804;;G1',
+    ]))
+    aceptados, rechazados = importar_archivo(ruta, existentes={clave_duplicado('0804', 'G2')},
+                                             filas_por_bloque=3)
+    assert [(s['nombre'], s['id_gestion']) for s in aceptados] == [('José Pérez', 'G1'), ('Pedro Sosa', 'G1')]
+    assert all(s['uid'] for s in aceptados) and aceptados[0]['descripcion'] == 'Socio'
+    assert [(r['fila'], r['motivo']) for r in rechazados] == [
+        (3, 'Nombre vacío'),
+        (4, 'Nombre con caracteres no permitidos'),
+        (5, 'Identificación vacía'),
+        (6, 'Identificación con caracteres no permitidos'),
+        (7, 'Sin ID de gestión'),
+        (8, 'Repetido en el archivo'),
+        (9, 'Ya registrado en la gestión'),
+    ]
+
+    reporte = guardar_rechazados(rechazados, str(tmp_path / 'rechazados.csv'))
+    with open(reporte, encoding='utf-8-sig') as f:
+        assert f.readline().strip() == 'fila,motivo,nombre,identificacion,descripcion,id_gestion'
+        assert len(f.readlines()) == 7
+
+
+def test_id_de_gestion_por_defecto(tmp_path):
+    ruta = escribir_csv(tmp_path / 'sujetos.csv', 'nombre,identificacion,id_gestion\nAna Paz,0801,\nLuis Paz,0802,G9\n')
+    aceptados, rechazados = importar_archivo(ruta, id_gestion_defecto='G1')
+    assert rechazados == []
+    assert [s['id_gestion'] for s in aceptados] == ['G1', 'G9']
+
+
+def test_excel(tmp_path):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    hoja = workbook.active
+    hoja.append(['Nombre', 'Identificacion', 'ID_Gestion', 'Otra'])
+    hoja.append(['Ana Paz', 801, 'G1', 'x'])
+    hoja.append(['Ana Paz', 801, 'G1', 'x'])
+    ruta = str(tmp_path / 'sujetos.xlsx')
+    workbook.save(ruta)
+    aceptados, rechazados = importar_archivo(ruta)
+    assert [(s['nombre'], s['identificacion']) for s in aceptados] == [('Ana Paz', '801')]
+    assert [(r['fila'], r['motivo']) for r in rechazados] == [(3, 'Repetido en el archivo')]
@@ -0,0 +1,75 @@
+import indice_sujetos
+from indice_sujetos import IndiceSujetos
+from modelo_caso import Sujeto
+
+
+def indice_con(*datos):
+    return IndiceSujetos(Sujeto(f'u{numero}', nombre, identificacion, '', gestion)
+                         for numero, (nombre, identificacion, gestion) in enumerate(datos))
+
+
+def test_busqueda_por_subcadena_y_prefijo():
+    indice = indice_con(('Ana Maria López', '0801-1990', 'G-2024-1'),
+                        ('Mariano Ruiz', '0501-1985', 'G-2024-2'),
+                        ('Pedro Ana', '0801-2001', 'H-1'))
+    indice.preparar()
+    assert [s.uid for s in indice.buscar('nombre', 'mari')] == ['u0', 'u1']
+    assert [s.uid for s in indice.buscar('nombre', 'ana', prefijo=True)] == ['u0']
+    assert [s.uid for s in indice.buscar('identificacion', '0801')] == ['u0', 'u2']
+    assert [s.uid for s in indice.buscar('id_gestion', 'g-2024')] == ['u0', 'u1']
+    assert indice.buscar('nombre', 'xyz') == []
+    # Términos de menos de tres letras recorren la lista
+    assert [s.uid for s in indice.buscar('nombre', 'ed')] == ['u2']
+
+
+def test_busqueda_sin_preparar_recorre_la_lista():
+    indice = indice_con(('Ana López', '1', 'G1'), ('Luis Ana', '2', 'G1'))
+    assert [s.uid for s in indice.buscar('nombre', 'ana')] == ['u0', 'u1']
+
+
+def test_eliminar_quita_de_todos_los_indices():
+    indice = indice_con(('Ana López', '0801', 'G1'), ('Ana Lopes', '0802', 'G1'), ('Luis Ana', '0801', 'G2'))
+    indice.preparar()
+    indice.eliminar(indice.por_uid('u0'))
+    indice.eliminar(indice.por_uid('u0') or Sujeto('u0', '', ''))
+    assert len(indice) == 2
+    assert indice.por_uid('u0') is None
+    assert [s.uid for s in indice.por_identificacion('0801')] == ['u2']
+    assert [s.uid for s in indice.por_gestion('G1')] == ['u1']
+    assert [s.uid for s in indice.buscar('nombre', 'ana')] == ['u1', 'u2']
+    assert [s.uid for _, s in indice.similares('Ana López')] == ['u1']
+
+
+def test_reconstruye_al_superar_la_mitad_de_huecos():
+    indice = indice_con(*((f'Sujeto {n}', str(n), 'G1') for n in range(2500)))
+    for numero in range(1250):
+        indice.eliminar(indice.por_uid(f'u{numero}'))
+    assert len(indice._sujetos) == 2500
+    indice.eliminar(indice.por_uid('u1250'))
+    assert len(indice._sujetos) == len(indice) == 1249
+    assert indice.por_uid('u2499').nombre == 'Sujeto 2499'
+    assert [s.uid for s in indice.buscar('identificacion', '2499')] == ['u2499']
+
+
+def test_similares_sin_esperar(monkeypatch):
+    monkeypatch.setattr(indice_sujetos, 'BLOQUE_INDEXADO', 2)
+    indice = indice_con(('José Pérez', '1', 'G1'), ('Maria Gomez', '2', 'G1'), ('Pedro Ruiz', '3', 'G1'))
+    monkeypatch.setattr(indice, 'preparar_en_segundo_plano', lambda: None)
+    assert not indice.listo
+    assert indice.similares('PEREZ, Jose', esperar=False) is None
+    assert [s.uid for _, s in indice.similares('PEREZ, Jose')] == ['u0']
+    assert indice.listo
+    indice.agregar(Sujeto('u9', 'Josefa Pérez', '9'))
+    # Lo agregado después (menos de un bloque) se indexa en el momento
+    assert indice.similares('Josefa Perez', esperar=False)[0][1].uid == 'u9'
+
+
+def test_busqueda_aproximada_no_espera_el_indice(monkeypatch):
+    monkeypatch.setattr(indice_sujetos, 'BLOQUE_INDEXADO', 2)
+    indice = indice_con(('José Pérez', '1', 'G1'), ('Maria Gomez', '2', 'G1'), ('Jose Perez Ruiz', '3', 'G1'))
+    monkeypatch.setattr(indice, 'preparar_en_segundo_plano', lambda: None)
+    # Sin el índice de nombres, por subcadena
+    assert [s.uid for s in indice.buscar('nombre_aproximado', 'jose')] == ['u2']
+    assert not indice.listo
+    indice.preparar()
+    assert [s.uid for s in indice.buscar('nombre_aproximado', 'PEREZ, José')][:1] == ['u0']
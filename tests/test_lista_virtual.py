@@ -0,0 +1,131 @@
+import lista_virtual
+from lista_virtual import ListaVirtual
+
+
+class ArbolFalso:
+    """Lo justo de ttk.Treeview para dibujar, con registro de altas y bajas"""
+
+    def __init__(self):
+        self.filas = {}
+        self.hijos = ()
+        self.insertados = []
+        self.borrados = []
+        self.seleccion = ()
+        self.foco = None
+
+    def insert(self, padre, posicion, iid, values):
+        self.filas[iid] = values
+        self.hijos += (iid,)
+        self.insertados.append(iid)
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.filas[iid]
+        self.hijos = tuple(iid for iid in self.hijos if iid not in iids)
+        self.borrados.extend(iids)
+
+    def get_children(self):
+        return self.hijos
+
+    def set_children(self, padre, *iids):
+        self.hijos = iids
+
+    def item(self, iid, values):
+        self.filas[iid] = values
+
+    def selection(self):
+        return self.seleccion
+
+    def selection_set(self, iid):
+        self.seleccion = (iid,)
+
+    def focus(self, iid):
+        self.foco = iid
+
+
+class BarraFalsa:
+    def set(self, primero, ultimo):
+        self.posicion = (primero, ultimo)
+
+
+def _lista(filas_visibles=5):
+    lista = object.__new__(ListaVirtual)
+    lista.valores_fila = lambda registro: (registro['nombre'],)
+    lista.clave_fila = lambda registro: registro['uid']
+    lista.datos = []
+    lista.inicio = 0
+    lista.filas_visibles = filas_visibles
+    lista._visibles = {}
+    lista._clave_seleccionada = None
+    lista._alto_fila = lista_virtual.ALTO_FILA_INICIAL
+    lista._alto_encabezado = lista_virtual.ALTO_ENCABEZADO_INICIAL
+    lista.tree = ArbolFalso()
+    lista.barra = BarraFalsa()
+    return lista
+
+
+def _registros(cantidad):
+    return [{'uid': f'u{n}', 'nombre': f'Sujeto {n}'} for n in range(cantidad)]
+
+
+def test_solo_la_ventana_visible_esta_en_el_arbol():
+    lista = _lista(5)
+    datos = _registros(100)
+    lista.establecer_datos(datos)
+    assert lista.tree.get_children() == ('u0', 'u1', 'u2', 'u3', 'u4')
+    assert lista.barra.posicion == (0.0, 0.05)
+    lista.establecer_datos(datos, al_final=True)
+    assert lista.inicio == 95
+    assert lista.tree.get_children() == tuple(f'u{n}' for n in range(95, 100))
+    assert lista.registro('u97') is datos[97] and lista.registro('u0') is None
+
+
+def test_desplazar_solo_toca_las_filas_que_cambian():
+    lista = _lista(5)
+    lista.establecer_datos(_registros(100))
+    lista.tree.insertados.clear()
+    lista._mover(2)
+    assert lista.tree.borrados == ['u0', 'u1']
+    assert lista.tree.insertados == ['u5', 'u6']
+    assert lista.tree.get_children() == ('u2', 'u3', 'u4', 'u5', 'u6')
+    lista._mover(-50)
+    assert lista.inicio == 0
+    lista._desplazar_barra('moveto', '0.5')
+    assert lista.tree.get_children()[0] == 'u50'
+
+
+def test_quitar_redibuja_sin_reinsertar_las_filas_que_siguen():
+    lista = _lista(3)
+    datos = _registros(10)
+    lista.establecer_datos(datos)
+    lista.tree.insertados.clear()
+    lista.quitar(datos[1])
+    assert lista.tree.borrados == ['u1']
+    assert lista.tree.insertados == ['u3']
+    assert lista.tree.get_children() == ('u0', 'u2', 'u3')
+    assert len(lista.datos) == 9
+
+
+def test_lista_vacia_y_mas_corta_que_la_ventana():
+    lista = _lista(5)
+    lista.establecer_datos(_registros(3))
+    assert lista.tree.get_children() == ('u0', 'u1', 'u2')
+    assert lista.barra.posicion == (0.0, 1.0)
+    lista.establecer_datos([])
+    assert lista.tree.get_children() == ()
+    assert lista.barra.posicion == (0.0, 1.0)
+
+
+def test_mover_seleccion_desplaza_la_ventana():
+    lista = _lista(3)
+    lista.establecer_datos(_registros(10))
+    lista._mover_seleccion(1)
+    assert lista.tree.selection() == ('u0',)
+    for _ in range(4):
+        lista.tree.seleccion = (lista._clave_seleccionada,)
+        lista._mover_seleccion(1)
+    assert lista._clave_seleccionada == 'u4' and lista.tree.foco == 'u4'
+    assert lista.tree.get_children() == ('u2', 'u3', 'u4')
+    lista._mover_seleccion(len(lista.datos))
+    assert lista._clave_seleccionada == 'u9'
+    assert lista.tree.get_children() == ('u7', 'u8', 'u9')
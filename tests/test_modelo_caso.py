@@ -0,0 +1,81 @@
+import modelo_caso
+from modelo_caso import (ESTADO_CON_COINCIDENCIAS, ListaSujetos, Sujeto, TablaResultados,
+                         fecha_desde_texto)
+
+
+def _sujetos(cantidad):
+    return [Sujeto(f'u{n}', f'Sujeto {n}', f'{n:04d}') for n in range(cantidad)]
+
+
+def test_lista_sujetos_indices_y_porciones(monkeypatch):
+    monkeypatch.setattr(modelo_caso, 'TAMANO_TRAMO', 4)
+    sujetos = _sujetos(11)
+    lista = ListaSujetos(sujetos)
+    assert len(lista) == 11
+    assert list(lista) == sujetos
+    assert lista[0] is sujetos[0] and lista[-1] is sujetos[-1] and lista[6] is sujetos[6]
+    assert lista[3:9] == sujetos[3:9]
+    assert lista[9:50] == sujetos[9:]
+    assert lista[::3] == sujetos[::3]
+
+
+def test_lista_sujetos_quitar_por_uid(monkeypatch):
+    monkeypatch.setattr(modelo_caso, 'TAMANO_TRAMO', 4)
+    sujetos = _sujetos(9)
+    lista = ListaSujetos(sujetos)
+    for uid in ('u5', 'u4', 'u6', 'u7', 'u0'):
+        assert lista.quitar(uid).uid == uid
+    assert lista.quitar('u5') is None
+    restantes = [s for s in sujetos if s.uid in ('u1', 'u2', 'u3', 'u8')]
+    assert list(lista) == restantes
+    assert lista[0:4] == restantes and lista[3] is sujetos[8]
+    assert sujetos[4] not in lista and sujetos[8] in lista
+    lista.append(sujetos[4])
+    assert lista[-1] is sujetos[4] and len(lista) == 5
+    lista.clear()
+    assert not lista and list(lista) == []
+
+
+def test_lista_sujetos_indices_tras_quitar_y_agregar(monkeypatch):
+    monkeypatch.setattr(modelo_caso, 'TAMANO_TRAMO', 4)
+    sujetos = _sujetos(30)
+    lista = ListaSujetos(sujetos[:20])
+    esperado = sujetos[:20]
+    for paso, uid in enumerate(('u2', 'u9', 'u10', 'u11', 'u8', 'u0', 'u19')):
+        lista.quitar(uid)
+        esperado = [s for s in esperado if s.uid != uid]
+        lista.append(sujetos[20 + paso])
+        esperado.append(sujetos[20 + paso])
+        assert [lista[n] for n in range(len(lista))] == esperado
+        assert lista[5:len(lista)] == esperado[5:]
+        assert lista[-1] is esperado[-1]
+
+
+def test_valor_comun_distinto_del_defecto():
+    tabla = TablaResultados(['OFAC', 'ONU'])
+    for uid in ('a', 'b', 'c'):
+        tabla.establecer(tabla.fila(uid, crear=True), 'OFAC', texto='Revisado', estado=ESTADO_CON_COINCIDENCIAS)
+    tabla.establecer(tabla.fila('a'), 'OFAC', fecha=fecha_desde_texto('01/02/2024'))
+    assert tabla.valor_comun('OFAC') == ('Revisado', ESTADO_CON_COINCIDENCIAS, None)
+    assert tabla.valor_comun('OFAC', sujetos=3) == ('Revisado', ESTADO_CON_COINCIDENCIAS, None)
+    assert tabla.valor_comun('ONU', sujetos=3) == tabla.defectos['ONU']
+    # Un cuarto sujeto sin fila tiene los valores por defecto
+    assert tabla.valor_comun('OFAC', sujetos=4) == (None, None, None)
+
+
+def test_valor_comun_sin_filas():
+    tabla = TablaResultados(['OFAC'])
+    tabla.establecer_columna('OFAC', texto='Sin registros')
+    assert tabla.valor_comun('OFAC', sujetos=10) == tabla.defectos['OFAC']
+    assert tabla.valor_comun('OFAC')[0] == 'Sin registros'
+
+
+def test_quitar_sujeto_mueve_la_ultima_fila():
+    tabla = TablaResultados(['OFAC'])
+    for uid in ('a', 'b', 'c'):
+        tabla.establecer(tabla.fila(uid, crear=True), 'OFAC', texto=f'texto {uid}')
+    tabla.quitar_sujeto('a')
+    tabla.quitar_sujeto('x')
+    assert tabla.uids == ['c', 'b']
+    assert tabla.resultado(tabla.fila('c'), 'OFAC').resultado == 'texto c'
+    assert tabla.fila('a') is None and len(tabla) == 2
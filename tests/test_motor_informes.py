@@ -0,0 +1,198 @@
+import os
+import threading
+import zipfile
+
+import pytest
+from docx import Document
+from openpyxl import load_workbook
+
+import datos_informe
+import motor_informes
+from motor_informes import (COLOR_FILA_ALTERNA, ESTILO_ETIQUETA, ESTILO_TABLA, ESTILO_TABLA_ENCABEZADO,
+                            ESTILO_TITULO, GeneracionCancelada, HOJA_INDICE, MARCA_DATOS, anchos_columnas,
+                            clonar_prototipo_word, construir_prototipo_word, construir_tabla_apa,
+                            empaquetar_zip, generar_en_paralelo, generar_excel_completo,
+                            generar_excel_pestanas, generar_excel_streaming, generar_word,
+                            nombres_hojas_unicos)
+
+
+def _caso(cantidad=3, **datos):
+    datos.setdefault('id_gestion', 'G1')
+    datos.setdefault('sujetos', [{'nombre': f'sujeto {n}', 'identificacion': f'{n:04d}'}
+                                 for n in range(cantidad)])
+    return datos_informe.caso_desde_dict(datos, datos_informe.configuraciones_default())
+
+
+def test_clon_del_prototipo_igual_a_uno_nuevo(monkeypatch):
+    monkeypatch.setattr(motor_informes, '_prototipos_word', {})
+    plantilla = datos_informe.plantilla_default()
+    construidos = []
+    construir = motor_informes.construir_prototipo_word
+    monkeypatch.setattr(motor_informes, 'construir_prototipo_word',
+                        lambda *args: construidos.append(args) or construir(*args))
+
+    primero = clonar_prototipo_word(plantilla, 'Informe')
+    primero.paragraphs[1].text = 'modificado'
+    segundo = clonar_prototipo_word(plantilla, 'Informe')
+    assert len(construidos) == 1
+    assert segundo.element.xml == construir_prototipo_word(plantilla, 'Informe').element.xml
+    assert segundo.paragraphs[1].text == MARCA_DATOS
+
+    clonar_prototipo_word(dict(plantilla, analista='Otra Persona'), 'Informe')
+    clonar_prototipo_word(plantilla, 'Otro título')
+    assert len(construidos) == 3
+
+
+def test_informe_word_usa_estilos_apa_con_nombre(tmp_path):
+    archivo = generar_word(_caso(), datos_informe.configuraciones_default(), str(tmp_path / 'informe.docx'))
+    doc = Document(archivo)
+    nombres = {estilo.name for estilo in doc.styles}
+    assert {motor_informes.ESTILO_TEXTO, motor_informes.ESTILO_DATO, motor_informes.ESTILO_TABLA,
+            ESTILO_ETIQUETA} <= nombres
+    assert doc.styles[ESTILO_TITULO].font.name == 'Times New Roman'
+    assert doc.styles[ESTILO_TITULO].font.bold
+
+    assert doc.paragraphs[0].style.name == ESTILO_TITULO
+    assert all(p.style.name.startswith('APA ') for p in doc.paragraphs)
+    # El formato viene de los estilos, no de cada run
+    runs = [run for p in doc.paragraphs for run in p.runs]
+    assert not any(run.font.name or run.font.size or run.bold for run in runs)
+    assert any(run.style.name == ESTILO_ETIQUETA for run in runs)
+    assert not any(p.text.startswith('{{') for p in doc.paragraphs)
+
+
+def test_tabla_apa_desde_xml():
+    doc = Document()
+    motor_informes.registrar_estilos_apa(doc)
+    filas = [('Ana & Paz', '<0801>', ''), ('Luis\x07 Paz', '0802', 'Proveedor')]
+    tabla = construir_tabla_apa(doc, ['Nombre', 'Identificación', 'Descripción'], filas)
+    doc.element.body.append(tabla._tbl)
+
+    assert tabla.style.name == 'Light Grid'
+    assert [[celda.text for celda in fila.cells] for fila in tabla.rows] == [
+        ['Nombre', 'Identificación', 'Descripción'],
+        ['Ana & Paz', '<0801>', ''],
+        ['Luis Paz', '0802', 'Proveedor']]
+    assert tabla.rows[0].cells[0].paragraphs[0].style.name == ESTILO_TABLA_ENCABEZADO
+    assert tabla.rows[2].cells[2].paragraphs[0].style.name == ESTILO_TABLA
+    assert len(tabla.columns) == 3
+
+
+def test_tablas_del_informe_word(tmp_path):
+    caso = _caso(4)
+    archivo = generar_word(caso, datos_informe.configuraciones_default(), str(tmp_path / 'informe.docx'))
+    sujetos, resultados = Document(archivo).tables[:2]
+    assert len(sujetos.rows) == 5
+    assert [celda.text for celda in sujetos.rows[4].cells] == ['Sujeto 3', '0003', '', 'G1']
+    # Los cuatro sujetos comparten resultado: una fila por fuente
+    fuentes = datos_informe.configuraciones_default()['fuentes_investigacion']
+    assert [fila.cells[0].text for fila in resultados.rows[1:]] == fuentes
+    assert {fila.cells[1].text for fila in resultados.rows[1:]} == {'Todos'}
+
+
+def test_excel_streaming_escribe_todos_los_casos(tmp_path):
+    configuraciones = datos_informe.configuraciones_default()
+    casos = [_caso(3, id_gestion='G1'), _caso(2, id_gestion='G2')]
+    archivo = generar_excel_streaming(casos, configuraciones, str(tmp_path / 'base.xlsx'), muestra_anchos=2)
+    libro = load_workbook(archivo)
+    hoja = libro.active
+    assert hoja.max_row == 6
+    assert [fila[0] for fila in hoja.iter_rows(min_row=2, values_only=True)] == ['G1'] * 3 + ['G2'] * 2
+    assert [celda.value for celda in hoja[1]] == motor_informes.columnas_excel_completo(configuraciones)
+    assert {'DD Encabezado', 'DD Datos'} <= set(libro.named_styles)
+    assert hoja['A1'].style == 'DD Encabezado' and hoja['G6'].style == 'DD Datos'
+    assert hoja.freeze_panes == 'A2'
+
+
+def test_anchos_columnas_entre_12_y_50():
+    filas = [('a', 'x' * 80, None, 7), ('bb', '', None, 123456789012345)]
+    assert anchos_columnas(filas, ['ID', 'Texto largo', 'Encabezado bastante largo', 'N']) == [12, 50, 27, 17]
+    assert anchos_columnas([], ['ID']) == [12]
+
+
+def test_excel_completo_con_bandas_en_una_regla(tmp_path):
+    archivo = generar_excel_completo(_caso(5), datos_informe.configuraciones_default(),
+                                     str(tmp_path / 'base.xlsx'), streaming=False)
+    hoja = load_workbook(archivo).active
+    reglas = list(hoja.conditional_formatting)
+    assert len(reglas) == 1
+    assert str(reglas[0].sqref) == f'A2:{hoja.cell(1, hoja.max_column).column_letter}6'
+    assert reglas[0].rules[0].formula == ['MOD(ROW(),2)=1']
+    assert reglas[0].rules[0].dxf.fill.bgColor.rgb.endswith(COLOR_FILA_ALTERNA)
+    # Sin relleno directo en las celdas
+    assert all(celda.fill.fill_type is None for fila in hoja.iter_rows(min_row=2) for celda in fila)
+    assert hoja.column_dimensions['G'].width == 12
+
+
+def test_nombres_hojas_unicos_y_validos():
+    nombres = ['Ana Paz', 'ANA PAZ', 'a/b:c', 'x' * 40, 'x' * 40, HOJA_INDICE, 'History', ' ']
+    assert nombres_hojas_unicos(nombres, reservados=[HOJA_INDICE]) == [
+        'Ana Paz', 'ANA PAZ (2)', 'a_b_c', 'x' * 31, 'x' * 27 + ' (2)', 'Índice (2)', 'History (2)', 'Sujeto']
+
+
+def test_excel_pestanas_con_una_hoja_por_sujeto(tmp_path):
+    sujetos = [{'nombre': nombre, 'identificacion': f'{n:04d}'}
+               for n, nombre in enumerate(['ana paz', 'ANA PAZ', 'índice', 'x' * 40, 'x' * 40])]
+    archivo = generar_excel_pestanas(_caso(sujetos=sujetos), datos_informe.configuraciones_default(),
+                                     str(tmp_path / 'pestanas.xlsx'))
+    libro = load_workbook(archivo)
+    assert libro.sheetnames == [HOJA_INDICE, 'ana paz', 'ANA PAZ (2)', 'índice (2)', 'x' * 31, 'x' * 27 + ' (2)']
+    assert len({nombre.casefold() for nombre in libro.sheetnames}) == len(libro.sheetnames)
+
+    indice = libro[HOJA_INDICE]
+    enlaces = [fila[1] for fila in indice.iter_rows(min_row=10, values_only=True)]
+    assert enlaces[1] == '=HYPERLINK("#\'ANA PAZ (2)\'!A1","Ana Paz")'
+    hoja = libro['índice (2)']
+    assert hoja['B2'].value == 'Índice' and hoja['A1'].style == 'DD Encabezado'
+
+
+def test_progreso_de_la_generacion_word(tmp_path, monkeypatch):
+    monkeypatch.setattr(motor_informes, 'AVISAR_CADA', 2)
+    avisos = []
+    generar_word(_caso(5), datos_informe.configuraciones_default(), str(tmp_path / 'informe.docx'),
+                 progreso=lambda *aviso: avisos.append(aviso))
+    assert [hecho for hecho, _, _ in avisos] == sorted(hecho for hecho, _, _ in avisos)
+    assert {total for _, total, _ in avisos} == {8}
+    assert avisos[-1] == (7, 8, 'Guardando')
+
+
+def test_cancelar_desde_el_progreso(tmp_path):
+    def progreso(hecho, total, etapa):
+        if hecho >= 1:
+            raise GeneracionCancelada()
+
+    with pytest.raises(GeneracionCancelada):
+        generar_excel_pestanas(_caso(3), datos_informe.configuraciones_default(),
+                               str(tmp_path / 'pestanas.xlsx'), progreso=progreso)
+    assert not (tmp_path / 'pestanas.xlsx').exists()
+
+
+@pytest.mark.parametrize('procesadores', [1, 2])
+def test_generar_en_paralelo_todos_los_documentos(tmp_path, monkeypatch, procesadores):
+    monkeypatch.setattr(os, 'cpu_count', lambda: procesadores)
+    destinos = {tipo: str(tmp_path / patron.format(id='G1'))
+                for tipo, (_, patron) in motor_informes.GENERADORES.items()}
+    avisos = []
+    terminados = list(generar_en_paralelo(_caso(), datos_informe.configuraciones_default(), destinos,
+                                          progreso=lambda tipo, *aviso: avisos.append(tipo)))
+    assert sorted(terminados) == sorted((tipo, archivo, None) for tipo, archivo in destinos.items())
+    assert set(avisos) == set(destinos)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(a) for a in destinos.values())
+
+    paquete = empaquetar_zip(list(destinos.values()), str(tmp_path / 'G1.zip'))
+    with zipfile.ZipFile(paquete) as zip_:
+        assert sorted(zip_.namelist()) == sorted(os.path.basename(a) for a in destinos.values())
+
+
+def test_cancelar_generar_en_paralelo_no_deja_archivos(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, 'cpu_count', lambda: 1)
+    existente = tmp_path / 'informe.docx'
+    existente.write_bytes(b'anterior')
+    destinos = {'word': str(existente), 'pestanas': str(tmp_path / 'pestanas.xlsx')}
+    cancelar = threading.Event()
+    cancelar.set()
+    with pytest.raises(GeneracionCancelada):
+        list(generar_en_paralelo(_caso(), datos_informe.configuraciones_default(), destinos,
+                                 cancelar=cancelar))
+    assert os.listdir(tmp_path) == ['informe.docx']
+    assert existente.read_bytes() == b'anterior'